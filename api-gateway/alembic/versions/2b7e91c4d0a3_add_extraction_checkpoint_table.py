@@ -0,0 +1,56 @@
+"""add_extraction_checkpoint_table
+
+Revision ID: 2b7e91c4d0a3
+Revises: d952812cd1d6, f8d4d2f6244a
+Create Date: 2026-10-18 21:00:00.000000
+
+Durable per-stage checkpoints for report extraction (resume on retry).
+Also merges the two existing heads.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = "2b7e91c4d0a3"
+down_revision: Union[str, Sequence[str], None] = ("d952812cd1d6", "f8d4d2f6244a")
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "extraction_checkpoint",
+        sa.Column("id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("report_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("stage", sa.String(length=20), nullable=False),
+        sa.Column("group_index", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column(
+            "payload",
+            postgresql.JSONB(astext_type=sa.Text()),
+            nullable=False,
+            server_default=sa.text("'{}'::jsonb"),
+        ),
+        sa.Column(
+            "created_at",
+            postgresql.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.CheckConstraint(
+            "stage IN ('IMAGES_STORED', 'GROUPS_BUILT', 'GROUP_PARSED', 'METRICS_SAVED')",
+            name="extraction_checkpoint_stage_check",
+        ),
+        sa.ForeignKeyConstraint(["report_id"], ["report.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "report_id", "stage", "group_index", name="extraction_checkpoint_stage_unique"
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("extraction_checkpoint")
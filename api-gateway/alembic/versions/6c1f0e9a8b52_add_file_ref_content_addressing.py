@@ -0,0 +1,37 @@
+"""add_file_ref_content_addressing
+
+Revision ID: 6c1f0e9a8b52
+Revises: 2b7e91c4d0a3
+Create Date: 2026-10-18 22:00:00.000000
+
+Content hash and reference count on file_ref (deduplicated uploads and images).
+Existing rows keep sha256 NULL and start with ref_count = 1.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "6c1f0e9a8b52"
+down_revision: Union[str, Sequence[str], None] = "2b7e91c4d0a3"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("file_ref", sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.add_column(
+        "file_ref",
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="1"),
+    )
+    op.create_check_constraint("file_ref_ref_count_check", "file_ref", "ref_count >= 0")
+    op.create_index("idx_file_ref_sha256", "file_ref", ["sha256"], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index("idx_file_ref_sha256", table_name="file_ref")
+    op.drop_constraint("file_ref_ref_count_check", "file_ref", type_="check")
+    op.drop_column("file_ref", "ref_count")
+    op.drop_column("file_ref", "sha256")
@@ -0,0 +1,28 @@
+"""add_file_ref_etag
+
+Revision ID: 9a4d2c7e1f36
+Revises: 6c1f0e9a8b52
+Create Date: 2026-10-18 23:00:00.000000
+
+Persisted download ETag on file_ref. Legacy rows stay NULL and are filled
+lazily on their first download.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "9a4d2c7e1f36"
+down_revision: Union[str, Sequence[str], None] = "6c1f0e9a8b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("file_ref", sa.Column("etag", sa.String(length=64), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("file_ref", "etag")
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Benchmark of Vision payload encodings on real report images.
+
+Builds the same vertical canvases as MetricExtractionService (one canvas per
+images directory, e.g. storage/reports/<participant>/<report>/images) and
+compares every candidate format of AdaptiveImageEncoder: payload size, encode
+time, PSNR and whether the candidate passes the encoder constraints.
+
+Usage:
+    python -m app.cli.benchmark_image_encoding /app/storage/reports
+    python -m app.cli.benchmark_image_encoding ./tmp_images --per-image --json out.json
+"""
+
+import argparse
+import json
+import statistics
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+from PIL import Image
+
+from app.services.image_encoding import FORMAT_PNG, AdaptiveImageEncoder
+
+IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".emf", ".gif", ".bmp"}
+IMAGE_PADDING = 20
+MAX_CANVAS_WIDTH = 4000
+
+
+def collect_image_sets(root: Path, per_image: bool) -> dict[str, list[Path]]:
+    """Group image files by parent directory (one canvas per directory)."""
+    sets: dict[str, list[Path]] = defaultdict(list)
+    for path in sorted(root.rglob("*")):
+        if path.suffix.lower() not in IMAGE_SUFFIXES or not path.is_file():
+            continue
+        key = str(path) if per_image else str(path.parent)
+        sets[key].append(path)
+    return dict(sets)
+
+
+def build_canvas(paths: list[Path]) -> Image.Image:
+    """Stack images vertically the way the extraction service does."""
+    images = []
+    for path in paths:
+        with Image.open(path) as img:
+            images.append(img.convert("RGB"))
+
+    target_width = min(max(img.width for img in images), MAX_CANVAS_WIDTH)
+    normalized = []
+    for img in images:
+        if img.width != target_width:
+            new_height = int(target_width * img.height / img.width)
+            img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+        normalized.append(img)
+
+    height = sum(img.height for img in normalized) + IMAGE_PADDING * (len(normalized) - 1)
+    canvas = Image.new("RGB", (target_width, height), (255, 255, 255))
+    y_offset = 0
+    for img in normalized:
+        canvas.paste(img, ((target_width - img.width) // 2, y_offset))
+        y_offset += img.height + IMAGE_PADDING
+    return canvas
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("root", type=Path, help="Directory with report images")
+    parser.add_argument(
+        "--per-image", action="store_true", help="Benchmark each image instead of canvases"
+    )
+    parser.add_argument("--max-mb", type=float, default=20.0, help="Payload size limit")
+    parser.add_argument("--budget-ms", type=float, default=1500.0, help="Encode-time budget")
+    parser.add_argument("--json", type=Path, default=None, help="Write raw results to file")
+    args = parser.parse_args()
+
+    image_sets = collect_image_sets(args.root, args.per_image)
+    if not image_sets:
+        print(f"No images found under {args.root}", file=sys.stderr)
+        return 1
+
+    encoder = AdaptiveImageEncoder(
+        max_bytes=int(args.max_mb * 1024 * 1024), time_budget_ms=args.budget_ms
+    )
+
+    rows = []
+    sizes: dict[str, list[int]] = defaultdict(list)
+    times: dict[str, list[float]] = defaultdict(list)
+    selected_counts: dict[str, int] = defaultdict(int)
+    baseline_total = 0
+    selected_total = 0
+
+    for name, paths in image_sets.items():
+        canvas = build_canvas(paths)
+        results = encoder.encode_all(canvas)
+        selected = encoder.encode(canvas)
+
+        for result in results:
+            sizes[result.format].append(result.size_bytes)
+            times[result.format].append(result.encode_ms)
+            rows.append(
+                {
+                    "canvas": name,
+                    "images": len(paths),
+                    **result.as_report(),
+                    "psnr_db": result.psnr_db,
+                    "acceptable": encoder.is_acceptable(result),
+                    "selected": selected is not None and selected.format == result.format,
+                }
+            )
+            if result.format == FORMAT_PNG:
+                baseline_total += result.size_bytes
+        if selected is not None:
+            selected_counts[selected.format] += 1
+            selected_total += selected.size_bytes
+
+    print(f"Canvases: {len(image_sets)}")
+    print(f"{'format':<16}{'mean KB':>12}{'median ms':>12}{'p95 ms':>10}{'selected':>10}")
+    for fmt in encoder.candidates:
+        if not sizes[fmt]:
+            continue
+        fmt_times = sorted(times[fmt])
+        p95 = fmt_times[min(len(fmt_times) - 1, int(len(fmt_times) * 0.95))]
+        print(
+            f"{fmt:<16}{statistics.mean(sizes[fmt]) / 1024:>12.1f}"
+            f"{statistics.median(fmt_times):>12.1f}{p95:>10.1f}{selected_counts[fmt]:>10}"
+        )
+    if baseline_total:
+        saved = 100 * (1 - selected_total / baseline_total)
+        print(
+            f"Total PNG: {baseline_total / 1024:.1f} KB, "
+            f"adaptive: {selected_total / 1024:.1f} KB ({saved:.1f}% smaller)"
+        )
+
+    if args.json:
+        args.json.write_text(json.dumps(rows, indent=2, ensure_ascii=False), encoding="utf-8")
+        print(f"Raw results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark for the report upload path.
+
+Runs N parallel uploads and, at the same time, probes how responsive the
+event loop stays. Two modes:
+
+- storage: in-process LocalReportStorage.save_report calls; the probe measures
+  event-loop lag (how late a 10 ms sleep wakes up)
+- http: real POST /api/participants/{id}/reports requests against a running
+  API; the probe measures GET /api/healthz latency on the same server
+
+Usage:
+    python -m app.cli.benchmark_upload storage --size-mb 10 --concurrency 8
+    python -m app.cli.benchmark_upload http --url http://localhost:9187 \\
+        --participant-id <uuid> --cookie access_token=<jwt> --concurrency 8
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+import httpx
+from fastapi import UploadFile
+
+from app.services.storage import LocalReportStorage
+
+PROBE_INTERVAL_S = 0.01
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def print_summary(title: str, values_ms: list[float]) -> None:
+    if not values_ms:
+        print(f"{title}: no samples")
+        return
+    print(
+        f"{title}: n={len(values_ms)} p50={statistics.median(values_ms):.1f}ms "
+        f"p95={percentile(values_ms, 0.95):.1f}ms max={max(values_ms):.1f}ms"
+    )
+
+
+async def probe_loop_lag(stop: asyncio.Event, samples: list[float]) -> None:
+    """Record how much later than requested a short sleep returns."""
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL_S)
+        samples.append((time.perf_counter() - started - PROBE_INTERVAL_S) * 1000)
+
+
+async def run_storage(args: argparse.Namespace, payload: bytes) -> None:
+    with tempfile.TemporaryDirectory() as base:
+        storage = LocalReportStorage(base)
+        stop = asyncio.Event()
+        lag: list[float] = []
+        durations: list[float] = []
+
+        async def upload(index: int) -> None:
+            started = time.perf_counter()
+            await storage.save_report(
+                UploadFile(file=BytesIO(payload), filename="original.docx"),
+                f"reports/bench/{index}/original.docx",
+                len(payload),
+            )
+            durations.append((time.perf_counter() - started) * 1000)
+
+        probe = asyncio.create_task(probe_loop_lag(stop, lag))
+        started = time.perf_counter()
+        for offset in range(0, args.uploads, args.concurrency):
+            batch = range(offset, min(offset + args.concurrency, args.uploads))
+            await asyncio.gather(*(upload(i) for i in batch))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe
+
+    report_throughput(args, payload, elapsed)
+    print_summary("upload", durations)
+    print_summary("event-loop lag", lag)
+
+
+async def run_http(args: argparse.Namespace, payload: bytes) -> None:
+    if not args.participant_id:
+        raise SystemExit("--participant-id is required in http mode")
+    cookies = dict(item.split("=", 1) for item in args.cookie or [])
+    headers = {"Authorization": f"Bearer {args.token}"} if args.token else {}
+    upload_url = f"{args.url.rstrip('/')}/api/participants/{args.participant_id}/reports"
+    probe_url = f"{args.url.rstrip('/')}/api/healthz"
+
+    async with httpx.AsyncClient(cookies=cookies, headers=headers, timeout=120) as client:
+        stop = asyncio.Event()
+        probe_latency: list[float] = []
+        durations: list[float] = []
+        statuses: dict[int, int] = {}
+
+        async def probe() -> None:
+            while not stop.is_set():
+                started = time.perf_counter()
+                await client.get(probe_url)
+                probe_latency.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(PROBE_INTERVAL_S)
+
+        async def upload(index: int) -> None:
+            started = time.perf_counter()
+            response = await client.post(
+                upload_url, files={"file": (f"bench-{index}.docx", payload, DOCX_MIME)}
+            )
+            durations.append((time.perf_counter() - started) * 1000)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        probe_task = asyncio.create_task(probe())
+        started = time.perf_counter()
+        for offset in range(0, args.uploads, args.concurrency):
+            batch = range(offset, min(offset + args.concurrency, args.uploads))
+            await asyncio.gather(*(upload(i) for i in batch))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    report_throughput(args, payload, elapsed)
+    print(f"status codes: {statuses}")
+    print_summary("upload", durations)
+    print_summary("healthz during uploads", probe_latency)
+
+
+def report_throughput(args: argparse.Namespace, payload: bytes, elapsed: float) -> None:
+    total_mb = len(payload) * args.uploads / (1024 * 1024)
+    print(
+        f"{args.uploads} uploads x {len(payload) / (1024 * 1024):.1f} MB, "
+        f"concurrency {args.concurrency}: {elapsed:.2f}s ({total_mb / elapsed:.1f} MB/s)"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("mode", choices=("storage", "http"))
+    parser.add_argument("--size-mb", type=float, default=10.0, help="Payload size per upload")
+    parser.add_argument("--uploads", type=int, default=16, help="Total number of uploads")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel uploads")
+    parser.add_argument("--url", default="http://localhost:9187", help="API base URL (http)")
+    parser.add_argument("--participant-id", default=None, help="Target participant (http)")
+    parser.add_argument("--token", default=None, help="Bearer token (http)")
+    parser.add_argument(
+        "--cookie", action="append", default=None, help="Cookie name=value (http, repeatable)"
+    )
+    args = parser.parse_args()
+
+    # Random bytes: incompressible and unique, so content dedup does not kick in
+    payload = os.urandom(int(args.size_mb * 1024 * 1024))
+    runner = run_storage if args.mode == "storage" else run_http
+    asyncio.run(runner(args, payload))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
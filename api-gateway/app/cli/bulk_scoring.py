@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Score a whole cohort against every professional activity.
+
+Runs BulkScoringService (vectorized scores, one bulk insert) against the
+database from POSTGRES_DSN and prints the summary as JSON.
+
+Usage:
+    python -m app.cli.bulk_scoring
+    python -m app.cli.bulk_scoring --activity DEVELOPER --activity ANALYST
+    python -m app.cli.bulk_scoring --participant-id <uuid> --enqueue-recommendations
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from uuid import UUID
+
+from app.db.session import AsyncSessionLocal, engine
+from app.services.bulk_scoring import BulkScoringService
+
+
+async def run(args: argparse.Namespace) -> dict:
+    try:
+        async with AsyncSessionLocal() as session:
+            summary = await BulkScoringService(session).score_all(
+                participant_ids=args.participant_id,
+                activity_codes=args.activity,
+                enqueue_recommendations=args.enqueue_recommendations,
+            )
+    finally:
+        await engine.dispose()
+    return summary.as_dict()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--participant-id",
+        type=UUID,
+        action="append",
+        default=None,
+        help="Participant to score (repeatable; default: everyone with metrics)",
+    )
+    parser.add_argument(
+        "--activity",
+        action="append",
+        default=None,
+        help="Activity code to score (repeatable; default: all with a weight table)",
+    )
+    parser.add_argument(
+        "--enqueue-recommendations",
+        action="store_true",
+        help="Queue batch AI recommendations for the new results",
+    )
+    parser.add_argument(
+        "--ids", action="store_true", help="Include created scoring_result_ids in the output"
+    )
+    args = parser.parse_args()
+
+    result = asyncio.run(run(args))
+    if not args.ids:
+        result.pop("scoring_result_ids")
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
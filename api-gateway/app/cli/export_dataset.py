@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Export every participant with metrics and latest scores to CSV, Parquet or XLSX.
+
+Streams rows from a server-side cursor of the database from POSTGRES_DSN and
+writes the file incrementally (same format as GET /api/admin/export/dataset).
+
+Usage:
+    python -m app.cli.export_dataset --output participants.csv
+    python -m app.cli.export_dataset --format parquet --output participants.parquet
+    python -m app.cli.export_dataset --format csv > participants.csv
+"""
+
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+from app.db.session import engine
+from app.services.dataset_export import WRITERS, DatasetExportError, get_writer, stream_dataset
+
+
+async def run(args: argparse.Namespace) -> int:
+    size = 0
+    output = args.output.open("wb") if args.output else sys.stdout.buffer
+    try:
+        async for chunk in stream_dataset(args.format, batch_size=args.batch_size):
+            output.write(chunk)
+            size += len(chunk)
+    finally:
+        if args.output:
+            output.close()
+        await engine.dispose()
+    return size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--format", choices=sorted(WRITERS), default=None)
+    parser.add_argument("--output", type=Path, default=None, help="Output file (default: stdout)")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=None,
+        help="Participants per cursor fetch (default: DATASET_EXPORT_BATCH_SIZE)",
+    )
+    args = parser.parse_args()
+    if args.format is None:
+        suffix = args.output.suffix.lstrip(".") if args.output else ""
+        args.format = suffix if suffix in WRITERS else "csv"
+
+    try:
+        get_writer(args.format)
+    except DatasetExportError as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 1
+
+    size = asyncio.run(run(args))
+    print(f"{size} bytes written ({args.format})", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
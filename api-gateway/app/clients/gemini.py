@@ -25,6 +25,7 @@ from app.clients.exceptions import (
     GeminiTimeoutError,
     GeminiValidationError,
 )
+from app.clients.schema import response_schema as build_response_schema
 
 logger = logging.getLogger(__name__)
 
@@ -457,6 +458,7 @@ class GeminiClient:
         system_instructions: str | None = None,
         response_mime_type: str = "text/plain",
         timeout: float | None = None,
+        response_schema: Any = None,
     ) -> dict[str, Any]:
         """
         Generate text using Gemini text model.
@@ -466,6 +468,8 @@ class GeminiClient:
             system_instructions: System instructions (optional)
             response_mime_type: Response MIME type (text/plain or application/json)
             timeout: Request timeout (uses default if None)
+            response_schema: Structured output schema: Pydantic model/type or a
+                ready Gemini schema dict (implies application/json)
 
         Returns:
             Gemini API response with generated text
@@ -478,7 +482,7 @@ class GeminiClient:
         # Build request payload
         payload: dict[str, Any] = {
             "contents": [{"parts": [{"text": prompt}], "role": "user"}],
-            "generationConfig": {"responseMimeType": response_mime_type},
+            "generationConfig": self._generation_config(response_mime_type, response_schema),
         }
 
         if system_instructions:
@@ -492,6 +496,7 @@ class GeminiClient:
                 "model": self.model_text,
                 "prompt_length": len(prompt),
                 "has_system": system_instructions is not None,
+                "has_schema": response_schema is not None,
             },
         )
 
@@ -510,6 +515,7 @@ class GeminiClient:
         mime_type: str = "image/png",
         response_mime_type: str = "application/json",
         timeout: float | None = None,
+        response_schema: Any = None,
     ) -> dict[str, Any]:
         """
         Generate content from image using Gemini vision model.
@@ -520,6 +526,8 @@ class GeminiClient:
             mime_type: Image MIME type (image/png, image/jpeg)
             response_mime_type: Response MIME type (typically application/json)
             timeout: Request timeout (uses default if None)
+            response_schema: Structured output schema: Pydantic model/type or a
+                ready Gemini schema dict (implies application/json)
 
         Returns:
             Gemini API response with extracted data
@@ -545,7 +553,7 @@ class GeminiClient:
                     "role": "user",
                 }
             ],
-            "generationConfig": {"responseMimeType": response_mime_type},
+            "generationConfig": self._generation_config(response_mime_type, response_schema),
         }
 
         headers = {"Content-Type": "application/json"}
@@ -557,6 +565,7 @@ class GeminiClient:
                 "prompt_length": len(prompt),
                 "image_size": len(image_data),
                 "mime_type": mime_type,
+                "has_schema": response_schema is not None,
             },
         )
 
@@ -568,6 +577,15 @@ class GeminiClient:
             timeout=timeout,
         )
 
+    @staticmethod
+    def _generation_config(response_mime_type: str, response_schema: Any) -> dict[str, Any]:
+        """Build generationConfig, adding the structured output schema if given."""
+        if response_schema is None:
+            return {"responseMimeType": response_mime_type}
+        if not isinstance(response_schema, dict):
+            response_schema = build_response_schema(response_schema)
+        return {"responseMimeType": "application/json", "responseSchema": response_schema}
+
     def __repr__(self) -> str:
         return (
             f"GeminiClient(model_text={self.model_text}, "
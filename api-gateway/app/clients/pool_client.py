@@ -385,6 +385,7 @@ class GeminiPoolClient:
         system_instructions: str | None = None,
         response_mime_type: str = "text/plain",
         timeout: float | None = None,
+        response_schema: Any = None,
     ) -> dict[str, Any]:
         """
         Generate text using Gemini text model with key pool.
@@ -394,6 +395,7 @@ class GeminiPoolClient:
             system_instructions: System instructions (optional)
             response_mime_type: Response MIME type (text/plain or application/json)
             timeout: Request timeout (uses default if None)
+            response_schema: Structured output schema (see GeminiClient.generate_text)
 
         Returns:
             Gemini API response with generated text
@@ -408,6 +410,7 @@ class GeminiPoolClient:
                 system_instructions=system_instructions,
                 response_mime_type=response_mime_type,
                 timeout=timeout,
+                response_schema=response_schema,
             )
 
         return await self._execute_with_pool("generate_text", _call)
@@ -419,6 +422,7 @@ class GeminiPoolClient:
         mime_type: str = "image/png",
         response_mime_type: str = "application/json",
         timeout: float | None = None,
+        response_schema: Any = None,
     ) -> dict[str, Any]:
         """
         Generate content from image using Gemini vision model with key pool.
@@ -429,6 +433,7 @@ class GeminiPoolClient:
             mime_type: Image MIME type (image/png, image/jpeg)
             response_mime_type: Response MIME type (typically application/json)
             timeout: Request timeout (uses default if None)
+            response_schema: Structured output schema (see GeminiClient.generate_text)
 
         Returns:
             Gemini API response with extracted data
@@ -444,6 +449,7 @@ class GeminiPoolClient:
                 mime_type=mime_type,
                 response_mime_type=response_mime_type,
                 timeout=timeout,
+                response_schema=response_schema,
             )
 
         return await self._execute_with_pool("generate_from_image", _call)
@@ -0,0 +1,93 @@
+"""
+Structured-output schemas for Gemini requests.
+
+Gemini accepts ``generationConfig.responseSchema`` in an OpenAPI 3.0 subset:
+no ``$ref``/``$defs``, no ``anyOf`` for optional fields, no ``title``/
+``default``/``additionalProperties``. ``response_schema`` converts the JSON
+schema of a Pydantic model (or any type ``TypeAdapter`` accepts, e.g.
+``list[Model]``) into that subset, so the model and the request schema never
+drift apart.
+
+String length limits are dropped (Gemini ignores or rejects them); the
+callers still validate the response locally against the same Pydantic model.
+"""
+
+from __future__ import annotations
+
+import copy
+from functools import lru_cache
+from typing import Any
+
+from pydantic import TypeAdapter
+
+# Keys Gemini understands; everything else is dropped
+_SUPPORTED_KEYS = frozenset(
+    {
+        "type",
+        "format",
+        "description",
+        "nullable",
+        "enum",
+        "items",
+        "properties",
+        "required",
+        "minItems",
+        "maxItems",
+        "minimum",
+        "maximum",
+    }
+)
+
+
+def _convert(node: dict[str, Any], defs: dict[str, Any]) -> dict[str, Any]:
+    if "$ref" in node:
+        resolved = defs[node["$ref"].rsplit("/", 1)[-1]]
+        merged = {**resolved, **{key: value for key, value in node.items() if key != "$ref"}}
+        return _convert(merged, defs)
+
+    # Optional[X] -> X with nullable
+    variants = node.get("anyOf")
+    if variants:
+        non_null = [variant for variant in variants if variant.get("type") != "null"]
+        base = _convert(non_null[0], defs) if len(non_null) == 1 else {"type": "string"}
+        if len(non_null) != len(variants):
+            base["nullable"] = True
+        if "description" in node:
+            base.setdefault("description", node["description"])
+        return base
+
+    schema: dict[str, Any] = {}
+    for key, value in node.items():
+        if key not in _SUPPORTED_KEYS:
+            continue
+        # Model docstrings are developer notes, not instructions for the model
+        if key == "description" and node.get("type") == "object":
+            continue
+        if key == "items":
+            schema[key] = _convert(value, defs)
+        elif key == "properties":
+            schema[key] = {name: _convert(child, defs) for name, child in value.items()}
+            # Gemini orders generated fields alphabetically unless told otherwise
+            schema["propertyOrdering"] = list(value)
+        else:
+            schema[key] = value
+    return schema
+
+
+@lru_cache(maxsize=32)
+def _cached_schema(tp: Any) -> dict[str, Any]:
+    json_schema = TypeAdapter(tp).json_schema()
+    return _convert(json_schema, json_schema.get("$defs", {}))
+
+
+def response_schema(tp: Any) -> dict[str, Any]:
+    """
+    Gemini ``responseSchema`` for a Pydantic model or type.
+
+    Args:
+        tp: Pydantic model class or type expression (e.g. ``list[Model]``)
+
+    Returns:
+        Schema dict (a fresh copy; safe to modify)
+    """
+    return copy.deepcopy(_cached_schema(tp))
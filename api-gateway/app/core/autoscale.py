@@ -0,0 +1,355 @@
+"""
+Capacity-aware autoscaling of the extraction and recommendations workers.
+
+Throughput of both queues is bounded by Gemini quota (healthy keys ×
+GEMINI_QPS_PER_KEY), not by CPU: extra processes only sleep on 429s. The
+controller sizes a worker's concurrency (and, through it, the prefetch count)
+with Little's law:
+
+    capacity = quota_rps × share × avg_task_seconds / gemini_calls_per_task
+
+where ``share`` splits the common quota between the queues by their demand.
+Concurrency follows demand (broker queue depth + reserved tasks) up to that
+capacity, grows by at most MAX_STEP_UP per evaluation and backs off by
+BACKOFF_FACTOR whenever workers report new 429s.
+
+Worker processes feed the shared state in Redis (task durations, key pool
+health and 429 counts); decisions are written back for ``GET
+/api/admin/autoscale`` and logged as ``autoscale_decision``. Enabled with
+``worker_autoscaler`` when the worker runs with ``--autoscale=max,min``.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import math
+import socket
+import time
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, Any
+
+import redis
+from celery.signals import task_postrun, task_prerun
+from celery.worker import state as worker_state
+from celery.worker.autoscale import Autoscaler
+
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from app.clients.key_pool import KeyPoolStats
+
+logger = logging.getLogger(__name__)
+
+# Queues under capacity control and Gemini requests per task on each
+# (extraction packs a report into 1-2 Vision canvases)
+GEMINI_CALLS_PER_TASK = {"extraction": 2.0, "recommendations": 1.0}
+
+KEY_PREFIX = "autoscale:"
+BACKOFF_FACTOR = 0.75
+MAX_STEP_UP = 2
+EWMA_ALPHA = 0.2
+
+
+@dataclass(slots=True)
+class CapacitySnapshot:
+    """Inputs of one scaling decision."""
+
+    queue: str
+    keys_total: int
+    keys_healthy: int
+    qps_per_key: float
+    rate_limited: int  # 429s reported since the previous evaluation
+    queue_depth: int  # messages waiting in the broker queue
+    reserved: int  # tasks prefetched or running on this worker
+    avg_task_seconds: float
+    gemini_calls_per_task: float
+    quota_share: float = 1.0
+
+
+@dataclass(slots=True)
+class ScalingDecision:
+    """Result of one evaluation (exported as autoscale metrics)."""
+
+    queue: str
+    concurrency: int
+    capacity_limit: int
+    demand: int
+    quota_rps: float
+    reason: str
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+def plan_concurrency(
+    snapshot: CapacitySnapshot, current: int, min_concurrency: int, max_concurrency: int
+) -> ScalingDecision:
+    """
+    Pick the concurrency limit for a worker.
+
+    Args:
+        snapshot: Quota, demand and feedback inputs
+        current: Current number of pool processes
+        min_concurrency: Lower bound (``--autoscale`` min)
+        max_concurrency: Upper bound (``--autoscale`` max)
+    """
+    quota_rps = snapshot.keys_healthy * snapshot.qps_per_key * snapshot.quota_share
+    # Little's law: tasks in flight that keep the quota busy without overshooting it
+    capacity_limit = max(
+        1,
+        math.ceil(
+            quota_rps * snapshot.avg_task_seconds / max(snapshot.gemini_calls_per_task, 1e-6)
+        ),
+    )
+    demand = snapshot.queue_depth + snapshot.reserved
+
+    if snapshot.rate_limited > 0:
+        target = math.floor(max(current, 1) * BACKOFF_FACTOR)
+        reason = "rate_limited"
+    elif demand >= capacity_limit:
+        target = min(capacity_limit, current + MAX_STEP_UP)
+        reason = "capacity"
+    else:
+        target = min(demand, current + MAX_STEP_UP)
+        reason = "demand"
+
+    return ScalingDecision(
+        queue=snapshot.queue,
+        concurrency=max(min_concurrency, min(max_concurrency, target), 1),
+        capacity_limit=capacity_limit,
+        demand=demand,
+        quota_rps=round(quota_rps, 4),
+        reason=reason,
+    )
+
+
+class CapacityStore:
+    """
+    Shared autoscaling state in Redis. Every call is best effort.
+
+    Keys:
+        autoscale:{queue}             hash: avg_task_seconds, rate_limited,
+                                      keys_total, keys_healthy
+        autoscale:demand:{queue}      demand seen by the queue's worker (TTL)
+        autoscale:decision:{queue}:{host}  last decision JSON (TTL)
+    """
+
+    def __init__(self, url: str | None = None):
+        self._url = url or settings.redis_url
+        self._client: redis.Redis | None = None
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                self._url, socket_connect_timeout=1, socket_timeout=1, decode_responses=True
+            )
+        return self._client
+
+    def _ttl(self) -> int:
+        return settings.autoscale_interval_sec * 3
+
+    def record_task(self, queue: str, seconds: float) -> None:
+        """Fold a task duration into the queue's moving average."""
+        try:
+            key = f"{KEY_PREFIX}{queue}"
+            previous = self.client.hget(key, "avg_task_seconds")
+            average = (
+                seconds
+                if previous is None
+                else (1 - EWMA_ALPHA) * float(previous) + EWMA_ALPHA * seconds
+            )
+            self.client.hset(key, "avg_task_seconds", round(average, 3))
+        except redis.RedisError:
+            pass
+
+    def record_key_pool(self, queue: str, stats: KeyPoolStats) -> None:
+        """Store key health and add the 429s seen by one Gemini pool client."""
+        try:
+            key = f"{KEY_PREFIX}{queue}"
+            rate_limited = sum(item["rate_limit_errors"] for item in stats.per_key_stats)
+            pipe = self.client.pipeline()
+            pipe.hset(
+                key,
+                mapping={"keys_total": stats.total_keys, "keys_healthy": stats.healthy_keys},
+            )
+            if rate_limited:
+                pipe.hincrby(key, "rate_limited", rate_limited)
+            pipe.execute()
+        except redis.RedisError:
+            pass
+
+    def load(self, queue: str) -> dict[str, str]:
+        try:
+            return self.client.hgetall(f"{KEY_PREFIX}{queue}")
+        except redis.RedisError:
+            return {}
+
+    def record_demand(self, queue: str, demand: int) -> int:
+        """Store this queue's demand and return the demand of all controlled queues."""
+        try:
+            self.client.set(f"{KEY_PREFIX}demand:{queue}", demand, ex=self._ttl())
+            values = self.client.mget(
+                [f"{KEY_PREFIX}demand:{name}" for name in GEMINI_CALLS_PER_TASK]
+            )
+            return sum(int(value) for value in values if value is not None)
+        except redis.RedisError:
+            return demand
+
+    def record_decision(self, hostname: str, decision: ScalingDecision) -> None:
+        try:
+            payload = {**decision.as_dict(), "hostname": hostname, "ts": time.time()}
+            self.client.set(
+                f"{KEY_PREFIX}decision:{decision.queue}:{hostname}",
+                json.dumps(payload),
+                ex=self._ttl(),
+            )
+        except redis.RedisError:
+            pass
+
+    def decisions(self) -> list[dict[str, Any]]:
+        """Latest decision of every live autoscaled worker."""
+        try:
+            keys = sorted(self.client.scan_iter(f"{KEY_PREFIX}decision:*"))
+            values = self.client.mget(keys) if keys else []
+        except redis.RedisError:
+            return []
+        return [json.loads(value) for value in values if value]
+
+
+_store: CapacityStore | None = None
+
+
+def get_capacity_store() -> CapacityStore:
+    global _store
+    if _store is None:
+        _store = CapacityStore()
+    return _store
+
+
+def record_key_pool_stats(queue: str, stats: KeyPoolStats) -> None:
+    """Report a finished Gemini pool client's health and 429s to the controller."""
+    if settings.worker_capacity_autoscale and queue in GEMINI_CALLS_PER_TASK:
+        get_capacity_store().record_key_pool(queue, stats)
+
+
+# ===== Task duration feed (runs in worker pool processes) =====
+_task_started: dict[str, float] = {}
+
+
+@task_prerun.connect
+def _on_task_prerun(task_id: str | None = None, **_: Any) -> None:
+    if task_id and settings.worker_capacity_autoscale:
+        _task_started[task_id] = time.monotonic()
+
+
+@task_postrun.connect
+def _on_task_postrun(task_id: str | None = None, task: Any = None, **_: Any) -> None:
+    started = _task_started.pop(task_id, None) if task_id else None
+    if started is None or task is None:
+        return
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    queue = delivery_info.get("routing_key")
+    if queue in GEMINI_CALLS_PER_TASK:
+        get_capacity_store().record_task(queue, time.monotonic() - started)
+
+
+class CapacityAutoscaler(Autoscaler):
+    """
+    Celery autoscaler that caps concurrency at the worker's share of Gemini capacity.
+
+    ``--autoscale=max,min`` are the hard bounds. Every AUTOSCALE_INTERVAL_SEC
+    the cap (``max_concurrency``) is recomputed; the consumer prefetch count
+    follows it. Between evaluations Celery's own logic scales processes up to
+    the cap as tasks are reserved.
+    """
+
+    def __init__(self, *args: Any, store: CapacityStore | None = None, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self.hard_max = self.max_concurrency
+        self.hard_min = self.min_concurrency
+        self.store = store or get_capacity_store()
+        self.hostname = getattr(self.worker, "hostname", None) or socket.gethostname()
+        self.queue = self._controlled_queue()
+        self.last_decision: ScalingDecision | None = None
+        self._next_evaluation = 0.0
+        self._rate_limited_seen: int | None = None
+
+    def _controlled_queue(self) -> str | None:
+        try:
+            consumed = list(self.worker.app.amqp.queues.consume_from)
+        except AttributeError:
+            return None
+        return next((name for name in consumed if name in GEMINI_CALLS_PER_TASK), None)
+
+    def _maybe_scale(self, req: Any = None) -> bool | None:
+        now = time.monotonic()
+        if self.queue is not None and now >= self._next_evaluation:
+            self._next_evaluation = now + settings.autoscale_interval_sec
+            try:
+                self.evaluate()
+            except Exception as exc:
+                logger.warning("autoscale_evaluation_failed", extra={"error": str(exc)})
+        return super()._maybe_scale(req)
+
+    def evaluate(self) -> ScalingDecision:
+        """Recompute the concurrency cap (caller holds the autoscaler mutex)."""
+        decision = plan_concurrency(self.snapshot(), self.processes, self.hard_min, self.hard_max)
+        if decision.concurrency != self.max_concurrency:
+            # Same steps as Autoscaler.update(max=...), which would re-take the mutex
+            if decision.concurrency < self.processes:
+                self._shrink(self.processes - decision.concurrency)
+            self._update_consumer_prefetch_count(decision.concurrency)
+            self.max_concurrency = decision.concurrency
+
+        self.last_decision = decision
+        self.store.record_decision(self.hostname, decision)
+        logger.info("autoscale_decision", extra=decision.as_dict())
+        return decision
+
+    def snapshot(self) -> CapacitySnapshot:
+        state = self.store.load(self.queue)
+        keys_total = int(state.get("keys_total") or len(settings.gemini_keys_list) or 1)
+        rate_limited_total = int(state.get("rate_limited") or 0)
+        rate_limited = (
+            0
+            if self._rate_limited_seen is None
+            else max(0, rate_limited_total - self._rate_limited_seen)
+        )
+        self._rate_limited_seen = rate_limited_total
+
+        queue_depth = self._queue_depth()
+        reserved = len(worker_state.reserved_requests)
+        demand = queue_depth + reserved
+        total_demand = self.store.record_demand(self.queue, demand)
+
+        return CapacitySnapshot(
+            queue=self.queue,
+            keys_total=keys_total,
+            keys_healthy=int(state.get("keys_healthy") or keys_total),
+            qps_per_key=settings.gemini_qps_per_key,
+            rate_limited=rate_limited,
+            queue_depth=queue_depth,
+            reserved=reserved,
+            avg_task_seconds=float(
+                state.get("avg_task_seconds") or settings.autoscale_default_task_sec
+            ),
+            gemini_calls_per_task=GEMINI_CALLS_PER_TASK[self.queue],
+            quota_share=demand / total_demand if total_demand > demand else 1.0,
+        )
+
+    def _queue_depth(self) -> int:
+        """Messages waiting in the broker queue (0 when the broker cannot tell)."""
+        try:
+            with self.worker.app.connection_for_read() as connection:
+                with connection.channel() as channel:
+                    return channel.queue_declare(queue=self.queue, passive=True).message_count
+        except Exception as exc:
+            logger.debug("autoscale_queue_depth_failed", extra={"error": str(exc)})
+            return 0
+
+    def info(self) -> dict[str, Any]:
+        info = super().info()
+        info["capacity"] = self.last_decision.as_dict() if self.last_decision else None
+        return info
@@ -0,0 +1,192 @@
+"""
+Caching primitives.
+
+``TTLCache`` is a bounded LRU map whose entries also expire after a TTL.
+It is not thread-safe by design: every user keeps one instance per process
+and touches it from a single event loop or worker thread.
+
+``SharedRedis`` is the Redis connection behind the shared cache tiers,
+indexes and pub/sub publishers: lazily connected, failing open, and skipped
+for a back-off window after an error instead of paying the socket timeout on
+every call.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+import redis
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+V = TypeVar("V")
+T = TypeVar("T")
+
+_MISSING = object()
+
+# After a Redis error, skip Redis for this long instead of timing out on every call
+REDIS_FAILURE_BACKOFF_S = 30.0
+
+
+@dataclass(slots=True)
+class CacheStats:
+    """Counters of one cache instance."""
+
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return round(self.hits / lookups, 4) if lookups else 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": self.hit_rate,
+        }
+
+
+class TTLCache(Generic[V]):
+    """
+    LRU cache with per-entry expiry.
+
+    Args:
+        maxsize: Maximum number of entries; the least recently used is evicted
+        ttl_s: Entry lifetime in seconds (None = no expiry)
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl_s: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.ttl_s = ttl_s
+        self.stats = CacheStats()
+        self._clock = clock
+        self._data: OrderedDict[Hashable, tuple[float | None, V]] = OrderedDict()
+
+    def get(self, key: Hashable, default: Any = None) -> V | Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.stats.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= self._clock():
+            del self._data[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.stats.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: V, ttl_s: float | None = None) -> None:
+        ttl_s = self.ttl_s if ttl_s is None else ttl_s
+        expires_at = self._clock() + ttl_s if ttl_s is not None else None
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.stats.evictions += 1
+
+    def delete(self, key: Hashable) -> bool:
+        return self._data.pop(key, _MISSING) is not _MISSING
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        entry = self._data.get(key)
+        return entry is not None and (entry[0] is None or entry[0] > self._clock())
+
+
+class SharedRedis:
+    """
+    Lazily connected synchronous Redis client with a failure back-off.
+
+    ``run`` is for synchronous callers (Celery tasks, listener threads);
+    ``arun`` runs the same call in a worker thread, so async code never blocks
+    the event loop on Redis I/O.
+
+    Args:
+        name: Owner, prefix of the ``<name>_redis_unavailable`` warning
+        redis_url: Redis URL (default REDIS_URL)
+        **options: Extra ``Redis.from_url`` options (e.g. decode_responses)
+    """
+
+    def __init__(self, name: str, redis_url: str | None = None, **options: Any):
+        self.name = name
+        self.url = redis_url or settings.redis_url
+        self._options = {"socket_connect_timeout": 1, "socket_timeout": 1, **options}
+        self._client: redis.Redis | None = None
+        self._lock = threading.Lock()
+        self._disabled_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        """False during the back-off window after a failure."""
+        return time.monotonic() >= self._disabled_until
+
+    def client(self) -> redis.Redis | None:
+        """The shared client, or None during the back-off window."""
+        if not self.available:
+            return None
+        with self._lock:
+            if self._client is None:
+                self._client = redis.Redis.from_url(self.url, **self._options)
+            return self._client
+
+    def failed(self, operation: str, exc: Exception) -> None:
+        """Start the back-off window after a Redis error."""
+        self._disabled_until = time.monotonic() + REDIS_FAILURE_BACKOFF_S
+        logger.warning(
+            f"{self.name}_redis_unavailable", extra={"operation": operation, "error": str(exc)}
+        )
+
+    def run(self, operation: str, call: Callable[[redis.Redis], T], default: Any = None) -> T | Any:
+        """
+        Run ``call(client)``.
+
+        Returns:
+            Its result, or ``default`` if Redis is unavailable or the call failed
+        """
+        if (client := self.client()) is None:
+            return default
+        try:
+            return call(client)
+        except redis.RedisError as exc:
+            self.failed(operation, exc)
+            return default
+
+    async def arun(
+        self, operation: str, call: Callable[[redis.Redis], T], default: Any = None
+    ) -> T | Any:
+        """``run`` in a worker thread (no thread hop during the back-off window)."""
+        if not self.available:
+            return default
+        return await asyncio.to_thread(self.run, operation, call, default)
@@ -12,7 +12,7 @@ celery_app = Celery(
     "workers_prof",
     broker=settings.rabbitmq_url,
     backend=settings.redis_url,
-    include=["app.tasks.extraction", "app.tasks.recommendations"],
+    include=["app.tasks.extraction", "app.tasks.recommendations", "app.tasks.pipeline"],
 )
 
 # Configure Celery
@@ -31,8 +31,15 @@ celery_app.conf.update(
     task_routes={
         "app.tasks.extraction.*": {"queue": "extraction"},
         "app.tasks.recommendations.*": {"queue": "recommendations"},
+        # Scoring is DB-only; it runs next to the recommendations it fans out
+        "app.tasks.pipeline.*": {"queue": "recommendations"},
     },
     # For testing
     task_always_eager=settings.celery_task_always_eager,
     task_eager_propagates=settings.celery_eager_propagates_exceptions,
 )
+
+if settings.worker_capacity_autoscale:
+    # Takes effect for workers started with --autoscale=max,min
+    celery_app.conf.worker_autoscaler = "app.core.autoscale:CapacityAutoscaler"
+
@@ -0,0 +1,229 @@
+"""
+Status events over Redis pub/sub.
+
+Celery tasks publish report extraction and recommendation progress to a
+per-participant channel; ``GET /api/events/participants/{id}`` streams them to
+the browser as Server-Sent Events, so the UI does not have to poll.
+
+Publishing is best effort: when Redis is unreachable the event is dropped
+(after one warning per back-off window) and the task carries on; clients fall
+back to polling when the stream cannot be opened.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+import redis.asyncio as redis_async
+
+from app.core.cache import SharedRedis
+from app.core.config import settings
+from app.repositories.extraction_checkpoint import STAGE_GROUP_PARSED
+
+if TYPE_CHECKING:
+    from app.db.models import Report, ScoringResult
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_PREFIX = "events:participant:"
+EVENT_REPORT = "report"
+EVENT_RECOMMENDATIONS = "recommendations"
+
+# Stages published in addition to the extraction checkpoint stages
+STAGE_STARTED = "STARTED"
+STAGE_RETRY_SCHEDULED = "RETRY_SCHEDULED"
+STAGE_GENERATING = "GENERATING"
+
+
+def participant_channel(participant_id: UUID | str) -> str:
+    """Pub/sub channel carrying events of one participant."""
+    return f"{CHANNEL_PREFIX}{participant_id}"
+
+
+def format_sse(event: dict[str, Any]) -> str:
+    """Serialize an event as an SSE frame (event name = event type)."""
+    data = json.dumps(event, ensure_ascii=False, default=str)
+    return f"event: {event['type']}\ndata: {data}\n\n"
+
+
+# Synchronous client: publishing is a single PUBLISH with a 1 s socket timeout
+_publisher = SharedRedis("status_events")
+
+
+def publish_event(event_type: str, participant_id: UUID | str, **payload: Any) -> bool:
+    """
+    Publish an event to the participant channel. Never raises.
+
+    Synchronous on purpose: callable from Celery tasks and from async code
+    (a single PUBLISH with a 1 s socket timeout).
+
+    Returns:
+        True if the event was handed to Redis
+    """
+    if not settings.status_events_enabled:
+        return False
+    event = {
+        "type": event_type,
+        "participant_id": str(participant_id),
+        "ts": time.time(),
+        **payload,
+    }
+    message = json.dumps(event, ensure_ascii=False, default=str)
+    channel = participant_channel(participant_id)
+    receivers = _publisher.run("publish", lambda client: client.publish(channel, message))
+    return receivers is not None
+
+
+def report_event(
+    report: Report, stage: str | None = None, progress: dict[str, Any] | None = None
+) -> dict[str, Any]:
+    """Event payload describing a report's status (shared by publisher and SSE snapshot)."""
+    return {
+        "report_id": str(report.id),
+        "status": report.status,
+        "stage": stage,
+        "progress": progress or {},
+        "error": report.extract_error,
+    }
+
+
+def recommendations_event(scoring_result: ScoringResult, stage: str | None = None) -> dict:
+    """Event payload describing a scoring result's recommendation status."""
+    return {
+        "scoring_result_id": str(scoring_result.id),
+        "status": scoring_result.recommendations_status,
+        "stage": stage,
+        "error": scoring_result.recommendations_error,
+    }
+
+
+def publish_report_status(
+    report: Report, stage: str | None = None, progress: dict[str, Any] | None = None
+) -> bool:
+    """Publish the current status (and optional stage progress) of a report."""
+    return publish_event(
+        EVENT_REPORT, report.participant_id, **report_event(report, stage, progress)
+    )
+
+
+def publish_recommendations_status(scoring_result: ScoringResult, stage: str | None = None) -> bool:
+    """Publish the current recommendation status of a scoring result."""
+    return publish_event(
+        EVENT_RECOMMENDATIONS,
+        scoring_result.participant_id,
+        **recommendations_event(scoring_result, stage),
+    )
+
+
+def snapshot_events(
+    participant_id: UUID, reports: list[Report], scoring_results: list[ScoringResult]
+) -> list[dict[str, Any]]:
+    """Current statuses sent first on every (re)connect of the event stream."""
+    events = [
+        {"type": EVENT_REPORT, "participant_id": str(participant_id), **report_event(report)}
+        for report in reports
+    ]
+    events.extend(
+        {
+            "type": EVENT_RECOMMENDATIONS,
+            "participant_id": str(participant_id),
+            **recommendations_event(result),
+        }
+        for result in scoring_results
+    )
+    return events
+
+
+class ExtractionProgress:
+    """
+    Checkpoint listener that turns saved extraction stages into progress events.
+
+    Passed as ``on_save`` to ExtractionCheckpointRepository; remembers the
+    number of Vision groups per report so GROUP_PARSED events carry
+    ``parsed``/``groups``.
+    """
+
+    def __init__(self, *reports: Report):
+        self.reports = {report.id: report for report in reports}
+        self._groups: dict[UUID, int] = {}
+        self._parsed: dict[UUID, set[int]] = {}
+
+    def __call__(
+        self, report_id: UUID, stage: str, group_index: int, payload: dict[str, Any]
+    ) -> None:
+        report = self.reports.get(report_id)
+        if report is None:
+            return
+        progress: dict[str, Any] = {}
+        if "images" in payload:
+            progress["images"] = payload["images"]
+        if "groups" in payload:
+            self._groups[report_id] = len(payload["groups"])
+            self._parsed[report_id] = set()
+        if stage == STAGE_GROUP_PARSED:
+            parsed = self._parsed.setdefault(report_id, set())
+            parsed.add(group_index)
+            progress["parsed"] = len(parsed)
+        if self._groups.get(report_id):
+            progress["groups"] = self._groups[report_id]
+        publish_report_status(report, stage=stage, progress=progress)
+
+
+async def subscribe(participant_id: UUID | str) -> redis_async.client.PubSub:
+    """
+    Subscribe to a participant channel.
+
+    Raises:
+        redis.RedisError: If Redis is unreachable
+    """
+    client = redis_async.Redis.from_url(settings.redis_url, socket_connect_timeout=2)
+    pubsub = client.pubsub(ignore_subscribe_messages=True)
+    try:
+        await pubsub.subscribe(participant_channel(participant_id))
+    except BaseException:
+        await pubsub.aclose()
+        await client.connection_pool.disconnect()
+        raise
+    return pubsub
+
+
+async def stream_events(
+    pubsub: redis_async.client.PubSub,
+    snapshot: list[dict[str, Any]],
+    is_disconnected: Callable[[], Awaitable[bool]],
+    keepalive_s: float | None = None,
+) -> AsyncIterator[str]:
+    """
+    Yield SSE frames: the snapshot first, then live events until the client leaves.
+
+    Subscribe before taking the snapshot so no event is lost in between; a
+    duplicate status event is harmless for the client.
+    """
+    keepalive_s = keepalive_s or settings.status_events_keepalive_sec
+    try:
+        yield f"retry: {settings.status_events_retry_ms}\n\n"
+        for event in snapshot:
+            yield format_sse(event)
+
+        last_sent = time.monotonic()
+        while not await is_disconnected():
+            message = await pubsub.get_message(timeout=1.0)
+            if message and message["type"] == "message":
+                data = message["data"]
+                if isinstance(data, bytes):
+                    data = data.decode()
+                event_type = json.loads(data).get("type", "message")
+                yield f"event: {event_type}\ndata: {data}\n\n"
+                last_sent = time.monotonic()
+            elif time.monotonic() - last_sent >= keepalive_s:
+                # Comment frame keeps proxies from closing an idle stream
+                yield ": keepalive\n\n"
+                last_sent = time.monotonic()
+    finally:
+        await pubsub.aclose()
+        await pubsub.connection_pool.disconnect()
@@ -3,12 +3,15 @@
 from __future__ import annotations
 
 import logging
+import re
 import time
 import uuid
+from collections.abc import Callable
 
 from fastapi import Request
 from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
-from starlette.responses import Response
+from starlette.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 from app.core.logging import log_context
 
@@ -71,3 +74,73 @@ class RequestContextMiddleware(BaseHTTPMiddleware):
             )
 
             return response
+
+
+class UploadSizeLimitMiddleware:
+    """
+    Reject oversized uploads by Content-Length before the body is read.
+
+    Pure ASGI middleware: a 413 is sent without consuming the request stream,
+    so the client is not forced to upload megabytes that would be discarded.
+    Requests without Content-Length (chunked) pass through; the storage layer
+    still enforces the limit while streaming.
+
+    Args:
+        app: Wrapped ASGI application
+        max_bytes: Callable returning the file size limit (read per request so
+            settings changes apply without a restart)
+        path_pattern: Regex of upload paths the limit applies to
+        overhead_bytes: Allowance for multipart boundaries and form fields
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        max_bytes: Callable[[], int],
+        path_pattern: str = r"/participants/[^/]+/reports$",
+        overhead_bytes: int = 64 * 1024,
+    ):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_pattern = re.compile(path_pattern)
+        self.overhead_bytes = overhead_bytes
+        self.logger = logging.getLogger("app.request")
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] != "POST"
+            or not self.path_pattern.search(scope["path"])
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = None
+        for name, value in scope["headers"]:
+            if name == b"content-length":
+                try:
+                    content_length = int(value)
+                except ValueError:
+                    content_length = None
+                break
+
+        limit = self.max_bytes() + self.overhead_bytes
+        if content_length is not None and content_length > limit:
+            self.logger.warning(
+                "upload_rejected_content_length",
+                extra={
+                    "event": "upload_rejected_content_length",
+                    "path": scope["path"],
+                    "content_length": content_length,
+                    "limit": limit,
+                },
+            )
+            response = JSONResponse(
+                status_code=413,
+                content={"detail": "Report file exceeds maximum allowed size"},
+                headers={"Connection": "close"},
+            )
+            await response(scope, receive, send)
+            return
+
+        await self.app(scope, receive, send)
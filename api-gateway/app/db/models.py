@@ -101,6 +101,12 @@ class FileRef(Base):
     Provides abstraction over storage backend.
     For LOCAL: bucket="local", key="reports/{participant_id}/{report_id}/original.docx"
     For MINIO: bucket="reports", key="{participant_id}/{report_id}/original.docx"
+
+    Content addressing:
+    - sha256: content hash, used to deduplicate identical uploads and images
+    - ref_count: number of reports/images pointing at this file; the blob is
+      removed from storage only when it drops to zero
+    - etag: MD5 computed once at upload, served on downloads without re-reading the file
     """
 
     __tablename__ = "file_ref"
@@ -112,6 +118,9 @@ class FileRef(Base):
     filename: Mapped[str | None] = mapped_column(String(255), nullable=True)
     mime: Mapped[str] = mapped_column(String(100), nullable=False)
     size_bytes: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    sha256: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    etag: Mapped[str | None] = mapped_column(String(64), nullable=True)
+    ref_count: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
     created_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True), nullable=False, server_default="now()"
     )
@@ -120,10 +129,13 @@ class FileRef(Base):
     __table_args__ = (
         CheckConstraint("storage IN ('LOCAL', 'MINIO')", name="file_ref_storage_check"),
         CheckConstraint("size_bytes >= 0", name="file_ref_size_check"),
+        CheckConstraint("ref_count >= 0", name="file_ref_ref_count_check"),
         # Unique constraint on (storage, bucket, key) to prevent duplicates
         UniqueConstraint("storage", "bucket", "key", name="file_ref_location_unique"),
         # Index for faster lookups by storage type
         Index("idx_file_ref_storage", "storage"),
+        # Index for content-addressed lookups (deduplication)
+        Index("idx_file_ref_sha256", "sha256"),
     )
 
     def __repr__(self) -> str:
@@ -229,6 +241,51 @@ class ReportImage(Base):
         return f"<ReportImage(id={self.id}, report_id={self.report_id}, kind={self.kind}, page={self.page})>"
 
 
+# ===== ExtractionCheckpoint Table =====
+class ExtractionCheckpoint(Base):
+    """
+    Durable progress marker of a report extraction run.
+
+    Stages:
+    - IMAGES_STORED: Images extracted from DOCX and saved (payload: image count)
+    - GROUPS_BUILT: Images grouped into Vision canvases (payload: image ids per group)
+    - GROUP_PARSED: Vision response of group ``group_index`` parsed (payload: raw metrics)
+    - METRICS_SAVED: Metrics mapped and saved (payload: extraction result)
+
+    Celery retries and manual re-extraction resume after the last stored stage.
+    Checkpoints are removed once the report reaches EXTRACTED.
+    """
+
+    __tablename__ = "extraction_checkpoint"
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    report_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("report.id", ondelete="CASCADE"), nullable=False
+    )
+    stage: Mapped[str] = mapped_column(String(20), nullable=False)
+    group_index: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    payload: Mapped[dict[str, Any]] = mapped_column(JSONB, nullable=False, default=dict)
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True), nullable=False, server_default="now()"
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "stage IN ('IMAGES_STORED', 'GROUPS_BUILT', 'GROUP_PARSED', 'METRICS_SAVED')",
+            name="extraction_checkpoint_stage_check",
+        ),
+        UniqueConstraint(
+            "report_id", "stage", "group_index", name="extraction_checkpoint_stage_unique"
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<ExtractionCheckpoint(report_id={self.report_id}, stage={self.stage}, "
+            f"group_index={self.group_index})>"
+        )
+
+
 # ===== ProfActivity Table =====
 class ProfActivity(Base):
     """
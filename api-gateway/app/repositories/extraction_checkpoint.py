@@ -0,0 +1,78 @@
+"""
+Repository for extraction checkpoints (resumable report extraction).
+"""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import ExtractionCheckpoint
+
+STAGE_IMAGES_STORED = "IMAGES_STORED"
+STAGE_GROUPS_BUILT = "GROUPS_BUILT"
+STAGE_GROUP_PARSED = "GROUP_PARSED"
+STAGE_METRICS_SAVED = "METRICS_SAVED"
+
+
+class ExtractionCheckpointRepository:
+    """
+    Data access for per-stage extraction checkpoints.
+
+    ``save`` commits immediately: a checkpoint is only useful if it survives
+    the crash or retry that follows it.
+    """
+
+    def __init__(
+        self,
+        db: AsyncSession,
+        on_save: Callable[[UUID, str, int, dict[str, Any]], None] | None = None,
+    ):
+        self.db = db
+        # Called with (report_id, stage, group_index, payload) after each commit
+        self.on_save = on_save
+
+    async def load(self, report_id: UUID) -> dict[tuple[str, int], dict[str, Any]]:
+        """Load all checkpoints of a report keyed by (stage, group_index)."""
+        result = await self.db.execute(
+            select(ExtractionCheckpoint).where(ExtractionCheckpoint.report_id == report_id)
+        )
+        return {
+            (checkpoint.stage, checkpoint.group_index): checkpoint.payload
+            for checkpoint in result.scalars().all()
+        }
+
+    async def save(
+        self,
+        report_id: UUID,
+        stage: str,
+        payload: dict[str, Any],
+        group_index: int = 0,
+    ) -> None:
+        """Insert or replace a checkpoint and commit."""
+        stmt = insert(ExtractionCheckpoint).values(
+            report_id=report_id,
+            stage=stage,
+            group_index=group_index,
+            payload=payload,
+        )
+        stmt = stmt.on_conflict_do_update(
+            constraint="extraction_checkpoint_stage_unique",
+            set_={"payload": stmt.excluded.payload, "created_at": stmt.excluded.created_at},
+        )
+        await self.db.execute(stmt)
+        await self.db.commit()
+        if self.on_save is not None:
+            self.on_save(report_id, stage, group_index, payload)
+
+    async def clear(self, report_id: UUID, stages: list[str] | None = None) -> None:
+        """Delete checkpoints of a report (all stages by default). Does not commit."""
+        stmt = delete(ExtractionCheckpoint).where(ExtractionCheckpoint.report_id == report_id)
+        if stages:
+            stmt = stmt.where(ExtractionCheckpoint.stage.in_(stages))
+        await self.db.execute(stmt)
@@ -234,6 +234,55 @@ class ExtractedMetricRepository:
             await self.db.refresh(extracted_metric)
             return extracted_metric
 
+    async def bulk_create_or_update(
+        self,
+        rows: list[tuple[UUID, UUID, Decimal, Decimal | None, str | None]],
+        source: str = "LLM",
+    ) -> int:
+        """
+        Create or update many extracted metrics without committing.
+
+        Existing rows for the involved reports are loaded with one query; the
+        caller owns the transaction and commits once for the whole batch.
+
+        Args:
+            rows: (report_id, metric_def_id, value, confidence, notes) tuples
+            source: Source of extraction (OCR, LLM, MANUAL)
+
+        Returns:
+            Number of created or updated rows
+        """
+        if not rows:
+            return 0
+
+        report_ids = {report_id for report_id, *_ in rows}
+        result = await self.db.execute(
+            select(ExtractedMetric).where(ExtractedMetric.report_id.in_(report_ids))
+        )
+        existing = {(m.report_id, m.metric_def_id): m for m in result.scalars().all()}
+
+        for report_id, metric_def_id, value, confidence, notes in rows:
+            metric = existing.get((report_id, metric_def_id))
+            if metric is None:
+                metric = ExtractedMetric(
+                    report_id=report_id,
+                    metric_def_id=metric_def_id,
+                    value=value,
+                    source=source,
+                    confidence=confidence,
+                    notes=notes,
+                )
+                self.db.add(metric)
+                existing[(report_id, metric_def_id)] = metric
+            else:
+                metric.value = value
+                metric.source = source
+                metric.confidence = confidence
+                metric.notes = notes
+
+        await self.db.flush()
+        return len(rows)
+
     async def get_by_id(self, extracted_metric_id: UUID) -> ExtractedMetric | None:
         """
         Get an extracted metric by ID.
@@ -4,13 +4,16 @@ Repository layer for Participant data access.
 Handles all database operations for participants with proper sorting and filtering.
 """
 
+from collections.abc import AsyncIterator, Sequence
 from datetime import date
 from uuid import UUID
 
-from sqlalchemy import func, or_, select
+from sqlalchemy import Text, cast, func, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.models import Participant
+from app.db.models import Participant, ParticipantMetric, ScoringResult
 
 # PostgreSQL running with default C locale does not downcase Cyrillic characters when using ILIKE.
 # We normalize case via translate() so substring searches behave consistently for Cyrillic and Latin.
@@ -46,6 +49,22 @@ class ParticipantRepository:
         await self.db.refresh(participant)
         return participant
 
+    async def get_by_external_ids(self, external_ids: list[str]) -> dict[str, Participant]:
+        """
+        Get participants by external IDs in one query.
+
+        external_id is not unique; when several participants share one, the
+        earliest created wins.
+        """
+        if not external_ids:
+            return {}
+        result = await self.db.execute(
+            select(Participant)
+            .where(Participant.external_id.in_(external_ids))
+            .order_by(Participant.created_at.desc())
+        )
+        return {participant.external_id: participant for participant in result.scalars().all()}
+
     async def get_by_id(self, participant_id: UUID) -> Participant | None:
         """
         Get a participant by ID.
@@ -59,6 +78,23 @@ class ParticipantRepository:
         result = await self.db.execute(select(Participant).where(Participant.id == participant_id))
         return result.scalar_one_or_none()
 
+    async def get_many(self, participant_ids: list[UUID]) -> dict[UUID, Participant]:
+        """
+        Get participants by IDs in one query.
+
+        Args:
+            participant_ids: UUIDs of the participants
+
+        Returns:
+            Mapping of ID to Participant (missing IDs are skipped)
+        """
+        if not participant_ids:
+            return {}
+        result = await self.db.execute(
+            select(Participant).where(Participant.id.in_(participant_ids))
+        )
+        return {participant.id: participant for participant in result.scalars().all()}
+
     async def update(
         self,
         participant_id: UUID,
@@ -189,3 +225,63 @@ class ParticipantRepository:
             Tuple of (list of participants, total count)
         """
         return await self.search(query=None, external_id=None, page=page, size=size)
+
+    async def stream_dataset(self, batch_size: int = 1000) -> AsyncIterator[Sequence[Row]]:
+        """
+        All participants with their metrics and latest scores, from a server-side cursor.
+
+        Args:
+            batch_size: Rows fetched per round trip
+
+        Yields:
+            Batches of rows (id, external_id, full_name, birth_date, metrics,
+            scores) ordered by full_name, id. ``metrics`` maps metric_code to
+            the value as text, ``scores`` maps weight_table_id to
+            [score_pct as text, computed_at] of the latest scoring result;
+            both are None when the participant has none.
+        """
+        metrics = (
+            select(
+                func.jsonb_object_agg(
+                    ParticipantMetric.metric_code, cast(ParticipantMetric.value, Text), type_=JSONB
+                )
+            )
+            .where(ParticipantMetric.participant_id == Participant.id)
+            .scalar_subquery()
+        )
+        latest = (
+            select(
+                ScoringResult.weight_table_id, ScoringResult.score_pct, ScoringResult.computed_at
+            )
+            .where(ScoringResult.participant_id == Participant.id)
+            .distinct(ScoringResult.weight_table_id)
+            .order_by(ScoringResult.weight_table_id, ScoringResult.computed_at.desc())
+            .correlate(Participant)
+            .subquery()
+        )
+        scores = (
+            select(
+                func.jsonb_object_agg(
+                    cast(latest.c.weight_table_id, Text),
+                    func.jsonb_build_array(cast(latest.c.score_pct, Text), latest.c.computed_at),
+                    type_=JSONB,
+                )
+            )
+            .select_from(latest)
+            .scalar_subquery()
+        )
+        stmt = (
+            select(
+                Participant.id,
+                Participant.external_id,
+                Participant.full_name,
+                Participant.birth_date,
+                metrics.label("metrics"),
+                scores.label("scores"),
+            )
+            .order_by(Participant.full_name, Participant.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.db.stream(stmt)
+        async for batch in result.partitions():
+            yield batch
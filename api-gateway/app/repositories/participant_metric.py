@@ -104,6 +104,82 @@ class ParticipantMetricRepository:
             await self.db.refresh(new_metric)
             return new_metric
 
+    async def upsert_many(
+        self,
+        participant_id: UUID,
+        items: list[tuple[str, Decimal, Decimal | None, UUID]],
+    ) -> int:
+        """
+        Upsert many metrics of one participant with a single commit.
+
+        Applies the same priority rules as ``upsert`` (more recent report wins,
+        higher confidence on tie), but resolves them with two queries for the
+        whole batch instead of three queries and a commit per metric.
+
+        Args:
+            participant_id: UUID of the participant
+            items: (metric_code, value, confidence, source_report_id) tuples
+
+        Returns:
+            Number of inserted or updated rows
+        """
+        if not items:
+            return 0
+
+        source_ids = {source_report_id for *_, source_report_id in items}
+        existing_result = await self.db.execute(
+            select(ParticipantMetric, Report.uploaded_at)
+            .outerjoin(Report, Report.id == ParticipantMetric.last_source_report_id)
+            .where(ParticipantMetric.participant_id == participant_id)
+        )
+        existing: dict[str, tuple[ParticipantMetric, datetime | None]] = {
+            metric.metric_code: (metric, uploaded_at)
+            for metric, uploaded_at in existing_result.all()
+        }
+
+        uploaded_result = await self.db.execute(
+            select(Report.id, Report.uploaded_at).where(Report.id.in_(source_ids))
+        )
+        uploaded_at_by_report = dict(uploaded_result.all())
+
+        written = 0
+        for metric_code, value, confidence, source_report_id in items:
+            report_uploaded_at = uploaded_at_by_report[source_report_id]
+            current = existing.get(metric_code)
+
+            if current is None:
+                new_metric = ParticipantMetric(
+                    participant_id=participant_id,
+                    metric_code=metric_code,
+                    value=value,
+                    confidence=confidence,
+                    last_source_report_id=source_report_id,
+                )
+                self.db.add(new_metric)
+                existing[metric_code] = (new_metric, report_uploaded_at)
+                written += 1
+                continue
+
+            metric, existing_uploaded_at = current
+            should_update = (
+                existing_uploaded_at is None
+                or report_uploaded_at > existing_uploaded_at
+                or (
+                    report_uploaded_at == existing_uploaded_at
+                    and (confidence or Decimal("0")) >= (metric.confidence or Decimal("0"))
+                )
+            )
+            if should_update:
+                metric.value = value
+                metric.confidence = confidence
+                metric.last_source_report_id = source_report_id
+                metric.updated_at = datetime.utcnow()
+                existing[metric_code] = (metric, report_uploaded_at)
+                written += 1
+
+        await self.db.commit()
+        return written
+
     async def get_by_participant_and_code(
         self, participant_id: UUID, metric_code: str
     ) -> ParticipantMetric | None:
@@ -157,6 +233,55 @@ class ParticipantMetricRepository:
         metrics = await self.list_by_participant(participant_id)
         return {metric.metric_code: metric.value for metric in metrics}
 
+    async def get_metrics_dicts(
+        self, participant_ids: list[UUID]
+    ) -> dict[UUID, dict[str, Decimal]]:
+        """
+        Get metrics of several participants in one query.
+
+        Args:
+            participant_ids: UUIDs of the participants
+
+        Returns:
+            participant_id -> {metric_code: value}; participants without
+            metrics map to an empty dict
+        """
+        metrics_by_participant: dict[UUID, dict[str, Decimal]] = {
+            participant_id: {} for participant_id in participant_ids
+        }
+        if not participant_ids:
+            return metrics_by_participant
+
+        result = await self.db.execute(
+            select(
+                ParticipantMetric.participant_id,
+                ParticipantMetric.metric_code,
+                ParticipantMetric.value,
+            ).where(ParticipantMetric.participant_id.in_(participant_ids))
+        )
+        for participant_id, metric_code, value in result.all():
+            metrics_by_participant[participant_id][metric_code] = value
+        return metrics_by_participant
+
+    async def get_all_metrics_dicts(self) -> dict[UUID, dict[str, Decimal]]:
+        """
+        Get metrics of every participant that has any, in one query.
+
+        Returns:
+            participant_id -> {metric_code: value}
+        """
+        result = await self.db.execute(
+            select(
+                ParticipantMetric.participant_id,
+                ParticipantMetric.metric_code,
+                ParticipantMetric.value,
+            ).order_by(ParticipantMetric.participant_id)
+        )
+        metrics_by_participant: dict[UUID, dict[str, Decimal]] = {}
+        for participant_id, metric_code, value in result.all():
+            metrics_by_participant.setdefault(participant_id, {})[metric_code] = value
+        return metrics_by_participant
+
     async def delete_by_participant_and_code(
         self, participant_id: UUID, metric_code: str
     ) -> bool:
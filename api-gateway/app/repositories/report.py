@@ -6,7 +6,7 @@ from __future__ import annotations
 
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
@@ -41,6 +41,12 @@ class ReportRepository:
         result = await self.db.execute(stmt)
         return result.scalar_one_or_none()
 
+    async def get_many(self, report_ids: list[UUID]) -> list[Report]:
+        """Get reports by IDs (missing IDs are silently ignored)."""
+        stmt = select(Report).where(Report.id.in_(report_ids))
+        result = await self.db.execute(stmt)
+        return list(result.scalars().all())
+
     async def get_all_by_participant(self, participant_id: UUID) -> list[Report]:
         """Get all reports for a participant."""
         stmt = (
@@ -52,6 +58,72 @@ class ReportRepository:
         result = await self.db.execute(stmt)
         return list(result.scalars().all())
 
+    async def get_file_ref_by_sha256(self, sha256: str, storage: str = "LOCAL") -> FileRef | None:
+        """Get the oldest live file reference with the given content hash."""
+        stmt = (
+            select(FileRef)
+            .where(FileRef.sha256 == sha256, FileRef.storage == storage, FileRef.ref_count > 0)
+            .order_by(FileRef.created_at)
+            .limit(1)
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def get_file_refs_by_sha256(
+        self, hashes: list[str], storage: str = "LOCAL"
+    ) -> dict[str, FileRef]:
+        """Get the oldest live file reference for each content hash in one query."""
+        if not hashes:
+            return {}
+        stmt = (
+            select(FileRef)
+            .where(FileRef.sha256.in_(hashes), FileRef.storage == storage, FileRef.ref_count > 0)
+            .order_by(FileRef.created_at.desc())
+        )
+        result = await self.db.execute(stmt)
+        return {file_ref.sha256: file_ref for file_ref in result.scalars().all()}
+
+    async def acquire_file_ref(self, file_ref_id: UUID, count: int = 1) -> int:
+        """Atomically increment reference count (no commit). Returns the new count."""
+        stmt = (
+            update(FileRef)
+            .where(FileRef.id == file_ref_id)
+            .values(ref_count=FileRef.ref_count + count)
+            .returning(FileRef.ref_count)
+            .execution_options(synchronize_session="fetch")
+        )
+        result = await self.db.execute(stmt)
+        return result.scalar_one()
+
+    async def release_file_ref(self, file_ref_id: UUID, count: int = 1) -> int:
+        """Atomically decrement reference count (no commit). Returns the remaining count."""
+        stmt = (
+            update(FileRef)
+            .where(FileRef.id == file_ref_id, FileRef.ref_count > 0)
+            .values(ref_count=func.greatest(FileRef.ref_count - count, 0))
+            .returning(FileRef.ref_count)
+            .execution_options(synchronize_session="fetch")
+        )
+        result = await self.db.execute(stmt)
+        remaining = result.scalar_one_or_none()
+        return remaining if remaining is not None else 0
+
+    async def find_extracted_by_sha256(
+        self, sha256: str, exclude_report_id: UUID | None = None
+    ) -> Report | None:
+        """Get the most recently extracted report whose original file has this hash."""
+        stmt = (
+            select(Report)
+            .join(FileRef, FileRef.id == Report.file_ref_id)
+            .where(FileRef.sha256 == sha256, Report.status == "EXTRACTED")
+            .order_by(Report.extracted_at.desc().nulls_last())
+            .limit(1)
+        )
+        if exclude_report_id is not None:
+            stmt = stmt.where(Report.id != exclude_report_id)
+        result = await self.db.execute(stmt)
+        return result.scalar_one_or_none()
+
     async def delete(self, report: Report) -> None:
         """Delete report and commit."""
         await self.db.delete(report)
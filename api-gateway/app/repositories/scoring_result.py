@@ -5,13 +5,16 @@ Handles all database operations for scoring results.
 """
 
 from decimal import Decimal
+from typing import Any
 from uuid import UUID
 
-from sqlalchemy import select
+from sqlalchemy import Text, cast, func, insert, literal_column, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.engine import Row
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.db.models import ScoringResult
+from app.db.models import Participant, ParticipantMetric, ScoringResult
 
 
 class ScoringResultRepository:
@@ -63,6 +66,22 @@ class ScoringResultRepository:
         await self.db.refresh(scoring_result)
         return scoring_result
 
+    async def create_many(self, rows: list[dict[str, Any]]) -> int:
+        """
+        Insert many scoring results with one bulk INSERT and one commit.
+
+        Args:
+            rows: Column values per result (including a client-side ``id``)
+
+        Returns:
+            Number of inserted rows
+        """
+        if not rows:
+            return 0
+        await self.db.execute(insert(ScoringResult), rows)
+        await self.db.commit()
+        return len(rows)
+
     async def get_by_id(self, scoring_result_id: UUID) -> ScoringResult | None:
         """
         Get a scoring result by ID.
@@ -83,6 +102,29 @@ class ScoringResultRepository:
         )
         return result.scalar_one_or_none()
 
+    async def get_many(self, scoring_result_ids: list[UUID]) -> list[ScoringResult]:
+        """
+        Get scoring results by IDs with weight table and activity loaded.
+
+        Args:
+            scoring_result_ids: UUIDs of the scoring results
+
+        Returns:
+            Found ScoringResult instances (missing IDs are skipped)
+        """
+        from app.db.models import WeightTable
+
+        if not scoring_result_ids:
+            return []
+        result = await self.db.execute(
+            select(ScoringResult)
+            .options(
+                selectinload(ScoringResult.weight_table).selectinload(WeightTable.prof_activity),
+            )
+            .where(ScoringResult.id.in_(scoring_result_ids))
+        )
+        return list(result.scalars().all())
+
     async def list_by_participant(
         self, participant_id: UUID, limit: int = 10
     ) -> list[ScoringResult]:
@@ -138,6 +180,128 @@ class ScoringResultRepository:
         )
         return result.scalar_one_or_none()
 
+    async def list_participant_ids_by_weight_table(self, weight_table_id: UUID) -> list[UUID]:
+        """
+        Participants with at least one scoring result for a weight table.
+
+        Args:
+            weight_table_id: UUID of the weight table
+
+        Returns:
+            Participant IDs ordered by full name
+        """
+        result = await self.db.execute(
+            select(Participant.id)
+            .where(
+                select(ScoringResult.id)
+                .where(
+                    ScoringResult.participant_id == Participant.id,
+                    ScoringResult.weight_table_id == weight_table_id,
+                )
+                .exists()
+            )
+            .order_by(Participant.full_name, Participant.id)
+        )
+        return list(result.scalars().all())
+
+    def _latest_id(self, participant_id: UUID, weight_table_id: UUID):
+        return (
+            select(ScoringResult.id)
+            .where(
+                ScoringResult.participant_id == participant_id,
+                ScoringResult.weight_table_id == weight_table_id,
+            )
+            .order_by(ScoringResult.computed_at.desc())
+            .limit(1)
+            .scalar_subquery()
+        )
+
+    async def get_final_report_version(
+        self, participant_id: UUID, weight_table_id: UUID
+    ) -> Row | None:
+        """
+        Fingerprint of the data behind a final report, in one query.
+
+        Args:
+            participant_id: UUID of the participant
+            weight_table_id: UUID of the weight table
+
+        Returns:
+            Row (id, recommendations_status, recommendations_digest, full_name,
+            metrics_digest) of the latest scoring result, None if there is none.
+            The digests are MD5s of the recommendations (regeneration keeps the
+            status) and of the participant's metric codes, values and confidences.
+        """
+        metric_entry = func.concat_ws(
+            ":",
+            ParticipantMetric.metric_code,
+            ParticipantMetric.value,
+            ParticipantMetric.confidence,
+        )
+        metrics_digest = (
+            select(
+                func.md5(
+                    func.coalesce(
+                        func.string_agg(
+                            metric_entry,
+                            aggregate_order_by(
+                                literal_column("','"), ParticipantMetric.metric_code
+                            ),
+                        ),
+                        "",
+                    )
+                )
+            )
+            .where(ParticipantMetric.participant_id == participant_id)
+            .scalar_subquery()
+        )
+        result = await self.db.execute(
+            select(
+                ScoringResult.id,
+                ScoringResult.recommendations_status,
+                func.md5(
+                    func.concat_ws(
+                        ":",
+                        cast(ScoringResult.recommendations, Text),
+                        ScoringResult.recommendations_error,
+                    )
+                ).label("recommendations_digest"),
+                Participant.full_name,
+                metrics_digest.label("metrics_digest"),
+            )
+            .join(Participant, Participant.id == ScoringResult.participant_id)
+            .where(ScoringResult.id == self._latest_id(participant_id, weight_table_id))
+        )
+        return result.one_or_none()
+
+    async def get_final_report_rows(
+        self, participant_id: UUID, weight_table_id: UUID
+    ) -> tuple[ScoringResult, str, list[ParticipantMetric]] | None:
+        """
+        Latest scoring result with the participant's name and metrics, in one query.
+
+        Args:
+            participant_id: UUID of the participant
+            weight_table_id: UUID of the weight table
+
+        Returns:
+            (scoring_result, participant full_name, participant metrics) or None
+            if there is no scoring result
+        """
+        result = await self.db.execute(
+            select(ScoringResult, Participant.full_name, ParticipantMetric)
+            .join(Participant, Participant.id == ScoringResult.participant_id)
+            .outerjoin(
+                ParticipantMetric, ParticipantMetric.participant_id == ScoringResult.participant_id
+            )
+            .where(ScoringResult.id == self._latest_id(participant_id, weight_table_id))
+        )
+        rows = result.all()
+        if not rows:
+            return None
+        scoring_result, full_name, _ = rows[0]
+        return scoring_result, full_name, [metric for _, _, metric in rows if metric is not None]
+
     async def delete(self, scoring_result_id: UUID) -> bool:
         """
         Delete a scoring result.
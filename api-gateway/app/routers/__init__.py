@@ -2,11 +2,21 @@
 API routers.
 """
 
-from app.routers import admin, auth, participants, prof_activities, reports, vpn, weights
+from app.routers import (
+    admin,
+    auth,
+    events,
+    participants,
+    prof_activities,
+    reports,
+    vpn,
+    weights,
+)
 
 __all__ = [
     "auth",
     "admin",
+    "events",
     "participants",
     "prof_activities",
     "reports",
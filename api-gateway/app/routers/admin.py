@@ -1,24 +1,52 @@
 """
 Admin router.
 
-Administrative endpoints for user management.
+Administrative endpoints for user management, worker autoscaling, cache status,
+bulk scoring, the cohort ranking index and the dataset export.
 Requires ADMIN role for all operations.
 """
 
+import asyncio
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.autoscale import get_capacity_store
+from app.core.config import settings
 from app.core.dependencies import require_admin
 from app.db.models import User
 from app.db.session import get_db
 from app.schemas.auth import UserResponse
 from app.services.auth import approve_user, list_pending_users
+from app.services.bulk_scoring import BulkScoringService
+from app.services.dataset_export import DatasetExportError, get_writer, stream_dataset
+from app.services.final_report_cache import get_final_report_cache
+from app.services.ranking import RankingService
+from app.services.recommendation_cache import get_recommendation_cache
+from app.services.recommendations import parse_path_stats
+from app.services.reference_cache import SCOPES, get_reference_cache
+from app.services.weight_catalog import get_weight_catalog_cache
 
 router = APIRouter()
 
 
+class BulkScoringRequest(BaseModel):
+    """Request schema for bulk scoring."""
+
+    participant_ids: list[UUID] | None = Field(
+        default=None, description="Participants to score (default: everyone with metrics)"
+    )
+    activity_codes: list[str] | None = Field(
+        default=None, description="Activities to score (default: all with a weight table)"
+    )
+    enqueue_recommendations: bool = Field(
+        default=False, description="Queue batch AI recommendations for the new results"
+    )
+
+
 @router.get("/pending-users", response_model=list[UserResponse])
 async def get_pending_users(
     db: AsyncSession = Depends(get_db),
@@ -70,3 +98,174 @@ async def approve_user_endpoint(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=str(e),
         ) from e
+
+
+@router.get("/autoscale")
+async def get_autoscale_decisions(
+    _admin: User = Depends(require_admin),
+):
+    """
+    Latest capacity-aware autoscaling decision of every running worker.
+
+    **Requires:** ADMIN role
+
+    **Returns:** Per worker: queue, concurrency cap, capacity limit (from
+    healthy Gemini keys × QPS), demand (queue depth + reserved tasks),
+    quota share and the reason of the last change. Empty when
+    WORKER_CAPACITY_AUTOSCALE is off or no worker runs with --autoscale.
+
+    **Errors:**
+    - 401: Not authenticated
+    - 403: Not an admin
+    """
+    decisions = await asyncio.to_thread(get_capacity_store().decisions)
+    return {"enabled": settings.worker_capacity_autoscale, "workers": decisions}
+
+
+@router.get("/cache-stats")
+async def get_cache_stats(
+    _admin: User = Depends(require_admin),
+):
+    """
+    Hit-rate statistics of application caches.
+
+    **Requires:** ADMIN role
+
+    **Returns:** Per cache: `local` counters of this API process (hits,
+    misses, evictions, expirations, hit_rate, entries) and `shared` counters
+    summed over all processes in Redis (null when Redis is unavailable).
+    `weights` (compiled weight tables) also reports reloads, invalidations
+    and the catalog version of this process next to the shared version.
+    `reference` (metric definitions, activities, label mappings) counts Redis
+    lookups in `shared` and reports the version of each invalidation scope.
+    `final_reports` is per process only. `recommendation_parse_paths` counts
+    how model output became a valid response (direct, repaired, llm_self_heal,
+    healed, failed); `shared` sums the API and worker processes.
+
+    **Errors:**
+    - 401: Not authenticated
+    - 403: Not an admin
+    """
+    return {
+        "recommendations": await asyncio.to_thread(get_recommendation_cache().stats),
+        "weights": await asyncio.to_thread(get_weight_catalog_cache().stats),
+        "reference": await asyncio.to_thread(get_reference_cache().stats),
+        "final_reports": get_final_report_cache().stats(),
+        "recommendation_parse_paths": await asyncio.to_thread(parse_path_stats),
+    }
+
+
+@router.post("/reference-cache/invalidate")
+async def invalidate_reference_cache(
+    scope: str = Query(..., description=f"One of: {', '.join(SCOPES)}"),
+    _admin: User = Depends(require_admin),
+):
+    """
+    Drop cached reference data in every API and worker process.
+
+    Metric definition and activity writes through the API invalidate the
+    cache themselves; use this after editing the metric mapping YAML or the
+    tables directly (the label mappings then reload from the file).
+
+    **Requires:** ADMIN role
+
+    **Errors:**
+    - 400: Unknown scope
+    - 401: Not authenticated
+    - 403: Not an admin
+    """
+    if scope not in SCOPES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown scope '{scope}'. Supported scopes: {', '.join(SCOPES)}",
+        )
+    await get_reference_cache().invalidate(scope, "admin")
+    return {"scope": scope, "invalidated": True}
+
+
+@router.post("/bulk-scoring")
+async def run_bulk_scoring(
+    request: BulkScoringRequest,
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(require_admin),
+):
+    """
+    Score many participants against every professional activity at once.
+
+    **Requires:** ADMIN role
+
+    **Flow:** loads participant metrics and weight tables once, computes all
+    scores with one vectorized pass and saves the ScoringResult rows with one
+    bulk insert. Pairs with missing or out-of-range metrics are skipped.
+
+    **Returns:** counts (participants, activities, scored, skipped), activities
+    skipped with the reason, created scoring_result_ids, recommendation task IDs
+    and timings per stage
+
+    **Errors:**
+    - 401: Not authenticated
+    - 403: Not an admin
+    """
+    summary = await BulkScoringService(db).score_all(
+        participant_ids=request.participant_ids,
+        activity_codes=request.activity_codes,
+        enqueue_recommendations=request.enqueue_recommendations,
+    )
+    return summary.as_dict()
+
+
+@router.post("/ranking/rebuild")
+async def rebuild_ranking_index(
+    db: AsyncSession = Depends(get_db),
+    _admin: User = Depends(require_admin),
+):
+    """
+    Rebuild the cohort ranking of every professional activity.
+
+    The index is normally kept up to date incrementally; use this after
+    restoring Redis or bulk-importing metrics outside the API.
+
+    **Requires:** ADMIN role
+
+    **Returns:** participants indexed per activity, activities without a
+    usable weight table, `indexed` (false when Redis is unavailable or the
+    index is disabled) and elapsed_ms
+
+    **Errors:**
+    - 401: Not authenticated
+    - 403: Not an admin
+    """
+    return await RankingService(db).rebuild_all()
+
+
+@router.get("/export/dataset", response_class=StreamingResponse)
+async def export_dataset(
+    format: str = Query("csv", description="File format: 'csv', 'parquet' or 'xlsx'"),
+    _admin: User = Depends(require_admin),
+):
+    """
+    Download every participant with all metric values and latest scores.
+
+    **Requires:** ADMIN role
+
+    **Returns:** one row per participant (participant_id, external_id,
+    full_name, birth_date), one column per metric code and, per activity with
+    a weight table, `score_pct:<code>` and `scored_at:<code>` of the latest
+    scoring result. Rows are read from a server-side cursor and the file is
+    streamed as it is written (XLSX is sent once complete).
+
+    **Errors:**
+    - 400: Unknown format or optional package (pyarrow, openpyxl) not installed
+    - 401: Not authenticated
+    - 403: Not an admin
+    """
+    try:
+        writer = get_writer(format)
+    except DatasetExportError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    return StreamingResponse(
+        stream_dataset(format),
+        media_type=writer.media_type,
+        headers={"Content-Disposition": f'attachment; filename="participants.{writer.extension}"'},
+    )
@@ -0,0 +1,86 @@
+"""
+Server-Sent Events stream of report extraction and recommendation status.
+"""
+
+from __future__ import annotations
+
+import logging
+from uuid import UUID
+
+import redis
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core import events
+from app.core.config import settings
+from app.core.dependencies import get_current_active_user
+from app.db.models import User
+from app.db.session import get_db
+from app.repositories.report import ReportRepository
+from app.repositories.scoring_result import ScoringResultRepository
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(tags=["events"])
+
+
+@router.get("/events/participants/{participant_id}")
+async def participant_events(
+    participant_id: UUID,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """
+    Stream status events of a participant's reports and scoring results (SSE).
+
+    The stream starts with the current status of every report and recent
+    scoring result, then pushes ``report`` events (status, extraction stage,
+    progress) and ``recommendations`` events as Celery tasks publish them.
+    EventSource sends the auth cookie; Bearer tokens work for other clients.
+
+    Returns 503 when status events are disabled or Redis is unavailable, so
+    clients can fall back to polling.
+
+    Requires active authentication.
+    """
+    report_repo = ReportRepository(db)
+    if not await report_repo.participant_exists(participant_id):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Participant not found")
+    if not settings.status_events_enabled:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Status events are disabled"
+        )
+
+    try:
+        pubsub = await events.subscribe(participant_id)
+    except (redis.RedisError, OSError) as exc:
+        logger.warning(
+            "status_events_subscribe_failed",
+            extra={"participant_id": str(participant_id), "error": str(exc)},
+        )
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Status events unavailable",
+        ) from exc
+
+    # Snapshot after subscribing: nothing published in between is lost
+    try:
+        reports = await report_repo.get_all_by_participant(participant_id)
+        scoring_results = await ScoringResultRepository(db).list_by_participant(participant_id)
+    except BaseException:
+        await pubsub.aclose()
+        await pubsub.connection_pool.disconnect()
+        raise
+    snapshot = events.snapshot_events(participant_id, reports, scoring_results)
+
+    return StreamingResponse(
+        events.stream_events(pubsub, snapshot, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            # nginx: deliver events immediately instead of buffering the response
+            "X-Accel-Buffering": "no",
+        },
+    )
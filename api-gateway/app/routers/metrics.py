@@ -32,6 +32,8 @@ from app.schemas.metric import (
     MetricTemplateResponse,
 )
 from app.services.metric_mapping import get_metric_mapping_service
+from app.services.reference_cache import METRIC_DEFS, get_metric_defs, get_reference_cache
+from app.services.weight_catalog import get_weight_catalog_cache
 
 router = APIRouter(prefix="/api", tags=["metrics"])
 
@@ -89,6 +91,8 @@ async def create_metric_def(
         max_value=request.max_value,
         active=request.active,
     )
+    await get_weight_catalog_cache().invalidate("metric_def_create")
+    await get_reference_cache().invalidate(METRIC_DEFS, "metric_def_create")
     return MetricDefResponse.model_validate(metric_def)
 
 
@@ -108,11 +112,8 @@ async def list_metric_defs(
 
     Returns: List of metric definitions sorted by code.
     """
-    repo = MetricDefRepository(db)
-    metrics = await repo.list_all(active_only=active_only)
-    return MetricDefListResponse(
-        items=[MetricDefResponse.model_validate(m) for m in metrics], total=len(metrics)
-    )
+    metrics = await get_metric_defs(MetricDefRepository(db), active_only=active_only)
+    return MetricDefListResponse(items=metrics, total=len(metrics))
 
 
 @router.get("/metric-defs/{metric_def_id}", response_model=MetricDefResponse)
@@ -168,6 +169,8 @@ async def update_metric_def(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Metric definition not found"
         )
+    await get_weight_catalog_cache().invalidate("metric_def_update")
+    await get_reference_cache().invalidate(METRIC_DEFS, "metric_def_update")
     return MetricDefResponse.model_validate(metric_def)
 
 
@@ -192,6 +195,8 @@ async def delete_metric_def(
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Metric definition not found"
         )
+    await get_weight_catalog_cache().invalidate("metric_def_delete")
+    await get_reference_cache().invalidate(METRIC_DEFS, "metric_def_delete")
     return MessageResponse(message="Metric definition deleted successfully")
 
 
@@ -222,8 +227,7 @@ async def get_metric_template(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
 
     # Get all active metric definitions
-    metric_def_repo = MetricDefRepository(db)
-    all_metric_defs = await metric_def_repo.list_all(active_only=True)
+    all_metric_defs = await get_metric_defs(MetricDefRepository(db))
 
     # Get existing extracted metrics for this report
     extracted_metric_repo = ExtractedMetricRepository(db)
@@ -243,7 +247,7 @@ async def get_metric_template(
             filled_count += 1
             template_items.append(
                 MetricTemplateItem(
-                    metric_def=MetricDefResponse.model_validate(metric_def),
+                    metric_def=metric_def,
                     value=extracted.value,
                     source=extracted.source,
                     confidence=extracted.confidence,
@@ -253,7 +257,7 @@ async def get_metric_template(
         else:
             template_items.append(
                 MetricTemplateItem(
-                    metric_def=MetricDefResponse.model_validate(metric_def),
+                    metric_def=metric_def,
                     value=None,
                     source=None,
                     confidence=None,
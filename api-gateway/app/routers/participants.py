@@ -7,7 +7,7 @@ All endpoints require authentication (ACTIVE user).
 
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -31,6 +31,8 @@ from app.schemas.participant import (
     ScoringHistoryResponse,
 )
 from app.services.participant import ParticipantService
+from app.services.ranking import RankingService
+from app.services.reference_cache import get_metric_defs
 from app.services.scoring import ScoringService
 
 router = APIRouter(prefix="/participants", tags=["participants"])
@@ -170,6 +172,8 @@ async def delete_participant(
 @router.get("/{participant_id}/final-report", response_model=FinalReportResponse)
 async def get_final_report(
     participant_id: UUID,
+    request: Request,
+    response: Response,
     activity_code: str = Query(..., description="Professional activity code"),
     format: str = Query("json", description="Response format: 'json' or 'html'"),
     db: AsyncSession = Depends(get_db),
@@ -194,6 +198,11 @@ async def get_final_report(
     - JSON: FinalReportResponse with all report data
     - HTML: Rendered HTML report (if format=html)
 
+    Caching: responses carry an ETag derived from the scoring result, the
+    participant's metrics and the content of the weight catalog; a matching
+    If-None-Match is answered with 304 after one version query. Assembled
+    reports are also kept in memory under the same fingerprint.
+
     Raises:
     - 404: Participant or activity not found
     - 400: No scoring result found (calculate score first)
@@ -201,9 +210,17 @@ async def get_final_report(
     scoring_service = ScoringService(db)
 
     try:
+        version = await scoring_service.final_report_version(participant_id, activity_code)
+        etag = version.etag("html" if format == "html" else "json")
+        headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+        if_none_match = request.headers.get("if-none-match", "")
+        if etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
         report_data = await scoring_service.generate_final_report(
             participant_id=participant_id,
             prof_activity_code=activity_code,
+            version=version,
         )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
@@ -213,9 +230,10 @@ async def get_final_report(
         from app.services.report_template import render_final_report_html
 
         html_content = render_final_report_html(report_data)
-        return HTMLResponse(content=html_content)
+        return HTMLResponse(content=html_content, headers=headers)
 
     # Return JSON by default
+    response.headers.update(headers)
     return FinalReportResponse(**report_data)
 
 
@@ -334,8 +352,7 @@ async def get_participant_metrics(
     by_code = {m.metric_code: m for m in metrics}
 
     # Ensure full metric coverage: load all defined MetricDefs
-    metric_def_repo = MetricDefRepository(db)
-    metric_defs = await metric_def_repo.list_all(active_only=True)
+    metric_defs = await get_metric_defs(MetricDefRepository(db))
 
     # Compose response list: existing metrics OR synthetic zeros
     response_items: list[ParticipantMetricResponse] = []
@@ -417,4 +434,5 @@ async def update_participant_metric(
             detail=f"Metric '{metric_code}' not found for participant {participant_id}",
         )
 
+    await RankingService(db).refresh_participant(participant_id)
     return ParticipantMetricResponse.model_validate(metric)
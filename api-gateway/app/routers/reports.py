@@ -6,25 +6,35 @@ from __future__ import annotations
 
 from uuid import UUID
 
+from celery import group
 from fastapi import (
     APIRouter,
     Depends,
     File,
     Form,
+    Query,
     Request,
     Response,
     UploadFile,
     status,
 )
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, RedirectResponse, StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import settings
 from app.core.dependencies import get_current_active_user
 from app.db.models import User
 from app.db.session import get_db
-from app.schemas.report import ReportListResponse, ReportResponse, ReportUploadResponse
+from app.schemas.report import (
+    ReportBatchExtractRequest,
+    ReportBulkUploadResponse,
+    ReportListResponse,
+    ReportResponse,
+    ReportUploadResponse,
+)
 from app.services.report import ReportService
-from app.tasks.extraction import extract_images_from_report
+from app.services.report_bulk import ReportBulkUploadService
+from app.tasks.extraction import extract_images_from_report, extract_images_from_reports_batch
 
 router = APIRouter(tags=["reports"])
 
@@ -81,23 +91,59 @@ async def download_report(
     """
     Download original DOCX report.
 
-    Returns 304 when If-None-Match matches stored ETag.
+    Returns 304 when If-None-Match matches the ETag stored at upload (no file
+    access). LOCAL files are served by FileResponse (Range supported) or, with
+    REPORT_DOWNLOAD_OFFLOAD, by the reverse proxy. Object storage downloads
+    redirect to a presigned URL, or are proxied with single-range support
+    when S3_PRESIGN_DOWNLOADS is off.
     """
     service = ReportService(db)
-    context = await service.get_download_context(report_id)
-
-    if ReportService.matches_etag(request.headers.get("if-none-match"), context.etag):
-        return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+    context = await service.get_download_context(
+        report_id, if_none_match=request.headers.get("if-none-match")
+    )
 
     headers = {"ETag": ReportService.format_etag(context.etag)}
+    if context.not_modified:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    offload_headers = ReportService.offload_headers(context)
+    if offload_headers is not None:
+        headers["Content-Disposition"] = f'attachment; filename="{context.filename}"'
+        return Response(media_type=context.mime, headers={**headers, **offload_headers})
+
+    if context.path is not None:
+        return FileResponse(
+            path=context.path,
+            media_type=context.mime,
+            filename=context.filename,
+            headers=headers,
+        )
+
+    presigned_url = await service.presigned_download_url(context)
+    if presigned_url is not None:
+        return RedirectResponse(
+            presigned_url, status_code=status.HTTP_307_TEMPORARY_REDIRECT, headers=headers
+        )
 
-    return FileResponse(
-        path=context.path,
+    headers["Accept-Ranges"] = "bytes"
+    headers["Content-Disposition"] = f'attachment; filename="{context.filename}"'
+    byte_range = ReportService.parse_range(request.headers.get("range"), context.size_bytes)
+    if byte_range is None:
+        headers["Content-Length"] = str(context.size_bytes)
+        return StreamingResponse(
+            context.storage.iter_bytes(context.key), media_type=context.mime, headers=headers
+        )
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{context.size_bytes}"
+    headers["Content-Length"] = str(end - start + 1)
+    return StreamingResponse(
+        context.storage.iter_bytes(context.key, start, end),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
         media_type=context.mime,
-        filename=context.filename,
         headers=headers,
     )
 
+
 @router.delete(
     "/reports/{report_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -123,6 +169,9 @@ async def delete_report(
 async def extract_report(
     report_id: UUID,
     request: Request,
+    restart: bool = Query(
+        False, description="Drop extraction checkpoints and run every stage again"
+    ),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> dict:
@@ -131,17 +180,15 @@ async def extract_report(
 
     Returns immediately with task ID. Extraction happens asynchronously.
     Report status will be updated to EXTRACTED or FAILED when complete.
+    A failed or interrupted extraction resumes from its last completed stage
+    unless restart=true.
 
     Requires active authentication.
     """
     service = ReportService(db)
 
-    # Verify report exists and belongs to accessible participant
-    report = await service.get_report_by_id(report_id)
-
-    # Update report status to PROCESSING
-    report.status = "PROCESSING"
-    await db.commit()
+    # Verify report exists, optionally drop checkpoints, set PROCESSING
+    await service.start_extraction(report_id, restart=restart)
 
     # Queue extraction task
     request_id = getattr(request.state, "request_id", None)
@@ -153,3 +200,90 @@ async def extract_report(
         "status": "accepted",
         "message": "Extraction task started",
     }
+
+
+@router.post(
+    "/reports/extract-batch",
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def extract_reports_batch(
+    payload: ReportBatchExtractRequest,
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> dict:
+    """
+    Start batched extraction of many reports.
+
+    Table images of each participant's reports are packed into shared canvases,
+    so a participant needs 1-2 Gemini Vision requests instead of one per report.
+
+    Reports that are already EXTRACTED are skipped and listed in
+    ``skipped_report_ids``.
+
+    Requires active authentication.
+    """
+    service = ReportService(db)
+    reports, skipped = await service.mark_reports_processing(payload.report_ids)
+    report_ids = [str(report.id) for report in reports]
+    skipped_report_ids = [str(report.id) for report in skipped]
+
+    if not report_ids:
+        return {
+            "report_ids": [],
+            "skipped_report_ids": skipped_report_ids,
+            "task_id": None,
+            "status": "skipped",
+            "message": "All reports are already extracted",
+        }
+
+    request_id = getattr(request.state, "request_id", None)
+    task = extract_images_from_reports_batch.delay(report_ids, request_id=request_id)
+
+    return {
+        "report_ids": report_ids,
+        "skipped_report_ids": skipped_report_ids,
+        "task_id": task.id,
+        "status": "accepted",
+        "message": "Batch extraction task started",
+    }
+
+
+@router.post(
+    "/reports/bulk-upload",
+    response_model=ReportBulkUploadResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+async def bulk_upload_reports(
+    request: Request,
+    file: UploadFile = File(...),
+    extract: bool = Form(True),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> ReportBulkUploadResponse:
+    """
+    Upload a ZIP archive of DOCX reports with a manifest.
+
+    manifest.csv / manifest.json maps each file to a participant by external_id
+    (columns: filename, external_id, full_name, birth_date); missing participants
+    are created. Files are streamed from the archive into storage one by one.
+
+    With extract=true the new reports are extracted by a group of batch tasks,
+    one per chunk of BULK_EXTRACT_CHUNK_SIZE reports.
+
+    Requires active authentication.
+    """
+    service = ReportBulkUploadService(db)
+    result = await service.ingest(file, mark_processing=extract)
+
+    if extract and result.items:
+        request_id = getattr(request.state, "request_id", None)
+        chunks = ReportBulkUploadService.extraction_chunks(
+            result.items, settings.bulk_extract_chunk_size
+        )
+        job = group(
+            extract_images_from_reports_batch.s(chunk, request_id=request_id) for chunk in chunks
+        ).apply_async()
+        result.extraction_task_ids = [task.id for task in job.results]
+
+    return result
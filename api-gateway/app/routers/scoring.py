@@ -6,14 +6,19 @@ Provides endpoints for:
 - Generating strengths and development areas (S2-03)
 - Generating AI recommendations (AI-03)
 - Fetching scoring history for participants (S2-06)
+- Ranking all activities for a participant (read-only best fit)
+- What-if scoring with hypothetical weights or metric values (read-only)
+- Cohort leaderboards and percentiles per activity
+- Bulk export of final reports (streamed ZIP of HTML/PDF)
 """
 
 from decimal import Decimal
-from typing import Union
+from typing import Annotated, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from pydantic import BaseModel, Field
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, model_validator
 from typing_extensions import Literal
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -24,6 +29,10 @@ from app.db.models import User
 from app.db.session import get_db
 from app.repositories.participant import ParticipantRepository
 from app.repositories.scoring_result import ScoringResultRepository
+from app.schemas.weight_table import WeightItem
+from app.services.ranking import RankingService
+from app.services.report_export import export_filename, stream_final_reports_zip
+from app.services.report_template import ReportRenderError, ensure_pdf_renderer
 from app.services.scoring import ScoringService
 
 router = APIRouter(prefix="/scoring", tags=["scoring"])
@@ -41,6 +50,13 @@ class MetricContribution(BaseModel):
     contribution: str  # Decimal as string
 
 
+class MetricWeight(BaseModel):
+    """Weight of one metric in the table used for scoring."""
+
+    metric_code: str
+    weight: str  # Decimal as string
+
+
 class MetricItem(BaseModel):
     """Metric item for strengths/dev_areas (S2-03)."""
 
@@ -105,6 +121,162 @@ class ScoringHistoryResponse(BaseModel):
     items: list[ScoringHistoryItem]
 
 
+class ActivityFitItem(BaseModel):
+    """One activity in the best-fit ranking."""
+
+    rank: int | None = Field(
+        None, description="1 = best fit; null if the activity cannot be scored"
+    )
+    prof_activity_code: str
+    prof_activity_name: str | None = None
+    weight_table_id: str | None = None
+    score_pct: Decimal | None = Field(None, description="Score (0-100) or null if not computable")
+    coverage_pct: Decimal = Field(
+        ..., description="Share of the weight covered by valid participant metrics (0-100)"
+    )
+    missing_metrics: list[str] = Field(default_factory=list)
+    out_of_range_metrics: list[str] = Field(
+        default_factory=list, description="Metrics outside [1..10]"
+    )
+    error: str | None = Field(None, description="Why the weight table cannot be used")
+
+
+class BestFitResponse(BaseModel):
+    """Response schema for the best-fit ranking."""
+
+    participant_id: str
+    best: str | None = Field(None, description="Code of the best-fitting activity")
+    items: list[ActivityFitItem]
+
+
+# Same precision as participant_metric.value (NUMERIC(4, 2)): the vectorized
+# scoring is exact only for values that can be stored
+MetricOverride = Annotated[Decimal, Field(max_digits=4, decimal_places=2)]
+
+
+class WhatIfRequest(BaseModel):
+    """Request schema for what-if scoring."""
+
+    participant_ids: list[UUID] = Field(..., min_length=1, max_length=1000)
+    prof_activity_code: str | None = Field(
+        None, description="Activity whose current weight table is used unless weights are given"
+    )
+    weights: list[WeightItem] | None = Field(
+        None, description="Hypothetical weight table (must sum to 1.0)"
+    )
+    metric_overrides: dict[str, MetricOverride] = Field(
+        default_factory=dict,
+        description="Metric values replacing the stored ones for every participant",
+    )
+
+    @model_validator(mode="after")
+    def validate_weights_source(self) -> "WhatIfRequest":
+        """Require weights or an activity; ad-hoc weights must sum to 1.0 without duplicates."""
+        if self.weights is None:
+            if self.prof_activity_code is None:
+                raise ValueError("Either prof_activity_code or weights is required")
+            return self
+        if not self.weights:
+            raise ValueError("At least one metric weight is required")
+        if len({item.metric_code for item in self.weights}) != len(self.weights):
+            raise ValueError("Duplicate metric codes in weights")
+        if sum(item.weight for item in self.weights) != Decimal("1"):
+            raise ValueError("Sum of weights must equal 1.0")
+        return self
+
+
+class WhatIfItem(BaseModel):
+    """What-if score of one participant."""
+
+    participant_id: str
+    score_pct: Decimal | None = Field(
+        None, description="Score (0-100) or null if metrics are missing or out of range"
+    )
+    details: list[MetricContribution] = Field(default_factory=list)
+    strengths: list[MetricItem] = Field(default_factory=list)
+    dev_areas: list[MetricItem] = Field(default_factory=list)
+    missing_metrics: list[str] = Field(default_factory=list)
+    out_of_range_metrics: list[str] = Field(
+        default_factory=list, description="Metrics outside [1..10]"
+    )
+
+
+class WhatIfResponse(BaseModel):
+    """Response schema for what-if scoring."""
+
+    prof_activity_code: str | None = None
+    weight_table_id: str | None = Field(
+        None, description="Weight table used (null for hypothetical weights)"
+    )
+    weights: list[MetricWeight]
+    items: list[WhatIfItem]
+
+
+class LeaderboardItem(BaseModel):
+    """One participant in an activity leaderboard."""
+
+    rank: int = Field(..., description="1 = best; tied scores share the rank")
+    participant_id: str
+    full_name: str | None = None
+    score_pct: Decimal
+
+
+class LeaderboardResponse(BaseModel):
+    """Response schema for an activity leaderboard page."""
+
+    prof_activity_code: str
+    weight_table_id: str
+    total: int = Field(..., description="Participants that can be scored for the activity")
+    offset: int
+    limit: int
+    items: list[LeaderboardItem]
+
+
+class ParticipantRankResponse(BaseModel):
+    """Response schema for a participant's position in an activity cohort."""
+
+    prof_activity_code: str
+    participant_id: str
+    score_pct: Decimal | None = Field(
+        None, description="Null if the participant cannot be scored for the activity"
+    )
+    rank: int | None = None
+    total: int | None = None
+    percentile: Decimal | None = Field(
+        None, description="Share of the cohort scoring lower, ties counted as half (0-100)"
+    )
+
+
+class FinalReportExportRequest(BaseModel):
+    """Request schema for bulk final report export."""
+
+    prof_activity_code: str = Field(..., min_length=1)
+    participant_ids: list[UUID] | None = Field(
+        None,
+        min_length=1,
+        max_length=5000,
+        description="Participants to export; omit to export everyone scored for the activity",
+    )
+    include_pdf: bool = Field(False, description="Add a PDF next to every HTML report")
+
+
+class RecommendationsBatchRequest(BaseModel):
+    """Request schema for batch recommendations generation."""
+
+    scoring_result_ids: list[UUID] = Field(..., min_length=1, max_length=500)
+
+
+class RecommendationsBatchResponse(BaseModel):
+    """Response schema for batch recommendations generation."""
+
+    queued: list[str] = Field(..., description="Results queued for generation")
+    skipped: list[str] = Field(
+        default_factory=list, description="Results already ready or disabled"
+    )
+    not_found: list[str] = Field(default_factory=list)
+    task_ids: list[str] = Field(default_factory=list, description="One Celery task per batch")
+
+
 # ===== Endpoints =====
 
 
@@ -221,3 +393,225 @@ async def get_participant_scoring_history(
         )
 
     return ScoringHistoryResponse(items=items)
+
+
+@router.get("/participants/{participant_id}/best-fit", response_model=BestFitResponse)
+async def get_participant_best_fit(
+    participant_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Rank all professional activities for a participant.
+
+    Read-only: scores are computed in one pass over all weight tables with the
+    same formula as `/calculate`, but nothing is saved and no AI
+    recommendations are generated.
+
+    Returns:
+    - items: activities ranked by score_pct; activities with missing or
+      out-of-range metrics follow (rank null), ordered by weight coverage
+    - best: code of the top activity (null if none can be scored)
+
+    Raises:
+    - 404: Participant not found
+    - 401: Unauthorized
+    """
+    participant = await ParticipantRepository(db).get_by_id(participant_id)
+    if not participant:
+        raise HTTPException(status_code=404, detail="Participant not found")
+
+    result = await ScoringService(db).rank_activities(participant_id)
+    return BestFitResponse(
+        participant_id=result["participant_id"],
+        best=result["best"],
+        items=[ActivityFitItem(**item) for item in result["items"]],
+    )
+
+
+@router.post("/what-if", response_model=WhatIfResponse)
+async def score_what_if(
+    request: WhatIfRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Score participants against hypothetical weights or metric values.
+
+    Read-only: uses the activity's current weight table or the given `weights`,
+    with `metric_overrides` applied on top of each participant's stored
+    metrics, and the same formula as `/calculate`. Nothing is saved and no AI
+    recommendations are generated.
+
+    Returns per participant: score_pct with contributions, strengths and
+    dev_areas, or null with the missing / out-of-range metrics.
+
+    Raises:
+    - 400: Unknown activity, no usable weight table or unknown metric codes
+    - 404: Participant not found
+    - 401: Unauthorized
+    """
+    participants = await ParticipantRepository(db).get_many(request.participant_ids)
+    missing = [str(pid) for pid in request.participant_ids if pid not in participants]
+    if missing:
+        raise HTTPException(status_code=404, detail=f"Participants not found: {', '.join(missing)}")
+
+    try:
+        result = await ScoringService(db).score_what_if(
+            request.participant_ids,
+            prof_activity_code=request.prof_activity_code,
+            weights=(
+                {item.metric_code: item.weight for item in request.weights}
+                if request.weights is not None
+                else None
+            ),
+            metric_overrides=request.metric_overrides,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return WhatIfResponse(
+        **{key: value for key, value in result.items() if key not in ("weights", "items")},
+        weights=[MetricWeight(**item) for item in result["weights"]],
+        items=[WhatIfItem(**item) for item in result["items"]],
+    )
+
+
+@router.get("/activities/{activity_code}/leaderboard", response_model=LeaderboardResponse)
+async def get_activity_leaderboard(
+    activity_code: str,
+    limit: int = Query(50, ge=1, le=500, description="Page size (top-K with offset 0)"),
+    offset: int = Query(0, ge=0),
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Participants ranked by their current score for an activity.
+
+    Scores come from the participants' current metrics and the activity's
+    weight table (same formula as `/calculate`) and are kept in a ranking
+    index updated when metrics or weights change; nothing is saved.
+    Participants with missing or out-of-range metrics are not ranked.
+
+    Raises:
+    - 404: Activity has no usable weight table
+    - 401: Unauthorized
+    """
+    try:
+        result = await RankingService(db).leaderboard(activity_code, limit=limit, offset=offset)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    return LeaderboardResponse(
+        **{key: value for key, value in result.items() if key != "items"},
+        items=[LeaderboardItem(**item) for item in result["items"]],
+    )
+
+
+@router.get(
+    "/activities/{activity_code}/participants/{participant_id}/rank",
+    response_model=ParticipantRankResponse,
+)
+async def get_participant_activity_rank(
+    activity_code: str,
+    participant_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Rank and percentile of a participant within an activity's cohort.
+
+    Returns:
+    - score_pct, rank (ties share the rank), total ranked participants and
+      percentile; all null if the participant cannot be scored
+
+    Raises:
+    - 404: Participant not found or activity has no usable weight table
+    - 401: Unauthorized
+    """
+    participant = await ParticipantRepository(db).get_by_id(participant_id)
+    if not participant:
+        raise HTTPException(status_code=404, detail="Participant not found")
+
+    try:
+        result = await RankingService(db).participant_rank(activity_code, participant_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    return ParticipantRankResponse(**result)
+
+
+@router.post("/final-reports/export", response_class=StreamingResponse)
+async def export_final_reports(
+    request: FinalReportExportRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Download the final reports of many participants as one ZIP archive.
+
+    Exports the given participants or, without `participant_ids`, the activity
+    cohort (everyone with a scoring result for its current weight table).
+    Reports are rendered concurrently and the archive is streamed as it is
+    built. Every report is `<full name>_<participant id>.html` (plus `.pdf`
+    with `include_pdf`); `manifest.json` lists the exported files and the
+    participants skipped with the reason (e.g. no scoring result).
+
+    Raises:
+    - 400: Unknown activity, no active weight table or PDF renderer not installed
+    - 404: Participant not found
+    - 401: Unauthorized
+    """
+    if request.include_pdf:
+        try:
+            ensure_pdf_renderer()
+        except ReportRenderError as e:
+            raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if request.participant_ids is not None:
+        participants = await ParticipantRepository(db).get_many(request.participant_ids)
+        missing = [str(pid) for pid in request.participant_ids if pid not in participants]
+        if missing:
+            raise HTTPException(
+                status_code=404, detail=f"Participants not found: {', '.join(missing)}"
+            )
+
+    try:
+        participant_ids = await ScoringService(db).final_report_participants(
+            request.prof_activity_code, request.participant_ids
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    return StreamingResponse(
+        stream_final_reports_zip(
+            request.prof_activity_code, participant_ids, include_pdf=request.include_pdf
+        ),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="{export_filename(request.prof_activity_code)}"'
+            )
+        },
+    )
+
+
+@router.post("/recommendations/batch", response_model=RecommendationsBatchResponse, status_code=202)
+async def queue_recommendations_batch(
+    payload: RecommendationsBatchRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Queue AI recommendations for many scoring results (cohort runs).
+
+    Several scoring results are packed into one Gemini request
+    (RECOMMENDATIONS_BATCH_SIZE per request); results with status pending or
+    error are (re)generated, the rest are skipped. Progress is visible through
+    recommendations_status and the participant status events.
+
+    Returns:
+    - queued / skipped / not_found scoring result IDs
+    - task_ids: Celery task per batch
+    """
+    result = await ScoringService(db).enqueue_recommendations_batch(payload.scoring_result_ids)
+    return RecommendationsBatchResponse(**result)
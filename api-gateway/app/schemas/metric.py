@@ -173,6 +173,35 @@ class MessageResponse(BaseModel):
     message: str
 
 
+# ===== Vision Extraction Schemas =====
+
+
+class VisionMetricItem(BaseModel):
+    """A label/value pair read from a report image by Gemini Vision."""
+
+    label: str = Field(..., min_length=1, description="Metric label as printed in the report")
+    value: str = Field(..., min_length=1, description="Value as printed, e.g. '7,5'")
+    section: int | None = Field(
+        None, description="Section number of the image (batch canvases only)"
+    )
+
+    @field_validator("label", "value", mode="before")
+    @classmethod
+    def coerce_to_str(cls, v):
+        """Accept numbers (models sometimes drop the quotes) and strip whitespace."""
+        if isinstance(v, int | float):
+            v = str(v)
+        return v.strip() if isinstance(v, str) else v
+
+
+class MetricsExtractionResponse(BaseModel):
+    """Structured output of the vision extraction prompt."""
+
+    metrics: list[VisionMetricItem] = Field(
+        default_factory=list, description="Metrics found on the image"
+    )
+
+
 # ===== Metric Template Schemas =====
 
 
@@ -157,6 +157,16 @@ class RecommendationsResponse(BaseModel):
         }
 
 
+class RecommendationsBatchElement(RecommendationsResponse):
+    """
+    One element of a batch recommendations response.
+
+    Gemini returns a JSON array of these, one per scoring result in the prompt.
+    """
+
+    scoring_result_id: str = Field(..., description="Scoring result the element belongs to")
+
+
 class RecommendationsInput(BaseModel):
     """
     Input data for generating recommendations.
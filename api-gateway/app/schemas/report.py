@@ -30,6 +30,7 @@ class FileRefResponse(BaseModel):
     filename: str | None
     mime: str
     size_bytes: int
+    sha256: str | None = None
     created_at: datetime
 
     model_config = {"from_attributes": True}
@@ -60,3 +61,38 @@ class ReportListResponse(BaseModel):
 
     items: list[ReportResponse]
     total: int
+
+
+class ReportBatchExtractRequest(BaseModel):
+    """Reports to extract together (e.g. all reports of a participant or an upload batch)."""
+
+    report_ids: list[UUID] = Field(..., min_length=1, max_length=300)
+
+
+class BulkUploadItem(BaseModel):
+    """One report created by a bulk ZIP upload."""
+
+    filename: str
+    report_id: UUID
+    participant_id: UUID
+    external_id: str | None = None
+    participant_created: bool = False
+    deduplicated: bool = Field(False, description="Same content already stored; file reused")
+
+
+class BulkUploadError(BaseModel):
+    """Archive member or manifest row that was skipped."""
+
+    filename: str
+    error: str
+
+
+class ReportBulkUploadResponse(BaseModel):
+    """Result of a bulk ZIP upload."""
+
+    items: list[BulkUploadItem]
+    errors: list[BulkUploadError]
+    participants_created: int
+    extraction_task_ids: list[str] = Field(
+        default_factory=list, description="Batch extraction tasks (one per chunk of reports)"
+    )
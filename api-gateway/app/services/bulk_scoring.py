@@ -0,0 +1,418 @@
+"""
+Bulk scoring of many participants against every professional activity.
+
+``ScoringService.calculate_score`` scores one participant for one activity
+(several queries, Decimal loops, one commit). For a cohort this engine:
+
+1. loads the participant_metric matrix with one query; weight tables and
+   metric definitions come from the compiled catalog (``weight_catalog``)
+2. computes every Σ(value × weight) × 10 with one NumPy matrix product per
+   cohort, in fixed-point integers, so the result is exactly the Decimal
+   result of ``calculate_score`` (quantized to 0.01, ROUND_HALF_UP)
+3. writes all ScoringResult rows with one bulk insert and one commit
+
+Eligibility follows ``calculate_score``: every metric of the weight table must
+be present and within [1..10], and the weights must sum to 1.0; other pairs
+are skipped and counted. Strengths and dev_areas use the same ordering
+(value, then metric code).
+
+Recommendations are left pending; ``enqueue_recommendations`` fans them out
+as ``generate_recommendations_batch`` tasks.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.models import WeightTable
+from app.repositories.metric import MetricDefRepository
+from app.repositories.participant_metric import ParticipantMetricRepository
+from app.repositories.prof_activity import ProfActivityRepository
+from app.repositories.scoring_result import ScoringResultRepository
+from app.repositories.weight_table import WeightTableRepository
+
+logger = logging.getLogger(__name__)
+
+MIN_VALUE = Decimal("1")
+MAX_VALUE = Decimal("10")
+TOP_N = 5
+
+COMPUTE_NOTES = "Score calculated using current weight table (bulk)"
+
+# Fixed-point products must stay exact in int64
+_INT64_LIMIT = 2**62
+
+
+def fraction_digits(values: list[Decimal]) -> int:
+    """Largest number of decimal places among the values."""
+    return max((max(0, -value.as_tuple().exponent) for value in values), default=0)
+
+
+def score_matrix(
+    values: np.ndarray, weights: np.ndarray, value_digits: int, weight_digits: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Score every participant (row) against every weight vector (column).
+
+    Args:
+        values: P×M float matrix of metric values, NaN where missing
+        weights: M×A float matrix of weights, NaN where the metric is not
+            in the activity's weight table
+        value_digits: Decimal places of the values (exact in the floats)
+        weight_digits: Decimal places of the weights (exact in the floats)
+
+    Returns:
+        (score_cents, eligible): P×A integer score_pct in hundredths
+        (ROUND_HALF_UP) and P×A mask of pairs ``calculate_score`` would accept
+    """
+    in_table = ~np.isnan(weights)
+    with np.errstate(invalid="ignore"):
+        invalid = np.isnan(values) | (values < float(MIN_VALUE)) | (values > float(MAX_VALUE))
+    eligible = (invalid.astype(np.int64) @ in_table.astype(np.int64)) == 0
+
+    values_fixed = np.rint(np.nan_to_num(values) * 10**value_digits).astype(np.int64)
+    weights_fixed = np.rint(np.nan_to_num(weights) * 10**weight_digits).astype(np.int64)
+    bound = int(np.abs(values_fixed).max(initial=0)) * int(
+        np.abs(weights_fixed).sum(axis=0).max(initial=0)
+    )
+    if bound >= _INT64_LIMIT:
+        # Python ints: slower, still exact
+        values_fixed = values_fixed.astype(object)
+        weights_fixed = weights_fixed.astype(object)
+    sums = values_fixed @ weights_fixed
+
+    # score_pct = sum × 10 / 10^(value_digits + weight_digits), in hundredths
+    shift = value_digits + weight_digits - 3
+    if shift <= 0:
+        cents = sums * 10**-shift
+    else:
+        divisor = 10**shift
+        cents = (sums + divisor // 2) // divisor
+    cents = np.asarray(cents, dtype=np.int64)
+    # Negative weights could leave the 0..100 range the table allows
+    return cents, eligible & (cents >= 0) & (cents <= 10000)
+
+
+@dataclass(slots=True)
+class ActivityWeights:
+    """
+    Parsed weight table of one activity (column ``column`` of the weight matrix).
+
+    ``weight_table`` is None for ad-hoc weights (what-if scoring).
+    """
+
+    weight_table: WeightTable | None
+    code: str
+    name: str
+    weights: dict[str, Decimal]
+    column: int = -1
+
+
+@dataclass(slots=True)
+class CompiledWeights:
+    """
+    All weight tables as one metrics × activities matrix.
+
+    ``matrix`` holds NaN where a metric is not in the activity's table;
+    ``skipped`` maps activity codes that cannot be scored to the reason.
+    """
+
+    activities: list[ActivityWeights]
+    codes: list[str]
+    column_of: dict[str, int]
+    matrix: np.ndarray
+    weight_digits: int
+    skipped: dict[str, str]
+
+    def values_matrix(self, metrics_rows: list[dict[str, Decimal]]) -> np.ndarray:
+        """Participants × metrics float matrix over ``codes`` (NaN where missing)."""
+        values = np.full((len(metrics_rows), len(self.codes)), np.nan)
+        for row, metrics in enumerate(metrics_rows):
+            for code, value in metrics.items():
+                column = self.column_of.get(code)
+                if column is not None:
+                    values[row, column] = float(value)
+        return values
+
+
+def compile_weight_tables(
+    weight_tables: list[WeightTable], activity_codes: list[str] | None = None
+) -> CompiledWeights:
+    """
+    Parse weight tables (with ``prof_activity`` loaded) into a weight matrix.
+
+    Tables whose weights do not sum to 1.0 are skipped, as ``calculate_score``
+    would reject them; requested codes without a table are reported too.
+    """
+    wanted = set(activity_codes) if activity_codes is not None else None
+    activities: list[ActivityWeights] = []
+    skipped: dict[str, str] = {}
+    for weight_table in weight_tables:
+        code = weight_table.prof_activity.code
+        if wanted is not None and code not in wanted:
+            continue
+        weights = {entry["metric_code"]: Decimal(entry["weight"]) for entry in weight_table.weights}
+        total = sum(weights.values())
+        if not weights or total != Decimal("1.0"):
+            skipped[code] = f"Sum of weights must equal 1.0, got {total}"
+            continue
+        activities.append(
+            ActivityWeights(
+                weight_table=weight_table,
+                code=code,
+                name=weight_table.prof_activity.name,
+                weights=weights,
+                column=len(activities),
+            )
+        )
+    if wanted is not None:
+        found = {activity.code for activity in activities} | set(skipped)
+        for code in sorted(wanted - found):
+            skipped[code] = "No weight table"
+    return compile_activities(activities, skipped)
+
+
+def compile_activities(
+    activities: list[ActivityWeights], skipped: dict[str, str] | None = None
+) -> CompiledWeights:
+    """Build the metrics × activities matrix of parsed weights (``column`` set by the caller)."""
+    codes = sorted({code for activity in activities for code in activity.weights})
+    column_of = {code: index for index, code in enumerate(codes)}
+    matrix = np.full((len(codes), len(activities)), np.nan)
+    for activity in activities:
+        for code, weight in activity.weights.items():
+            matrix[column_of[code], activity.column] = float(weight)
+    return CompiledWeights(
+        activities=activities,
+        codes=codes,
+        column_of=column_of,
+        matrix=matrix,
+        weight_digits=fraction_digits(
+            [weight for activity in activities for weight in activity.weights.values()]
+        ),
+        skipped=skipped or {},
+    )
+
+
+@dataclass(slots=True)
+class ScoredPair:
+    """Eligible (participant row, activity) pair with its score and ranked metrics."""
+
+    row: int
+    activity: ActivityWeights
+    score_pct: Decimal
+    strengths: list[dict[str, str]]
+    dev_areas: list[dict[str, str]]
+
+
+def score_cohort(
+    metrics_rows: list[dict[str, Decimal]],
+    compiled: CompiledWeights,
+    metric_names: dict[str, str],
+) -> tuple[list[ScoredPair], np.ndarray]:
+    """
+    Score every participant against every compiled activity.
+
+    Args:
+        metrics_rows: Metric values per participant (row order is kept)
+        compiled: Weight matrix of the activities
+        metric_names: Display name by metric code; metrics without one are
+            left out of strengths and dev_areas, as in ``calculate_score``
+
+    Returns:
+        (pairs, eligible): eligible pairs activity by activity, and the P×A
+        eligibility mask from ``score_matrix``
+    """
+    values = compiled.values_matrix(metrics_rows)
+    score_cents, eligible = score_matrix(
+        values,
+        compiled.matrix,
+        fraction_digits([value for metrics in metrics_rows for value in metrics.values()]),
+        compiled.weight_digits,
+    )
+
+    pairs: list[ScoredPair] = []
+    for activity in compiled.activities:
+        ranked_codes = sorted(code for code in activity.weights if code in metric_names)
+        ranked = values[:, [compiled.column_of[code] for code in ranked_codes]]
+        # Stable sort over code-ordered columns: ties keep metric code order
+        strongest = np.argsort(-ranked, axis=1, kind="stable")[:, :TOP_N]
+        weakest = np.argsort(ranked, axis=1, kind="stable")[:, :TOP_N]
+
+        for row in np.flatnonzero(eligible[:, activity.column]):
+            metrics = metrics_rows[row]
+            items = [
+                {
+                    "metric_code": code,
+                    "metric_name": metric_names[code],
+                    "value": str(metrics[code]),
+                    "weight": str(activity.weights[code]),
+                }
+                for code in ranked_codes
+            ]
+            pairs.append(
+                ScoredPair(
+                    row=int(row),
+                    activity=activity,
+                    score_pct=Decimal(int(score_cents[row, activity.column])).scaleb(-2),
+                    strengths=[items[index] for index in strongest[row]],
+                    dev_areas=[items[index] for index in weakest[row]],
+                )
+            )
+    return pairs, eligible
+
+
+@dataclass
+class BulkScoringSummary:
+    """Outcome of a bulk scoring run."""
+
+    participants: int = 0
+    activities: int = 0
+    scored: int = 0
+    skipped: int = 0
+    skipped_activities: dict[str, str] = field(default_factory=dict)
+    scoring_result_ids: list[str] = field(default_factory=list)
+    task_ids: list[str] = field(default_factory=list)
+    elapsed_ms: dict[str, int] = field(default_factory=dict)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "participants": self.participants,
+            "activities": self.activities,
+            "scored": self.scored,
+            "skipped": self.skipped,
+            "skipped_activities": self.skipped_activities,
+            "scoring_result_ids": self.scoring_result_ids,
+            "task_ids": self.task_ids,
+            "elapsed_ms": self.elapsed_ms,
+        }
+
+
+class BulkScoringService:
+    """Vectorized scoring of a cohort against all (or selected) activities."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.participant_metric_repo = ParticipantMetricRepository(db)
+        self.prof_activity_repo = ProfActivityRepository(db)
+        self.weight_table_repo = WeightTableRepository(db)
+        self.metric_def_repo = MetricDefRepository(db)
+        self.scoring_result_repo = ScoringResultRepository(db)
+
+    async def score_all(
+        self,
+        participant_ids: list[UUID] | None = None,
+        activity_codes: list[str] | None = None,
+        enqueue_recommendations: bool = False,
+    ) -> BulkScoringSummary:
+        """
+        Score participants against activities and save the results.
+
+        Args:
+            participant_ids: Participants to score (None: everyone with metrics)
+            activity_codes: Activities to score (None: every activity with a weight table)
+            enqueue_recommendations: Queue batch recommendation generation for
+                the new results (when AI recommendations are enabled)
+
+        Returns:
+            BulkScoringSummary with counts, skipped activities and created result IDs
+        """
+        # Imported here: the catalog compiles its weights with this module
+        from app.services.weight_catalog import get_weight_catalog
+
+        summary = BulkScoringSummary()
+        started = time.perf_counter()
+
+        # 1. Load everything once
+        if participant_ids is None:
+            metrics_by_participant = await self.participant_metric_repo.get_all_metrics_dicts()
+        else:
+            metrics_by_participant = await self.participant_metric_repo.get_metrics_dicts(
+                list(dict.fromkeys(participant_ids))
+            )
+        catalog = await get_weight_catalog(
+            self.prof_activity_repo, self.weight_table_repo, self.metric_def_repo
+        )
+        compiled = (
+            catalog.compiled
+            if activity_codes is None
+            else compile_weight_tables(list(catalog.weight_tables.values()), activity_codes)
+        )
+        activities = compiled.activities
+        summary.skipped_activities = compiled.skipped
+        metric_names = {
+            metric_def.code: metric_def.name_ru or metric_def.name
+            for metric_def in catalog.metric_defs.values()
+        }
+        pids = list(metrics_by_participant)
+        summary.participants, summary.activities = len(pids), len(activities)
+        summary.elapsed_ms["load"] = int((time.perf_counter() - started) * 1000)
+        if not pids or not activities:
+            return summary
+
+        # 2. Participants × metrics matrix against the metrics × activities weights,
+        # strengths/dev_areas ranked per activity
+        computed = time.perf_counter()
+        pairs, eligible = score_cohort(
+            [metrics_by_participant[pid] for pid in pids], compiled, metric_names
+        )
+
+        # 3. Rows for eligible pairs
+        status = "pending" if settings.ai_recommendations_enabled else "disabled"
+        rows: list[dict[str, Any]] = [
+            {
+                "id": uuid.uuid4(),
+                "participant_id": pids[pair.row],
+                "weight_table_id": pair.activity.weight_table.id,
+                "score_pct": pair.score_pct,
+                "strengths": pair.strengths,
+                "dev_areas": pair.dev_areas,
+                "recommendations": None,
+                "compute_notes": COMPUTE_NOTES,
+                "recommendations_status": status,
+            }
+            for pair in pairs
+        ]
+        summary.skipped = int(eligible.size - eligible.sum())
+        summary.elapsed_ms["compute"] = int((time.perf_counter() - computed) * 1000)
+
+        # 4. One bulk insert, one commit
+        saved = time.perf_counter()
+        await self.scoring_result_repo.create_many(rows)
+        summary.scored = len(rows)
+        summary.scoring_result_ids = [str(row["id"]) for row in rows]
+        summary.elapsed_ms["save"] = int((time.perf_counter() - saved) * 1000)
+
+        if enqueue_recommendations and status == "pending":
+            from app.tasks.recommendations import generate_recommendations_batch
+
+            batch_size = settings.recommendations_batch_size
+            ids = summary.scoring_result_ids
+            summary.task_ids = [
+                generate_recommendations_batch.delay(ids[start : start + batch_size]).id
+                for start in range(0, len(ids), batch_size)
+            ]
+
+        summary.elapsed_ms["total"] = int((time.perf_counter() - started) * 1000)
+        logger.info(
+            "bulk_scoring_completed",
+            extra={
+                "participants": summary.participants,
+                "activities": summary.activities,
+                "scored": summary.scored,
+                "skipped": summary.skipped,
+                "tasks": len(summary.task_ids),
+                "elapsed_ms": summary.elapsed_ms,
+            },
+        )
+        return summary
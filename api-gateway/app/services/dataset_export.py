@@ -0,0 +1,320 @@
+"""
+Streaming export of the whole participant dataset (CSV, Parquet, XLSX).
+
+One row per participant: identity columns, one column per metric definition
+(participant_metric values) and, per professional activity with a weight
+table, the score and time of the latest scoring result.
+
+Rows come from a server-side cursor in batches of DATASET_EXPORT_BATCH_SIZE
+(metrics and latest scores are aggregated per participant in the same
+query), are pivoted into columns and handed to an incremental writer in a
+worker thread; whatever the writer has produced is sent before the next batch
+is fetched. Memory stays constant in the number of participants:
+
+- CSV: written batch by batch (UTF-8 with BOM so Excel detects the encoding)
+- Parquet: one row group per batch (requires the optional pyarrow package)
+- XLSX: openpyxl write-only workbook spooled to a temporary file and sent once
+  complete (requires the optional openpyxl package)
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import importlib
+import io
+import logging
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator, Callable
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.repositories.metric import MetricDefRepository
+from app.repositories.participant import ParticipantRepository
+from app.repositories.prof_activity import ProfActivityRepository
+from app.repositories.weight_table import WeightTableRepository
+from app.services.reference_cache import get_metric_defs
+from app.services.report_export import ChunkSink
+from app.services.weight_catalog import get_weight_catalog
+
+logger = logging.getLogger(__name__)
+
+TEXT, DATE, NUMBER, TIMESTAMP = "text", "date", "number", "timestamp"
+
+XLSX_READ_CHUNK = 1024 * 1024
+
+
+class DatasetExportError(RuntimeError):
+    """Raised when the dataset cannot be exported in the requested format."""
+
+
+def _import_optional(module: str, package: str, label: str) -> Any:
+    try:
+        return importlib.import_module(module)
+    except ImportError as exc:
+        raise DatasetExportError(
+            f"{label} export requires the optional {package} package (pip install {package})"
+        ) from exc
+
+
+class DatasetLayout:
+    """
+    Column layout of the export and conversion of cursor rows into it.
+
+    Args:
+        metric_codes: Metric columns, in order
+        activities: (activity code, weight table ID) pairs with score columns
+    """
+
+    def __init__(self, metric_codes: list[str], activities: list[tuple[str, str]]):
+        self.metric_codes = metric_codes
+        self.activities = activities
+        self.columns: list[tuple[str, str]] = [
+            ("participant_id", TEXT),
+            ("external_id", TEXT),
+            ("full_name", TEXT),
+            ("birth_date", DATE),
+            *((code, NUMBER) for code in metric_codes),
+        ]
+        for code, _ in activities:
+            self.columns += [(f"score_pct:{code}", NUMBER), (f"scored_at:{code}", TIMESTAMP)]
+
+    def row(self, row: Any) -> list[Any]:
+        """Pivot one ``ParticipantRepository.stream_dataset`` row."""
+        metrics = row.metrics or {}
+        scores = row.scores or {}
+        values: list[Any] = [str(row.id), row.external_id, row.full_name, row.birth_date]
+        for code in self.metric_codes:
+            value = metrics.get(code)
+            values.append(Decimal(value) if value is not None else None)
+        for _, weight_table_id in self.activities:
+            score = scores.get(weight_table_id)
+            if score is None:
+                values += [None, None]
+            else:
+                values += [Decimal(score[0]), datetime.fromisoformat(score[1])]
+        return values
+
+
+async def load_layout(db: AsyncSession) -> DatasetLayout:
+    """Metric columns from all metric definitions, score columns from the weight catalog."""
+    metric_defs = await get_metric_defs(MetricDefRepository(db), active_only=False)
+    catalog = await get_weight_catalog(
+        ProfActivityRepository(db), WeightTableRepository(db), MetricDefRepository(db)
+    )
+    return DatasetLayout(
+        metric_codes=sorted(metric_def.code for metric_def in metric_defs),
+        activities=[
+            (code, str(catalog.weight_tables[code].id)) for code in sorted(catalog.weight_tables)
+        ],
+    )
+
+
+class DatasetWriter(ABC):
+    """
+    Incremental writer: ``write`` batches of rows, then ``close``; ``read``
+    returns the bytes produced since the previous call (b"" when none).
+    """
+
+    extension = ""
+    media_type = ""
+    label = ""
+    # (module, pip package) of the optional dependency
+    requires: tuple[str, str] | None = None
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        self.columns = columns
+        self.sink = ChunkSink()
+
+    @abstractmethod
+    def write(self, rows: list[list[Any]]) -> None:
+        """Append a batch of rows (cells in ``columns`` order)."""
+
+    def close(self) -> None:  # noqa: B027
+        """Finish the output; nothing to do for formats written batch by batch."""
+
+    def read(self) -> bytes:
+        return self.sink.drain()
+
+
+class CsvDatasetWriter(DatasetWriter):
+    extension = "csv"
+    media_type = "text/csv; charset=utf-8"
+    label = "CSV"
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        super().__init__(columns)
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer)
+        self._buffer.write("\ufeff")
+        self._csv.writerow([name for name, _ in columns])
+        self._flush()
+
+    def _flush(self) -> None:
+        self.sink.write(self._buffer.getvalue().encode())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        return value.isoformat() if isinstance(value, date | datetime) else value
+
+    def write(self, rows: list[list[Any]]) -> None:
+        self._csv.writerows([self._cell(value) for value in row] for row in rows)
+        self._flush()
+
+
+class ParquetDatasetWriter(DatasetWriter):
+    extension = "parquet"
+    media_type = "application/vnd.apache.parquet"
+    label = "Parquet"
+    requires = ("pyarrow.parquet", "pyarrow")
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        super().__init__(columns)
+        parquet = _import_optional(*self.requires, self.label)
+        self._pa = importlib.import_module("pyarrow")
+        types = {
+            TEXT: self._pa.string(),
+            DATE: self._pa.date32(),
+            # participant_metric.value is NUMERIC(4, 2), scoring_result.score_pct NUMERIC(5, 2)
+            NUMBER: self._pa.decimal128(5, 2),
+            TIMESTAMP: self._pa.timestamp("us", tz="UTC"),
+        }
+        self._schema = self._pa.schema([(name, types[kind]) for name, kind in columns])
+        self._writer = parquet.ParquetWriter(self.sink, self._schema, compression="zstd")
+
+    def write(self, rows: list[list[Any]]) -> None:
+        if not rows:
+            return
+        arrays = [
+            self._pa.array(values, type=field.type)
+            for values, field in zip(zip(*rows, strict=True), self._schema, strict=True)
+        ]
+        self._writer.write_batch(self._pa.record_batch(arrays, schema=self._schema))
+
+    def close(self) -> None:
+        self._writer.close()
+
+
+class XlsxDatasetWriter(DatasetWriter):
+    extension = "xlsx"
+    media_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+    label = "XLSX"
+    requires = ("openpyxl", "openpyxl")
+
+    def __init__(self, columns: list[tuple[str, str]]):
+        super().__init__(columns)
+        openpyxl = _import_optional(*self.requires, self.label)
+        # Write-only worksheets keep rows in a temporary file, not in memory
+        self._workbook = openpyxl.Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet("participants")
+        self._sheet.append([name for name, _ in columns])
+        self._file: Any = None
+
+    @staticmethod
+    def _cell(value: Any) -> Any:
+        # Excel has no time zones: timestamps are written in UTC
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            return value.astimezone(UTC).replace(tzinfo=None)
+        return value
+
+    def write(self, rows: list[list[Any]]) -> None:
+        for row in rows:
+            self._sheet.append([self._cell(value) for value in row])
+
+    def close(self) -> None:
+        self._file = tempfile.TemporaryFile()
+        self._workbook.save(self._file)
+        self._file.seek(0)
+
+    def read(self) -> bytes:
+        if self._file is None:
+            return b""
+        chunk = self._file.read(XLSX_READ_CHUNK)
+        if not chunk:
+            self._file.close()
+        return chunk
+
+
+WRITERS: dict[str, type[DatasetWriter]] = {
+    writer.extension: writer
+    for writer in (CsvDatasetWriter, ParquetDatasetWriter, XlsxDatasetWriter)
+}
+
+
+def get_writer(format: str) -> type[DatasetWriter]:
+    """
+    Writer class of a format, checking that its optional package is installed.
+
+    Raises:
+        DatasetExportError: Unknown format or missing optional package
+    """
+    writer = WRITERS.get(format)
+    if writer is None:
+        raise DatasetExportError(f"Unsupported export format '{format}'")
+    if writer.requires is not None:
+        _import_optional(*writer.requires, writer.label)
+    return writer
+
+
+async def stream_dataset(
+    format: str,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    batch_size: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream the participant dataset in the given format.
+
+    Args:
+        format: "csv", "parquet" or "xlsx"
+        session_factory: Opens the session holding the server-side cursor
+        batch_size: Rows per cursor fetch (default DATASET_EXPORT_BATCH_SIZE)
+
+    Yields:
+        Consecutive chunks of the file
+
+    Raises:
+        DatasetExportError: Unknown format or missing optional package
+    """
+    writer_cls = get_writer(format)
+    batch_size = batch_size or settings.dataset_export_batch_size
+    started = time.perf_counter()
+    exported = 0
+
+    def write_batch(batch: Any) -> None:
+        writer.write([layout.row(row) for row in batch])
+
+    async with session_factory() as db:
+        layout = await load_layout(db)
+        writer = await asyncio.to_thread(writer_cls, layout.columns)
+        if chunk := writer.read():
+            yield chunk
+        async for batch in ParticipantRepository(db).stream_dataset(batch_size):
+            # Pivoting and encoding run off the event loop
+            await asyncio.to_thread(write_batch, batch)
+            exported += len(batch)
+            if chunk := writer.read():
+                yield chunk
+
+    await asyncio.to_thread(writer.close)
+    while chunk := await asyncio.to_thread(writer.read):
+        yield chunk
+
+    logger.info(
+        "dataset_exported",
+        extra={
+            "format": format,
+            "participants": exported,
+            "metric_columns": len(layout.metric_codes),
+            "activities": len(layout.activities),
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
@@ -0,0 +1,103 @@
+"""
+Cache of assembled final reports.
+
+A final report is a pure function of the latest scoring result (including its
+recommendations status), the participant's name and metrics, the compiled
+weight catalog and the template version. ``FinalReportVersion`` fingerprints
+all of these with one cheap query (``get_final_report_version``); the
+fingerprint is both the cache key and the HTTP ETag, so repeat views are
+answered with 304 or from memory without loading the report rows.
+
+Entries are never invalidated explicitly: any change produces a new
+fingerprint and old entries age out of the LRU.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from dataclasses import dataclass
+from typing import Any
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+TEMPLATE_VERSION = "1.0.0"
+
+
+@dataclass(frozen=True, slots=True)
+class FinalReportVersion:
+    """Fingerprint of the data a final report is built from."""
+
+    scoring_result_id: str
+    key: str
+
+    @classmethod
+    def from_row(cls, row: Any, catalog_fingerprint: str) -> FinalReportVersion:
+        """
+        Build from a ``ScoringResultRepository.get_final_report_version`` row.
+
+        Args:
+            row: (id, recommendations_status, recommendations_digest, full_name,
+                metrics_digest)
+            catalog_fingerprint: ``WeightCatalog.fingerprints`` entry of the
+                activity (names, units, weights)
+        """
+        return cls(
+            scoring_result_id=str(row.id),
+            key=":".join(
+                [
+                    str(row.id),
+                    row.recommendations_status,
+                    row.recommendations_digest,
+                    row.full_name,
+                    row.metrics_digest,
+                    catalog_fingerprint,
+                    TEMPLATE_VERSION,
+                ]
+            ),
+        )
+
+    def etag(self, representation: str) -> str:
+        """Quoted strong ETag of one representation (json/html)."""
+        digest = hashlib.sha256(f"{self.key}:{representation}".encode()).hexdigest()
+        return f'"{digest[:32]}"'
+
+
+class FinalReportCache:
+    """In-process LRU of final report dicts keyed by ``FinalReportVersion.key``."""
+
+    def __init__(self):
+        self.local: TTLCache[dict[str, Any]] = TTLCache(
+            maxsize=settings.final_report_cache_max_entries,
+            ttl_s=settings.final_report_cache_ttl_sec,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return settings.final_report_cache_enabled
+
+    def get(self, version: FinalReportVersion) -> dict[str, Any] | None:
+        if not self.enabled:
+            return None
+        return self.local.get(version.key)
+
+    def set(self, version: FinalReportVersion, report: dict[str, Any]) -> None:
+        if self.enabled:
+            self.local.set(version.key, report)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit-rate counters of this process."""
+        return {
+            "enabled": self.enabled,
+            "local": {**self.local.stats.as_dict(), "entries": len(self.local)},
+        }
+
+
+_cache: FinalReportCache | None = None
+
+
+def get_final_report_cache() -> FinalReportCache:
+    global _cache
+    if _cache is None:
+        _cache = FinalReportCache()
+    return _cache
@@ -0,0 +1,254 @@
+"""
+Adaptive payload encoder for Gemini Vision requests.
+
+Combined report canvases are mostly black text on a white background, so a
+plain RGB PNG is rarely the cheapest way to ship them. The encoder tries a
+small set of candidate formats, discards the ones that break the encode-time
+budget or the legibility constraints, and keeps the smallest payload.
+
+Candidates (in evaluation order):
+- PNG_GRAY: 8-bit grayscale PNG, only for images without meaningful colour
+- PNG_PALETTE: palette PNG (<=256 colours), exact when the canvas has few colours
+- JPEG: high-quality JPEG, accepted only above a PSNR threshold
+- WEBP_LOSSLESS: lossless WebP
+- PNG: RGB PNG (reference/fallback, always legible)
+
+The budget applies to every candidate, the optimized PNG included: once it is
+spent and an acceptable payload exists, the remaining candidates are skipped.
+If nothing acceptable was found by then, PNG is still produced with fast, light
+compression so a legible payload is always returned.
+"""
+
+from __future__ import annotations
+
+import io
+import logging
+import math
+import time
+from dataclasses import dataclass
+
+from PIL import Image, ImageChops, ImageStat
+
+logger = logging.getLogger(__name__)
+
+FORMAT_PNG = "PNG"
+FORMAT_PNG_GRAY = "PNG_GRAY"
+FORMAT_PNG_PALETTE = "PNG_PALETTE"
+FORMAT_JPEG = "JPEG"
+FORMAT_WEBP_LOSSLESS = "WEBP_LOSSLESS"
+
+DEFAULT_CANDIDATES: tuple[str, ...] = (
+    FORMAT_PNG_GRAY,
+    FORMAT_PNG_PALETTE,
+    FORMAT_JPEG,
+    FORMAT_WEBP_LOSSLESS,
+    FORMAT_PNG,
+)
+
+MIME_TYPES: dict[str, str] = {
+    FORMAT_PNG: "image/png",
+    FORMAT_PNG_GRAY: "image/png",
+    FORMAT_PNG_PALETTE: "image/png",
+    FORMAT_JPEG: "image/jpeg",
+    FORMAT_WEBP_LOSSLESS: "image/webp",
+}
+
+
+@dataclass(slots=True)
+class EncodedImage:
+    """Encoded payload ready to be sent to Gemini Vision."""
+
+    data: bytes
+    format: str
+    mime_type: str
+    encode_ms: float
+    width: int
+    height: int
+    psnr_db: float | None = None  # None for lossless encodings
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.data)
+
+    def as_report(self) -> dict[str, object]:
+        """Compact summary for logs and extraction results."""
+        return {
+            "format": self.format,
+            "mime_type": self.mime_type,
+            "bytes": self.size_bytes,
+            "encode_ms": round(self.encode_ms, 1),
+            "width": self.width,
+            "height": self.height,
+        }
+
+
+def sniff_mime_type(data: bytes) -> str:
+    """
+    Detect image MIME type from magic bytes.
+
+    Falls back to image/png, which is what the pipeline produced historically.
+    """
+    if data.startswith(b"\xff\xd8\xff"):
+        return "image/jpeg"
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "image/webp"
+    return "image/png"
+
+
+def psnr(reference: Image.Image, candidate: Image.Image) -> float:
+    """Peak signal-to-noise ratio (dB) between two images of the same size."""
+    if candidate.mode != reference.mode:
+        candidate = candidate.convert(reference.mode)
+    diff = ImageChops.difference(reference, candidate)
+    mse = sum(rms * rms for rms in ImageStat.Stat(diff).rms) / len(diff.getbands())
+    if mse == 0:
+        return math.inf
+    return 10 * math.log10((255 * 255) / mse)
+
+
+class AdaptiveImageEncoder:
+    """
+    Pick the smallest legible encoding of a canvas within an encode-time budget.
+
+    Constraints:
+    - payload must not exceed ``max_bytes``
+    - each candidate except PNG must encode within ``time_budget_ms`` (PNG is
+      the legible baseline and is never rejected for time); once the
+      cumulative budget is spent, remaining candidates are skipped, except a
+      fast PNG fallback when no candidate has been accepted yet
+    - grayscale is used only when the max channel spread is <= ``gray_tolerance``
+    - lossy results (JPEG, quantized palette) must reach ``min_psnr_db``
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        time_budget_ms: float = 1500.0,
+        jpeg_quality: int = 90,
+        min_psnr_db: float = 38.0,
+        gray_tolerance: int = 8,
+        candidates: tuple[str, ...] | None = None,
+    ):
+        candidates = candidates or DEFAULT_CANDIDATES
+        unknown = set(candidates) - set(MIME_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown encoder candidates: {sorted(unknown)}")
+        self.max_bytes = max_bytes
+        self.time_budget_ms = time_budget_ms
+        self.jpeg_quality = jpeg_quality
+        self.min_psnr_db = min_psnr_db
+        self.gray_tolerance = gray_tolerance
+        self.candidates = candidates
+
+    def encode(self, img: Image.Image) -> EncodedImage | None:
+        """
+        Encode image with the smallest acceptable candidate format.
+
+        Returns:
+            EncodedImage, or None when no candidate fits into ``max_bytes``
+            (caller is expected to downscale and retry).
+        """
+        rgb = img if img.mode == "RGB" else img.convert("RGB")
+        best: EncodedImage | None = None
+        spent_ms = 0.0
+
+        for fmt in self.candidates:
+            fallback = False
+            if spent_ms >= self.time_budget_ms:
+                if best is not None or fmt != FORMAT_PNG:
+                    logger.debug("image_encoder_budget_exhausted", extra={"skipped": fmt})
+                    continue
+                # Nothing acceptable within the budget: cheap PNG as the legible fallback
+                fallback = True
+
+            encoded = self._encode_candidate(rgb, fmt, fast=fallback)
+            if encoded is None:
+                continue
+            spent_ms += encoded.encode_ms
+
+            if not self._is_acceptable(encoded, check_time=fmt != FORMAT_PNG):
+                continue
+            if best is None or encoded.size_bytes < best.size_bytes:
+                best = encoded
+
+        if best is not None:
+            logger.info(
+                "image_encoder_selected",
+                extra={**best.as_report(), "search_ms": round(spent_ms, 1)},
+            )
+        return best
+
+    def encode_all(self, img: Image.Image) -> list[EncodedImage]:
+        """Encode image with every applicable candidate (benchmarking helper)."""
+        rgb = img if img.mode == "RGB" else img.convert("RGB")
+        results = []
+        for fmt in self.candidates:
+            encoded = self._encode_candidate(rgb, fmt)
+            if encoded is not None:
+                results.append(encoded)
+        return results
+
+    def is_acceptable(self, encoded: EncodedImage) -> bool:
+        """Public wrapper used by the benchmark to mark rejected candidates."""
+        return self._is_acceptable(encoded)
+
+    def _is_acceptable(self, encoded: EncodedImage, check_time: bool = True) -> bool:
+        if encoded.size_bytes > self.max_bytes:
+            return False
+        if check_time and encoded.encode_ms > self.time_budget_ms:
+            return False
+        if encoded.psnr_db is not None and encoded.psnr_db < self.min_psnr_db:
+            return False
+        return True
+
+    def _encode_candidate(
+        self, rgb: Image.Image, fmt: str, fast: bool = False
+    ) -> EncodedImage | None:
+        started = time.perf_counter()
+        psnr_db: float | None = None
+        output = io.BytesIO()
+
+        if fmt == FORMAT_PNG_GRAY:
+            if not self._is_grayscale(rgb):
+                return None
+            rgb.convert("L").save(output, format="PNG", optimize=True)
+        elif fmt == FORMAT_PNG_PALETTE:
+            colors = rgb.getcolors(maxcolors=256)
+            if colors is not None:
+                # Exact palette: no information lost
+                paletted = rgb.convert("P", palette=Image.Palette.ADAPTIVE, colors=len(colors))
+            else:
+                paletted = rgb.quantize(colors=256, dither=Image.Dither.NONE)
+                psnr_db = psnr(rgb, paletted.convert("RGB"))
+            paletted.save(output, format="PNG", optimize=True)
+        elif fmt == FORMAT_JPEG:
+            rgb.save(output, format="JPEG", quality=self.jpeg_quality, subsampling=0)
+            psnr_db = psnr(rgb, Image.open(io.BytesIO(output.getvalue())))
+        elif fmt == FORMAT_WEBP_LOSSLESS:
+            if max(rgb.size) > 16383:
+                return None  # WebP hard dimension limit
+            rgb.save(output, format="WEBP", lossless=True, quality=80, method=4)
+        elif fast:
+            rgb.save(output, format="PNG", compress_level=1)
+        else:
+            rgb.save(output, format="PNG", optimize=True)
+
+        encode_ms = (time.perf_counter() - started) * 1000
+        return EncodedImage(
+            data=output.getvalue(),
+            format=fmt,
+            mime_type=MIME_TYPES[fmt],
+            encode_ms=encode_ms,
+            width=rgb.width,
+            height=rgb.height,
+            psnr_db=psnr_db,
+        )
+
+    def _is_grayscale(self, rgb: Image.Image) -> bool:
+        r, g, b = rgb.split()
+        spread = max(
+            ImageChops.difference(r, g).getextrema()[1],
+            ImageChops.difference(g, b).getextrema()[1],
+            ImageChops.difference(r, b).getextrema()[1],
+        )
+        return spread <= self.gray_tolerance
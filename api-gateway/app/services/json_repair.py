@@ -0,0 +1,169 @@
+"""
+Local repair of almost-valid JSON returned by LLMs.
+
+Handles the usual defects of model output without another model call:
+
+- markdown code fences and prose around the JSON value
+- trailing commas before ``}`` / ``]``
+- output cut off mid-value (max tokens): unterminated strings are closed,
+  incomplete trailing members dropped and open arrays/objects closed
+
+Text without any JSON object or array is not repairable: ``repair_json``
+raises ValueError and the caller falls back to its LLM self-heal.
+"""
+
+from __future__ import annotations
+
+import json
+import re
+from typing import Any
+
+_FENCE_RE = re.compile(r"```(?:json|JSON)?\s*(.*?)(?:```|$)", re.DOTALL)
+_CLOSERS = {"{": "}", "[": "]"}
+_DANGLING_KEY_RE = re.compile(r'([{,])\s*"(?:[^"\\]|\\.)*"\s*:?\s*$')
+_DANGLING_SEPARATOR_RE = re.compile(r"[,:]\s*$")
+
+# Cut-back attempts for truncated output (each drops one trailing member)
+MAX_TRUNCATION_CUTS = 8
+
+
+def strip_fences(text: str) -> str:
+    """Return the content of the first markdown code fence (or the text itself)."""
+    match = _FENCE_RE.search(text)
+    return match.group(1).strip() if match else text.strip()
+
+
+def _scan(text: str) -> tuple[str, list[str], bool, list[int]]:
+    """
+    Walk JSON text outside/inside strings.
+
+    Returns:
+        Text without trailing commas, open brackets stack, whether a string is
+        left open, and output positions of top-level-or-nested member commas
+    """
+    out: list[str] = []
+    stack: list[str] = []
+    commas: list[int] = []
+    in_string = escaped = False
+
+    for char in text:
+        if in_string:
+            out.append(char)
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+            continue
+
+        if char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+        elif char in "}]":
+            # Trailing comma: drop it together with the whitespace after it
+            while out and out[-1].isspace():
+                out.pop()
+            if out and out[-1] == ",":
+                out.pop()
+                commas.pop()
+            if stack:
+                stack.pop()
+        elif char == ",":
+            commas.append(len(out))
+        out.append(char)
+
+    return "".join(out), stack, in_string, commas
+
+
+def _close(text: str) -> str:
+    """Terminate an open string and close open containers."""
+    cleaned, stack, in_string, _ = _scan(text)
+    if in_string:
+        cleaned += '"'
+    cleaned = cleaned.rstrip()
+    # A member key without its value cannot be completed: drop it
+    if stack and stack[-1] == "{":
+        cleaned = _DANGLING_KEY_RE.sub(lambda match: match.group(1).strip(","), cleaned)
+    cleaned = _DANGLING_SEPARATOR_RE.sub("", cleaned)
+    return cleaned + "".join(_CLOSERS[opener] for opener in reversed(stack))
+
+
+def repair_json(text: str) -> tuple[Any, list[str]]:
+    """
+    Parse LLM output, repairing it locally when needed.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Parsed value and the list of repairs applied (empty if none was needed)
+
+    Raises:
+        ValueError: If no JSON value can be recovered
+    """
+    repairs: list[str] = []
+    candidate = text.strip()
+
+    unfenced = strip_fences(candidate)
+    if unfenced != candidate:
+        repairs.append("fences")
+        candidate = unfenced
+
+    try:
+        return json.loads(candidate), repairs
+    except json.JSONDecodeError:
+        pass
+
+    starts = [index for index in (candidate.find("{"), candidate.find("[")) if index >= 0]
+    if not starts:
+        raise ValueError("No JSON object or array in response")
+    end = _value_end(candidate, min(starts))
+    if min(starts) > 0 or end < len(candidate):
+        repairs.append("prose")
+    candidate = candidate[min(starts) : end]
+
+    cleaned, stack, in_string, commas = _scan(candidate)
+    if cleaned != candidate:
+        repairs.append("trailing_commas")
+    if not stack and not in_string:
+        try:
+            return json.loads(cleaned), repairs
+        except json.JSONDecodeError as exc:
+            raise ValueError(f"Unrepairable JSON: {exc}") from exc
+
+    repairs.append("truncated")
+    attempt = cleaned
+    for _ in range(MAX_TRUNCATION_CUTS + 1):
+        try:
+            return json.loads(_close(attempt)), repairs
+        except json.JSONDecodeError:
+            if not commas:
+                break
+            attempt = cleaned[: commas.pop()]
+    raise ValueError("Unrepairable truncated JSON")
+
+
+def _value_end(text: str, start: int) -> int:
+    """Index just past the JSON value starting at ``start`` (text length if unbalanced)."""
+    depth = 0
+    in_string = escaped = False
+    for index in range(start, len(text)):
+        char = text[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+    return len(text)
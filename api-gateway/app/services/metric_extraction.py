@@ -5,6 +5,7 @@ Implements the improved extraction approach with:
 - Enhanced prompt with explicit examples
 - Extraction of both labels and values
 - Image preprocessing (transparent background to white)
+- Adaptive payload encoding (smallest legible format per request)
 - Validation and normalization
 - Mapping labels to MetricDef codes
 """
@@ -13,7 +14,6 @@ from __future__ import annotations
 
 import asyncio
 import io
-import json
 import logging
 import re
 from dataclasses import dataclass
@@ -21,18 +21,41 @@ from decimal import Decimal
 from typing import Any
 from uuid import UUID
 
-from PIL import Image
+from PIL import Image, ImageDraw, ImageFont
+from pydantic import ValidationError
 from sqlalchemy import select
 from sqlalchemy.exc import DBAPIError, IntegrityError, OperationalError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.clients.pool_client import GeminiPoolClient
+from app.core.autoscale import record_key_pool_stats
 from app.core.config import settings
 from app.db.models import Report, ReportImage
+from app.repositories.extraction_checkpoint import (
+    STAGE_GROUP_PARSED,
+    STAGE_GROUPS_BUILT,
+    STAGE_METRICS_SAVED,
+    ExtractionCheckpointRepository,
+)
 from app.repositories.metric import ExtractedMetricRepository, MetricDefRepository
 from app.repositories.participant_metric import ParticipantMetricRepository
+from app.repositories.report_image import ReportImageRepository
+from app.schemas.metric import MetricsExtractionResponse, VisionMetricItem
+from app.services.image_encoding import (
+    FORMAT_PNG,
+    AdaptiveImageEncoder,
+    EncodedImage,
+    sniff_mime_type,
+)
+from app.services.json_repair import repair_json
 from app.services.metric_mapping import get_metric_mapping_service
-from app.services.vision_prompts import IMPROVED_VISION_PROMPT
+from app.services.ranking import RankingService
+from app.services.reference_cache import get_metric_defs
+from app.services.vision_prompts import (
+    BATCH_VISION_PROMPT,
+    IMPROVED_VISION_PROMPT,
+    SECTION_HEADER_TEMPLATE,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +63,53 @@ logger = logging.getLogger(__name__)
 VALUE_PATTERN = re.compile(r"^(?:10|[1-9])(?:[,.][0-9])?$")
 
 
+def parse_vision_metrics(text: str) -> list[dict[str, Any]]:
+    """
+    Parse a vision response into label/value(/section) dicts.
+
+    The response is requested with the MetricsExtractionResponse schema, so
+    it normally validates as a whole. Otherwise the JSON is repaired locally
+    and items are validated one by one: a single malformed item no longer
+    loses the whole group of metrics. A truncated response loses its last
+    item, whose value may have been cut (``"6`` of 6.5) and then closed by
+    the repair.
+
+    Returns:
+        Valid metric dicts (empty if nothing could be recovered)
+    """
+    try:
+        parsed = MetricsExtractionResponse.model_validate_json(text)
+        return [item.model_dump(exclude_none=True) for item in parsed.metrics]
+    except ValidationError:
+        pass
+
+    try:
+        data, repairs = repair_json(text)
+    except ValueError as e:
+        logger.error(f"Failed to parse Gemini response: {e}")
+        return []
+
+    items = data.get("metrics", []) if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        logger.warning(f"Response 'metrics' is not a list: {type(items)}")
+        return []
+    if "truncated" in repairs:
+        # A repaired value is never trusted: the cut item is dropped
+        items = items[:-1]
+
+    metrics = []
+    for item in items:
+        try:
+            metrics.append(VisionMetricItem.model_validate(item).model_dump(exclude_none=True))
+        except ValidationError:
+            continue
+    logger.warning(
+        "vision_metrics_repaired",
+        extra={"repairs": repairs, "kept": len(metrics), "dropped": len(items) - len(metrics)},
+    )
+    return metrics
+
+
 @dataclass
 class ExtractedMetricData:
     """Extracted metric data before saving to DB."""
@@ -104,17 +174,34 @@ class MetricExtractionService:
         self.max_image_size_mb = 20  # Gemini Vision limit
         self.image_padding = 20  # Padding between images in pixels
 
+        # Payload encoder: adaptive format search, or plain PNG when disabled
+        self.image_encoder = AdaptiveImageEncoder(
+            max_bytes=self.max_image_size_mb * 1024 * 1024,
+            time_budget_ms=settings.vision_encode_budget_ms,
+            candidates=None if settings.vision_adaptive_encoding else (FORMAT_PNG,),
+        )
+        # Encoding reports for the current extraction run (format, bytes, encode_ms)
+        self.payload_reports: list[dict[str, Any]] = []
+        # Batch metrics whose section (report) could not be resolved
+        self.unassigned_metrics: list[dict[str, Any]] = []
+
     async def extract_metrics_from_report_images(
         self,
         report_id: UUID,
         images: list[ReportImage],
+        checkpoints: ExtractionCheckpointRepository | None = None,
     ) -> dict[str, Any]:
         """
         Extract metrics from all images of a report.
 
+        With ``checkpoints`` the run is resumable: the image grouping and every
+        parsed Vision response are stored, so a retry only pays for the groups
+        that did not finish, and a run whose metrics were saved is not repeated.
+
         Args:
             report_id: Report UUID
             images: List of ReportImage instances
+            checkpoints: Optional checkpoint repository (resumable mode)
 
         Returns:
             Dict with extraction results:
@@ -122,12 +209,29 @@ class MetricExtractionService:
                 "metrics_extracted": int,
                 "metrics_saved": int,
                 "errors": list[dict],
+                "failed_groups": list[int],
             }
         """
         logger.info(f"Starting metric extraction for report {report_id}, {len(images)} images")
 
         all_metrics: list[ExtractedMetricData] = []
         errors = []
+        failed_groups: list[int] = []
+        self.payload_reports = []
+
+        saved_state = await checkpoints.load(report_id) if checkpoints else {}
+        if (STAGE_METRICS_SAVED, 0) in saved_state:
+            logger.info(
+                "extraction_resumed_from_checkpoint",
+                extra={"report_id": str(report_id), "stage": STAGE_METRICS_SAVED},
+            )
+            return saved_state[(STAGE_METRICS_SAVED, 0)]
+        # An empty parse is a failed one: it is re-requested, never replayed
+        parsed_state: dict[int, list[dict[str, Any]]] = {
+            group_index: payload["metrics"]
+            for (stage, group_index), payload in saved_state.items()
+            if stage == STAGE_GROUP_PARSED and payload.get("metrics")
+        }
 
         # Get report for participant_id
         result = await self.db.execute(select(Report).where(Report.id == report_id))
@@ -141,7 +245,7 @@ class MetricExtractionService:
         logger.info(f"Using default report type: {report_type}")
 
         # Load all metric definitions and create mapping by code
-        metric_defs = await self.metric_def_repo.list_all(active_only=True)
+        metric_defs = await get_metric_defs(self.metric_def_repo)
         metric_def_by_code = {m.code: m for m in metric_defs}
 
         logger.info(f"Loaded {len(metric_defs)} active metric definitions")
@@ -167,9 +271,26 @@ class MetricExtractionService:
             logger.info("Single image, processing directly")
             img = images[0]
             try:
-                image_data = await self._load_image_data(img)
-                processed_data = self._preprocess_image(image_data)
-                raw_metrics = await self._extract_metrics_with_retry(processed_data, str(img.id))
+                if 0 in parsed_state and saved_state.get((STAGE_GROUPS_BUILT, 0)) == {
+                    "groups": [[str(img.id)]]
+                }:
+                    raw_metrics = parsed_state[0]
+                    logger.info(f"Reusing parsed checkpoint for image {img.id}")
+                else:
+                    await self._save_checkpoint(
+                        checkpoints, report_id, STAGE_GROUPS_BUILT, {"groups": [[str(img.id)]]}
+                    )
+                    image_data = await self._load_image_data(img)
+                    processed_data = self._preprocess_image(image_data)
+                    with Image.open(io.BytesIO(processed_data)) as pil_image:
+                        payload = self._encode_canvas(pil_image)
+                    raw_metrics = await self._extract_metrics_with_retry(
+                        payload.data, str(img.id), mime_type=payload.mime_type
+                    )
+                    if raw_metrics:
+                        await self._save_checkpoint(
+                            checkpoints, report_id, STAGE_GROUP_PARSED, {"metrics": raw_metrics}
+                        )
                 logger.info(f"Extracted {len(raw_metrics)} raw metrics from image {img.id}")
 
                 for metric in raw_metrics:
@@ -188,45 +309,43 @@ class MetricExtractionService:
             except Exception as e:
                 logger.error(f"Failed to extract metrics from image {img.id}: {e}")
                 errors.append({"image_id": str(img.id), "error": str(e)})
+                failed_groups.append(1)
         else:
             # Multiple images: combine and process together
             logger.info(f"Combining {len(images)} images for batch processing")
 
             try:
-                # Load and preprocess all images
-                processed_images: list[tuple[Image.Image, str]] = []
-                for img in images:
-                    try:
-                        image_data = await self._load_image_data(img)
-                        processed_data = self._preprocess_image(image_data)
-                        # Open as PIL Image for combination (copy to avoid closing issues)
-                        pil_image = Image.open(io.BytesIO(processed_data))
-                        # Convert to RGB to ensure compatibility
-                        if pil_image.mode != "RGB":
-                            pil_image = pil_image.convert("RGB")
-                        # Copy image to avoid file handle issues
-                        pil_image = pil_image.copy()
-                        processed_images.append((pil_image, str(img.id)))
-                    except Exception as e:
-                        logger.error(f"Failed to load/preprocess image {img.id}: {e}")
-                        errors.append({"image_id": str(img.id), "error": str(e)})
-
-                if not processed_images:
-                    logger.error("No images successfully loaded for combination")
-                    return {
-                        "metrics_extracted": 0,
-                        "metrics_saved": 0,
-                        "errors": errors,
-                    }
+                # Resume: grouping stored and every group parsed -> no image work at all
+                groups_state = saved_state.get((STAGE_GROUPS_BUILT, 0))
+                combined_groups_data: list[tuple[bytes | None, list[str]]] = []
+                if groups_state and all(
+                    idx in parsed_state for idx in range(len(groups_state["groups"]))
+                ):
+                    combined_groups_data = [(None, ids) for ids in groups_state["groups"]]
+                    processed_images = []
+                    combined_groups_bytes = []
+                else:
+                    # Load and preprocess all images
+                    processed_images = await self._load_processed_images(images, errors)
+
+                    if not processed_images:
+                        logger.error("No images successfully loaded for combination")
+                        return {
+                            "metrics_extracted": 0,
+                            "metrics_saved": 0,
+                            "errors": errors,
+                            "failed_groups": [],
+                        }
 
-                # Combine images into groups (1-2 combined images)
-                # Store image IDs for each group
-                combined_groups_data: list[tuple[bytes, list[str]]] = []
-                combined_groups_bytes = self._combine_images_into_groups(processed_images)
+                    # Combine images into groups (1-2 combined images)
+                    # Store image IDs for each group
+                    combined_groups_bytes = self._combine_images_into_groups(processed_images)
 
                 # Create mapping: group -> list of image IDs in that group
                 # For simplicity, if split into 2 groups, first half goes to group 1, second to group 2
-                if len(combined_groups_bytes) == 1:
+                if not combined_groups_bytes:
+                    pass  # Fully resumed from checkpoints
+                elif len(combined_groups_bytes) == 1:
                     # All images in one group
                     image_ids = [img_id for _, img_id in processed_images]
                     combined_groups_data.append((combined_groups_bytes[0], image_ids))
@@ -238,6 +357,15 @@ class MetricExtractionService:
                     combined_groups_data.append((combined_groups_bytes[0], group1_ids))
                     combined_groups_data.append((combined_groups_bytes[1], group2_ids))
 
+                if combined_groups_bytes:
+                    group_ids = [ids for _, ids in combined_groups_data]
+                    if not groups_state or groups_state["groups"] != group_ids:
+                        # New or changed grouping: parsed checkpoints no longer apply
+                        parsed_state = {}
+                        await self._save_checkpoint(
+                            checkpoints, report_id, STAGE_GROUPS_BUILT, {"groups": group_ids}
+                        )
+
                 logger.info(
                     f"Combined {len(processed_images)} images into {len(combined_groups_data)} group(s)"
                 )
@@ -249,9 +377,25 @@ class MetricExtractionService:
                     try:
                         # Extract metrics from combined image
                         image_ids_str = ",".join(group_image_ids)
-                        raw_metrics = await self._extract_metrics_with_retry(
-                            combined_image_data, f"combined_group_{group_idx + 1}"
-                        )
+                        if group_idx in parsed_state:
+                            raw_metrics = parsed_state[group_idx]
+                            logger.info(
+                                f"Reusing parsed checkpoint for combined group {group_idx + 1}"
+                            )
+                        else:
+                            raw_metrics = await self._extract_metrics_with_retry(
+                                combined_image_data,
+                                f"combined_group_{group_idx + 1}",
+                                mime_type=sniff_mime_type(combined_image_data),
+                            )
+                            if raw_metrics:
+                                await self._save_checkpoint(
+                                    checkpoints,
+                                    report_id,
+                                    STAGE_GROUP_PARSED,
+                                    {"metrics": raw_metrics},
+                                    group_index=group_idx,
+                                )
 
                         logger.info(
                             f"Extracted {len(raw_metrics)} raw metrics from combined group {group_idx + 1}"
@@ -282,6 +426,7 @@ class MetricExtractionService:
                                 "error": str(e),
                             }
                         )
+                        failed_groups.append(group_idx + 1)
 
                 # Log optimization results
                 requests_after_optimization = len(combined_groups_data)
@@ -437,13 +582,390 @@ class MetricExtractionService:
             f"Metric extraction complete for report {report_id}: "
             f"{len(all_metrics)} extracted, {metrics_saved} saved, {len(errors)} errors"
         )
+        if metrics_saved:
+            await RankingService(self.db).refresh_participant(report.participant_id)
 
-        return {
+        extraction_result = {
             "metrics_extracted": len(all_metrics),
             "metrics_saved": metrics_saved,
             "errors": errors,
+            "payloads": self.payload_reports,
+            "failed_groups": failed_groups,
+        }
+        # A failed save (e.g. unknown labels) is not checkpointed: re-extraction
+        # after a mapping or metric definition fix must map the parses again
+        if metrics_saved and not failed_groups:
+            await self._save_checkpoint(
+                checkpoints, report_id, STAGE_METRICS_SAVED, extraction_result
+            )
+        return extraction_result
+
+    @staticmethod
+    async def _save_checkpoint(
+        checkpoints: ExtractionCheckpointRepository | None,
+        report_id: UUID,
+        stage: str,
+        payload: dict[str, Any],
+        group_index: int = 0,
+    ) -> None:
+        """Persist a checkpoint when running in resumable mode."""
+        if checkpoints is None:
+            return
+        await checkpoints.save(report_id, stage, payload, group_index=group_index)
+        logger.debug(
+            "extraction_checkpoint_saved",
+            extra={"report_id": str(report_id), "stage": stage, "group_index": group_index},
+        )
+
+    async def extract_metrics_from_reports_batch(
+        self,
+        images_by_report: dict[UUID, list[ReportImage]],
+    ) -> dict[UUID, dict[str, Any]]:
+        """
+        Extract metrics for many reports, sharing Gemini requests per participant.
+
+        Images of all reports of one participant are packed into shared
+        canvases (one "SECTION n" band per report), so a participant with three
+        reports costs 1-2 Vision calls instead of 3-6. Parsed metrics are
+        attributed back to their report by section number; metrics without a
+        resolvable section are collected in ``unassigned_metrics``.
+        participant_metric upserts are committed once per participant, and a
+        failing participant is rolled back without affecting the others.
+
+        Args:
+            images_by_report: Mapping report_id -> ReportImage list (with file_ref)
+
+        Returns:
+            Mapping report_id -> result dict with the same keys as
+            extract_metrics_from_report_images; ``retryable`` is set when the
+            report failed on a Vision or transient error and may be retried
+        """
+        self.payload_reports = []
+        self.unassigned_metrics = []
+        results: dict[UUID, dict[str, Any]] = {
+            report_id: {"metrics_extracted": 0, "metrics_saved": 0, "errors": [], "payloads": []}
+            for report_id in images_by_report
+        }
+        if not images_by_report:
+            return results
+
+        report_rows = await self.db.execute(
+            select(Report.id, Report.participant_id)
+            .where(Report.id.in_(list(images_by_report)))
+            .order_by(Report.participant_id, Report.uploaded_at)
+        )
+        report_ids_by_participant: dict[UUID, list[UUID]] = {}
+        for report_id, participant_id in report_rows.all():
+            report_ids_by_participant.setdefault(participant_id, []).append(report_id)
+
+        metric_defs = await get_metric_defs(self.metric_def_repo)
+        metric_def_by_code = {m.code: m for m in metric_defs}
+
+        rolled_back = False
+        for participant_id, report_ids in report_ids_by_participant.items():
+            payloads_before = len(self.payload_reports)
+            try:
+                await self._extract_participant_reports(
+                    participant_id,
+                    report_ids,
+                    images_by_report,
+                    metric_def_by_code,
+                    results,
+                    reload_images=rolled_back,
+                )
+            except Exception as e:
+                # Only this participant fails; earlier participants are committed
+                logger.error(
+                    "batch_extraction_participant_failed",
+                    extra={"participant_id": str(participant_id), "error": str(e)},
+                    exc_info=True,
+                )
+                await self.db.rollback()
+                rolled_back = True
+                self.unassigned_metrics = [
+                    item
+                    for item in self.unassigned_metrics
+                    if item["participant_id"] != str(participant_id)
+                ]
+                for report_id in report_ids:
+                    results[report_id]["metrics_saved"] = 0
+                    results[report_id]["retryable"] = True
+                    results[report_id]["errors"].append({"error": f"Metric extraction failed: {e}"})
+            participant_payloads = self.payload_reports[payloads_before:]
+            for report_id in report_ids:
+                results[report_id]["payloads"] = participant_payloads
+
+        return results
+
+    async def _extract_participant_reports(
+        self,
+        participant_id: UUID,
+        report_ids: list[UUID],
+        images_by_report: dict[UUID, list[ReportImage]],
+        metric_def_by_code: dict[str, Any],
+        results: dict[UUID, dict[str, Any]],
+        reload_images: bool = False,
+    ) -> None:
+        """
+        Extract and save the metrics of one participant's reports.
+
+        ``reload_images`` re-reads the images after a rollback of an earlier
+        participant expired the loaded instances.
+        """
+        metrics_by_report: dict[UUID, list[ExtractedMetricData]] = {
+            report_id: [] for report_id in report_ids
         }
 
+        # 1. Load images of every report as one section per report
+        sections: list[tuple[int, UUID, list[Image.Image]]] = []
+        for report_id in report_ids:
+            if reload_images:
+                report_images = await ReportImageRepository(self.db).get_by_report(report_id)
+            else:
+                report_images = images_by_report.get(report_id) or []
+            if not report_images:
+                results[report_id]["errors"].append({"error": "No images provided"})
+                continue
+            processed = await self._load_processed_images(
+                report_images, results[report_id]["errors"]
+            )
+            if processed:
+                sections.append((len(sections) + 1, report_id, [img for img, _ in processed]))
+
+        if not sections:
+            return
+
+        # 2. Pack sections into shared canvases and query Gemini once per canvas
+        canvases = self._pack_sections_into_canvases(sections)
+        logger.info(
+            "batch_extraction_canvases",
+            extra={
+                "participant_id": str(participant_id),
+                "reports": len(sections),
+                "images": sum(len(images) for _, _, images in sections),
+                "requests": len(canvases),
+            },
+        )
+
+        for canvas_idx, (canvas, section_map) in enumerate(canvases, start=1):
+            payload = self._encode_canvas(canvas)
+            canvas_name = f"participant_{participant_id}_canvas_{canvas_idx}"
+            try:
+                raw_metrics = await self._extract_metrics_with_retry(
+                    payload.data,
+                    canvas_name,
+                    mime_type=payload.mime_type,
+                    prompt=BATCH_VISION_PROMPT,
+                )
+            except Exception as e:
+                logger.error(f"Failed to extract metrics from {canvas_name}: {e}")
+                for report_id in set(section_map.values()):
+                    results[report_id]["retryable"] = True
+                    results[report_id]["errors"].append({"canvas": canvas_idx, "error": str(e)})
+                continue
+
+            for metric in raw_metrics:
+                report_id = self._resolve_section(metric, section_map)
+                if report_id is None:
+                    # Section missing/unknown: the report cannot be told, do not guess
+                    logger.warning(
+                        "batch_extraction_unassigned_metric",
+                        extra={"participant_id": str(participant_id), "canvas": canvas_name},
+                    )
+                    self.unassigned_metrics.append(
+                        {
+                            "participant_id": str(participant_id),
+                            "canvas": canvas_idx,
+                            "metric": metric,
+                        }
+                    )
+                    continue
+                try:
+                    metrics_by_report[report_id].append(
+                        self._validate_and_normalize(metric, canvas_name)
+                    )
+                except ValueError as e:
+                    logger.warning(f"Validation failed for metric: {e}")
+                    results[report_id]["errors"].append(
+                        {"canvas": canvas_idx, "metric": metric, "error": str(e)}
+                    )
+
+        # 3. Save all metrics of the participant in one transaction
+        await self._save_participant_batch(
+            participant_id, report_ids, metrics_by_report, metric_def_by_code, results
+        )
+
+    def _pack_sections_into_canvases(
+        self, sections: list[tuple[int, UUID, list[Image.Image]]]
+    ) -> list[tuple[Image.Image, dict[int, UUID]]]:
+        """
+        Pack report sections into as few canvases as the height limit allows.
+
+        Every section starts with a "SECTION n" header band; a section that
+        continues on the next canvas gets its header repeated there.
+
+        Args:
+            sections: (section_number, report_id, images) tuples
+
+        Returns:
+            List of (canvas, {section_number: report_id}) tuples
+        """
+        max_width = max(img.width for _, _, images in sections for img in images)
+        target_width = min(max_width, self.max_combined_width)
+
+        canvases: list[tuple[Image.Image, dict[int, UUID]]] = []
+        tiles: list[Image.Image] = []
+        section_map: dict[int, UUID] = {}
+        height = 0
+
+        def flush() -> None:
+            nonlocal tiles, section_map, height
+            if tiles:
+                canvases.append((self._render_canvas(tiles), section_map))
+            tiles, section_map, height = [], {}, 0
+
+        for section_number, report_id, images in sections:
+            header = self._render_section_header(section_number, target_width)
+            for img in images:
+                if img.width != target_width:
+                    new_height = int(target_width * img.height / img.width)
+                    img = img.resize((target_width, new_height), Image.Resampling.LANCZOS)
+
+                new_tiles = [img] if section_number in section_map else [header, img]
+                added = sum(tile.height + self.image_padding for tile in new_tiles)
+                if tiles and height + added > self.max_combined_height:
+                    flush()
+                    new_tiles = [header, img]
+
+                if new_tiles[0] is header:
+                    section_map[section_number] = report_id
+                for tile in new_tiles:
+                    height += tile.height + (self.image_padding if tiles else 0)
+                    tiles.append(tile)
+
+        flush()
+        return canvases
+
+    def _render_section_header(self, section_number: int, width: int) -> Image.Image:
+        """Render the "SECTION n" band separating reports on a shared canvas."""
+        band_height = 72
+        header = Image.new("RGB", (width, band_height), (255, 255, 255))
+        draw = ImageDraw.Draw(header)
+        font = ImageFont.load_default(size=44)
+        draw.text(
+            (16, 8), SECTION_HEADER_TEMPLATE.format(number=section_number), fill=(0, 0, 0), font=font
+        )
+        draw.rectangle((0, band_height - 6, width, band_height), fill=(0, 0, 0))
+        return header
+
+    @staticmethod
+    def _resolve_section(metric: dict[str, Any], section_map: dict[int, UUID]) -> UUID | None:
+        """Map the "section" field of a parsed metric to its report."""
+        try:
+            return section_map.get(int(metric.get("section")))
+        except (TypeError, ValueError):
+            return None
+
+    async def _save_participant_batch(
+        self,
+        participant_id: UUID,
+        report_ids: list[UUID],
+        metrics_by_report: dict[UUID, list[ExtractedMetricData]],
+        metric_def_by_code: dict[str, Any],
+        results: dict[UUID, dict[str, Any]],
+    ) -> None:
+        """Map labels to codes and persist one participant's metrics with one commit."""
+        report_type = "REPORT_1"
+        extracted_rows = []
+        participant_rows = []
+
+        for report_id in report_ids:
+            result = results[report_id]
+            for metric in metrics_by_report.get(report_id, []):
+                result["metrics_extracted"] += 1
+                metric_code = self.mapping_service.get_metric_code(
+                    report_type, metric.normalized_label
+                )
+                if not metric_code:
+                    result["errors"].append(
+                        {
+                            "label": metric.normalized_label,
+                            "error": "mapping_not_found",
+                            "report_type": report_type,
+                        }
+                    )
+                    continue
+
+                metric_def = metric_def_by_code.get(metric_code)
+                if not metric_def:
+                    result["errors"].append(
+                        {
+                            "label": metric.normalized_label,
+                            "metric_code": metric_code,
+                            "error": "metric_def_not_found",
+                        }
+                    )
+                    continue
+
+                confidence = Decimal(str(metric.confidence))
+                extracted_rows.append(
+                    (
+                        report_id,
+                        metric_def.id,
+                        metric.normalized_value,
+                        confidence,
+                        f"Extracted from batched canvas: {metric.source_image}",
+                    )
+                )
+                participant_rows.append(
+                    (metric_code, metric.normalized_value, confidence, report_id)
+                )
+                result["metrics_saved"] += 1
+
+        try:
+            await self.extracted_metric_repo.bulk_create_or_update(extracted_rows, source="LLM")
+            # Single commit for the participant (covers extracted_metric rows too)
+            await self.participant_metric_repo.upsert_many(participant_id, participant_rows)
+        except (DBAPIError, IntegrityError, OperationalError):
+            logger.error(
+                f"Critical database error while saving batch for participant {participant_id}",
+                exc_info=True,
+            )
+            raise
+
+        logger.info(
+            "batch_extraction_saved",
+            extra={
+                "participant_id": str(participant_id),
+                "reports": len(report_ids),
+                "metrics_saved": len(participant_rows),
+            },
+        )
+        if participant_rows:
+            await RankingService(self.db).refresh_participant(participant_id)
+
+    async def _load_processed_images(
+        self, images: list[ReportImage], errors: list[dict[str, Any]]
+    ) -> list[tuple[Image.Image, str]]:
+        """Load, preprocess and open report images as RGB PIL images."""
+        processed_images: list[tuple[Image.Image, str]] = []
+        for img in images:
+            try:
+                image_data = await self._load_image_data(img)
+                processed_data = self._preprocess_image(image_data)
+                # Open as PIL Image for combination (copy to avoid closing issues)
+                pil_image = Image.open(io.BytesIO(processed_data))
+                # Convert to RGB to ensure compatibility
+                if pil_image.mode != "RGB":
+                    pil_image = pil_image.convert("RGB")
+                # Copy image to avoid file handle issues
+                pil_image = pil_image.copy()
+                processed_images.append((pil_image, str(img.id)))
+            except Exception as e:
+                logger.error(f"Failed to load/preprocess image {img.id}: {e}")
+                errors.append({"image_id": str(img.id), "error": str(e)})
+        return processed_images
+
     def _combine_images_into_groups(
         self, processed_images: list[tuple[Image.Image, str]]
     ) -> list[bytes]:
@@ -454,7 +976,7 @@ class MetricExtractionService:
             processed_images: List of (PIL Image, image_id) tuples
 
         Returns:
-            List of combined image bytes (PNG format)
+            List of combined image bytes (format chosen by the adaptive encoder)
         """
         if not processed_images:
             return []
@@ -509,18 +1031,19 @@ class MetricExtractionService:
             images: List of PIL Images to combine
 
         Returns:
-            Combined image bytes (PNG format)
+            Combined image bytes (format chosen by the adaptive encoder)
         """
         if not images:
             raise ValueError("No images to combine")
 
         if len(images) == 1:
-            # Single image, just return it
-            output = io.BytesIO()
-            images[0].save(output, format="PNG")
-            return output.getvalue()
+            # Single image, just encode it
+            return self._encode_canvas(images[0]).data
+
+        return self._encode_canvas(self._render_canvas(images)).data
 
-        # Calculate dimensions
+    def _render_canvas(self, images: list[Image.Image]) -> Image.Image:
+        """Paste images vertically with padding onto a white canvas."""
         max_width = max(img.width for img in images)
         total_height = sum(img.height for img in images)
         total_height += self.image_padding * (len(images) - 1)
@@ -536,26 +1059,44 @@ class MetricExtractionService:
             combined.paste(img, (x_offset, y_offset))
             y_offset += img.height + self.image_padding
 
-        # Save to bytes
-        output = io.BytesIO()
-        combined.save(output, format="PNG", optimize=True)
-        combined_bytes = output.getvalue()
+        return combined
 
-        # Check size limit
-        size_mb = len(combined_bytes) / (1024 * 1024)
-        if size_mb > self.max_image_size_mb:
+    def _encode_canvas(self, img: Image.Image) -> EncodedImage:
+        """
+        Encode canvas with the adaptive encoder, downscaling only as a last resort.
+
+        Args:
+            img: PIL Image to encode
+
+        Returns:
+            EncodedImage (data, format, mime type, encode time)
+        """
+        payload = self.image_encoder.encode(img)
+
+        if payload is None:
+            # No format fits into the size limit: fall back to LANCZOS downscaling
             logger.warning(
-                f"Combined image size {size_mb:.2f}MB exceeds limit {self.max_image_size_mb}MB, "
-                f"compressing..."
+                f"No encoding of {img.width}x{img.height} image fits into "
+                f"{self.max_image_size_mb}MB, compressing..."
             )
-            # Compress by reducing quality/size
-            combined = self._compress_image(combined, target_size_mb=self.max_image_size_mb)
-            output = io.BytesIO()
-            combined.save(output, format="PNG", optimize=True)
-            combined_bytes = output.getvalue()
-            logger.info(f"Compressed to {len(combined_bytes) / (1024 * 1024):.2f}MB")
+            img = self._compress_image(img, target_size_mb=self.max_image_size_mb)
+            payload = self.image_encoder.encode(img)
+            if payload is None:
+                # Still too large: send PNG anyway and let the API decide
+                output = io.BytesIO()
+                img.convert("RGB").save(output, format="PNG", optimize=True)
+                payload = EncodedImage(
+                    data=output.getvalue(),
+                    format=FORMAT_PNG,
+                    mime_type="image/png",
+                    encode_ms=0.0,
+                    width=img.width,
+                    height=img.height,
+                )
+            logger.info(f"Compressed to {payload.size_bytes / (1024 * 1024):.2f}MB")
 
-        return combined_bytes
+        self.payload_reports.append(payload.as_report())
+        return payload
 
     def _compress_image(self, img: Image.Image, target_size_mb: float) -> Image.Image:
         """
@@ -586,17 +1127,15 @@ class MetricExtractionService:
         return img.resize((new_width, new_height), Image.Resampling.LANCZOS)
 
     async def _load_image_data(self, img: ReportImage) -> bytes:
-        """Load image data from storage."""
+        """Load image data from storage (LOCAL file or object storage, in memory)."""
         # Import here to avoid circular dependency
-        from app.services.storage import LocalReportStorage
-
-        storage = LocalReportStorage(settings.file_storage_base)
-        image_path = storage.resolve_path(img.file_ref.key)
+        from app.services.storage import get_report_storage
 
-        if not image_path.exists():
-            raise FileNotFoundError(f"Image file not found: {image_path}")
-
-        return image_path.read_bytes()
+        storage = get_report_storage(img.file_ref.storage, settings)
+        try:
+            return await storage.read_bytes(img.file_ref.key)
+        except FileNotFoundError as exc:
+            raise FileNotFoundError(f"Image file not found: {img.file_ref.key}") from exc
 
     def _preprocess_image(self, image_data: bytes) -> bytes:
         """
@@ -657,21 +1196,25 @@ class MetricExtractionService:
         image_data: bytes,
         image_name: str,
         max_retries: int = 3,
+        mime_type: str = "image/png",
+        prompt: str = IMPROVED_VISION_PROMPT,
     ) -> list[dict[str, str]]:
         """
         Extract metrics with exponential backoff retry on 503 errors.
 
         Args:
-            image_data: Image bytes (PNG)
+            image_data: Image bytes (PNG, JPEG or WebP)
             image_name: Image filename for logging
             max_retries: Maximum retry attempts
+            mime_type: MIME type of image_data
+            prompt: Vision prompt (single report or sectioned batch canvas)
 
         Returns:
             List of dicts with 'label' and 'value' keys
         """
         for attempt in range(max_retries):
             try:
-                return await self._extract_metrics_with_labels(image_data)
+                return await self._extract_metrics_with_labels(image_data, mime_type, prompt)
             except Exception as e:
                 error_str = str(e)
 
@@ -696,40 +1239,41 @@ class MetricExtractionService:
 
         return []
 
-    async def _extract_metrics_with_labels(self, image_data: bytes) -> list[dict[str, str]]:
+    async def _extract_metrics_with_labels(
+        self,
+        image_data: bytes,
+        mime_type: str = "image/png",
+        prompt: str = IMPROVED_VISION_PROMPT,
+    ) -> list[dict[str, str]]:
         """
         Extract metrics with labels using Gemini Vision API.
 
         Args:
-            image_data: Image bytes (PNG)
+            image_data: Image bytes (PNG, JPEG or WebP)
+            mime_type: MIME type of image_data
+            prompt: Vision prompt
 
         Returns:
             List of dicts with 'label' and 'value' keys
         """
         response = await self.gemini_client.generate_from_image(
-            prompt=IMPROVED_VISION_PROMPT,
+            prompt=prompt,
             image_data=image_data,
-            mime_type="image/png",
+            mime_type=mime_type,
             response_mime_type="application/json",
             timeout=60,
+            response_schema=MetricsExtractionResponse,
         )
 
         # Parse response
         try:
             text = response["candidates"][0]["content"]["parts"][0]["text"]
-            data = json.loads(text)
-            metrics = data.get("metrics", [])
-
-            if not isinstance(metrics, list):
-                logger.warning(f"Response 'metrics' is not a list: {type(metrics)}")
-                return []
-
-            return metrics
-
-        except (KeyError, json.JSONDecodeError, IndexError) as e:
+        except (KeyError, IndexError, TypeError) as e:
             logger.error(f"Failed to parse Gemini response: {e}")
             return []
 
+        return parse_vision_metrics(text)
+
     def _validate_and_normalize(
         self, metric: dict[str, str], source_image: str
     ) -> ExtractedMetricData:
@@ -781,4 +1325,5 @@ class MetricExtractionService:
 
     async def close(self):
         """Close resources."""
+        record_key_pool_stats("extraction", self.gemini_client.get_pool_stats())
         await self.gemini_client.close()
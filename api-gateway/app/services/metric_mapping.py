@@ -9,6 +9,8 @@ from pathlib import Path
 
 import yaml
 
+from app.services.reference_cache import METRIC_MAPPINGS, get_reference_cache
+
 logger = logging.getLogger(__name__)
 
 
@@ -75,8 +77,9 @@ class MetricMappingService:
                 f"Invalid report_mappings structure: expected dict, got {type(report_mappings)}"
             )
 
-        # Parse and validate mappings for each report type
-        self._mappings = {}
+        # Parse and validate mappings for each report type; readers in other
+        # threads keep the previous mappings until the new ones are complete
+        mappings: dict[str, dict[str, str]] = {}
         for report_type, mapping_config in report_mappings.items():
             if not isinstance(mapping_config, dict):
                 logger.warning(
@@ -94,14 +97,15 @@ class MetricMappingService:
                 continue
 
             # Store normalized mapping (uppercase keys)
-            self._mappings[report_type] = {
+            mappings[report_type] = {
                 label.upper().strip(): code.strip() for label, code in header_map.items()
             }
 
             logger.info(
-                f"Loaded {len(self._mappings[report_type])} mappings for report type {report_type}"
+                f"Loaded {len(mappings[report_type])} mappings for report type {report_type}"
             )
 
+        self._mappings = mappings
         self._loaded = True
         logger.info(f"Successfully loaded mappings for {len(self._mappings)} report types")
 
@@ -172,6 +176,10 @@ class MetricMappingService:
         self._mappings = {}
         self.load()
 
+    def mark_stale(self) -> None:
+        """Reload from the configuration file on next use (reference cache invalidation)."""
+        self._loaded = False
+
 
 # Global singleton instance
 _mapping_service: MetricMappingService | None = None
@@ -191,4 +199,5 @@ def get_metric_mapping_service(config_path: str | Path | None = None) -> MetricM
     if _mapping_service is None:
         _mapping_service = MetricMappingService(config_path)
         _mapping_service.load()
+        get_reference_cache().on_invalidate(METRIC_MAPPINGS, _mapping_service.mark_stale)
     return _mapping_service
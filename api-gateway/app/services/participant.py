@@ -17,6 +17,7 @@ from app.schemas.participant import (
     ParticipantSearchParams,
     ParticipantUpdateRequest,
 )
+from app.services.ranking import RankingService
 
 
 class ParticipantService:
@@ -92,7 +93,10 @@ class ParticipantService:
         Returns:
             True if deleted, False if not found
         """
-        return await self.repo.delete(participant_id)
+        deleted = await self.repo.delete(participant_id)
+        if deleted:
+            await RankingService(self.db).remove_participant(participant_id)
+        return deleted
 
     async def search_participants(self, params: ParticipantSearchParams) -> ParticipantListResponse:
         """
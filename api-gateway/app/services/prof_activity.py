@@ -15,6 +15,12 @@ from app.schemas.prof_activity import (
     ProfActivityResponse,
     ProfActivityUpdateRequest,
 )
+from app.services.reference_cache import (
+    PROF_ACTIVITIES,
+    get_prof_activities,
+    get_reference_cache,
+)
+from app.services.weight_catalog import get_weight_catalog_cache
 
 
 class ProfActivityService:
@@ -31,8 +37,7 @@ class ProfActivityService:
         Returns:
             List of serialized professional activities.
         """
-        activities = await self.repo.list_all()
-        return [ProfActivityResponse.model_validate(activity) for activity in activities]
+        return await get_prof_activities(self.repo)
 
     async def create_prof_activity(
         self, request: ProfActivityCreateRequest
@@ -57,6 +62,8 @@ class ProfActivityService:
         prof_activity = await self.repo.create(
             code=request.code, name=request.name, description=request.description
         )
+        await get_weight_catalog_cache().invalidate("prof_activity_create")
+        await get_reference_cache().invalidate(PROF_ACTIVITIES, "prof_activity_create")
         return ProfActivityResponse.model_validate(prof_activity)
 
     async def update_prof_activity(
@@ -81,6 +88,8 @@ class ProfActivityService:
         if not prof_activity:
             raise ValueError("Professional activity not found")
 
+        await get_weight_catalog_cache().invalidate("prof_activity_update")
+        await get_reference_cache().invalidate(PROF_ACTIVITIES, "prof_activity_update")
         return ProfActivityResponse.model_validate(prof_activity)
 
     async def delete_prof_activity(self, prof_activity_id: UUID) -> None:
@@ -96,6 +105,8 @@ class ProfActivityService:
         success = await self.repo.delete(prof_activity_id)
         if not success:
             raise ValueError("Professional activity not found")
+        await get_weight_catalog_cache().invalidate("prof_activity_delete")
+        await get_reference_cache().invalidate(PROF_ACTIVITIES, "prof_activity_delete")
 
     async def seed_defaults(self) -> None:
         """Seed default professional activities in idempotent manner."""
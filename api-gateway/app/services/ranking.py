@@ -0,0 +1,525 @@
+"""
+Cohort ranking index per professional activity.
+
+Each activity with a usable weight table has a Redis sorted set
+``ranking:activity:{code}``: member = participant id, score = score_pct in
+hundredths, computed from the participant's current metrics with the
+arithmetic of ``calculate_score`` (see ``bulk_scoring.score_matrix``).
+Participants with missing or out-of-range metrics are not in the set. Top-K,
+leaderboard pages, rank and percentile are then a few O(log N) Redis calls.
+
+The index is maintained incrementally:
+
+- participant_metric writes call ``RankingService.refresh_participant``: the
+  participant is re-scored against every weight table in one pass and added
+  to / removed from each set
+- participant deletes call ``remove_participant``: the participant is
+  removed from every set
+- weight table uploads and updates call ``refresh_activity``: the set is
+  rebuilt for the whole cohort with one vectorized pass and swapped in
+  atomically (MULTI/EXEC)
+- each set records the weight table id and weights fingerprint it was built
+  from; a read that finds the set missing or built from other weights
+  rebuilds it first
+
+Maintenance is best effort: errors are logged and never fail the write that
+triggered them. When Redis is unavailable (or RANKING_INDEX_ENABLED is off)
+reads are answered from the database with the same vectorized scoring.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Any
+from uuid import UUID
+
+import redis
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cache import SharedRedis
+from app.core.config import settings
+from app.repositories.metric import MetricDefRepository
+from app.repositories.participant import ParticipantRepository
+from app.repositories.participant_metric import ParticipantMetricRepository
+from app.repositories.prof_activity import ProfActivityRepository
+from app.repositories.weight_table import WeightTableRepository
+from app.services.bulk_scoring import (
+    ActivityWeights,
+    CompiledWeights,
+    compile_weight_tables,
+    fraction_digits,
+    score_matrix,
+)
+from app.services.recommendation_cache import weights_fingerprint
+from app.services.weight_catalog import WeightCatalog, get_weight_catalog
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "ranking:activity:"
+
+_ZADD_CHUNK = 5000
+
+
+def ranking_key(prof_activity_code: str) -> str:
+    """Sorted set holding the cohort ranking of one activity."""
+    return f"{KEY_PREFIX}{prof_activity_code}"
+
+
+def _meta_key(prof_activity_code: str) -> str:
+    return f"{ranking_key(prof_activity_code)}:meta"
+
+
+def index_version(activity: ActivityWeights) -> str:
+    """Identity of the weights a ranking was built from."""
+    return f"{activity.weight_table.id}:{weights_fingerprint(activity.weight_table.weights)}"
+
+
+def percentile(below: int, equal: int, total: int) -> Decimal:
+    """Percentile rank: share of the cohort below, counting ties as half (0-100)."""
+    value = (Decimal(below) + Decimal(equal) / 2) * 100 / Decimal(total)
+    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+@dataclass(slots=True)
+class RankPosition:
+    """Position of one participant in an activity ranking."""
+
+    score_cents: int
+    rank: int  # 1-based; tied scores share the rank
+    below: int
+    equal: int
+    total: int
+
+
+class RankingIndex:
+    """
+    Redis sorted sets of cohort scores per activity.
+
+    Redis calls run in a worker thread. Writes return False and reads None
+    when Redis is unavailable (after a failure Redis is skipped for a back-off
+    window); ``available`` tells an unranked participant from an unreachable
+    index, so callers can fall back to the database.
+    """
+
+    def __init__(self, redis_url: str | None = None):
+        self._redis = SharedRedis("ranking_index", redis_url)
+
+    @property
+    def enabled(self) -> bool:
+        return settings.ranking_index_enabled
+
+    @property
+    def available(self) -> bool:
+        return self.enabled and self._redis.available
+
+    async def _run(
+        self, operation: str, call: Callable[[redis.Redis], Any], default: Any = None
+    ) -> Any:
+        if not self.enabled:
+            return default
+        return await self._redis.arun(operation, call, default)
+
+    async def version(self, prof_activity_code: str) -> str | None:
+        """Version the ranking was built from ("" if it was never built)."""
+        raw = await self._run(
+            "version", lambda client: client.hget(_meta_key(prof_activity_code), "version") or b""
+        )
+        return raw.decode() if raw is not None else None
+
+    async def replace(self, prof_activity_code: str, version: str, scores: dict[UUID, int]) -> bool:
+        """Atomically replace the whole ranking of an activity."""
+        key, members = ranking_key(prof_activity_code), list(scores.items())
+
+        def call(client: redis.Redis) -> bool:
+            pipe = client.pipeline(transaction=True)
+            pipe.delete(key)
+            for start in range(0, len(members), _ZADD_CHUNK):
+                chunk = members[start : start + _ZADD_CHUNK]
+                pipe.zadd(key, {str(participant_id): cents for participant_id, cents in chunk})
+            pipe.hset(
+                _meta_key(prof_activity_code),
+                mapping={"version": version, "built_at": datetime.now(UTC).isoformat()},
+            )
+            pipe.execute()
+            return True
+
+        return await self._run("replace", call, default=False)
+
+    async def drop(self, prof_activity_code: str) -> bool:
+        """Remove the ranking of an activity that can no longer be scored."""
+
+        def call(client: redis.Redis) -> bool:
+            client.delete(ranking_key(prof_activity_code), _meta_key(prof_activity_code))
+            return True
+
+        return await self._run("drop", call, default=False)
+
+    async def update(self, participant_id: UUID, scores: dict[str, int | None]) -> bool:
+        """
+        Set one participant's score in several rankings.
+
+        Args:
+            participant_id: Participant
+            scores: Score in hundredths per activity code; None removes the
+                participant from that ranking
+        """
+        member = str(participant_id)
+
+        def call(client: redis.Redis) -> bool:
+            pipe = client.pipeline(transaction=False)
+            for code, cents in scores.items():
+                if cents is None:
+                    pipe.zrem(ranking_key(code), member)
+                else:
+                    pipe.zadd(ranking_key(code), {member: cents})
+            pipe.execute()
+            return True
+
+        return await self._run("update", call, default=False)
+
+    async def remove(self, participant_id: UUID) -> bool:
+        """Remove a participant from the ranking of every activity."""
+        member = str(participant_id)
+
+        def call(client: redis.Redis) -> bool:
+            pipe = client.pipeline(transaction=False)
+            for key in client.scan_iter(match=f"{KEY_PREFIX}*", _type="zset"):
+                pipe.zrem(key, member)
+            pipe.execute()
+            return True
+
+        return await self._run("remove", call, default=False)
+
+    async def page(
+        self, prof_activity_code: str, offset: int, limit: int
+    ) -> tuple[list[tuple[str, int]], int, int] | None:
+        """
+        One leaderboard page, best first.
+
+        Returns:
+            (entries, total, rank of the first entry) or None if Redis is unavailable
+        """
+        key = ranking_key(prof_activity_code)
+
+        def call(client: redis.Redis) -> tuple[list[tuple[str, int]], int, int]:
+            pipe = client.pipeline(transaction=False)
+            pipe.zrevrange(key, offset, offset + limit - 1, withscores=True)
+            pipe.zcard(key)
+            raw, total = pipe.execute()
+            first_rank = 1
+            if raw:
+                first_rank = client.zcount(key, f"({raw[0][1]}", "+inf") + 1
+            entries = [(member.decode(), int(score)) for member, score in raw]
+            return entries, int(total), first_rank
+
+        return await self._run("page", call)
+
+    async def position(self, prof_activity_code: str, participant_id: UUID) -> RankPosition | None:
+        """Rank of a participant (None if not ranked or Redis is unavailable)."""
+        key = ranking_key(prof_activity_code)
+
+        def call(client: redis.Redis) -> RankPosition | None:
+            score = client.zscore(key, str(participant_id))
+            if score is None:
+                return None
+            pipe = client.pipeline(transaction=False)
+            pipe.zcount(key, f"({score}", "+inf")
+            pipe.zcount(key, "-inf", f"({score}")
+            pipe.zcard(key)
+            above, below, total = pipe.execute()
+            return RankPosition(
+                score_cents=int(score),
+                rank=above + 1,
+                below=below,
+                equal=total - above - below,
+                total=total,
+            )
+
+        return await self._run("position", call)
+
+
+_index: RankingIndex | None = None
+
+
+def get_ranking_index() -> RankingIndex:
+    global _index
+    if _index is None:
+        _index = RankingIndex()
+    return _index
+
+
+def _cohort_scores(
+    compiled: CompiledWeights, metrics_by_participant: dict[UUID, dict[str, Decimal]]
+) -> dict[str, dict[UUID, int]]:
+    """Scores in hundredths per activity code, eligible participants only."""
+    if not compiled.activities:
+        return {}
+    pids = list(metrics_by_participant)
+    score_cents, eligible = score_matrix(
+        compiled.values_matrix([metrics_by_participant[pid] for pid in pids]),
+        compiled.matrix,
+        value_digits=fraction_digits(
+            [value for metrics in metrics_by_participant.values() for value in metrics.values()]
+        ),
+        weight_digits=compiled.weight_digits,
+    )
+    scores: dict[str, dict[UUID, int]] = {}
+    for activity in compiled.activities:
+        column = activity.column
+        scores[activity.code] = {
+            pids[row]: int(score_cents[row, column]) for row in eligible[:, column].nonzero()[0]
+        }
+    return scores
+
+
+def _cents_to_pct(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
+
+
+class RankingService:
+    """Leaderboards and percentiles per activity on top of ``RankingIndex``."""
+
+    def __init__(self, db: AsyncSession, index: RankingIndex | None = None):
+        self.db = db
+        self.index = index or get_ranking_index()
+        self.participant_repo = ParticipantRepository(db)
+        self.participant_metric_repo = ParticipantMetricRepository(db)
+        self.prof_activity_repo = ProfActivityRepository(db)
+        self.weight_table_repo = WeightTableRepository(db)
+        self.metric_def_repo = MetricDefRepository(db)
+
+    async def _weight_catalog(self) -> WeightCatalog:
+        return await get_weight_catalog(
+            self.prof_activity_repo, self.weight_table_repo, self.metric_def_repo
+        )
+
+    async def _activity(self, prof_activity_code: str) -> ActivityWeights:
+        return (await self._weight_catalog()).compiled_activity(prof_activity_code)
+
+    async def _scores(self, activity: ActivityWeights) -> dict[UUID, int]:
+        compiled = compile_weight_tables([activity.weight_table])
+        metrics = await self.participant_metric_repo.get_all_metrics_dicts()
+        return _cohort_scores(compiled, metrics).get(activity.code, {})
+
+    async def _ensure_built(self, activity: ActivityWeights) -> dict[UUID, int] | None:
+        """
+        Rebuild the ranking if it is missing or stale.
+
+        Returns:
+            The computed scores when the index cannot be used (Redis
+            unavailable), None when the index is up to date
+        """
+        version = await self.index.version(activity.code)
+        if version == index_version(activity):
+            return None
+        scores = await self._scores(activity)
+        if version is not None and await self.index.replace(
+            activity.code, index_version(activity), scores
+        ):
+            logger.info(
+                "ranking_index_rebuilt",
+                extra={"prof_activity_code": activity.code, "participants": len(scores)},
+            )
+            return None
+        return scores
+
+    async def refresh_participant(self, participant_id: UUID) -> bool:
+        """
+        Re-score one participant in every ranking after a metric change.
+
+        Best effort: returns False (and logs) instead of raising.
+        """
+        if not self.index.enabled:
+            return False
+        try:
+            compiled = (await self._weight_catalog()).compiled
+            metrics = await self.participant_metric_repo.get_metrics_dict(participant_id)
+            scores = _cohort_scores(compiled, {participant_id: metrics})
+            updates: dict[str, int | None] = {
+                code: activity_scores.get(participant_id)
+                for code, activity_scores in scores.items()
+            }
+            updates.update(dict.fromkeys(compiled.skipped))
+            return await self.index.update(participant_id, updates)
+        except Exception as exc:
+            logger.warning(
+                "ranking_index_refresh_failed",
+                extra={"participant_id": str(participant_id), "error": str(exc)},
+            )
+            return False
+
+    async def remove_participant(self, participant_id: UUID) -> bool:
+        """
+        Drop a deleted participant from every ranking.
+
+        Best effort: returns False (and logs) instead of raising.
+        """
+        if not self.index.enabled:
+            return False
+        try:
+            return await self.index.remove(participant_id)
+        except Exception as exc:
+            logger.warning(
+                "ranking_index_refresh_failed",
+                extra={"participant_id": str(participant_id), "error": str(exc)},
+            )
+            return False
+
+    async def refresh_activity(self, prof_activity_code: str) -> bool:
+        """
+        Rebuild one activity's ranking after its weight table changed.
+
+        Best effort: returns False (and logs) instead of raising.
+        """
+        if not self.index.enabled:
+            return False
+        try:
+            try:
+                activity = await self._activity(prof_activity_code)
+            except ValueError:
+                return await self.index.drop(prof_activity_code)
+            scores = await self._scores(activity)
+            return await self.index.replace(prof_activity_code, index_version(activity), scores)
+        except Exception as exc:
+            logger.warning(
+                "ranking_index_refresh_failed",
+                extra={"prof_activity_code": prof_activity_code, "error": str(exc)},
+            )
+            return False
+
+    async def rebuild_all(self) -> dict[str, Any]:
+        """
+        Rebuild every ranking with one metrics load and one vectorized pass.
+
+        Returns:
+            Participants indexed per activity, activities dropped with the
+            reason, whether the index was available and the elapsed time
+        """
+        started = time.perf_counter()
+        compiled = (await self._weight_catalog()).compiled
+        metrics = await self.participant_metric_repo.get_all_metrics_dicts()
+        scores = _cohort_scores(compiled, metrics)
+        stored = True
+        for activity in compiled.activities:
+            stored &= await self.index.replace(
+                activity.code, index_version(activity), scores[activity.code]
+            )
+        for code in compiled.skipped:
+            stored &= await self.index.drop(code)
+        summary = {
+            "indexed": stored,
+            "activities": {code: len(activity_scores) for code, activity_scores in scores.items()},
+            "skipped_activities": compiled.skipped,
+            "elapsed_ms": int((time.perf_counter() - started) * 1000),
+        }
+        logger.info("ranking_index_rebuilt_all", extra=summary)
+        return summary
+
+    async def leaderboard(
+        self, prof_activity_code: str, limit: int = 50, offset: int = 0
+    ) -> dict[str, Any]:
+        """
+        Leaderboard page of an activity (top-K with ``offset=0``).
+
+        Ties share the rank and are ordered by participant id, as in Redis.
+
+        Raises:
+            ValueError: If the activity has no usable weight table
+        """
+        activity = await self._activity(prof_activity_code)
+        computed = await self._ensure_built(activity)
+        if computed is None:
+            page = await self.index.page(activity.code, offset, limit)
+            if page is None:
+                computed = await self._scores(activity)
+        if computed is not None:
+            ranked = sorted(
+                ((str(pid), cents) for pid, cents in computed.items()),
+                key=lambda entry: (entry[1], entry[0]),
+                reverse=True,
+            )
+            entries = ranked[offset : offset + limit]
+            first_rank = 1
+            if entries:
+                first_rank = sum(1 for _, cents in ranked if cents > entries[0][1]) + 1
+            page = (entries, len(ranked), first_rank)
+        entries, total, rank = page
+
+        participants = await self.participant_repo.get_many(
+            [UUID(participant_id) for participant_id, _ in entries]
+        )
+        items = []
+        for index, (participant_id, cents) in enumerate(entries):
+            if index and cents != entries[index - 1][1]:
+                rank = offset + index + 1
+            participant = participants.get(UUID(participant_id))
+            items.append(
+                {
+                    "rank": rank,
+                    "participant_id": participant_id,
+                    "full_name": participant.full_name if participant else None,
+                    "score_pct": _cents_to_pct(cents),
+                }
+            )
+        return {
+            "prof_activity_code": activity.code,
+            "weight_table_id": str(activity.weight_table.id),
+            "total": total,
+            "offset": offset,
+            "limit": limit,
+            "items": items,
+        }
+
+    async def participant_rank(
+        self, prof_activity_code: str, participant_id: UUID
+    ) -> dict[str, Any]:
+        """
+        Rank and percentile of a participant within an activity's cohort.
+
+        Score fields are None when the participant cannot be scored for the
+        activity (missing or out-of-range metrics).
+
+        Raises:
+            ValueError: If the activity has no usable weight table
+        """
+        activity = await self._activity(prof_activity_code)
+        computed = await self._ensure_built(activity)
+        if computed is None:
+            position = await self.index.position(activity.code, participant_id)
+            if position is None and not self.index.available:
+                computed = await self._scores(activity)
+        if computed is not None:
+            own = computed.get(participant_id)
+            position = None
+            if own is not None:
+                above = sum(1 for cents in computed.values() if cents > own)
+                below = sum(1 for cents in computed.values() if cents < own)
+                position = RankPosition(
+                    score_cents=own,
+                    rank=above + 1,
+                    below=below,
+                    equal=len(computed) - above - below,
+                    total=len(computed),
+                )
+
+        result: dict[str, Any] = {
+            "prof_activity_code": activity.code,
+            "participant_id": str(participant_id),
+            "score_pct": None,
+            "rank": None,
+            "total": None,
+            "percentile": None,
+        }
+        if position:
+            result.update(
+                score_pct=_cents_to_pct(position.score_cents),
+                rank=position.rank,
+                total=position.total,
+                percentile=percentile(position.below, position.equal, position.total),
+            )
+        return result
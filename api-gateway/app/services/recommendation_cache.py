@@ -0,0 +1,166 @@
+"""
+Cache of generated AI recommendations.
+
+Recommendations depend only on the prompt inputs: prof activity, weight table
+and the participant's metric values. Recalculations and participants with
+near-identical profiles therefore reuse a previous Gemini answer instead of
+spending quota on a new one.
+
+Key: prof activity code + weight table id + fingerprint of its weights (tables
+are edited in place, so the fingerprint acts as the version) + metric values
+quantized to RECOMMENDATIONS_CACHE_QUANTUM + prompt version and text model.
+
+Two tiers: an in-process TTL/LRU map in front of Redis, which is shared by the
+API and all worker processes and called from a worker thread, never on the
+event loop. Redis errors only disable the shared tier for a back-off window;
+the cache never fails a scoring request or a task.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from decimal import ROUND_HALF_UP, Decimal
+from typing import TYPE_CHECKING, Any
+
+import redis
+
+from app.core.cache import SharedRedis, TTLCache
+from app.core.config import settings
+from app.services.recommendations import RecommendationsGenerator
+
+if TYPE_CHECKING:
+    from app.db.models import WeightTable
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cache:recommendations:"
+STATS_KEY = f"{KEY_PREFIX}stats"
+
+
+def weights_fingerprint(weights: list[dict[str, Any]]) -> str:
+    """Stable digest of weight table entries (order-insensitive)."""
+    canonical = sorted(
+        (entry["metric_code"], str(Decimal(str(entry["weight"])))) for entry in weights
+    )
+    return hashlib.sha256(json.dumps(canonical).encode()).hexdigest()[:16]
+
+
+def quantize_value(value: Decimal | float | str, quantum: Decimal) -> str:
+    """Round a metric value to the cache step (quantum <= 0 keeps it exact)."""
+    value = Decimal(str(value))
+    if quantum <= 0:
+        return str(value.normalize())
+    steps = (value / quantum).quantize(Decimal("1"), rounding=ROUND_HALF_UP)
+    return str((steps * quantum).normalize())
+
+
+def recommendation_cache_key(
+    prof_activity_code: str,
+    weight_table: WeightTable,
+    metrics: list[dict[str, Any]],
+) -> str:
+    """
+    Build the cache key for a recommendations request.
+
+    Args:
+        prof_activity_code: Professional activity code
+        weight_table: Weight table used for the score
+        metrics: Prompt metrics (``build_recommendation_metrics`` output)
+    """
+    quantum = Decimal(str(settings.recommendations_cache_quantum))
+    profile = sorted(
+        (metric["code"], quantize_value(metric["value"], quantum)) for metric in metrics
+    )
+    digest = hashlib.sha256(
+        json.dumps(
+            {
+                "prompt": RecommendationsGenerator.PROMPT_VERSION,
+                "model": settings.gemini_model_text,
+                "weights": weights_fingerprint(weight_table.weights),
+                "metrics": profile,
+            }
+        ).encode()
+    ).hexdigest()
+    return f"{KEY_PREFIX}{prof_activity_code}:{weight_table.id}:{digest[:32]}"
+
+
+class RecommendationCache:
+    """Two-tier (process + Redis) cache of ScoringResult.recommendations lists."""
+
+    def __init__(self, redis_url: str | None = None):
+        self._redis = SharedRedis("recommendations_cache", redis_url)
+        self.local: TTLCache[list[dict[str, Any]]] = TTLCache(
+            maxsize=settings.recommendations_cache_max_entries,
+            ttl_s=settings.recommendations_cache_ttl_sec,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return settings.recommendations_cache_enabled
+
+    async def get(self, key: str) -> list[dict[str, Any]] | None:
+        """Return cached recommendations or None (also counts the lookup)."""
+        if not self.enabled:
+            return None
+
+        def lookup(client: redis.Redis) -> bytes | None:
+            raw = client.get(key)
+            client.hincrby(STATS_KEY, "hits" if raw is not None else "misses", 1)
+            return raw
+
+        value = self.local.get(key)
+        source = "local"
+        if value is None and self._redis.available:
+            source = "redis"
+            raw = await self._redis.arun("get", lookup)
+            if raw is not None:
+                value = json.loads(raw)
+                self.local.set(key, value)
+        elif value is not None:
+            await self._redis.arun("stats", lambda client: client.hincrby(STATS_KEY, "hits", 1))
+
+        logger.info(
+            "recommendations_cache_hit" if value is not None else "recommendations_cache_miss",
+            extra={"key": key, "source": source},
+        )
+        return value
+
+    async def set(self, key: str, recommendations: list[dict[str, Any]]) -> None:
+        if not self.enabled or not recommendations:
+            return
+        self.local.set(key, recommendations)
+        payload = json.dumps(recommendations, ensure_ascii=False)
+        await self._redis.arun(
+            "set",
+            lambda client: client.set(key, payload, ex=settings.recommendations_cache_ttl_sec),
+        )
+
+    def stats(self) -> dict[str, Any]:
+        """Hit-rate counters of this process and of all processes (Redis)."""
+        shared: dict[str, Any] | None = None
+        raw = self._redis.run("stats", lambda client: client.hgetall(STATS_KEY))
+        if raw is not None:
+            hits, misses = int(raw.get(b"hits", 0)), int(raw.get(b"misses", 0))
+            lookups = hits + misses
+            shared = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            }
+        return {
+            "enabled": self.enabled,
+            "local": {**self.local.stats.as_dict(), "entries": len(self.local)},
+            "shared": shared,
+        }
+
+
+_cache: RecommendationCache | None = None
+
+
+def get_recommendation_cache() -> RecommendationCache:
+    global _cache
+    if _cache is None:
+        _cache = RecommendationCache()
+    return _cache
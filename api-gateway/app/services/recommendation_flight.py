@@ -0,0 +1,120 @@
+"""
+Single-flight coordination of recommendation generation.
+
+Every "calculate" click creates a ScoringResult and a recommendations task.
+Tasks for the same participant, weight table and metric snapshot would all
+send the same prompt to Gemini; only one of them should.
+
+A flight is a Redis key holding the leader's scoring_result_id plus a set of
+follower ids:
+
+- ``lead_or_follow`` (task start): the first task becomes the leader; later
+  tasks join as followers, skip Gemini and check back later: by then the
+  leader has filled their result, or the flight has expired (leader lost)
+  and the follower leads a new one
+- ``complete`` (leader finished): ends the flight and returns the followers,
+  whose results the leader fills with the same recommendations or error
+
+Each operation is a Lua script, so a follower can never join a flight that
+has just been completed; scripts run in a worker thread, off the event loop.
+Without Redis every task leads (no deduplication).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from decimal import Decimal
+from typing import TYPE_CHECKING, Any
+from uuid import UUID
+
+from app.core.cache import SharedRedis
+from app.core.config import settings
+from app.services.recommendation_cache import weights_fingerprint
+
+if TYPE_CHECKING:
+    from app.db.models import WeightTable
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "flight:recommendations:"
+FOLLOWERS_SUFFIX = ":followers"
+
+# KEYS: flight, followers; ARGV: scoring_result_id, ttl -> leader id
+_LEAD_OR_FOLLOW = """
+local leader = redis.call('GET', KEYS[1])
+if not leader then
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    return ARGV[1]
+end
+if leader == ARGV[1] then
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return leader
+end
+redis.call('SADD', KEYS[2], ARGV[1])
+redis.call('EXPIRE', KEYS[2], ARGV[2])
+return leader
+"""
+
+# KEYS: flight, followers; ARGV: scoring_result_id -> follower ids
+_COMPLETE = """
+if redis.call('GET', KEYS[1]) ~= ARGV[1] then
+    return {}
+end
+local followers = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2])
+return followers
+"""
+
+
+def flight_key(
+    participant_id: UUID | str, weight_table: WeightTable, metrics: list[dict[str, Any]]
+) -> str:
+    """
+    Key of the flight for a participant's metric snapshot under a weight table.
+
+    Args:
+        participant_id: Participant UUID
+        weight_table: Weight table used for the score
+        metrics: Prompt metrics (``build_recommendation_metrics`` output)
+    """
+    snapshot = sorted((metric["code"], str(Decimal(str(metric["value"])))) for metric in metrics)
+    digest = hashlib.sha256(
+        json.dumps([weights_fingerprint(weight_table.weights), snapshot]).encode()
+    ).hexdigest()
+    return f"{KEY_PREFIX}{participant_id}:{weight_table.id}:{digest[:32]}"
+
+
+class RecommendationFlights:
+    """Redis-backed single-flight registry (fails open)."""
+
+    def __init__(self, redis_url: str | None = None):
+        self._redis = SharedRedis("recommendations_flight", redis_url, decode_responses=True)
+
+    async def _run(self, script: str, key: str, *args: Any) -> Any:
+        return await self._redis.arun(
+            "flight",
+            lambda client: client.eval(script, 2, key, f"{key}{FOLLOWERS_SUFFIX}", *args),
+        )
+
+    async def lead_or_follow(self, key: str, scoring_result_id: str) -> str:
+        """Start or join a flight; returns the leader's scoring_result_id."""
+        leader = await self._run(
+            _LEAD_OR_FOLLOW, key, scoring_result_id, settings.recommendations_flight_ttl_sec
+        )
+        return leader or scoring_result_id
+
+    async def complete(self, key: str, scoring_result_id: str) -> list[str]:
+        """End the leader's flight and return the followers to fill."""
+        return list(await self._run(_COMPLETE, key, scoring_result_id) or [])
+
+
+_flights: RecommendationFlights | None = None
+
+
+def get_recommendation_flights() -> RecommendationFlights:
+    global _flights
+    if _flights is None:
+        _flights = RecommendationFlights()
+    return _flights
@@ -10,20 +10,84 @@ Implements:
 
 import json
 import logging
+from collections import Counter
+from dataclasses import dataclass
 from typing import Any, Union
 
 from pydantic import ValidationError
 
 from app.clients import GeminiClient, GeminiPoolClient
 from app.clients.exceptions import GeminiClientError
+from app.core.cache import SharedRedis
 from app.core.config import settings
 from app.schemas.recommendations import (
+    RecommendationsBatchElement,
     RecommendationsInput,
     RecommendationsResponse,
 )
+from app.services.json_repair import repair_json
 
 logger = logging.getLogger(__name__)
 
+# How model output was turned into a valid response
+PARSE_PATH_DIRECT = "direct"
+PARSE_PATH_REPAIRED = "repaired"
+PARSE_PATH_LLM_SELF_HEAL = "llm_self_heal"
+PARSE_PATH_HEALED = "healed"
+PARSE_PATH_FAILED = "failed"
+PARSE_PATHS = (
+    PARSE_PATH_DIRECT,
+    PARSE_PATH_REPAIRED,
+    PARSE_PATH_LLM_SELF_HEAL,
+    PARSE_PATH_HEALED,
+    PARSE_PATH_FAILED,
+)
+
+# Generation runs in Celery workers: the counters of all processes live in Redis
+PARSE_PATH_STATS_KEY = "stats:recommendations:parse_paths"
+
+parse_path_counts: Counter[str] = Counter()
+_parse_path_redis = SharedRedis("recommendations_parse_path")
+
+
+async def _record_parse_path(path: str, prof_activity_code: str) -> None:
+    parse_path_counts[path] += 1
+    await _parse_path_redis.arun(
+        "record", lambda client: client.hincrby(PARSE_PATH_STATS_KEY, path, 1)
+    )
+    logger.info(
+        "recommendations_parse_path",
+        extra={
+            "path": path,
+            "prof_activity_code": prof_activity_code,
+            "counts": dict(parse_path_counts),
+        },
+    )
+
+
+def parse_path_stats() -> dict[str, Any]:
+    """Parse path counters of this process and of all processes (shared is None without Redis)."""
+    raw = _parse_path_redis.run("stats", lambda client: client.hgetall(PARSE_PATH_STATS_KEY))
+    return {
+        "local": {path: parse_path_counts[path] for path in PARSE_PATHS},
+        "shared": (
+            {path: int(raw.get(path.encode(), 0)) for path in PARSE_PATHS}
+            if raw is not None
+            else None
+        ),
+    }
+
+
+@dataclass(slots=True)
+class RecommendationsBatchItem:
+    """One scoring result in a batch recommendations request."""
+
+    scoring_result_id: str
+    metrics: list[dict]
+    score_pct: float
+    prof_activity_code: str
+    prof_activity_name: str
+
 
 class RecommendationsGenerator:
     """
@@ -34,8 +98,21 @@ class RecommendationsGenerator:
     - Self-healing validation (retries on invalid JSON)
     - Automatic list truncation to ≤5 items per section
     - Russian language support
+    - Batch mode: several scoring results per request (generate_batch)
     """
 
+    # Bump when SYSTEM_INSTRUCTIONS, the prompt or the output format change:
+    # it is part of the recommendations cache key
+    PROMPT_VERSION = "1"
+
+    # Fields an item must have to survive local repair, and list-typed fields
+    _REQUIRED_FIELDS = {
+        "strengths": ("title", "metric_codes", "reason"),
+        "dev_areas": ("title", "metric_codes", "actions"),
+        "recommendations": ("title", "skill_focus", "development_advice"),
+    }
+    _LIST_FIELDS = frozenset({"metric_codes", "actions", "recommended_formats"})
+
     # System instructions for Gemini (from prompt-gemini-recommendations.md)
     SYSTEM_INSTRUCTIONS = """Ты эксперт по оценке компетенций и обучению взрослых.
 
@@ -177,6 +254,64 @@ class RecommendationsGenerator:
 
         return prompt
 
+    def _build_batch_prompt(self, items: list[RecommendationsBatchItem]) -> str:
+        """
+        Build one prompt for several scoring results.
+
+        Args:
+            items: Batch items (each with its own activity, metrics and score)
+
+        Returns:
+            Prompt asking for a JSON array keyed by scoring_result_id
+        """
+        inputs = [
+            {
+                "scoring_result_id": item.scoring_result_id,
+                **self._build_input(item).model_dump(),
+            }
+            for item in items
+        ]
+        inputs_json = json.dumps(inputs, indent=2, ensure_ascii=False)
+
+        return f"""Ниже данные по метрикам и весам для {len(items)} участников. Для КАЖДОГО элемента сформируй рекомендации отдельно, учитывая его профдеятельность (context.prof_activity).
+
+Инпут (массив):
+{inputs_json}
+
+Верни только JSON-массив по схеме, по одному элементу на каждый scoring_result_id из инпута:
+[
+  {{
+    "scoring_result_id": "string",
+    "strengths": [
+      {{"title": "string", "metric_codes": ["string"], "reason": "string"}}
+    ],
+    "dev_areas": [
+      {{"title": "string", "metric_codes": ["string"], "actions": ["string"]}}
+    ],
+    "recommendations": [
+      {{
+        "title": "string",
+        "skill_focus": "string",
+        "development_advice": "string",
+        "recommended_formats": ["string"]
+      }}
+    ]
+  }}
+]
+
+Требования:
+- scoring_result_id: скопируй без изменений из инпута
+- Каждый список: максимум 5 элементов
+- title: максимум 80 символов
+- reason: максимум 200 символов
+- skill_focus: максимум 120 символов (какой навык развивать)
+- development_advice: максимум 240 символов (как развивать)
+- recommended_formats: список форматов обучения (воркшоп, наставник, практикум и т.п.), максимум 5 элементов, каждый ≤80 символов
+- metric_codes: реальные коды из метрик этого же элемента
+- Пиши на русском языке
+- НЕ используй URL, ссылки и названия конкретных коммерческих курсов
+"""
+
     def _truncate_response(self, data: dict[str, Any]) -> dict[str, Any]:
         """
         Truncate lists to maximum 5 items and enforce length limits.
@@ -266,16 +401,14 @@ class RecommendationsGenerator:
             )
 
         # Build input data
-        input_data = RecommendationsInput(
-            context={
-                "language": "ru",
-                "prof_activity": {
-                    "code": prof_activity_code,
-                    "name": prof_activity_name,
-                },
-            },
-            metrics=metrics,
-            score_pct=score_pct,
+        input_data = self._build_input(
+            RecommendationsBatchItem(
+                scoring_result_id="",
+                metrics=metrics,
+                score_pct=score_pct,
+                prof_activity_code=prof_activity_code,
+                prof_activity_name=prof_activity_name,
+            )
         )
 
         # Build prompt
@@ -301,6 +434,7 @@ class RecommendationsGenerator:
                     prompt=prompt,
                     system_instructions=self.SYSTEM_INSTRUCTIONS,
                     response_mime_type="application/json",
+                    response_schema=RecommendationsResponse,
                 )
 
                 # Extract text from response
@@ -319,12 +453,22 @@ class RecommendationsGenerator:
                         },
                     )
 
+                    # Local repair first: no second request for fences, commas, truncation
+                    repaired = self._repair_locally(raw_text)
+                    if repaired is not None:
+                        await _record_parse_path(PARSE_PATH_REPAIRED, prof_activity_code)
+                        return repaired
+
                     if attempt < max_attempts:
                         # Retry with self-heal prompt
+                        await _record_parse_path(PARSE_PATH_LLM_SELF_HEAL, prof_activity_code)
                         prompt = self._build_self_heal_prompt(raw_text)
                         continue
                     else:
-                        raise ValueError(f"Failed to parse JSON after {max_attempts} attempts") from e
+                        await _record_parse_path(PARSE_PATH_FAILED, prof_activity_code)
+                        raise ValueError(
+                            f"Failed to parse JSON after {max_attempts} attempts"
+                        ) from e
 
                 # Truncate if needed
                 truncated_json = self._truncate_response(raw_json)
@@ -342,6 +486,9 @@ class RecommendationsGenerator:
                         "recommendations_count": len(recommendations.recommendations),
                     },
                 )
+                await _record_parse_path(
+                    PARSE_PATH_DIRECT if attempt == 1 else PARSE_PATH_HEALED, prof_activity_code
+                )
 
                 return recommendations
 
@@ -356,8 +503,15 @@ class RecommendationsGenerator:
 
                 last_error = e
 
+                # Field types or limits off: coerce locally before asking again
+                repaired = self._repair_locally(raw_text)
+                if repaired is not None:
+                    await _record_parse_path(PARSE_PATH_REPAIRED, prof_activity_code)
+                    return repaired
+
                 if attempt < max_attempts:
                     # Retry with more explicit instructions
+                    await _record_parse_path(PARSE_PATH_LLM_SELF_HEAL, prof_activity_code)
                     prompt = self._build_self_heal_prompt(raw_text)
                     continue
 
@@ -374,6 +528,7 @@ class RecommendationsGenerator:
                 raise
 
         # All attempts failed
+        await _record_parse_path(PARSE_PATH_FAILED, prof_activity_code)
         logger.error(
             "recommendations_generation_failed",
             extra={
@@ -387,6 +542,209 @@ class RecommendationsGenerator:
             f"Last error: {last_error}"
         )
 
+    async def generate_batch(
+        self, items: list[RecommendationsBatchItem]
+    ) -> dict[str, RecommendationsResponse | Exception]:
+        """
+        Generate recommendations for several scoring results in one request.
+
+        The batch response is a JSON array keyed by scoring_result_id; every
+        element is validated on its own. Missing or invalid elements (and all
+        of them, if the array cannot be parsed) are retried one by one with
+        ``generate``, so one bad element never fails the others.
+
+        Args:
+            items: Batch items
+
+        Returns:
+            scoring_result_id -> validated response, or the exception raised by
+            its individual retry
+
+        Raises:
+            ValueError: If recommendations generation is disabled
+            GeminiClientError: If the batch request itself fails
+        """
+        if not settings.ai_recommendations_enabled:
+            raise ValueError(
+                "AI recommendations are disabled. "
+                "Set AI_RECOMMENDATIONS_ENABLED=1 in .env to enable."
+            )
+
+        results: dict[str, RecommendationsResponse | Exception] = {}
+        elements: dict[str, Any] = {}
+        if len(items) > 1:
+            response = await self.client.generate_text(
+                prompt=self._build_batch_prompt(items),
+                system_instructions=self.SYSTEM_INSTRUCTIONS,
+                response_mime_type="application/json",
+                response_schema=list[RecommendationsBatchElement],
+            )
+            try:
+                elements = self._parse_batch(self._extract_text_from_response(response))
+            except ValueError as e:
+                logger.warning(
+                    "recommendations_batch_parse_error",
+                    extra={"batch_size": len(items), "error": str(e)},
+                )
+
+        for item in items:
+            element = elements.get(item.scoring_result_id)
+            if element is None:
+                continue
+            data = self._coerce_response(element)
+            if not data["recommendations"]:
+                logger.warning(
+                    "recommendations_batch_item_invalid",
+                    extra={"scoring_result_id": item.scoring_result_id, "error": "empty"},
+                )
+                continue
+            try:
+                results[item.scoring_result_id] = RecommendationsResponse(
+                    **self._truncate_response(data)
+                )
+            except ValidationError as e:
+                logger.warning(
+                    "recommendations_batch_item_invalid",
+                    extra={"scoring_result_id": item.scoring_result_id, "error": str(e)},
+                )
+
+        retried = [item for item in items if item.scoring_result_id not in results]
+        for item in retried:
+            try:
+                results[item.scoring_result_id] = await self.generate(
+                    metrics=item.metrics,
+                    score_pct=item.score_pct,
+                    prof_activity_code=item.prof_activity_code,
+                    prof_activity_name=item.prof_activity_name,
+                )
+            except (GeminiClientError, ValueError) as e:
+                results[item.scoring_result_id] = e
+
+        logger.info(
+            "recommendations_batch_done",
+            extra={
+                "batch_size": len(items),
+                "from_batch": len(items) - len(retried),
+                "retried_individually": len(retried),
+                "failed": sum(1 for value in results.values() if isinstance(value, Exception)),
+            },
+        )
+        return results
+
+    def _parse_batch(self, raw_text: str) -> dict[str, Any]:
+        """
+        Parse a batch response into elements by scoring_result_id.
+
+        Raises:
+            ValueError: If the text is not a JSON array of objects
+        """
+        try:
+            data, _ = repair_json(raw_text)
+        except ValueError as e:
+            raise ValueError(f"Failed to parse batch JSON: {e}") from e
+        if isinstance(data, dict):
+            data = data.get("items", data.get("results"))
+        if not isinstance(data, list):
+            raise ValueError("Batch response is not a JSON array")
+
+        return {
+            str(element["scoring_result_id"]): element
+            for element in data
+            if isinstance(element, dict) and element.get("scoring_result_id")
+        }
+
+    def _build_input(self, item: RecommendationsBatchItem) -> RecommendationsInput:
+        """Build prompt input data for one scoring result."""
+        return RecommendationsInput(
+            context={
+                "language": "ru",
+                "prof_activity": {
+                    "code": item.prof_activity_code,
+                    "name": item.prof_activity_name,
+                },
+            },
+            metrics=item.metrics,
+            score_pct=item.score_pct,
+        )
+
+    def _repair_locally(self, raw_text: str) -> RecommendationsResponse | None:
+        """
+        Repair model output without another request.
+
+        Fixes JSON syntax (fences, trailing commas, truncation), coerces field
+        types, drops incomplete items and applies ``_truncate_response`` limits.
+
+        Returns:
+            Validated response, or None if the output is beyond local repair
+            (including a repaired response without any recommendations)
+        """
+        try:
+            data, repairs = repair_json(raw_text)
+        except ValueError:
+            return None
+
+        data = self._coerce_response(data)
+        if not data["recommendations"]:
+            return None
+        try:
+            recommendations = RecommendationsResponse(**self._truncate_response(data))
+        except ValidationError:
+            return None
+
+        logger.info(
+            "recommendations_json_repaired",
+            extra={
+                "repairs": repairs,
+                "recommendations_count": len(recommendations.recommendations),
+            },
+        )
+        return recommendations
+
+    def _coerce_response(self, data: Any) -> dict[str, list[dict[str, Any]]]:
+        """
+        Coerce a parsed response to the expected shape.
+
+        - a single-element array or a bare item becomes the section list
+        - strings become one-element lists (formats are split on commas)
+        - non-string scalars become strings
+        - items missing required fields (e.g. cut off) are dropped
+        """
+        if isinstance(data, list) and len(data) == 1:
+            data = data[0]
+        if not isinstance(data, dict):
+            data = {}
+
+        coerced: dict[str, list[dict[str, Any]]] = {}
+        for section, required in self._REQUIRED_FIELDS.items():
+            items = data.get(section) or []
+            if isinstance(items, dict):
+                items = [items]
+            if not isinstance(items, list):
+                items = []
+
+            coerced[section] = []
+            for item in items:
+                if not isinstance(item, dict) or any(item.get(key) is None for key in required):
+                    continue
+                fixed = {}
+                for key, value in item.items():
+                    if key in self._LIST_FIELDS:
+                        if isinstance(value, str):
+                            value = (
+                                [part.strip() for part in value.split(",")]
+                                if key == "recommended_formats"
+                                else [value]
+                            )
+                        elif not isinstance(value, list):
+                            value = []
+                        value = [str(element) for element in value if element is not None]
+                    elif value is not None and not isinstance(value, str):
+                        value = str(value)
+                    fixed[key] = value
+                if fixed.get("metric_codes", [None]):
+                    coerced[section].append(fixed)
+        return coerced
+
     def _extract_text_from_response(self, response: dict[str, Any]) -> str:
         """
         Extract text content from Gemini API response.
@@ -463,6 +821,41 @@ class RecommendationsGenerator:
 """
 
 
+def build_recommendation_metrics(
+    weights: list[dict[str, Any]],
+    metric_values: dict[str, Any],
+    metric_def_by_code: dict[str, Any],
+) -> list[dict]:
+    """
+    Build the prompt metrics list for a weight table.
+
+    Args:
+        weights: Weight table entries (metric_code, weight)
+        metric_values: Participant metric values by code
+        metric_def_by_code: Active MetricDef by code (for names and units)
+
+    Returns:
+        Metrics with code, name, unit, value, weight; metrics without a value
+        or an active definition are skipped
+    """
+    metrics = []
+    for weight_entry in weights:
+        metric_code = weight_entry["metric_code"]
+        metric_def = metric_def_by_code.get(metric_code)
+        if metric_code not in metric_values or not metric_def:
+            continue
+        metrics.append(
+            {
+                "code": metric_code,
+                "name": metric_def.name_ru or metric_def.name,
+                "unit": metric_def.unit or "балл",
+                "value": float(metric_values[metric_code]),
+                "weight": float(weight_entry["weight"]),
+            }
+        )
+    return metrics
+
+
 async def generate_recommendations(
     gemini_client: Union[GeminiClient, GeminiPoolClient],
     metrics: list[dict],
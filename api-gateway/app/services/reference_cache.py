@@ -0,0 +1,267 @@
+"""
+Cache of reference data: metric definitions, professional activities and the
+metric label mappings.
+
+These change a few times a month but were re-queried on every extraction,
+recommendations task, metric template and participant metrics request.
+
+Two tiers, like the recommendations cache: an in-process TTL/LRU map in front
+of Redis. Redis keys carry the version of their scope
+(``cache:reference:metric_defs:active:v7``), so a write only has to bump the
+version to make every stale copy unreachable; the old keys expire after
+REFERENCE_CACHE_TTL_SEC.
+
+Invalidation: metric definition and activity writes call ``invalidate``,
+which bumps the scope version in Redis and publishes the scope on a pub/sub
+channel. Every process runs a listener thread that marks its local entries
+stale on a message (and on reconnect, since messages may have been missed)
+and runs the callbacks registered with ``on_invalidate`` (the label mappings
+reload from YAML this way). The local tier itself is only touched from the
+event loop: the next ``get`` clears it. The local TTL bounds staleness while
+Redis is unavailable.
+
+Cached values are Pydantic response models, not ORM rows: they are shared
+across sessions and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+import redis
+from pydantic import BaseModel
+
+from app.core.cache import REDIS_FAILURE_BACKOFF_S, SharedRedis, TTLCache
+from app.core.config import settings
+from app.schemas.metric import MetricDefResponse
+from app.schemas.prof_activity import ProfActivityResponse
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cache:reference:"
+VERSIONS_KEY = f"{KEY_PREFIX}versions"
+STATS_KEY = f"{KEY_PREFIX}stats"
+CHANNEL = f"{KEY_PREFIX}invalidate"
+
+METRIC_DEFS = "metric_defs"
+PROF_ACTIVITIES = "prof_activities"
+METRIC_MAPPINGS = "metric_mappings"
+SCOPES = (METRIC_DEFS, PROF_ACTIVITIES, METRIC_MAPPINGS)
+
+M = TypeVar("M", bound=BaseModel)
+
+
+class ReferenceCache:
+    """
+    Two-tier (process + Redis) cache of reference lists with pub/sub invalidation.
+
+    Args:
+        redis_url: Redis for the shared tier, scope versions and the channel
+        subscribe: Start the pub/sub listener thread (off in unit tests)
+        clock: Monotonic time source of the local tier (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        subscribe: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._redis = SharedRedis("reference_cache", redis_url)
+        self._subscribe = subscribe
+        self._listener_pid: int | None = None
+        # Bumped on every invalidation seen here (also from the listener
+        # thread); a load that started before one must not repopulate the
+        # local tier
+        self._generation = 0
+        # Generation the local tier was last cleared for, on the event loop
+        self._cleared_generation = 0
+        self._callbacks: dict[str, list[Callable[[], None]]] = {}
+        self.local: TTLCache[list[BaseModel]] = TTLCache(
+            maxsize=32, ttl_s=settings.reference_cache_ttl_sec, clock=clock
+        )
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.reference_cache_enabled
+
+    async def _get_shared(self, scope: str, variant: str) -> tuple[str | None, Any]:
+        """Versioned Redis key of the entry and its decoded value (None on a miss)."""
+
+        def lookup(client: redis.Redis) -> tuple[str, bytes | None]:
+            version = int(client.hget(VERSIONS_KEY, scope) or 0)
+            key = f"{KEY_PREFIX}{scope}:{variant}:v{version}"
+            raw = client.get(key)
+            client.hincrby(STATS_KEY, "hits" if raw is not None else "misses", 1)
+            return key, raw
+
+        key, raw = await self._redis.arun("get", lookup, default=(None, None))
+        return key, json.loads(raw) if raw is not None else None
+
+    async def _set_shared(self, key: str, items: list[BaseModel]) -> None:
+        payload = json.dumps([item.model_dump(mode="json") for item in items], ensure_ascii=False)
+        await self._redis.arun(
+            "set", lambda client: client.set(key, payload, ex=settings.reference_cache_ttl_sec)
+        )
+
+    async def get(
+        self,
+        scope: str,
+        variant: str,
+        model: type[M],
+        loader: Callable[[], Awaitable[list[Any]]],
+    ) -> list[M]:
+        """
+        Return a cached list, loading it from the database on a miss in both tiers.
+
+        Args:
+            scope: Invalidation scope (METRIC_DEFS, PROF_ACTIVITIES)
+            variant: Query variant within the scope (e.g. "active", "all")
+            model: Response model the rows are converted to
+            loader: Fetches the rows (ORM objects) from the database
+        """
+        if not self.enabled:
+            return [model.model_validate(row) for row in await loader()]
+
+        self._ensure_listener()
+        generation = self._generation
+        if generation != self._cleared_generation:
+            # TTLCache is not thread-safe: invalidations only mark it stale
+            self.local.clear()
+            self._cleared_generation = generation
+        cached = self.local.get((scope, variant))
+        if cached is not None:
+            return cached
+
+        key, shared = await self._get_shared(scope, variant)
+        if shared is not None:
+            items = [model.model_validate(item) for item in shared]
+        else:
+            items = [model.model_validate(row) for row in await loader()]
+            if key is not None:
+                await self._set_shared(key, items)
+            logger.info("reference_cache_loaded", extra={"scope": scope, "variant": variant})
+        if generation == self._generation:
+            self.local.set((scope, variant), items)
+        return items
+
+    def on_invalidate(self, scope: str, callback: Callable[[], None]) -> None:
+        """
+        Run ``callback`` whenever ``scope`` is invalidated in any process.
+
+        Callbacks run on the listener thread: they must only mark state stale.
+        """
+        self._callbacks.setdefault(scope, []).append(callback)
+
+    def _drop(self, scopes: tuple[str, ...]) -> None:
+        self._generation += 1
+        for scope in scopes:
+            for callback in self._callbacks.get(scope, ()):
+                callback()
+
+    async def invalidate(self, scope: str, reason: str = "") -> None:
+        """Drop ``scope`` here and, through Redis pub/sub, in every other process."""
+        self.invalidations += 1
+        self._drop((scope,))
+        if not self.enabled:
+            return
+
+        def bump(client: redis.Redis) -> int:
+            version = client.hincrby(VERSIONS_KEY, scope, 1)
+            client.publish(CHANNEL, scope)
+            return version
+
+        if (version := await self._redis.arun("invalidate", bump)) is None:
+            return
+        logger.info(
+            "reference_cache_invalidated",
+            extra={"scope": scope, "version": version, "reason": reason},
+        )
+
+    def _ensure_listener(self) -> None:
+        # Threads do not survive fork: start one per (worker) process
+        if not self._subscribe or self._listener_pid == os.getpid():
+            return
+        self._listener_pid = os.getpid()
+        threading.Thread(
+            target=self._listen, name="reference-cache-invalidation", daemon=True
+        ).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                client = redis.Redis.from_url(
+                    self._redis.url, socket_connect_timeout=1, health_check_interval=30
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Messages may have been missed while disconnected
+                self._drop(SCOPES)
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._drop((message["data"].decode(),))
+            except redis.RedisError as exc:
+                logger.warning("reference_cache_listener_disconnected", extra={"error": str(exc)})
+                time.sleep(REDIS_FAILURE_BACKOFF_S)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit-rate counters of this process and of all processes, and scope versions."""
+        shared: dict[str, Any] | None = None
+        counters = self._redis.run(
+            "stats", lambda client: (client.hgetall(STATS_KEY), client.hgetall(VERSIONS_KEY))
+        )
+        if counters is not None:
+            raw, versions = counters
+            hits, misses = int(raw.get(b"hits", 0)), int(raw.get(b"misses", 0))
+            lookups = hits + misses
+            shared = {
+                "hits": hits,
+                "misses": misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "versions": {scope: int(versions.get(scope.encode(), 0)) for scope in SCOPES},
+            }
+        return {
+            "enabled": self.enabled,
+            "local": {
+                **self.local.stats.as_dict(),
+                "entries": len(self.local),
+                "invalidations": self.invalidations,
+            },
+            "shared": shared,
+        }
+
+
+_cache: ReferenceCache | None = None
+
+
+def get_reference_cache() -> ReferenceCache:
+    global _cache
+    if _cache is None:
+        _cache = ReferenceCache()
+    return _cache
+
+
+async def get_metric_defs(
+    metric_def_repo: Any, active_only: bool = True
+) -> list[MetricDefResponse]:
+    """Cached ``MetricDefRepository.list_all``."""
+    return await get_reference_cache().get(
+        METRIC_DEFS,
+        "active" if active_only else "all",
+        MetricDefResponse,
+        lambda: metric_def_repo.list_all(active_only=active_only),
+    )
+
+
+async def get_prof_activities(prof_activity_repo: Any) -> list[ProfActivityResponse]:
+    """Cached ``ProfActivityRepository.list_all``."""
+    return await get_reference_cache().get(
+        PROF_ACTIVITIES, "all", ProfActivityResponse, prof_activity_repo.list_all
+    )
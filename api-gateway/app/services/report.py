@@ -5,6 +5,7 @@ Service layer for report uploads and downloads.
 from __future__ import annotations
 
 import uuid
+from collections import Counter
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -14,11 +15,19 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.models import FileRef, Report
+from app.repositories.extraction_checkpoint import ExtractionCheckpointRepository
 from app.repositories.report import ReportRepository
 from app.repositories.report_image import ReportImageRepository
 from app.repositories.metric import ExtractedMetricRepository
 from app.schemas.report import ReportResponse, ReportUploadResponse
-from app.services.storage import FileTooLargeError, LocalReportStorage, StorageError
+from app.services.report_dedup import ReportDedupService
+from app.services.storage import (
+    FileTooLargeError,
+    LocalReportStorage,
+    ReportStorage,
+    StorageError,
+    get_report_storage,
+)
 
 
 @dataclass(slots=True)
@@ -26,10 +35,14 @@ class ReportDownloadContext:
     """Resolved context for serving a report file."""
 
     report: Report
-    path: Path
+    storage: ReportStorage
+    key: str
+    path: Path | None  # Local file path; None for object storage
     mime: str
     etag: str
     filename: str
+    size_bytes: int = 0
+    not_modified: bool = False
 
 
 class ReportService:
@@ -44,13 +57,14 @@ class ReportService:
     def __init__(self, db: AsyncSession):
         self.db = db
         self.repo = ReportRepository(db)
-        self.storage = LocalReportStorage(settings.file_storage_base)
-
-        if settings.file_storage != "LOCAL":
+        try:
+            # Backend for new uploads; existing files use their FileRef.storage
+            self.storage = get_report_storage()
+        except StorageError as exc:
             raise HTTPException(
-                status_code=status.HTTP_501_NOT_IMPLEMENTED,
-                detail="Only LOCAL storage is supported in this version.",
-            )
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Storage backend unavailable: {exc}",
+            ) from exc
 
     async def upload_report(
         self,
@@ -89,36 +103,56 @@ class ReportService:
                 detail=f"Failed to store report file: {exc}",
             ) from exc
 
-        file_ref = FileRef(
-            id=file_ref_id,
-            storage="LOCAL",
-            bucket="local",
-            key=stored.key,
-            filename=upload.filename,
-            mime=mime,
-            size_bytes=stored.size_bytes,
+        # Content-addressed dedup: identical bytes share one FileRef and blob
+        file_ref = await self.repo.get_file_ref_by_sha256(
+            stored.sha256, storage=self.storage.storage_type
         )
+        if file_ref is not None and await self._storage_for(file_ref).exists(file_ref.key):
+            await self.repo.acquire_file_ref(file_ref.id)
+            await self.storage.delete(stored.key)
+            stored_key = None
+        else:
+            file_ref = FileRef(
+                id=file_ref_id,
+                storage=self.storage.storage_type,
+                bucket=self.storage.bucket,
+                key=stored.key,
+                filename=upload.filename,
+                mime=mime,
+                size_bytes=stored.size_bytes,
+                sha256=stored.sha256,
+                etag=stored.etag,
+                ref_count=1,
+            )
+            stored_key = stored.key
         report = Report(
             id=report_id,
             participant_id=participant_id,
             status="UPLOADED",
-            file_ref_id=file_ref_id,
+            file_ref_id=file_ref.id,
         )
 
         try:
             saved_report = await self.repo.create(report, file_ref)
         except IntegrityError as exc:
             await self.db.rollback()
-            self.storage.delete_file(stored.path)
+            if stored_key is not None:
+                await self.storage.delete(stored_key)
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Failed to create report due to constraint violation",
             ) from exc
         except Exception:
             await self.db.rollback()
-            self.storage.delete_file(stored.path)
+            if stored_key is not None:
+                await self.storage.delete(stored_key)
             raise
 
+        if stored_key is None:
+            # Same file was uploaded before: reuse its extraction results if any
+            if await ReportDedupService(self.db).reuse_extraction(saved_report):
+                saved_report = await self.repo.get_with_file_ref(report_id)
+
         response = ReportResponse.model_validate(saved_report)
         return ReportUploadResponse(**response.model_dump(), etag=stored.etag)
 
@@ -129,6 +163,47 @@ class ReportService:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
         return report
 
+    async def start_extraction(self, report_id: uuid.UUID, restart: bool = False) -> Report:
+        """
+        Mark report as PROCESSING before queueing extraction.
+
+        Extraction resumes from stored checkpoints by default; ``restart`` drops
+        them so every stage (including Vision requests) runs again.
+        """
+        report = await self.get_report_by_id(report_id)
+        if restart:
+            await ExtractionCheckpointRepository(self.db).clear(report_id)
+        report.status = "PROCESSING"
+        await self.db.commit()
+        return report
+
+    async def mark_reports_processing(
+        self, report_ids: list[uuid.UUID]
+    ) -> tuple[list[Report], list[Report]]:
+        """
+        Set PROCESSING on reports before a batch extraction, 404 if any is missing.
+
+        Already extracted reports are left as they are (use the single-report
+        endpoint to re-extract one).
+
+        Returns:
+            (reports to extract, skipped EXTRACTED reports)
+        """
+        unique_ids = list(dict.fromkeys(report_ids))
+        reports = await self.repo.get_many(unique_ids)
+        missing = set(unique_ids) - {report.id for report in reports}
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Reports not found: {', '.join(sorted(str(r) for r in missing))}",
+            )
+        to_extract = [report for report in reports if report.status != "EXTRACTED"]
+        skipped = [report for report in reports if report.status == "EXTRACTED"]
+        for report in to_extract:
+            report.status = "PROCESSING"
+        await self.db.commit()
+        return to_extract, skipped
+
     async def get_participant_reports(self, participant_id: uuid.UUID) -> list[Report]:
         """Get all reports for a participant."""
         if not await self.repo.participant_exists(participant_id):
@@ -137,40 +212,127 @@ class ReportService:
             )
         return await self.repo.get_all_by_participant(participant_id)
 
-    async def get_download_context(self, report_id: uuid.UUID) -> ReportDownloadContext:
-        """Resolve report and file path for download."""
+    async def get_download_context(
+        self, report_id: uuid.UUID, if_none_match: str | None = None
+    ) -> ReportDownloadContext:
+        """
+        Resolve report and storage location for download.
+
+        The ETag stored at upload is used as is, so a matching If-None-Match
+        returns ``not_modified=True`` without touching storage. Legacy rows
+        without a stored ETag are hashed once and the value is persisted.
+        """
         report = await self.repo.get_with_file_ref(report_id)
         if not report:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Report not found")
 
-        if report.file_ref.storage != "LOCAL":
-            raise HTTPException(
-                status_code=status.HTTP_501_NOT_IMPLEMENTED,
-                detail="Only LOCAL storage is supported in this version.",
-            )
+        file_ref = report.file_ref
+        storage = self._storage_for(file_ref)
+        path = None
+        if isinstance(storage, LocalReportStorage):
+            path = storage.resolve_path(file_ref.key)
+        context = ReportDownloadContext(
+            report=report,
+            storage=storage,
+            key=file_ref.key,
+            path=path,
+            mime=file_ref.mime,
+            etag=file_ref.etag or "",
+            filename=self.DEFAULT_FILENAME,
+            size_bytes=file_ref.size_bytes,
+        )
+        if context.etag and self.matches_etag(if_none_match, context.etag):
+            context.not_modified = True
+            return context
 
-        path = self.storage.resolve_path(report.file_ref.key)
-        if not path.exists():
+        if not await storage.exists(file_ref.key):
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Report file not found",
             )
 
+        if not context.etag:
+            try:
+                context.etag = await storage.hash_object(file_ref.key)
+            except (OSError, StorageError) as exc:
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail=f"Failed to read report file: {exc}",
+                ) from exc
+            file_ref.etag = context.etag
+            await self.db.commit()
+            context.not_modified = self.matches_etag(if_none_match, context.etag)
+
+        return context
+
+    @staticmethod
+    def offload_headers(context: ReportDownloadContext) -> dict[str, str] | None:
+        """
+        Build reverse-proxy offload headers for the configured download mode.
+
+        Returns None when downloads are streamed by the application itself
+        (always the case for object storage, which uses presigned URLs).
+        """
+        if context.path is None:
+            return None
+        mode = settings.report_download_offload
+        if mode == "x-accel-redirect":
+            prefix = settings.report_download_accel_prefix.rstrip("/")
+            return {"X-Accel-Redirect": f"{prefix}/{context.report.file_ref.key}"}
+        if mode == "x-sendfile":
+            return {"X-Sendfile": str(context.path.resolve())}
+        return None
+
+    async def presigned_download_url(self, context: ReportDownloadContext) -> str | None:
+        """Presigned URL for object storage downloads (None if disabled or LOCAL)."""
+        if context.path is not None or not settings.s3_presign_downloads:
+            return None
+        return await context.storage.presigned_url(context.key, filename=context.filename)
+
+    @staticmethod
+    def parse_range(range_header: str | None, size: int) -> tuple[int, int] | None:
+        """
+        Parse a single-range ``Range: bytes=...`` header.
+
+        Returns:
+            (start, end) inclusive, or None to serve the whole file
+
+        Raises:
+            HTTPException 416: If the range cannot be satisfied
+        """
+        if not range_header or not range_header.startswith("bytes=") or "," in range_header:
+            return None
+        start_text, _, end_text = range_header[len("bytes="):].strip().partition("-")
         try:
-            etag = await self.storage.compute_etag(path)
-        except OSError as exc:
+            if start_text:
+                start = int(start_text)
+                end = int(end_text) if end_text else size - 1
+            else:
+                # Suffix range: last N bytes
+                start = max(size - int(end_text), 0)
+                end = size - 1
+        except ValueError:
+            return None
+        end = min(end, size - 1)
+        if start > end or start >= size:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to read report file: {exc}",
-            ) from exc
+                status_code=status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable",
+                headers={"Content-Range": f"bytes */{size}"},
+            )
+        return start, end
 
-        return ReportDownloadContext(
-            report=report,
-            path=path,
-            mime=report.file_ref.mime,
-            etag=etag,
-            filename=self.DEFAULT_FILENAME,
-        )
+    def _storage_for(self, file_ref: FileRef) -> ReportStorage:
+        """Backend that holds a given file (may differ from the one for new uploads)."""
+        if file_ref.storage == self.storage.storage_type:
+            return self.storage
+        try:
+            return get_report_storage(file_ref.storage)
+        except StorageError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Storage backend unavailable: {exc}",
+            ) from exc
 
     async def _validate_file(self, upload: UploadFile) -> None:
         """Validate incoming upload for MIME type and filename."""
@@ -213,9 +375,9 @@ class ReportService:
         """
         Delete report and all related entities and files.
         - Removes extracted metrics for the report
-        - Removes report images and their files
-        - Removes original report file
-        - Deletes report and its file_ref
+        - Removes report images; image files are deleted once no report uses them
+        - Deletes report; the original file and its file_ref are deleted only
+          when no other report references the same content
         """
         # Load report with file_ref or 404
         report = await self.get_report_by_id(report_id)
@@ -224,24 +386,27 @@ class ReportService:
         metrics_repo = ExtractedMetricRepository(self.db)
         await metrics_repo.delete_by_report(report.id)
 
-        # Delete report images' files, then DB records
+        # Delete report image records, then release shared image blobs
         image_repo = ReportImageRepository(self.db)
         images_with_files = await image_repo.get_by_report(report.id)
-        for image in images_with_files:
-            if image.file_ref and image.file_ref.storage == "LOCAL":
-                image_path = self.storage.resolve_path(image.file_ref.key)
-                self.storage.delete_file(image_path)
+        image_file_refs = {image.file_ref_id: image.file_ref for image in images_with_files}
+        image_ref_counts = Counter(image.file_ref_id for image in images_with_files)
         await image_repo.delete_by_report_id(report.id)
+        for file_ref_id, image_file_ref in image_file_refs.items():
+            await self._release_file_ref(image_file_ref, image_ref_counts[file_ref_id])
 
-        # Delete original report file
-        if report.file_ref and report.file_ref.storage == "LOCAL":
-            report_path = self.storage.resolve_path(report.file_ref.key)
-            self.storage.delete_file(report_path)
-
-        # Delete report and associated file_ref in a single commit
+        # Delete report, then release the original file (shared by duplicate uploads)
         file_ref = report.file_ref
         await self.db.delete(report)
         await self.db.flush()
         if file_ref is not None:
-            await self.db.delete(file_ref)
+            await self._release_file_ref(file_ref)
         await self.db.commit()
+
+    async def _release_file_ref(self, file_ref: FileRef, count: int = 1) -> None:
+        """Drop references; delete blob and FileRef when none are left."""
+        if await self.repo.release_file_ref(file_ref.id, count) > 0:
+            return
+        await self._storage_for(file_ref).delete(file_ref.key)
+        await self.db.delete(file_ref)
+        await self.db.flush()
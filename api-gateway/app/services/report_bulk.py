@@ -0,0 +1,405 @@
+"""
+Bulk report ingestion from a ZIP archive.
+
+The archive holds DOCX files plus a manifest (``manifest.csv`` or
+``manifest.json``) that maps every file to a participant by external_id:
+
+    filename,external_id,full_name,birth_date
+    ivanov.docx,EMP-001,Иванов Иван Иванович,1990-05-01
+
+Participants missing for an external_id are created (full_name required).
+Members are streamed one at a time from the disk-spooled upload straight into
+storage, so the archive is never held in memory; participants, file refs and
+reports are then inserted with a single commit.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import csv
+import io
+import json
+import logging
+import uuid
+import zipfile
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+from pathlib import PurePosixPath
+
+from fastapi import HTTPException, UploadFile, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.datastructures import Headers
+
+from app.core.config import settings
+from app.db.models import FileRef, Participant, Report
+from app.repositories.participant import ParticipantRepository
+from app.repositories.report import ReportRepository
+from app.schemas.report import BulkUploadError, BulkUploadItem, ReportBulkUploadResponse
+from app.services.storage import FileTooLargeError, StorageError, StoredFile, get_report_storage
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAMES = ("manifest.csv", "manifest.json")
+MANIFEST_MAX_BYTES = 5 * 1024 * 1024
+DOCX_MIME = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+ZIP_MIME_TYPES = {"application/zip", "application/x-zip-compressed", "multipart/x-zip"}
+
+
+@dataclass(slots=True)
+class ManifestRow:
+    """One manifest entry: archive member and its participant."""
+
+    filename: str
+    external_id: str
+    full_name: str | None = None
+    birth_date: date | None = None
+
+
+def parse_manifest(name: str, data: bytes) -> list[ManifestRow]:
+    """
+    Parse manifest.csv / manifest.json.
+
+    Raises:
+        ValueError: If the manifest is malformed or misses required fields
+    """
+    text = data.decode("utf-8-sig")
+    if name.endswith(".json"):
+        raw_rows = json.loads(text)
+        if not isinstance(raw_rows, list):
+            raise ValueError("manifest.json must contain a list of objects")
+    else:
+        raw_rows = list(csv.DictReader(io.StringIO(text)))
+
+    rows = []
+    for index, raw in enumerate(raw_rows, start=1):
+        if not isinstance(raw, dict):
+            raise ValueError(f"Manifest row {index} is not an object")
+        filename = str(raw.get("filename") or "").strip()
+        external_id = str(raw.get("external_id") or "").strip()
+        if not filename or not external_id:
+            raise ValueError(f"Manifest row {index}: filename and external_id are required")
+        birth_date_text = str(raw.get("birth_date") or "").strip()
+        try:
+            birth_date = date.fromisoformat(birth_date_text) if birth_date_text else None
+        except ValueError as exc:
+            raise ValueError(
+                f"Manifest row {index}: invalid birth_date {birth_date_text!r}"
+            ) from exc
+        rows.append(
+            ManifestRow(
+                filename=filename,
+                external_id=external_id,
+                full_name=str(raw.get("full_name") or "").strip() or None,
+                birth_date=birth_date,
+            )
+        )
+    return rows
+
+
+class ReportBulkUploadService:
+    """Create participants and reports from a ZIP archive with a manifest."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.report_repo = ReportRepository(db)
+        self.participant_repo = ParticipantRepository(db)
+        try:
+            self.storage = get_report_storage()
+        except StorageError as exc:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Storage backend unavailable: {exc}",
+            ) from exc
+
+    async def ingest(
+        self, upload: UploadFile, mark_processing: bool = True
+    ) -> ReportBulkUploadResponse:
+        """
+        Ingest a ZIP archive of reports.
+
+        Rows with problems (missing member, unknown participant without
+        full_name, oversized or non-DOCX file) are reported in ``errors`` and
+        skipped; the rest of the archive is still ingested.
+
+        Args:
+            upload: ZIP archive upload
+            mark_processing: Create reports as PROCESSING (extraction will be queued)
+        """
+        self._validate_archive(upload)
+        try:
+            archive = await asyncio.to_thread(zipfile.ZipFile, upload.file)
+        except (zipfile.BadZipFile, OSError) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid ZIP archive: {exc}"
+            ) from exc
+
+        stored: list[tuple[ManifestRow, uuid.UUID, StoredFile]] = []
+        try:
+            members = {info.filename: info for info in archive.infolist() if not info.is_dir()}
+            rows = await self._read_manifest(archive, members)
+            errors: list[BulkUploadError] = []
+            participants, created_ids = await self._resolve_participants(rows, errors)
+
+            for row in rows:
+                participant = participants.get(row.external_id)
+                if participant is None:
+                    continue
+                error = await self._store_member(archive, members, row, participant, stored)
+                if error:
+                    errors.append(BulkUploadError(filename=row.filename, error=error))
+
+            items = await self._persist(stored, participants, created_ids, mark_processing)
+        except BaseException:
+            await self.db.rollback()
+            for _, _, stored_file in stored:
+                await self.storage.delete(stored_file.key)
+            raise
+        finally:
+            archive.close()
+            await upload.close()
+
+        logger.info(
+            "bulk_upload_completed",
+            extra={
+                "reports": len(items),
+                "participants_created": len(created_ids),
+                "errors": len(errors),
+            },
+        )
+        return ReportBulkUploadResponse(
+            items=items, errors=errors, participants_created=len(created_ids)
+        )
+
+    @staticmethod
+    def extraction_chunks(items: list[BulkUploadItem], chunk_size: int) -> list[list[str]]:
+        """
+        Split report IDs into batch-extraction chunks.
+
+        A participant's reports stay in one chunk so the batch task can pack
+        them into shared Vision canvases.
+        """
+        by_participant: dict[uuid.UUID, list[str]] = {}
+        for item in items:
+            by_participant.setdefault(item.participant_id, []).append(str(item.report_id))
+
+        chunks: list[list[str]] = []
+        current: list[str] = []
+        for report_ids in by_participant.values():
+            if current and len(current) + len(report_ids) > chunk_size:
+                chunks.append(current)
+                current = []
+            current.extend(report_ids)
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def _validate_archive(self, upload: UploadFile) -> None:
+        filename = (upload.filename or "").lower()
+        content_type = (upload.content_type or "").lower()
+        if not filename.endswith(".zip") and content_type not in ZIP_MIME_TYPES:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Bulk upload expects a .zip archive",
+            )
+        max_bytes = settings.bulk_upload_max_mb * 1024 * 1024
+        if upload.size is not None and upload.size > max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="Archive exceeds maximum allowed size",
+            )
+
+    async def _read_manifest(
+        self, archive: zipfile.ZipFile, members: dict[str, zipfile.ZipInfo]
+    ) -> list[ManifestRow]:
+        manifest = next(
+            (
+                info
+                for name, info in members.items()
+                if PurePosixPath(name).name.lower() in MANIFEST_NAMES
+            ),
+            None,
+        )
+        if manifest is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Archive must contain manifest.csv or manifest.json",
+            )
+        if manifest.file_size > MANIFEST_MAX_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Manifest is too large"
+            )
+
+        try:
+            data = await asyncio.to_thread(archive.read, manifest)
+            rows = parse_manifest(manifest.filename.lower(), data)
+        except (ValueError, UnicodeDecodeError, zipfile.BadZipFile) as exc:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid manifest: {exc}"
+            ) from exc
+
+        if not rows:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Manifest is empty")
+        if len(rows) > settings.bulk_upload_max_files:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Archive exceeds {settings.bulk_upload_max_files} reports",
+            )
+        duplicates = [
+            name for name, count in Counter(r.filename for r in rows).items() if count > 1
+        ]
+        if duplicates:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Duplicate filenames in manifest: {', '.join(sorted(duplicates))}",
+            )
+        return rows
+
+    async def _resolve_participants(
+        self, rows: list[ManifestRow], errors: list[BulkUploadError]
+    ) -> tuple[dict[str, Participant], set[uuid.UUID]]:
+        """Load participants by external_id and stage the missing ones (no flush)."""
+        participants = await self.participant_repo.get_by_external_ids(
+            sorted({row.external_id for row in rows})
+        )
+        created_ids: set[uuid.UUID] = set()
+        for row in rows:
+            if row.external_id in participants:
+                continue
+            if not row.full_name:
+                errors.append(
+                    BulkUploadError(
+                        filename=row.filename,
+                        error=f"Participant {row.external_id!r} not found and full_name is empty",
+                    )
+                )
+                continue
+            participant = Participant(
+                id=uuid.uuid4(),
+                full_name=row.full_name,
+                birth_date=row.birth_date,
+                external_id=row.external_id,
+            )
+            participants[row.external_id] = participant
+            created_ids.add(participant.id)
+        return participants, created_ids
+
+    async def _store_member(
+        self,
+        archive: zipfile.ZipFile,
+        members: dict[str, zipfile.ZipInfo],
+        row: ManifestRow,
+        participant: Participant,
+        stored: list[tuple[ManifestRow, uuid.UUID, StoredFile]],
+    ) -> str | None:
+        """Stream one archive member into storage. Returns an error message or None."""
+        info = members.get(row.filename)
+        if info is None:
+            return "File listed in manifest is missing from archive"
+        if not row.filename.lower().endswith(".docx"):
+            return "Only .docx files are supported"
+        if info.file_size > settings.report_max_size_bytes:
+            return "Report file exceeds maximum allowed size"
+
+        report_id = uuid.uuid4()
+        key = self.storage.report_key(str(participant.id), str(report_id))
+        member = UploadFile(
+            file=await asyncio.to_thread(archive.open, info),
+            filename=PurePosixPath(row.filename).name,
+            headers=Headers({"content-type": DOCX_MIME}),
+        )
+        try:
+            stored_file = await self.storage.save_report(
+                member, key, settings.report_max_size_bytes
+            )
+        except FileTooLargeError:
+            return "Report file exceeds maximum allowed size"
+        except (StorageError, zipfile.BadZipFile, zlib.error) as exc:
+            return f"Failed to store report file: {exc}"
+
+        stored.append((row, report_id, stored_file))
+        return None
+
+    async def _persist(
+        self,
+        stored: list[tuple[ManifestRow, uuid.UUID, StoredFile]],
+        participants: dict[str, Participant],
+        created_ids: set[uuid.UUID],
+        mark_processing: bool,
+    ) -> list[BulkUploadItem]:
+        """Insert participants, file refs and reports with one commit (content dedup applied)."""
+        storage_type = self.storage.storage_type
+        existing_refs = await self.report_repo.get_file_refs_by_sha256(
+            sorted({stored_file.sha256 for _, _, stored_file in stored}), storage=storage_type
+        )
+        refs_by_hash: dict[str, FileRef] = {}
+        for sha256, file_ref in existing_refs.items():
+            if await self.storage.exists(file_ref.key):
+                refs_by_hash[sha256] = file_ref
+        acquired: Counter[uuid.UUID] = Counter()
+        new_refs: list[FileRef] = []
+        duplicate_keys: list[str] = []
+
+        self.db.add_all(
+            participant for participant in participants.values() if participant.id in created_ids
+        )
+
+        items = []
+        reports = []
+        for row, report_id, stored_file in stored:
+            participant = participants[row.external_id]
+            file_ref = refs_by_hash.get(stored_file.sha256)
+            deduplicated = file_ref is not None
+            if file_ref is None:
+                file_ref = FileRef(
+                    id=uuid.uuid4(),
+                    storage=storage_type,
+                    bucket=self.storage.bucket,
+                    key=stored_file.key,
+                    filename=PurePosixPath(row.filename).name,
+                    mime=DOCX_MIME,
+                    size_bytes=stored_file.size_bytes,
+                    sha256=stored_file.sha256,
+                    etag=stored_file.etag,
+                    ref_count=1,
+                )
+                refs_by_hash[stored_file.sha256] = file_ref
+                new_refs.append(file_ref)
+            else:
+                duplicate_keys.append(stored_file.key)
+                if file_ref in new_refs:
+                    file_ref.ref_count += 1
+                else:
+                    acquired[file_ref.id] += 1
+
+            reports.append(
+                Report(
+                    id=report_id,
+                    participant_id=participant.id,
+                    status="PROCESSING" if mark_processing else "UPLOADED",
+                    file_ref_id=file_ref.id,
+                )
+            )
+            items.append(
+                BulkUploadItem(
+                    filename=row.filename,
+                    report_id=report_id,
+                    participant_id=participant.id,
+                    external_id=row.external_id,
+                    participant_created=participant.id in created_ids,
+                    deduplicated=deduplicated,
+                )
+            )
+
+        self.db.add_all(new_refs)
+        await self.db.flush()
+        self.db.add_all(reports)
+        for file_ref_id, count in acquired.items():
+            await self.report_repo.acquire_file_ref(file_ref_id, count)
+        await self.db.commit()
+
+        # Duplicate copies are only removed once their FileRef is committed
+        for key in duplicate_keys:
+            await self.storage.delete(key)
+        return items
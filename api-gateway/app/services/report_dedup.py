@@ -0,0 +1,111 @@
+"""
+Reuse of extraction results between reports with identical content.
+
+Uploads are content-addressed (FileRef.sha256). When a new report has the same
+original file as a report that is already EXTRACTED, its images and metrics are
+cloned from that report instead of re-running DOCX extraction and Gemini Vision.
+Image blobs are shared (FileRef.ref_count is incremented), only rows are copied.
+"""
+
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from datetime import UTC, datetime
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db.models import Report, ReportImage
+from app.repositories.metric import ExtractedMetricRepository
+from app.repositories.participant_metric import ParticipantMetricRepository
+from app.repositories.report import ReportRepository
+from app.repositories.report_image import ReportImageRepository
+from app.services.ranking import RankingService
+
+logger = logging.getLogger(__name__)
+
+
+class ReportDedupService:
+    """Clone extraction results from an already extracted report with the same file."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.report_repo = ReportRepository(db)
+        self.image_repo = ReportImageRepository(db)
+        self.extracted_metric_repo = ExtractedMetricRepository(db)
+        self.participant_metric_repo = ParticipantMetricRepository(db)
+
+    async def find_source(self, report: Report) -> Report | None:
+        """Find an EXTRACTED report with the same original file content."""
+        sha256 = report.file_ref.sha256 if report.file_ref is not None else None
+        if not sha256:
+            return None
+        return await self.report_repo.find_extracted_by_sha256(sha256, exclude_report_id=report.id)
+
+    async def reuse_extraction(self, report: Report) -> bool:
+        """
+        Copy images and metrics from a matching extracted report and commit.
+
+        Does nothing (returns False) when there is no such report or the target
+        already has images of its own.
+
+        Args:
+            report: Target report with file_ref loaded
+
+        Returns:
+            True if results were reused and the report is now EXTRACTED
+        """
+        source = await self.find_source(report)
+        if source is None:
+            return False
+        if await self.image_repo.get_by_report_id(report.id):
+            return False
+
+        source_images = await self.image_repo.get_by_report_id(source.id)
+        for image in source_images:
+            await self.report_repo.acquire_file_ref(image.file_ref_id)
+            self.db.add(
+                ReportImage(
+                    report_id=report.id,
+                    file_ref_id=image.file_ref_id,
+                    kind=image.kind,
+                    page=image.page,
+                    order_index=image.order_index,
+                )
+            )
+
+        source_metrics = await self.extracted_metric_repo.list_by_report(source.id)
+        rows_by_source: dict[str, list] = defaultdict(list)
+        participant_rows = []
+        for metric in source_metrics:
+            rows_by_source[metric.source].append(
+                (report.id, metric.metric_def_id, metric.value, metric.confidence, metric.notes)
+            )
+            participant_rows.append(
+                (metric.metric_def.code, metric.value, metric.confidence, report.id)
+            )
+        for source_kind, rows in rows_by_source.items():
+            await self.extracted_metric_repo.bulk_create_or_update(rows, source=source_kind)
+
+        report.status = "EXTRACTED"
+        report.extracted_at = datetime.now(UTC)
+        report.extract_error = None
+        await self.db.flush()
+
+        if participant_rows:
+            # Commits the whole clone together with participant metrics
+            await self.participant_metric_repo.upsert_many(report.participant_id, participant_rows)
+            await RankingService(self.db).refresh_participant(report.participant_id)
+        else:
+            await self.db.commit()
+
+        logger.info(
+            "report_extraction_reused",
+            extra={
+                "report_id": str(report.id),
+                "source_report_id": str(source.id),
+                "images": len(source_images),
+                "metrics": len(source_metrics),
+            },
+        )
+        return True
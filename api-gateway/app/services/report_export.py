@@ -0,0 +1,192 @@
+"""
+Bulk export of final reports as a streamed ZIP archive.
+
+Reports are loaded one after another on a session of their own (the request
+session is closed before a streaming body is sent, and the final report cache
+is used as for single reports) and rendered to HTML, and optionally PDF, in
+worker threads: up to REPORT_EXPORT_CONCURRENCY reports are rendered while the
+next ones load. Finished reports are written to the archive in request order
+and each member is yielded as soon as it is written: the archive is produced
+with data descriptors into a non-seekable sink, so only the reports in flight
+and the ZIP central directory are ever held in memory.
+
+Participants without a report do not fail the download; they are listed with
+the reason in ``manifest.json``, the last member of the archive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import time
+import zipfile
+from collections import deque
+from collections.abc import AsyncIterator, Callable
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal
+from app.services.report_template import render_final_report_html, render_html_to_pdf
+from app.services.scoring import ScoringService
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "manifest.json"
+_UNSAFE_NAME_CHARS = re.compile(r'[\\/:*?"<>|\x00-\x1f]+')
+
+
+class ChunkSink:
+    """Write-only, non-seekable file object collecting archive bytes until drained."""
+
+    def __init__(self):
+        self._chunks: list[bytes] = []
+        self._offset = 0
+
+    def write(self, data: bytes) -> int:
+        chunk = bytes(data)
+        self._chunks.append(chunk)
+        self._offset += len(chunk)
+        return len(chunk)
+
+    def tell(self) -> int:
+        return self._offset
+
+    def flush(self) -> None:
+        pass
+
+    @property
+    def closed(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def member_stem(report: dict[str, Any]) -> str:
+    """Archive file name (without extension) of a participant's report."""
+    name = _UNSAFE_NAME_CHARS.sub("_", str(report["participant_name"])).strip(" ._")
+    return f"{name or 'participant'}_{report['participant_id']}"
+
+
+def export_filename(prof_activity_code: str) -> str:
+    """ASCII download name of an activity's export archive."""
+    return f"final_reports_{re.sub(r'[^A-Za-z0-9_.-]+', '_', prof_activity_code)}.zip"
+
+
+def render_report_files(report: dict[str, Any], include_pdf: bool) -> list[tuple[str, bytes]]:
+    """Render one final report into archive members (HTML, then PDF)."""
+    stem = member_stem(report)
+    html = render_final_report_html(report)
+    files = [(f"{stem}.html", html.encode())]
+    if include_pdf:
+        files.append((f"{stem}.pdf", render_html_to_pdf(html)))
+    return files
+
+
+async def stream_final_reports_zip(
+    prof_activity_code: str,
+    participant_ids: list[UUID],
+    include_pdf: bool = False,
+    session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+    concurrency: int | None = None,
+) -> AsyncIterator[bytes]:
+    """
+    Stream a ZIP archive with the final reports of the given participants.
+
+    Args:
+        prof_activity_code: Code of the professional activity
+        participant_ids: Participants in archive order
+        include_pdf: Add a PDF next to every HTML report (requires WeasyPrint)
+        session_factory: Opens the database session used for loading reports
+        concurrency: Max reports rendered at once (default REPORT_EXPORT_CONCURRENCY)
+
+    Yields:
+        Consecutive chunks of the archive
+    """
+    concurrency = concurrency or settings.report_export_concurrency
+    sink = ChunkSink()
+    archive = zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED)
+    pending: deque[tuple[UUID, asyncio.Task[list[tuple[str, bytes]]]]] = deque()
+    exported: list[dict[str, Any]] = []
+    errors: list[dict[str, str]] = []
+    started = time.perf_counter()
+
+    def write_members(files: list[tuple[str, bytes]]) -> bytes:
+        for name, data in files:
+            # PDF streams are already compressed
+            compress_type = zipfile.ZIP_STORED if name.endswith(".pdf") else zipfile.ZIP_DEFLATED
+            archive.writestr(name, data, compress_type=compress_type)
+        return sink.drain()
+
+    async def write_next() -> bytes:
+        participant_id, task = pending.popleft()
+        try:
+            files = await task
+        except Exception as exc:  # noqa: BLE001
+            logger.warning(
+                "final_report_export_render_failed",
+                extra={"participant_id": str(participant_id), "error": str(exc)},
+            )
+            errors.append({"participant_id": str(participant_id), "error": str(exc)})
+            return b""
+        exported.append(
+            {"participant_id": str(participant_id), "files": [name for name, _ in files]}
+        )
+        # Compression runs off the event loop as well; members are still written one at a time
+        return await asyncio.to_thread(write_members, files)
+
+    try:
+        async with session_factory() as db:
+            service = ScoringService(db)
+            for participant_id in participant_ids:
+                try:
+                    version = await service.final_report_version(participant_id, prof_activity_code)
+                    report = await service.generate_final_report(
+                        participant_id, prof_activity_code, version=version
+                    )
+                except ValueError as exc:
+                    errors.append({"participant_id": str(participant_id), "error": str(exc)})
+                    continue
+                task = asyncio.create_task(
+                    asyncio.to_thread(render_report_files, report, include_pdf)
+                )
+                pending.append((participant_id, task))
+                if len(pending) >= concurrency and (chunk := await write_next()):
+                    yield chunk
+
+        while pending:
+            if chunk := await write_next():
+                yield chunk
+
+        manifest = {
+            "prof_activity_code": prof_activity_code,
+            "exported": exported,
+            "errors": errors,
+        }
+        archive.writestr(MANIFEST_NAME, json.dumps(manifest, ensure_ascii=False, indent=2))
+        archive.close()
+        yield sink.drain()
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+    logger.info(
+        "final_reports_exported",
+        extra={
+            "prof_activity_code": prof_activity_code,
+            "exported": len(exported),
+            "failed": len(errors),
+            "include_pdf": include_pdf,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+        },
+    )
@@ -2,31 +2,71 @@
 Service for rendering final report HTML templates (S2-04).
 
 Uses Jinja2 for template rendering with versioning support.
+
+The environment is built once per process: templates are compiled on startup
+(``precompile_templates``) and kept in the environment's template cache, and
+the compiled bytecode is stored on disk so other workers and restarts skip the
+parse step. Outside dev, templates are not re-checked for changes.
+
+PDF rendering goes through the optional WeasyPrint package.
 """
 
+import threading
 from pathlib import Path
 from typing import Any
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, select_autoescape
+
+from app.core.config import settings
 
 # Template directory path
 TEMPLATE_DIR = Path(__file__).parent.parent / "templates"
 
+FINAL_REPORT_TEMPLATE = "final_report_v1.html"
+
+_env: Environment | None = None
+_env_lock = threading.Lock()
+
+
+class ReportRenderError(RuntimeError):
+    """Raised when a report cannot be rendered in the requested format."""
+
 
 def get_jinja_env() -> Environment:
     """
-    Get configured Jinja2 environment.
+    Get the configured Jinja2 environment (one per process).
+
+    Returns:
+        Shared Jinja2 Environment instance
+    """
+    global _env
+    if _env is None:
+        # Reports are rendered from worker threads during bulk export
+        with _env_lock:
+            if _env is None:
+                _env = Environment(
+                    loader=FileSystemLoader(str(TEMPLATE_DIR)),
+                    autoescape=select_autoescape(["html", "xml"]),
+                    trim_blocks=True,
+                    lstrip_blocks=True,
+                    bytecode_cache=FileSystemBytecodeCache(),
+                    auto_reload=settings.is_dev,
+                )
+    return _env
+
+
+def precompile_templates() -> int:
+    """
+    Compile every HTML template into the shared environment.
 
     Returns:
-        Configured Jinja2 Environment instance
+        Number of compiled templates
     """
-    env = Environment(
-        loader=FileSystemLoader(str(TEMPLATE_DIR)),
-        autoescape=select_autoescape(["html", "xml"]),
-        trim_blocks=True,
-        lstrip_blocks=True,
-    )
-    return env
+    env = get_jinja_env()
+    names = env.list_templates(extensions=["html"])
+    for name in names:
+        env.get_template(name)
+    return len(names)
 
 
 def render_final_report_html(report_data: dict[str, Any]) -> str:
@@ -48,7 +88,37 @@ def render_final_report_html(report_data: dict[str, Any]) -> str:
 
     # For now, we only have version 1.0.0
     # In future, could select template based on version
-    template = env.get_template("final_report_v1.html")
+    template = env.get_template(FINAL_REPORT_TEMPLATE)
 
     html = template.render(**report_data)
     return html
+
+
+def _weasyprint() -> Any:
+    try:
+        import weasyprint
+    except ImportError as exc:
+        raise ReportRenderError(
+            "PDF export requires the optional weasyprint package (pip install weasyprint)"
+        ) from exc
+    return weasyprint
+
+
+def ensure_pdf_renderer() -> None:
+    """
+    Check that PDF rendering is available.
+
+    Raises:
+        ReportRenderError: If WeasyPrint is not installed
+    """
+    _weasyprint()
+
+
+def render_html_to_pdf(html: str) -> bytes:
+    """
+    Render an HTML report to PDF locally with WeasyPrint.
+
+    Raises:
+        ReportRenderError: If WeasyPrint is not installed
+    """
+    return _weasyprint().HTML(string=html, base_url=str(TEMPLATE_DIR)).write_pdf()
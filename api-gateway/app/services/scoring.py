@@ -9,6 +9,7 @@ Implements:
 With Decimal precision and quantization to 0.01.
 """
 
+import logging
 from decimal import ROUND_HALF_UP, Decimal
 from typing import Any, Union
 from uuid import UUID
@@ -17,10 +18,26 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.clients import GeminiClient, GeminiPoolClient
-from app.repositories.metric import ExtractedMetricRepository
+from app.repositories.metric import ExtractedMetricRepository, MetricDefRepository
 from app.repositories.participant_metric import ParticipantMetricRepository
 from app.repositories.prof_activity import ProfActivityRepository
 from app.repositories.scoring_result import ScoringResultRepository
+from app.repositories.weight_table import WeightTableRepository
+from app.services.final_report_cache import (
+    TEMPLATE_VERSION,
+    FinalReportVersion,
+    get_final_report_cache,
+)
+from app.services.recommendation_cache import get_recommendation_cache, recommendation_cache_key
+from app.services.recommendations import build_recommendation_metrics
+from app.services.weight_catalog import (
+    ActivitySnapshot,
+    WeightCatalog,
+    WeightTableSnapshot,
+    get_weight_catalog,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class ScoringService:
@@ -34,13 +51,22 @@ class ScoringService:
         self.extracted_metric_repo = ExtractedMetricRepository(db)  # Legacy, for backward compatibility
         self.participant_metric_repo = ParticipantMetricRepository(db)  # S2-08: New storage
         self.prof_activity_repo = ProfActivityRepository(db)
+        self.weight_table_repo = WeightTableRepository(db)
+        self.metric_def_repo = MetricDefRepository(db)
         self.scoring_result_repo = ScoringResultRepository(db)
 
+    async def _weight_catalog(self) -> WeightCatalog:
+        """Activities, parsed weight tables and metric definitions (cached per process)."""
+        return await get_weight_catalog(
+            self.prof_activity_repo, self.weight_table_repo, self.metric_def_repo
+        )
+
     async def calculate_score(
         self,
         participant_id: UUID,
         prof_activity_code: str,
         report_ids: list[UUID] | None = None,
+        enqueue_recommendations: bool = True,
     ) -> dict:
         """
         Calculate professional fitness score for a participant.
@@ -50,6 +76,9 @@ class ScoringService:
             prof_activity_code: Code of the professional activity
             report_ids: Optional list of report IDs to use for metrics.
                        If None, uses all reports for the participant.
+            enqueue_recommendations: Start the recommendations task right away.
+                       False leaves the result "pending" for the caller to fan out
+                       (auto-scoring pipeline); the Gemini client is not required then.
 
         Returns:
             Dictionary with:
@@ -60,38 +89,24 @@ class ScoringService:
         Raises:
             ValueError: If no active weight table or required metrics are missing
         """
-        # 1. Get professional activity
-        prof_activity = await self.prof_activity_repo.get_by_code(prof_activity_code)
+        # 1-4. Professional activity, its weight table (weights parsed, sum
+        # validated) and active MetricDefs come from the compiled catalog
+        catalog = await self._weight_catalog()
+        prof_activity = catalog.activities.get(prof_activity_code)
         if not prof_activity:
             raise ValueError(f"Professional activity '{prof_activity_code}' not found")
 
-        # 2. Get active weight table
-        weight_table = await self.prof_activity_repo.get_active_weight_table(prof_activity.id)
+        weight_table = catalog.weight_tables.get(prof_activity_code)
         if not weight_table:
             raise ValueError(f"No active weight table for activity '{prof_activity_code}'")
-
-        # 3. Parse weights from JSONB
-        weights_map = {}  # metric_code -> weight
-        for weight_entry in weight_table.weights:
-            metric_code = weight_entry["metric_code"]
-            weight = Decimal(weight_entry["weight"])
-            weights_map[metric_code] = weight
-
-        # 4. Validate sum of weights == 1.0
-        total_weight = sum(weights_map.values())
-        if total_weight != Decimal("1.0"):
-            raise ValueError(f"Sum of weights must equal 1.0, got {total_weight}")
+        if weight_table.error:
+            raise ValueError(weight_table.error)
+        weights_map = weight_table.weights_map  # metric_code -> weight
+        metric_def_by_code = catalog.metric_defs
 
         # 5. Get participant metrics (S2-08: from participant_metric table)
         metrics_map = await self.participant_metric_repo.get_metrics_dict(participant_id)
 
-        # 5b. Load MetricDef for names (needed for strengths/dev_areas/recommendations)
-        from app.repositories.metric import MetricDefRepository
-
-        metric_def_repo = MetricDefRepository(self.db)
-        metric_defs = await metric_def_repo.list_all(active_only=True)
-        metric_def_by_code = {m.code: m for m in metric_defs}
-
         # 6. Check for missing required metrics
         missing_metrics = []
         for metric_code in weights_map.keys():
@@ -143,23 +158,38 @@ class ScoringService:
         # Save scoring result first, then trigger async recommendations generation
         recommendations = None
         recommendations_status = "pending"
-        if not settings.ai_recommendations_enabled or self.gemini_client is None:
+        if not settings.ai_recommendations_enabled or (
+            enqueue_recommendations and self.gemini_client is None
+        ):
             recommendations_status = "disabled"
 
-        # 10. Save scoring result to database (without recommendations initially)
+        # 9b. Same activity, weight table and metric profile seen before: reuse its
+        # recommendations instead of calling Gemini again
+        prompt_metrics = build_recommendation_metrics(
+            weight_table.weights, metrics_map, metric_def_by_code
+        )
+        if recommendations_status == "pending":
+            recommendations = await get_recommendation_cache().get(
+                recommendation_cache_key(prof_activity_code, weight_table, prompt_metrics)
+            )
+            if recommendations is not None:
+                recommendations_status = "ready"
+
+        # 10. Save scoring result to database (recommendations are filled by the
+        # Celery task unless they came from the cache)
         scoring_result = await self.scoring_result_repo.create(
             participant_id=participant_id,
             weight_table_id=weight_table.id,
             score_pct=score_pct,
             strengths=strengths,
             dev_areas=dev_areas,
-            recommendations=None,  # Will be updated by Celery task
+            recommendations=recommendations,
             compute_notes="Score calculated using current weight table",
             recommendations_status=recommendations_status,
         )
 
         # 11. Trigger async recommendations generation (AI-08)
-        if recommendations_status == "pending":
+        if recommendations_status == "pending" and enqueue_recommendations:
             from app.tasks.recommendations import generate_report_recommendations
 
             # Launch Celery task
@@ -177,9 +207,6 @@ class ScoringService:
                     recommendations_status = scoring_result.recommendations_status
                 except Exception as e:
                     # Log error but don't fail scoring calculation
-                    import logging
-
-                    logger = logging.getLogger(__name__)
                     logger.warning(
                         f"Recommendations generation failed in eager mode: {e}",
                         exc_info=True,
@@ -206,6 +233,284 @@ class ScoringService:
             "recommendations_error": scoring_result.recommendations_error,
         }
 
+    async def enqueue_recommendations_batch(self, scoring_result_ids: list[UUID]) -> dict:
+        """
+        Queue batch recommendation generation for many scoring results.
+
+        Results with status pending or error are (re)queued in chunks of
+        RECOMMENDATIONS_BATCH_SIZE, one ``generate_recommendations_batch`` task
+        (one Gemini request) per chunk. Ready and disabled results are skipped.
+
+        Args:
+            scoring_result_ids: UUIDs of the scoring results
+
+        Returns:
+            Dictionary with queued, skipped and not_found IDs and the task IDs
+        """
+        from app.tasks.recommendations import generate_recommendations_batch
+
+        scoring_result_ids = list(dict.fromkeys(scoring_result_ids))
+        found = {
+            result.id: result
+            for result in await self.scoring_result_repo.get_many(scoring_result_ids)
+        }
+        queued = [
+            found[result_id]
+            for result_id in scoring_result_ids
+            if result_id in found
+            and found[result_id].recommendations_status in {"pending", "error"}
+        ]
+        for scoring_result in queued:
+            scoring_result.recommendations_status = "pending"
+            scoring_result.recommendations_error = None
+        await self.db.commit()
+
+        queued_ids = [str(scoring_result.id) for scoring_result in queued]
+        batch_size = settings.recommendations_batch_size
+        task_ids = [
+            generate_recommendations_batch.delay(queued_ids[start : start + batch_size]).id
+            for start in range(0, len(queued_ids), batch_size)
+        ]
+        logger.info(
+            "scoring_recommendations_batch_enqueued",
+            extra={"queued": len(queued_ids), "tasks": len(task_ids)},
+        )
+        return {
+            "queued": queued_ids,
+            "skipped": [
+                str(result_id)
+                for result_id in scoring_result_ids
+                if result_id in found and str(result_id) not in queued_ids
+            ],
+            "not_found": [
+                str(result_id) for result_id in scoring_result_ids if result_id not in found
+            ],
+            "task_ids": task_ids,
+        }
+
+    async def rank_activities(self, participant_id: UUID) -> dict:
+        """
+        Score a participant against every activity without saving anything.
+
+        One query for the participant's metrics (weight tables come from the
+        compiled catalog); the scores come from one vectorized pass (same arithmetic as
+        ``calculate_score``). No ScoringResult is written and Gemini is not called.
+
+        Args:
+            participant_id: UUID of the participant
+
+        Returns:
+            Dictionary with ``items`` ranked by score (activities that cannot be
+            scored last, by weight coverage) and ``best`` (code or None)
+        """
+        from app.services.bulk_scoring import MAX_VALUE, MIN_VALUE, fraction_digits, score_matrix
+
+        catalog = await self._weight_catalog()
+        metrics_map = await self.participant_metric_repo.get_metrics_dict(participant_id)
+        compiled = catalog.compiled
+        names = {code: activity.name for code, activity in catalog.activities.items()}
+
+        scored = []
+        if compiled.activities:
+            score_cents, eligible = score_matrix(
+                compiled.values_matrix([metrics_map]),
+                compiled.matrix,
+                value_digits=fraction_digits(list(metrics_map.values())),
+                weight_digits=compiled.weight_digits,
+            )
+        for activity in compiled.activities:
+            missing = sorted(code for code in activity.weights if code not in metrics_map)
+            out_of_range = sorted(
+                code
+                for code, value in metrics_map.items()
+                if code in activity.weights and not (MIN_VALUE <= value <= MAX_VALUE)
+            )
+            covered = sum(
+                (
+                    weight
+                    for code, weight in activity.weights.items()
+                    if code not in missing and code not in out_of_range
+                ),
+                Decimal("0"),
+            )
+            is_eligible = bool(eligible[0, activity.column])
+            scored.append(
+                {
+                    "prof_activity_code": activity.code,
+                    "prof_activity_name": activity.name,
+                    "weight_table_id": str(activity.weight_table.id),
+                    "score_pct": (
+                        Decimal(int(score_cents[0, activity.column])).scaleb(-2)
+                        if is_eligible
+                        else None
+                    ),
+                    "coverage_pct": (covered * 100).quantize(
+                        Decimal("0.01"), rounding=ROUND_HALF_UP
+                    ),
+                    "missing_metrics": missing,
+                    "out_of_range_metrics": out_of_range,
+                    "error": None,
+                }
+            )
+
+        # Scored activities by score; the rest by how much of the table is covered
+        scored.sort(
+            key=lambda item: (
+                item["score_pct"] is None,
+                -(item["score_pct"] if item["score_pct"] is not None else item["coverage_pct"]),
+                item["prof_activity_code"],
+            )
+        )
+        rank = 0
+        for item in scored:
+            if item["score_pct"] is not None:
+                rank += 1
+            item["rank"] = rank if item["score_pct"] is not None else None
+
+        for code, reason in sorted(compiled.skipped.items()):
+            scored.append(
+                {
+                    "rank": None,
+                    "prof_activity_code": code,
+                    "prof_activity_name": names.get(code),
+                    "weight_table_id": None,
+                    "score_pct": None,
+                    "coverage_pct": Decimal("0.00"),
+                    "missing_metrics": [],
+                    "out_of_range_metrics": [],
+                    "error": reason,
+                }
+            )
+
+        return {
+            "participant_id": str(participant_id),
+            "best": scored[0]["prof_activity_code"] if scored and scored[0]["rank"] else None,
+            "items": scored,
+        }
+
+    async def score_what_if(
+        self,
+        participant_ids: list[UUID],
+        prof_activity_code: str | None = None,
+        weights: dict[str, Decimal] | None = None,
+        metric_overrides: dict[str, Decimal] | None = None,
+    ) -> dict:
+        """
+        Score participants against current or hypothetical weights without saving anything.
+
+        Same eligibility and arithmetic as ``calculate_score``, computed with the
+        vectorized path of bulk scoring; one query for the participants' metrics.
+        No ScoringResult is written and Gemini is not called.
+
+        Args:
+            participant_ids: Participants to score (order is kept)
+            prof_activity_code: Activity whose current weight table is used
+                (or that labels the ad-hoc weights)
+            weights: Ad-hoc weights (metric_code -> weight, summing to 1.0)
+            metric_overrides: Metric values replacing the stored ones for every participant
+
+        Returns:
+            Dictionary with the weights used and per-participant ``items``
+            (score_pct, contributions, strengths, dev_areas or the missing and
+            out-of-range metrics that prevent scoring)
+
+        Raises:
+            ValueError: If the activity or its weight table is unknown or unusable,
+                or the ad-hoc weights reference unknown metrics
+        """
+        from app.services.bulk_scoring import (
+            MAX_VALUE,
+            MIN_VALUE,
+            ActivityWeights,
+            compile_activities,
+            score_cohort,
+        )
+
+        catalog = await self._weight_catalog()
+        prof_activity = None
+        if prof_activity_code is not None:
+            prof_activity = catalog.activities.get(prof_activity_code)
+            if not prof_activity:
+                raise ValueError(f"Professional activity '{prof_activity_code}' not found")
+
+        weight_table = None
+        if weights is None:
+            weight_table = catalog.weight_tables.get(prof_activity_code)
+            if not weight_table:
+                raise ValueError(f"No active weight table for activity '{prof_activity_code}'")
+            if weight_table.error:
+                raise ValueError(weight_table.error)
+            weights = weight_table.weights_map
+        else:
+            unknown = sorted(code for code in weights if code not in catalog.metric_defs)
+            if unknown:
+                raise ValueError(f"Unknown metric codes: {', '.join(unknown)}")
+
+        activity = ActivityWeights(
+            weight_table=weight_table,
+            code=prof_activity_code or "WHAT_IF",
+            name=prof_activity.name if prof_activity else "What-if",
+            weights=weights,
+            column=0,
+        )
+        metrics_by_participant = await self.participant_metric_repo.get_metrics_dicts(
+            list(dict.fromkeys(participant_ids))
+        )
+        pids = list(metrics_by_participant)
+        metrics_rows = [{**metrics_by_participant[pid], **(metric_overrides or {})} for pid in pids]
+        pairs, _ = score_cohort(
+            metrics_rows,
+            compile_activities([activity]),
+            {
+                code: metric_def.name_ru or metric_def.name
+                for code, metric_def in catalog.metric_defs.items()
+            },
+        )
+        scored = {pair.row: pair for pair in pairs}
+
+        items = []
+        for row, pid in enumerate(pids):
+            metrics = metrics_rows[row]
+            pair = scored.get(row)
+            details = []
+            if pair:
+                for code, weight in weights.items():
+                    contribution = metrics[code] * weight
+                    details.append(
+                        {
+                            "metric_code": code,
+                            "value": str(metrics[code]),
+                            "weight": str(weight),
+                            "contribution": str(
+                                contribution.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+                            ),
+                        }
+                    )
+            items.append(
+                {
+                    "participant_id": str(pid),
+                    "score_pct": pair.score_pct if pair else None,
+                    "details": details,
+                    "strengths": pair.strengths if pair else [],
+                    "dev_areas": pair.dev_areas if pair else [],
+                    "missing_metrics": sorted(code for code in weights if code not in metrics),
+                    "out_of_range_metrics": sorted(
+                        code
+                        for code in weights
+                        if code in metrics and not (MIN_VALUE <= metrics[code] <= MAX_VALUE)
+                    ),
+                }
+            )
+
+        return {
+            "prof_activity_code": prof_activity_code,
+            "weight_table_id": str(weight_table.id) if weight_table else None,
+            "weights": [
+                {"metric_code": code, "weight": str(weight)} for code, weight in weights.items()
+            ],
+            "items": items,
+        }
+
     def _generate_strengths_and_dev_areas(
         self,
         metrics_map: dict[str, Decimal],
@@ -264,10 +569,71 @@ class ScoringService:
 
         return strengths, dev_areas
 
+    @staticmethod
+    def _final_report_activity(
+        catalog: WeightCatalog, prof_activity_code: str
+    ) -> tuple[ActivitySnapshot, WeightTableSnapshot]:
+        prof_activity = catalog.activities.get(prof_activity_code)
+        if not prof_activity:
+            raise ValueError(f"Professional activity '{prof_activity_code}' not found")
+
+        weight_table = catalog.weight_tables.get(prof_activity_code)
+        if not weight_table:
+            raise ValueError(f"No active weight table for activity '{prof_activity_code}'")
+        return prof_activity, weight_table
+
+    @staticmethod
+    def _no_scoring_result(participant_id: UUID, prof_activity_code: str) -> ValueError:
+        return ValueError(
+            f"No scoring result found for participant {participant_id} and activity '{prof_activity_code}'. "
+            f"Please calculate score first."
+        )
+
+    async def final_report_version(
+        self, participant_id: UUID, prof_activity_code: str
+    ) -> FinalReportVersion:
+        """
+        Fingerprint of the final report (cache key and ETag) with one query.
+
+        Raises:
+            ValueError: Same cases as ``generate_final_report``
+        """
+        catalog = await self._weight_catalog()
+        _, weight_table = self._final_report_activity(catalog, prof_activity_code)
+        row = await self.scoring_result_repo.get_final_report_version(
+            participant_id, weight_table.id
+        )
+        if row is None:
+            raise self._no_scoring_result(participant_id, prof_activity_code)
+        return FinalReportVersion.from_row(row, catalog.fingerprints[prof_activity_code])
+
+    async def final_report_participants(
+        self, prof_activity_code: str, participant_ids: list[UUID] | None = None
+    ) -> list[UUID]:
+        """
+        Participants to export final reports for.
+
+        Args:
+            prof_activity_code: Code of the professional activity
+            participant_ids: Explicit list; None selects the activity cohort
+                (everyone scored against its current weight table)
+
+        Raises:
+            ValueError: If the activity or its active weight table is not found
+        """
+        catalog = await self._weight_catalog()
+        _, weight_table = self._final_report_activity(catalog, prof_activity_code)
+        if participant_ids is not None:
+            return list(dict.fromkeys(participant_ids))
+        return await self.scoring_result_repo.list_participant_ids_by_weight_table(
+            weight_table.id
+        )
+
     async def generate_final_report(
         self,
         participant_id: UUID,
         prof_activity_code: str,
+        version: FinalReportVersion | None = None,
     ) -> dict:
         """
         Generate final report data for a participant (S2-04).
@@ -275,63 +641,41 @@ class ScoringService:
         Args:
             participant_id: UUID of the participant
             prof_activity_code: Code of the professional activity
+            version: Fingerprint from ``final_report_version``; when given, the
+                report is served from and stored in the final report cache
 
         Returns:
             Dictionary with final report data ready for JSON/HTML rendering
+            (shared with the cache: do not modify)
 
         Raises:
             ValueError: If no scoring result found or required data is missing
         """
-        from app.repositories.participant import ParticipantRepository
-
-        # 1. Get professional activity
-        prof_activity = await self.prof_activity_repo.get_by_code(prof_activity_code)
-        if not prof_activity:
-            raise ValueError(f"Professional activity '{prof_activity_code}' not found")
-
-        # 2. Get active weight table
-        weight_table = await self.prof_activity_repo.get_active_weight_table(prof_activity.id)
-        if not weight_table:
-            raise ValueError(f"No active weight table for activity '{prof_activity_code}'")
-
-        # 3. Get latest scoring result
-        scoring_result = await self.scoring_result_repo.get_latest_by_participant_and_weight_table(
-            participant_id=participant_id,
-            weight_table_id=weight_table.id,
+        cache = get_final_report_cache()
+        if version is not None and (report := cache.get(version)) is not None:
+            return report
+
+        # 1-2. Professional activity and weight table (compiled catalog)
+        catalog = await self._weight_catalog()
+        prof_activity, weight_table = self._final_report_activity(catalog, prof_activity_code)
+
+        # 3-5. Latest scoring result, participant name and participant metrics
+        # (value, confidence - S2-08) in one query
+        rows = await self.scoring_result_repo.get_final_report_rows(
+            participant_id, weight_table.id
         )
-        if not scoring_result:
-            raise ValueError(
-                f"No scoring result found for participant {participant_id} and activity '{prof_activity_code}'. "
-                f"Please calculate score first."
-            )
-
-        # 4. Get participant details
-        participant_repo = ParticipantRepository(self.db)
-        participant = await participant_repo.get_by_id(participant_id)
-        if not participant:
-            raise ValueError(f"Participant {participant_id} not found")
-
-        # 5. Get participant metrics with details (value, confidence) - S2-08
-        participant_metrics = await self.participant_metric_repo.list_by_participant(participant_id)
+        if rows is None:
+            raise self._no_scoring_result(participant_id, prof_activity_code)
+        scoring_result, participant_name, participant_metrics = rows
 
         # Create metric_code -> ParticipantMetric mapping
         metrics_map = {}
         for metric in participant_metrics:
             metrics_map[metric.metric_code] = metric
 
-        # 5b. Load MetricDef for names and units
-        from app.repositories.metric import MetricDefRepository
-
-        metric_def_repo = MetricDefRepository(self.db)
-        metric_defs = await metric_def_repo.list_all(active_only=True)
-        metric_def_by_code = {m.code: m for m in metric_defs}
-
-        # 6. Parse weights from weight table
-        weights_map = {}
-        for weight_entry in weight_table.weights:
-            metric_code = weight_entry["metric_code"]
-            weight = Decimal(weight_entry["weight"])
-            weights_map[metric_code] = weight
+        # 5b-6. MetricDef names and units, parsed weights (compiled catalog)
+        metric_def_by_code = catalog.metric_defs
+        weights_map = weight_table.weights_map
 
         # 7. Build detailed metrics list
         detailed_metrics = []
@@ -418,10 +762,10 @@ class ScoringService:
 
         recommendations_list = scoring_result.recommendations or []
 
-        return {
+        report = {
             # Header
             "participant_id": participant_id,
-            "participant_name": participant.full_name,
+            "participant_name": participant_name,
             "report_date": scoring_result.computed_at,
             "prof_activity_code": prof_activity_code,
             "prof_activity_name": prof_activity.name,
@@ -440,5 +784,8 @@ class ScoringService:
             # Notes
             "notes": notes,
             # Template version
-            "template_version": "1.0.0",
+            "template_version": TEMPLATE_VERSION,
         }
+        if version is not None:
+            cache.set(version, report)
+        return report
@@ -1,19 +1,37 @@
 """
-File storage utilities for report uploads.
+File storage backends for report uploads and extracted images.
 
-Currently implements LOCAL storage with deterministic path structure:
-reports/{participant_id}/{report_id}/original.docx
+Backends implement ``ReportStorage`` and are selected per FileRef.storage:
+- LOCAL: files under ``file_storage_base`` (shared volume)
+- MINIO: S3-compatible object storage (MinIO, AWS S3), optional ``boto3``
+
+Key layout:
+- LOCAL: reports/{participant_id}/{report_id}/original.docx
+- MINIO: {participant_id}/{report_id}/original.docx in ``s3_bucket``
+
+Extracted report images are content-addressed and shared between reports:
+blobs/images/{sha256[:2]}/{sha256}.png
 """
 
 from __future__ import annotations
 
 import asyncio
 import hashlib
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 from dataclasses import dataclass
 from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any
 
 from fastapi import UploadFile
 
+if TYPE_CHECKING:
+    from app.core.config import Settings
+
 
 class StorageError(Exception):
     """Base error for storage operations."""
@@ -27,21 +45,119 @@ class FileTooLargeError(StorageError):
         self.max_bytes = max_bytes
 
 
+def _write_chunk(sink: IO[bytes], chunk: bytes, *hashers) -> None:
+    """Write chunk and feed hashers (runs in a worker thread; hashlib releases the GIL)."""
+    sink.write(chunk)
+    for hasher in hashers:
+        hasher.update(chunk)
+
+
+def _update_hashers(chunk: bytes, *hashers) -> None:
+    for hasher in hashers:
+        hasher.update(chunk)
+
+
+def _commit_file(sink: IO[bytes], temp_path: Path, destination: Path) -> None:
+    """Flush temporary file to disk and atomically move it into place."""
+    try:
+        sink.flush()
+        os.fsync(sink.fileno())
+    finally:
+        sink.close()
+    os.replace(temp_path, destination)
+
+
+def _discard_file(sink: IO[bytes] | None, temp_path: Path) -> None:
+    """Close and remove a partially written temporary file."""
+    if sink is not None:
+        sink.close()
+    temp_path.unlink(missing_ok=True)
+
+
 @dataclass(slots=True)
 class StoredFile:
     """Metadata for a stored file."""
 
     key: str
-    path: Path
+    path: Path | None  # None for object storage
     size_bytes: int
     etag: str
+    sha256: str = ""
 
 
-class LocalReportStorage:
-    """LOCAL storage backend for report files."""
+class ReportStorage(ABC):
+    """
+    Storage backend interface for report documents and images.
 
+    ``storage_type`` and ``bucket`` are written to FileRef so every file can be
+    read back through the backend that stored it.
+    """
+
+    storage_type: str
+    bucket: str
     CHUNK_SIZE = 1024 * 1024  # 1 MiB
 
+    def report_key(self, participant_id: str, report_id: str) -> str:
+        """Build key for report original document."""
+        return f"reports/{participant_id}/{report_id}/original.docx"
+
+    def image_blob_key(self, sha256: str, suffix: str = ".png") -> str:
+        """Build content-addressed key for an extracted report image."""
+        return f"blobs/images/{sha256[:2]}/{sha256}{suffix}"
+
+    @abstractmethod
+    async def save_report(self, upload: UploadFile, key: str, max_bytes: int) -> StoredFile:
+        """Stream an upload into storage, enforcing ``max_bytes``."""
+
+    @abstractmethod
+    async def write_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        """Store a small object (extracted image) in one request."""
+
+    @abstractmethod
+    async def read_bytes(self, key: str) -> bytes:
+        """Read a whole object into memory. Raises FileNotFoundError if missing."""
+
+    @abstractmethod
+    async def iter_bytes(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        """Stream an object, optionally a byte range (``end`` inclusive)."""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Check whether an object exists."""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Delete object if it exists (non-fatal)."""
+
+    @abstractmethod
+    def local_copy(self, key: str):
+        """
+        Async context manager yielding a local filesystem path to the object.
+
+        LOCAL returns the stored file itself; object storage downloads it to a
+        temporary file that is removed on exit.
+        """
+
+    async def hash_object(self, key: str) -> str:
+        """Compute MD5-based ETag of a stored object."""
+        hasher = hashlib.md5()
+        async for chunk in self.iter_bytes(key):
+            await asyncio.to_thread(hasher.update, chunk)
+        return hasher.hexdigest()
+
+    async def presigned_url(self, key: str, filename: str | None = None) -> str | None:
+        """Time-limited direct download URL, or None when the backend has none."""
+        return None
+
+
+class LocalReportStorage(ReportStorage):
+    """LOCAL storage backend for report files."""
+
+    storage_type = "LOCAL"
+    bucket = "local"
+
     def __init__(self, base_path: str):
         self.base_path = Path(base_path)
 
@@ -49,10 +165,6 @@ class LocalReportStorage:
         """Ensure base directory exists."""
         self.base_path.mkdir(parents=True, exist_ok=True)
 
-    def report_key(self, participant_id: str, report_id: str) -> str:
-        """Build key for report original document."""
-        return f"reports/{participant_id}/{report_id}/original.docx"
-
     def resolve_path(self, key: str) -> Path:
         """Resolve absolute path for storage key."""
         return self.base_path / key
@@ -61,49 +173,113 @@ class LocalReportStorage:
         """
         Persist uploaded report to disk.
 
+        Disk writes, hashing and fsync run in the default thread pool so large
+        uploads do not block the event loop. Data is written to a temporary
+        file next to the destination and atomically renamed once complete, so
+        readers never observe a partially written report.
+
         Args:
             upload: UploadFile from FastAPI request
             key: storage key relative to base directory
             max_bytes: maximum allowed file size
 
         Returns:
-            StoredFile metadata with size and ETag hash.
+            StoredFile metadata with size, ETag (MD5) and SHA-256 content hash.
 
         Raises:
             FileTooLargeError: If file exceeds size limit
             StorageError: On I/O problems
         """
-        self.ensure_base()
-
         destination = self.resolve_path(key)
-        destination.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = destination.with_name(f".{destination.name}.{uuid.uuid4().hex}.part")
 
         hasher = hashlib.md5()
+        content_hasher = hashlib.sha256()
         total_size = 0
+        sink = None
 
         try:
-            with destination.open("wb") as sink:
-                while True:
-                    chunk = await upload.read(self.CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    total_size += len(chunk)
-                    if total_size > max_bytes:
-                        raise FileTooLargeError(max_bytes)
-                    sink.write(chunk)
-                    hasher.update(chunk)
+            await asyncio.to_thread(self._prepare_directory, destination.parent)
+            sink = await asyncio.to_thread(temp_path.open, "wb")
+            while True:
+                chunk = await upload.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                total_size += len(chunk)
+                if total_size > max_bytes:
+                    raise FileTooLargeError(max_bytes)
+                await asyncio.to_thread(_write_chunk, sink, chunk, hasher, content_hasher)
+            await asyncio.to_thread(_commit_file, sink, temp_path, destination)
+            sink = None
         except FileTooLargeError:
             # Clean up partially written file
-            destination.unlink(missing_ok=True)
+            await asyncio.to_thread(_discard_file, sink, temp_path)
             raise
         except OSError as exc:
-            destination.unlink(missing_ok=True)
+            await asyncio.to_thread(_discard_file, sink, temp_path)
             raise StorageError(str(exc)) from exc
         finally:
             await upload.close()
 
         etag = hasher.hexdigest()
-        return StoredFile(key=key, path=destination, size_bytes=total_size, etag=etag)
+        return StoredFile(
+            key=key,
+            path=destination,
+            size_bytes=total_size,
+            etag=etag,
+            sha256=content_hasher.hexdigest(),
+        )
+
+    def _prepare_directory(self, directory: Path) -> None:
+        self.ensure_base()
+        directory.mkdir(parents=True, exist_ok=True)
+
+    async def write_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        path = self.resolve_path(key)
+
+        def _write() -> None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+
+        await asyncio.to_thread(_write)
+
+    async def read_bytes(self, key: str) -> bytes:
+        path = self.resolve_path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        return await asyncio.to_thread(path.read_bytes)
+
+    async def iter_bytes(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        path = self.resolve_path(key)
+        source = await asyncio.to_thread(path.open, "rb")
+        try:
+            await asyncio.to_thread(source.seek, start)
+            remaining = None if end is None else end - start + 1
+            while remaining is None or remaining > 0:
+                size = self.CHUNK_SIZE if remaining is None else min(self.CHUNK_SIZE, remaining)
+                chunk = await asyncio.to_thread(source.read, size)
+                if not chunk:
+                    break
+                if remaining is not None:
+                    remaining -= len(chunk)
+                yield chunk
+        finally:
+            source.close()
+
+    async def exists(self, key: str) -> bool:
+        return self.resolve_path(key).exists()
+
+    async def delete(self, key: str) -> None:
+        self.delete_file(self.resolve_path(key))
+
+    @asynccontextmanager
+    async def local_copy(self, key: str):
+        path = self.resolve_path(key)
+        if not path.exists():
+            raise FileNotFoundError(f"File not found: {path}")
+        yield path
 
     async def compute_etag(self, path: Path) -> str:
         """Compute MD5-based ETag for an existing file."""
@@ -117,6 +293,9 @@ class LocalReportStorage:
 
         return await asyncio.to_thread(_hash_file)
 
+    async def hash_object(self, key: str) -> str:
+        return await self.compute_etag(self.resolve_path(key))
+
     def delete_file(self, path: Path) -> None:
         """Delete file if it exists (non-fatal)."""
         try:
@@ -124,3 +303,275 @@ class LocalReportStorage:
         except OSError:
             # Log warning in future when logging subsystem is ready
             pass
+
+
+_S3_MISSING_CODES = {"404", "NoSuchKey", "NoSuchBucket", "NoSuchUpload", "NotFound"}
+
+
+class S3ReportStorage(ReportStorage):
+    """
+    S3-compatible storage backend (MinIO, AWS S3).
+
+    ``boto3`` is an optional dependency imported on first use. The client is
+    synchronous, so every request runs in the default thread pool. Uploads are
+    streamed as multipart uploads (``part_size`` bytes per part) and hashed on
+    the fly, so a report is never fully buffered in memory.
+    """
+
+    storage_type = "MINIO"
+
+    def __init__(
+        self,
+        bucket: str,
+        endpoint_url: str | None = None,
+        access_key: str | None = None,
+        secret_key: str | None = None,
+        region: str = "us-east-1",
+        part_size: int = 8 * 1024 * 1024,
+        presign_ttl_sec: int = 300,
+        client: Any | None = None,
+    ):
+        self.bucket = bucket
+        self.part_size = part_size
+        self.presign_ttl_sec = presign_ttl_sec
+        if client is None:
+            try:
+                import boto3
+                from botocore.config import Config
+            except ImportError as exc:
+                raise StorageError(
+                    "FILE_STORAGE=MINIO requires the optional boto3 package (pip install boto3)"
+                ) from exc
+            client = boto3.client(
+                "s3",
+                endpoint_url=endpoint_url,
+                aws_access_key_id=access_key,
+                aws_secret_access_key=secret_key,
+                region_name=region,
+                config=Config(signature_version="s3v4", s3={"addressing_style": "path"}),
+            )
+        self.client = client
+
+    def report_key(self, participant_id: str, report_id: str) -> str:
+        return f"{participant_id}/{report_id}/original.docx"
+
+    async def ensure_bucket(self) -> None:
+        """Create the bucket if it does not exist (MinIO bootstrap, tests)."""
+        if not await self._call("head_bucket", missing_ok=True, Bucket=self.bucket):
+            await self._call("create_bucket", Bucket=self.bucket)
+
+    async def save_report(self, upload: UploadFile, key: str, max_bytes: int) -> StoredFile:
+        """
+        Stream upload into a multipart object.
+
+        Raises:
+            FileTooLargeError: If file exceeds size limit (upload is aborted)
+            StorageError: On S3 errors
+        """
+        hasher = hashlib.md5()
+        content_hasher = hashlib.sha256()
+        total_size = 0
+        parts: list[dict[str, Any]] = []
+        buffer = bytearray()
+
+        try:
+            created = await self._call(
+                "create_multipart_upload",
+                Bucket=self.bucket,
+                Key=key,
+                ContentType=upload.content_type or "application/octet-stream",
+            )
+        except Exception:
+            await upload.close()
+            raise
+        upload_id = created["UploadId"]
+
+        async def flush_part() -> None:
+            part_number = len(parts) + 1
+            response = await self._call(
+                "upload_part",
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                PartNumber=part_number,
+                Body=bytes(buffer),
+            )
+            parts.append({"ETag": response["ETag"], "PartNumber": part_number})
+            buffer.clear()
+
+        try:
+            while True:
+                chunk = await upload.read(self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                total_size += len(chunk)
+                if total_size > max_bytes:
+                    raise FileTooLargeError(max_bytes)
+                await asyncio.to_thread(_update_hashers, chunk, hasher, content_hasher)
+                buffer.extend(chunk)
+                if len(buffer) >= self.part_size:
+                    await flush_part()
+            if buffer or not parts:
+                # Last part may be smaller than the minimum (or empty for an empty file)
+                await flush_part()
+            await self._call(
+                "complete_multipart_upload",
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": parts},
+            )
+        except BaseException:
+            try:
+                await self._call(
+                    "abort_multipart_upload",
+                    missing_ok=True,
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                )
+            except StorageError:
+                pass  # Incomplete uploads are also reaped by bucket lifecycle rules
+            raise
+        finally:
+            await upload.close()
+
+        return StoredFile(
+            key=key,
+            path=None,
+            size_bytes=total_size,
+            etag=hasher.hexdigest(),
+            sha256=content_hasher.hexdigest(),
+        )
+
+    async def write_bytes(self, key: str, data: bytes, content_type: str) -> None:
+        await self._call(
+            "put_object", Bucket=self.bucket, Key=key, Body=data, ContentType=content_type
+        )
+
+    async def read_bytes(self, key: str) -> bytes:
+        response = await self._call("get_object", missing_ok=True, Bucket=self.bucket, Key=key)
+        if response is None:
+            raise FileNotFoundError(f"Object not found: {self.bucket}/{key}")
+        body = response["Body"]
+        try:
+            return await asyncio.to_thread(body.read)
+        finally:
+            body.close()
+
+    async def iter_bytes(
+        self, key: str, start: int = 0, end: int | None = None
+    ) -> AsyncIterator[bytes]:
+        params: dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if start or end is not None:
+            params["Range"] = f"bytes={start}-{'' if end is None else end}"
+        response = await self._call("get_object", missing_ok=True, **params)
+        if response is None:
+            raise FileNotFoundError(f"Object not found: {self.bucket}/{key}")
+        body = response["Body"]
+        try:
+            while True:
+                chunk = await asyncio.to_thread(body.read, self.CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            body.close()
+
+    async def exists(self, key: str) -> bool:
+        response = await self._call("head_object", missing_ok=True, Bucket=self.bucket, Key=key)
+        return response is not None
+
+    async def delete(self, key: str) -> None:
+        try:
+            await self._call("delete_object", Bucket=self.bucket, Key=key)
+        except StorageError:
+            pass
+
+    @asynccontextmanager
+    async def local_copy(self, key: str):
+        if not await self.exists(key):
+            raise FileNotFoundError(f"Object not found: {self.bucket}/{key}")
+        fd, name = tempfile.mkstemp(suffix=Path(key).suffix)
+        os.close(fd)
+        path = Path(name)
+        try:
+            await self._call("download_file", Bucket=self.bucket, Key=key, Filename=name)
+            yield path
+        finally:
+            path.unlink(missing_ok=True)
+
+    async def presigned_url(self, key: str, filename: str | None = None) -> str | None:
+        params: dict[str, Any] = {"Bucket": self.bucket, "Key": key}
+        if filename:
+            params["ResponseContentDisposition"] = f'attachment; filename="{filename}"'
+        return await asyncio.to_thread(
+            self.client.generate_presigned_url,
+            "get_object",
+            Params=params,
+            ExpiresIn=self.presign_ttl_sec,
+        )
+
+    async def _call(self, method: str, missing_ok: bool = False, **kwargs: Any) -> Any:
+        """
+        Run a boto3 client method in the thread pool.
+
+        With ``missing_ok``, 404/NoSuchKey/NoSuchBucket/NoSuchUpload errors
+        return None instead of raising.
+        """
+        try:
+            return await asyncio.to_thread(getattr(self.client, method), **kwargs)
+        except Exception as exc:
+            error = getattr(exc, "response", {}).get("Error", {})
+            code = str(error.get("Code", ""))
+            if missing_ok and code in _S3_MISSING_CODES:
+                return None
+            if isinstance(exc, StorageError):
+                raise
+            raise StorageError(f"S3 {method} failed: {exc}") from exc
+
+
+_S3_STORAGES: dict[tuple[Any, ...], S3ReportStorage] = {}
+
+
+def get_report_storage(
+    storage: str | None = None, config: Settings | None = None
+) -> ReportStorage:
+    """
+    Return the storage backend for a FileRef.storage value.
+
+    Args:
+        storage: "LOCAL" or "MINIO"; defaults to ``config.file_storage`` (new uploads)
+        config: Settings to read paths/credentials from (defaults to app settings)
+
+    Raises:
+        StorageError: If MINIO is requested and boto3 is not installed
+    """
+    if config is None:
+        from app.core.config import settings as config
+    storage = storage or config.file_storage
+
+    if storage != "MINIO":
+        return LocalReportStorage(config.file_storage_base)
+
+    cache_key = (
+        config.s3_endpoint_url,
+        config.s3_access_key,
+        config.s3_bucket,
+        config.s3_region,
+        config.s3_multipart_chunk_mb,
+        config.s3_presign_ttl_sec,
+    )
+    backend = _S3_STORAGES.get(cache_key)
+    if backend is None:
+        backend = S3ReportStorage(
+            bucket=config.s3_bucket,
+            endpoint_url=config.s3_endpoint_url,
+            access_key=config.s3_access_key,
+            secret_key=config.s3_secret_key,
+            region=config.s3_region,
+            part_size=config.s3_multipart_chunk_mb * 1024 * 1024,
+            presign_ttl_sec=config.s3_presign_ttl_sec,
+        )
+        _S3_STORAGES[cache_key] = backend
+    return backend
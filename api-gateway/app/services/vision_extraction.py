@@ -13,7 +13,6 @@ from __future__ import annotations
 
 import asyncio
 import io
-import json
 import logging
 import re
 from dataclasses import dataclass
@@ -23,6 +22,8 @@ from PIL import Image
 
 from app.clients.pool_client import GeminiPoolClient
 from app.core.config import settings
+from app.schemas.metric import MetricsExtractionResponse
+from app.services.metric_extraction import parse_vision_metrics
 from app.services.vision_prompts import IMPROVED_VISION_PROMPT
 
 logger = logging.getLogger(__name__)
@@ -282,24 +283,18 @@ class VisionMetricExtractor:
             mime_type="image/png",
             response_mime_type="application/json",
             timeout=60,
+            response_schema=MetricsExtractionResponse,
         )
 
         # Parse response
         try:
             text = response["candidates"][0]["content"]["parts"][0]["text"]
-            data = json.loads(text)
-            metrics = data.get("metrics", [])
-
-            if not isinstance(metrics, list):
-                logger.warning(f"Response 'metrics' is not a list: {type(metrics)}")
-                return []
-
-            return metrics
-
-        except (KeyError, json.JSONDecodeError, IndexError) as e:
+        except (KeyError, IndexError, TypeError) as e:
             logger.error(f"Failed to parse Gemini response: {e}")
             return []
 
+        return parse_vision_metrics(text)
+
     def _extract_and_filter_values(
         self, raw_metrics: list[dict[str, str]]
     ) -> list[ExtractedMetric]:
@@ -161,3 +161,28 @@ IMPROVED_VISION_PROMPT = """Ты — эксперт по анализу визу
 
 Теперь проанализируй изображение и верни JSON со всеми найденными метриками:
 """
+
+# Section attribution for multi-report canvases (batched extraction).
+# The canvas is split by header bands "SECTION <n>", one section per report.
+SECTION_HEADER_TEMPLATE = "SECTION {number}"
+
+BATCH_VISION_PROMPT = (
+    IMPROVED_VISION_PROMPT
+    + """
+ДОПОЛНИТЕЛЬНО: ИЗОБРАЖЕНИЕ РАЗБИТО НА СЕКЦИИ
+Изображение состоит из нескольких секций. Каждая секция начинается с заголовка
+вида «SECTION 1», «SECTION 2» и т.д. (крупный текст над горизонтальной чертой).
+Заголовки секций НЕ являются метриками — не извлекай их.
+
+Для КАЖДОЙ метрики добавь поле "section" — номер секции (целое число), в которой
+находится метрика:
+```json
+{
+  "metrics": [
+    {"label": "РАБОТА С ДОКУМЕНТАМИ", "value": "6.4", "section": 1},
+    {"label": "ЛИДЕРСТВО", "value": "7.1", "section": 2}
+  ]
+}
+```
+"""
+)
@@ -0,0 +1,346 @@
+"""
+Compiled weight tables shared by every scoring path.
+
+Scoring used to re-query the professional activity, its weight table and all
+active metric definitions, and to re-parse the JSONB weights into Decimals on
+every call. ``WeightCatalog`` holds all of that parsed once per process:
+
+- activities by code
+- weight tables by activity code: metric codes in table order, Decimal
+  weights and the sum check result
+- active metric definitions (names and units)
+- the metrics × activities float matrix for vectorized scoring
+  (``bulk_scoring.CompiledWeights``)
+- per activity, a content fingerprint of what a final report shows from the
+  catalog (activity name, weights, names and units of the weighted metrics)
+
+With a warm catalog ``calculate_score`` reads only the participant metrics.
+
+Invalidation: weight table, metric definition and activity writes call
+``invalidate``, which bumps the version counter in Redis and publishes it on
+a pub/sub channel. Every process runs a listener thread that marks its copy
+stale on a message (or when it reconnects and the version moved), so the next
+``get`` reloads. Entries also expire after WEIGHT_CACHE_TTL_SEC, which bounds
+staleness while Redis is unavailable.
+
+The snapshots are plain objects, not ORM rows: they are shared across
+sessions, event loops and threads and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import redis
+
+from app.core.cache import REDIS_FAILURE_BACKOFF_S, CacheStats, SharedRedis
+from app.core.config import settings
+from app.services.bulk_scoring import ActivityWeights, CompiledWeights, compile_weight_tables
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "cache:weights:"
+VERSION_KEY = f"{KEY_PREFIX}version"
+CHANNEL = f"{KEY_PREFIX}invalidate"
+
+
+@dataclass(frozen=True, slots=True)
+class ActivitySnapshot:
+    """Professional activity fields used by scoring."""
+
+    id: UUID
+    code: str
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class MetricDefSnapshot:
+    """Active metric definition fields used by scoring and reports."""
+
+    code: str
+    name: str
+    name_ru: str | None
+    unit: str | None
+
+
+@dataclass(frozen=True, slots=True)
+class WeightTableSnapshot:
+    """
+    Parsed weight table (duck-compatible with WeightTable where scoring reads it).
+
+    ``weights`` keeps the raw JSONB entries for cache keys and prompts;
+    ``weights_map`` holds the Decimal weights in table order; ``error`` is set
+    when the weights do not sum to 1.0.
+    """
+
+    id: UUID
+    prof_activity_id: UUID
+    prof_activity: ActivitySnapshot
+    weights: list[dict[str, Any]]
+    weights_map: dict[str, Decimal]
+    error: str | None
+
+    @property
+    def metric_codes(self) -> tuple[str, ...]:
+        return tuple(self.weights_map)
+
+
+@dataclass(slots=True)
+class WeightCatalog:
+    """Everything scoring needs besides participant metrics."""
+
+    version: int
+    activities: dict[str, ActivitySnapshot]
+    weight_tables: dict[str, WeightTableSnapshot]
+    metric_defs: dict[str, MetricDefSnapshot]
+    compiled: CompiledWeights = field(init=False)
+    fingerprints: dict[str, str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self.compiled = compile_weight_tables(list(self.weight_tables.values()))
+        self.fingerprints = {
+            code: self._fingerprint(weight_table)
+            for code, weight_table in self.weight_tables.items()
+        }
+
+    def _fingerprint(self, weight_table: WeightTableSnapshot) -> str:
+        # Content, not the shared version: the version stays 0 without Redis
+        used_defs = [
+            (code, metric_def.name, metric_def.name_ru, metric_def.unit)
+            if (metric_def := self.metric_defs.get(code))
+            else (code,)
+            for code in sorted(weight_table.weights_map)
+        ]
+        content = [
+            str(weight_table.id),
+            weight_table.prof_activity.name,
+            [(code, str(weight)) for code, weight in weight_table.weights_map.items()],
+            used_defs,
+        ]
+        return hashlib.sha256(json.dumps(content).encode()).hexdigest()[:16]
+
+    def compiled_activity(self, prof_activity_code: str) -> ActivityWeights:
+        """
+        Scorable weights of one activity.
+
+        Raises:
+            ValueError: If the activity has no weight table or its weights are invalid
+        """
+        for activity in self.compiled.activities:
+            if activity.code == prof_activity_code:
+                return activity
+        raise ValueError(
+            self.compiled.skipped.get(prof_activity_code)
+            or f"No weight table for activity '{prof_activity_code}'"
+        )
+
+
+def parse_weight_table(weight_table: Any, activity: ActivitySnapshot) -> WeightTableSnapshot:
+    """Snapshot a WeightTable row, validating the sum of weights like ``calculate_score``."""
+    weights = [dict(entry) for entry in weight_table.weights]
+    weights_map = {entry["metric_code"]: Decimal(entry["weight"]) for entry in weights}
+    total = sum(weights_map.values())
+    return WeightTableSnapshot(
+        id=weight_table.id,
+        prof_activity_id=activity.id,
+        prof_activity=activity,
+        weights=weights,
+        weights_map=weights_map,
+        error=None if total == Decimal("1.0") else f"Sum of weights must equal 1.0, got {total}",
+    )
+
+
+async def load_weight_catalog(
+    prof_activity_repo: Any, weight_table_repo: Any, metric_def_repo: Any, version: int = 0
+) -> WeightCatalog:
+    """Build a catalog with three queries (activities, weight tables, metric definitions)."""
+    activities = {
+        row.code: ActivitySnapshot(id=row.id, code=row.code, name=row.name)
+        for row in await prof_activity_repo.list_all()
+    }
+    weight_tables: dict[str, WeightTableSnapshot] = {}
+    for row in await weight_table_repo.list_all():
+        code = row.prof_activity.code
+        activity = activities.get(code) or ActivitySnapshot(
+            id=row.prof_activity.id, code=code, name=row.prof_activity.name
+        )
+        # list_all orders newest first within an activity
+        weight_tables.setdefault(code, parse_weight_table(row, activity))
+    metric_defs = {
+        row.code: MetricDefSnapshot(
+            code=row.code, name=row.name, name_ru=row.name_ru, unit=row.unit
+        )
+        for row in await metric_def_repo.list_all(active_only=True)
+    }
+    return WeightCatalog(
+        version=version,
+        activities=activities,
+        weight_tables=weight_tables,
+        metric_defs=metric_defs,
+    )
+
+
+class WeightCatalogCache:
+    """
+    Process-wide WeightCatalog with cross-process invalidation.
+
+    Args:
+        redis_url: Redis for the version counter and the invalidation channel
+        subscribe: Start the pub/sub listener thread (off in unit tests)
+        clock: Monotonic time source (overridable in tests)
+    """
+
+    def __init__(
+        self,
+        redis_url: str | None = None,
+        subscribe: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._redis = SharedRedis("weight_cache", redis_url)
+        self._subscribe = subscribe
+        self._clock = clock
+        self._listener_pid: int | None = None
+        self._catalog: WeightCatalog | None = None
+        self._loaded_at = 0.0
+        self._stale = False
+        self.counters = CacheStats()
+        self.reloads = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return settings.weight_cache_enabled
+
+    @staticmethod
+    def _read_version(client: redis.Redis) -> int:
+        return int(client.get(VERSION_KEY) or 0)
+
+    def _shared_version(self) -> int | None:
+        return self._redis.run("version", self._read_version)
+
+    def _fresh(self) -> bool:
+        return (
+            self._catalog is not None
+            and not self._stale
+            and self._clock() - self._loaded_at < settings.weight_cache_ttl_sec
+        )
+
+    async def get(self, loader: Callable[[int], Awaitable[WeightCatalog]]) -> WeightCatalog:
+        """
+        Return the cached catalog, loading it on a miss.
+
+        Args:
+            loader: Builds a catalog for a version (``load_weight_catalog`` bound
+                to the caller's repositories)
+        """
+        if not self.enabled:
+            return await loader(0)
+
+        self._ensure_listener()
+        if self._fresh():
+            self.counters.hits += 1
+            return self._catalog
+
+        self.counters.misses += 1
+        # Cleared before loading: an invalidation that arrives meanwhile wins
+        self._stale = False
+        version = await self._redis.arun("version", self._read_version)
+        catalog = await loader(version or 0)
+        self._catalog, self._loaded_at = catalog, self._clock()
+        self.reloads += 1
+        logger.info(
+            "weight_cache_loaded",
+            extra={"version": catalog.version, "weight_tables": len(catalog.weight_tables)},
+        )
+        return catalog
+
+    async def invalidate(self, reason: str = "") -> None:
+        """Drop the catalog here and, through Redis pub/sub, in every other process."""
+        self._stale = True
+        self.invalidations += 1
+        if not self.enabled:
+            return
+
+        def bump(client: redis.Redis) -> int:
+            version = client.incr(VERSION_KEY)
+            client.publish(CHANNEL, str(version))
+            return version
+
+        if (version := await self._redis.arun("invalidate", bump)) is None:
+            return
+        logger.info("weight_cache_invalidated", extra={"version": version, "reason": reason})
+
+    def _ensure_listener(self) -> None:
+        # Threads do not survive fork: start one per (worker) process
+        if not self._subscribe or self._listener_pid == os.getpid():
+            return
+        self._listener_pid = os.getpid()
+        threading.Thread(target=self._listen, name="weight-cache-invalidation", daemon=True).start()
+
+    def _listen(self) -> None:
+        while True:
+            try:
+                client = redis.Redis.from_url(
+                    self._redis.url, socket_connect_timeout=1, health_check_interval=30
+                )
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(CHANNEL)
+                # Messages may have been missed while disconnected
+                catalog = self._catalog
+                if catalog is not None and int(client.get(VERSION_KEY) or 0) != catalog.version:
+                    self._stale = True
+                for message in pubsub.listen():
+                    if message["type"] == "message":
+                        self._stale = True
+            except redis.RedisError as exc:
+                self._stale = True
+                logger.warning("weight_cache_listener_disconnected", extra={"error": str(exc)})
+                time.sleep(REDIS_FAILURE_BACKOFF_S)
+
+    def stats(self) -> dict[str, Any]:
+        """Hit-rate counters of this process and the shared version (None without Redis)."""
+        catalog = self._catalog
+        return {
+            "enabled": self.enabled,
+            "local": {
+                **self.counters.as_dict(),
+                "reloads": self.reloads,
+                "invalidations": self.invalidations,
+                "version": catalog.version if catalog is not None else None,
+                "weight_tables": len(catalog.weight_tables) if catalog is not None else 0,
+            },
+            "shared": {"version": self._shared_version()},
+        }
+
+
+_cache: WeightCatalogCache | None = None
+
+
+def get_weight_catalog_cache() -> WeightCatalogCache:
+    global _cache
+    if _cache is None:
+        _cache = WeightCatalogCache()
+    return _cache
+
+
+async def get_weight_catalog(
+    prof_activity_repo: Any, weight_table_repo: Any, metric_def_repo: Any
+) -> WeightCatalog:
+    """Cached catalog, loaded through the caller's repositories on a miss."""
+
+    async def load(version: int) -> WeightCatalog:
+        return await load_weight_catalog(
+            prof_activity_repo, weight_table_repo, metric_def_repo, version=version
+        )
+
+    return await get_weight_catalog_cache().get(load)
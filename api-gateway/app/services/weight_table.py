@@ -19,6 +19,8 @@ from app.schemas.weight_table import (
     WeightTableResponse,
     WeightTableUploadRequest,
 )
+from app.services.ranking import RankingService
+from app.services.weight_catalog import get_weight_catalog_cache
 
 
 class WeightTableService:
@@ -66,6 +68,8 @@ class WeightTableService:
                 metadata=payload.metadata,
             )
 
+        await get_weight_catalog_cache().invalidate("weight_table_upload")
+        await RankingService(self.db).refresh_activity(prof_activity.code)
         return self._serialize(weight_table, prof_activity=prof_activity)
 
     async def list_weight_tables(
@@ -118,6 +122,8 @@ class WeightTableService:
             metadata=payload.metadata,
         )
 
+        await get_weight_catalog_cache().invalidate("weight_table_update")
+        await RankingService(self.db).refresh_activity(prof_activity.code)
         return self._serialize(updated_table, prof_activity=prof_activity)
 
     def _serialize(
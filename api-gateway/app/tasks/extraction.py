@@ -5,6 +5,7 @@ Celery tasks for DOCX extraction and image processing.
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import threading
 import time
@@ -19,11 +20,24 @@ from sqlalchemy.orm import selectinload, sessionmaker
 
 from app.core.celery_app import celery_app
 from app.core.config import Settings
+from app.core.events import (
+    STAGE_RETRY_SCHEDULED,
+    STAGE_STARTED,
+    ExtractionProgress,
+    publish_report_status,
+)
 from app.core.logging import log_context
 from app.db.models import FileRef, Report
+from app.repositories.extraction_checkpoint import (
+    STAGE_IMAGES_STORED,
+    ExtractionCheckpointRepository,
+)
+from app.repositories.report import ReportRepository
 from app.repositories.report_image import ReportImageRepository
 from app.services.docx_extraction import DocxExtractionError, DocxImageExtractor
-from app.services.storage import LocalReportStorage
+from app.services.report_dedup import ReportDedupService
+from app.services.storage import ReportStorage, get_report_storage
+from app.tasks.pipeline import schedule_if_ready
 
 logger = logging.getLogger(__name__)
 
@@ -76,6 +90,175 @@ def _run_coroutine_blocking(coro: Coroutine[Any, Any, Any]) -> Any:
     return future.result()
 
 
+async def _store_report_images(
+    session: AsyncSession,
+    report: Report,
+    storage: ReportStorage,
+) -> int:
+    """
+    Extract images from the report DOCX, save them to storage and create records.
+
+    Idempotent for retries: images whose order_index already has a ReportImage
+    row are skipped, existing FileRefs are reused.
+
+    Returns:
+        Number of images stored for the report (including already existing)
+    """
+    report_id = str(report.id)
+
+    # 2. Get file (object storage downloads it to a temporary file)
+    file_key = report.file_ref.key
+
+    if not await storage.exists(file_key):
+        logger.error(
+            "task_report_file_missing",
+            extra={"report_id": report_id, "path": file_key},
+        )
+        raise FileNotFoundError(f"Report file not found: {file_key}")
+
+    logger.info(
+        "task_report_extracting",
+        extra={"report_id": report_id, "path": file_key},
+    )
+
+    # 3. Extract images
+    extractor = DocxImageExtractor()
+    async with storage.local_copy(file_key) as file_path:
+        extracted_images = extractor.extract_images(file_path)
+
+    # 4. Save images and create records
+    report_image_repo = ReportImageRepository(session)
+    saved_count = 0
+
+    logger.info(
+        "task_report_images_found",
+        extra={"report_id": report_id, "image_count": len(extracted_images)},
+    )
+
+    # Load existing images once to avoid duplicate processing on retries
+    existing_images = await report_image_repo.get_by_report_id(report.id)
+    existing_order_indices = {ri.order_index for ri in existing_images}
+
+    for img in extracted_images:
+        # Check if ReportImage already exists for this report and order_index
+        # (handles retry scenarios)
+        if img.order_index in existing_order_indices:
+            logger.debug(
+                "task_report_image_skipped_exists",
+                extra={"report_id": report_id, "order_index": img.order_index},
+            )
+            saved_count += 1
+            continue
+
+        # Convert to PNG for consistency
+        png_data = extractor.convert_to_png(img.data)
+
+        # Content-addressed key: identical images are stored once and shared
+        sha256 = hashlib.sha256(png_data).hexdigest()
+        image_key = storage.image_blob_key(sha256)
+        if not await storage.exists(image_key):
+            await storage.write_bytes(image_key, png_data, "image/png")
+
+            logger.debug(
+                "task_report_image_saved",
+                extra={
+                    "report_id": report_id,
+                    "image_key": image_key,
+                    "bytes": len(png_data),
+                },
+            )
+
+        # Reuse the blob's FileRef when another image (or report) already has it
+        stmt_file_ref = select(FileRef).where(
+            FileRef.storage == storage.storage_type,
+            FileRef.bucket == storage.bucket,
+            FileRef.key == image_key,
+        )
+        result_file_ref = await session.execute(stmt_file_ref)
+        file_ref = result_file_ref.scalar_one_or_none()
+
+        if file_ref:
+            await ReportRepository(session).acquire_file_ref(file_ref.id)
+            logger.debug(
+                "task_file_ref_reused",
+                extra={
+                    "report_id": report_id,
+                    "file_ref_id": str(file_ref.id),
+                    "image_key": image_key,
+                },
+            )
+        else:
+            # Create FileRef
+            file_ref = FileRef(
+                id=uuid.uuid4(),
+                storage=storage.storage_type,
+                bucket=storage.bucket,
+                key=image_key,
+                mime="image/png",
+                size_bytes=len(png_data),
+                sha256=sha256,
+                ref_count=1,
+            )
+            session.add(file_ref)
+            await session.flush()
+
+        # Create ReportImage
+        await report_image_repo.create(
+            report_id=report.id,
+            file_ref_id=file_ref.id,
+            kind="TABLE",  # Default to TABLE, can be refined later
+            page=img.page,
+            order_index=img.order_index,
+        )
+        saved_count += 1
+
+    return saved_count
+
+
+def _apply_metrics_status(report: Report, metrics_result: dict[str, Any]) -> None:
+    """Set report status (EXTRACTED/FAILED) from metric extraction result."""
+    report_id = str(report.id)
+    metrics_saved = metrics_result.get("metrics_saved", 0)
+    errors = metrics_result.get("errors", [])
+
+    if metrics_saved > 0:
+        # Success: at least some metrics were saved to participant_metric
+        report.status = "EXTRACTED"
+        report.extracted_at = datetime.now(UTC)
+        report.extract_error = None
+        logger.info(
+            "task_report_status_extracted",
+            extra={
+                "report_id": report_id,
+                "metrics_saved": metrics_saved,
+            },
+        )
+    else:
+        # Failure: no metrics saved to participant_metric
+        if errors:
+            # Critical error during metric extraction/saving
+            error_msg = errors[0].get("error", "Unknown error")
+            report.status = "FAILED"
+            report.extract_error = f"Failed to save metrics: {error_msg}"
+            logger.error(
+                "task_report_status_error_no_metrics_saved",
+                extra={
+                    "report_id": report_id,
+                    "error": error_msg,
+                    "total_errors": len(errors),
+                },
+            )
+        else:
+            # No errors, but no metrics found (e.g., empty images)
+            report.status = "EXTRACTED"
+            report.extracted_at = datetime.now(UTC)
+            report.extract_error = None
+            logger.warning(
+                "task_report_status_extracted_no_metrics",
+                extra={"report_id": report_id},
+            )
+
+
 @celery_app.task(
     name="app.tasks.extraction.extract_images_from_report",
     bind=True,
@@ -136,116 +319,48 @@ def extract_images_from_report(self, report_id: str, request_id: str | None = No
                         "reason": f"Report status is {report.status}, expected UPLOADED or PROCESSING",
                     }
 
-                # 2. Get file path
-                storage = LocalReportStorage(settings.file_storage_base)
-                file_path = storage.resolve_path(report.file_ref.key)
+                publish_report_status(report, stage=STAGE_STARTED)
 
-                if not file_path.exists():
-                    logger.error(
-                        "task_report_file_missing",
-                        extra={"report_id": report_id, "path": str(file_path)},
+                # 1a. Same file already extracted for another report: reuse results
+                if await ReportDedupService(session).reuse_extraction(report):
+                    publish_report_status(report)
+                    await schedule_if_ready(session, [report.participant_id], request_id)
+                    reused_images = await ReportImageRepository(session).get_by_report_id(
+                        report_uuid
                     )
-                    raise FileNotFoundError(f"Report file not found: {file_path}")
-
-                logger.info(
-                    "task_report_extracting",
-                    extra={"report_id": report_id, "path": str(file_path)},
-                )
-
-                # 3. Extract images
-                extractor = DocxImageExtractor()
-                extracted_images = extractor.extract_images(file_path)
+                    logger.info("task_report_reused", extra={"report_id": report_id})
+                    return {
+                        "status": "success",
+                        "report_id": report_id,
+                        "reused": True,
+                        "images_extracted": len(reused_images),
+                        "metrics_extracted": 0,
+                        "metrics_saved": 0,
+                        "metric_errors": [],
+                    }
 
-                # 4. Save images and create records
+                # 2-4. Extract images, save them and create records
+                # (skipped entirely when a previous attempt already stored them)
+                # Images go to the backend that holds the report document
+                storage = get_report_storage(report.file_ref.storage, settings)
                 report_image_repo = ReportImageRepository(session)
-                saved_count = 0
-
-                logger.info(
-                    "task_report_images_found",
-                    extra={"report_id": report_id, "image_count": len(extracted_images)},
+                checkpoints = ExtractionCheckpointRepository(
+                    session, on_save=ExtractionProgress(report)
                 )
+                saved_state = await checkpoints.load(report_uuid)
 
-                # Load existing images once to avoid duplicate processing on retries
-                existing_images = await report_image_repo.get_by_report_id(report_uuid)
-                existing_order_indices = {ri.order_index for ri in existing_images}
-
-                for img in extracted_images:
-                    # Generate storage key for image
-                    participant_id = str(report.participant_id)
-                    image_filename = f"image_{img.order_index}.png"
-                    image_key = f"reports/{participant_id}/{report_id}/images/{image_filename}"
-
-                    # Check if ReportImage already exists for this report and order_index
-                    # (handles retry scenarios)
-                    if img.order_index in existing_order_indices:
-                        logger.debug(
-                            "task_report_image_skipped_exists",
-                            extra={
-                                "report_id": report_id,
-                                "order_index": img.order_index,
-                                "image_key": image_key,
-                            },
-                        )
-                        saved_count += 1
-                        continue
-
-                    # Convert to PNG for consistency
-                    png_data = extractor.convert_to_png(img.data)
-
-                    # Save to storage
-                    image_path = storage.resolve_path(image_key)
-                    image_path.parent.mkdir(parents=True, exist_ok=True)
-                    image_path.write_bytes(png_data)
-
-                    logger.debug(
-                        "task_report_image_saved",
-                        extra={
-                            "report_id": report_id,
-                            "image_key": image_key,
-                            "bytes": len(png_data),
-                        },
-                    )
-
-                    # Check if FileRef already exists (handles retry scenarios)
-                    stmt_file_ref = select(FileRef).where(
-                        FileRef.storage == "LOCAL",
-                        FileRef.bucket == "local",
-                        FileRef.key == image_key,
+                if (STAGE_IMAGES_STORED, 0) in saved_state:
+                    saved_count = saved_state[(STAGE_IMAGES_STORED, 0)]["images"]
+                    logger.info(
+                        "task_report_resumed",
+                        extra={"report_id": report_id, "stage": STAGE_IMAGES_STORED},
                     )
-                    result_file_ref = await session.execute(stmt_file_ref)
-                    file_ref = result_file_ref.scalar_one_or_none()
-
-                    if file_ref:
-                        logger.debug(
-                            "task_file_ref_reused",
-                            extra={
-                                "report_id": report_id,
-                                "file_ref_id": str(file_ref.id),
-                                "image_key": image_key,
-                            },
-                        )
-                    else:
-                        # Create FileRef
-                        file_ref = FileRef(
-                            id=uuid.uuid4(),
-                            storage="LOCAL",
-                            bucket="local",
-                            key=image_key,
-                            mime="image/png",
-                            size_bytes=len(png_data),
-                        )
-                        session.add(file_ref)
-                        await session.flush()
-
-                    # Create ReportImage
-                    await report_image_repo.create(
-                        report_id=report_uuid,
-                        file_ref_id=file_ref.id,
-                        kind="TABLE",  # Default to TABLE, can be refined later
-                        page=img.page,
-                        order_index=img.order_index,
+                else:
+                    saved_count = await _store_report_images(session, report, storage)
+                    # Commits the stored images together with the checkpoint
+                    await checkpoints.save(
+                        report_uuid, STAGE_IMAGES_STORED, {"images": saved_count}
                     )
-                    saved_count += 1
 
                 # 5. Extract metrics from images using Gemini Vision
                 metrics_result = {}
@@ -260,7 +375,7 @@ def extract_images_from_report(self, report_id: str, request_id: str | None = No
                     if report_images:
                         metric_service = MetricExtractionService(session)
                         metrics_result = await metric_service.extract_metrics_from_report_images(
-                            report_uuid, report_images
+                            report_uuid, report_images, checkpoints=checkpoints
                         )
 
                         logger.info(
@@ -302,48 +417,34 @@ def extract_images_from_report(self, report_id: str, request_id: str | None = No
                                 extra={"report_id": report_id, "error": str(close_exc)},
                             )
 
-                # 6. Update report status based on metrics_saved
-                metrics_saved = metrics_result.get("metrics_saved", 0)
-                errors = metrics_result.get("errors", [])
-
-                if metrics_saved > 0:
-                    # Success: at least some metrics were saved to participant_metric
-                    report.status = "EXTRACTED"
-                    report.extracted_at = datetime.now(UTC)
-                    report.extract_error = None
-                    logger.info(
-                        "task_report_status_extracted",
-                        extra={
-                            "report_id": report_id,
-                            "metrics_saved": metrics_saved,
-                        },
+                # 6. Retry failed Vision groups; finished groups are checkpointed
+                failed_groups = metrics_result.get("failed_groups") or []
+                if failed_groups and self.request.retries < self.max_retries:
+                    await session.commit()
+                    publish_report_status(
+                        report,
+                        stage=STAGE_RETRY_SCHEDULED,
+                        progress={"failed_groups": failed_groups},
                     )
-                else:
-                    # Failure: no metrics saved to participant_metric
-                    if errors:
-                        # Critical error during metric extraction/saving
-                        error_msg = errors[0].get("error", "Unknown error")
-                        report.status = "FAILED"
-                        report.extract_error = f"Failed to save metrics: {error_msg}"
-                        logger.error(
-                            "task_report_status_error_no_metrics_saved",
-                            extra={
-                                "report_id": report_id,
-                                "error": error_msg,
-                                "total_errors": len(errors),
-                            },
-                        )
-                    else:
-                        # No errors, but no metrics found (e.g., empty images)
-                        report.status = "EXTRACTED"
-                        report.extracted_at = datetime.now(UTC)
-                        report.extract_error = None
-                        logger.warning(
-                            "task_report_status_extracted_no_metrics",
-                            extra={"report_id": report_id},
-                        )
+                    logger.warning(
+                        "task_report_retry_scheduled",
+                        extra={"report_id": report_id, "failed_groups": failed_groups},
+                    )
+                    return {
+                        "status": "retry",
+                        "report_id": report_id,
+                        "failed_groups": failed_groups,
+                    }
+
+                # 7. Update report status based on metrics_saved
+                _apply_metrics_status(report, metrics_result)
+                if report.status == "EXTRACTED":
+                    await checkpoints.clear(report_uuid)
 
                 await session.commit()
+                publish_report_status(report)
+                if report.status == "EXTRACTED":
+                    await schedule_if_ready(session, [report.participant_id], request_id)
 
                 logger.info(
                     "task_report_success",
@@ -377,6 +478,7 @@ def extract_images_from_report(self, report_id: str, request_id: str | None = No
                     report.status = "FAILED"
                     report.extract_error = f"Extraction error: {str(exc)}"
                     await session.commit()
+                    publish_report_status(report)
 
                 return {
                     "status": "failed",
@@ -397,6 +499,7 @@ def extract_images_from_report(self, report_id: str, request_id: str | None = No
                     report.status = "FAILED"
                     report.extract_error = f"Unexpected error: {str(exc)}"
                     await session.commit()
+                    publish_report_status(report)
 
                 return {
                     "status": "failed",
@@ -445,4 +548,265 @@ def extract_images_from_report(self, report_id: str, request_id: str | None = No
                 "status": result.get("status"),
             },
         )
+        if result.get("status") == "retry":
+            # Resumes from checkpoints: only unfinished Vision groups are re-sent
+            raise self.retry(countdown=30 * 2**self.request.retries)
+        return result
+
+
+@celery_app.task(
+    name="app.tasks.extraction.extract_images_from_reports_batch",
+    bind=True,
+    max_retries=3,
+)
+def extract_images_from_reports_batch(
+    self, report_ids: list[str], request_id: str | None = None
+) -> dict:
+    """
+    Extract many reports at once, sharing Gemini Vision requests per participant.
+
+    This task:
+    1. Stores images of every report (same idempotent step as the single task)
+    2. Packs table images of each participant's reports into shared canvases
+    3. Fans parsed metrics back to reports, one participant_metric commit per participant
+    4. Updates every report status to EXTRACTED or FAILED
+
+    A participant whose extraction fails does not affect the others. Reports
+    that failed on Vision or transient errors stay PROCESSING and are retried
+    (only those reports) with exponential backoff, up to ``max_retries``.
+    """
+
+    async def _async_extract_batch() -> dict:
+        async_engine = create_async_engine(
+            settings.postgres_dsn,
+            echo=False,
+            pool_pre_ping=True,
+        )
+        AsyncSessionLocal = sessionmaker(
+            async_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        report_uuids = [uuid.UUID(report_id) for report_id in report_ids]
+        per_report: dict[str, dict[str, Any]] = {}
+
+        async with AsyncSessionLocal() as session:
+            try:
+                result = await session.execute(
+                    select(Report)
+                    .where(Report.id.in_(report_uuids))
+                    .options(selectinload(Report.file_ref))
+                )
+                reports = {report.id: report for report in result.scalars().all()}
+
+                for report_uuid in report_uuids:
+                    if report_uuid not in reports:
+                        per_report[str(report_uuid)] = {"status": "failed", "error": "not found"}
+
+                # 1. Store images report by report (failures isolated per report)
+                report_image_repo = ReportImageRepository(session)
+                progress = ExtractionProgress(*reports.values())
+                checkpoints = ExtractionCheckpointRepository(session, on_save=progress)
+                dedup = ReportDedupService(session)
+                images_by_report = {}
+                extracted_participants: list[uuid.UUID] = []
+                for report_uuid, report in list(reports.items()):
+                    if report.status not in ("UPLOADED", "PROCESSING"):
+                        per_report[str(report.id)] = {
+                            "status": "skipped",
+                            "reason": f"Report status is {report.status}",
+                        }
+                        continue
+                    publish_report_status(report, stage=STAGE_STARTED)
+                    if await dedup.reuse_extraction(report):
+                        publish_report_status(report)
+                        extracted_participants.append(report.participant_id)
+                        per_report[str(report.id)] = {"status": "success", "reused": True}
+                        continue
+                    try:
+                        saved_state = await checkpoints.load(report_uuid)
+                        if (STAGE_IMAGES_STORED, 0) in saved_state:
+                            images_extracted = saved_state[(STAGE_IMAGES_STORED, 0)]["images"]
+                        else:
+                            storage = get_report_storage(report.file_ref.storage, settings)
+                            images_extracted = await _store_report_images(session, report, storage)
+                            await checkpoints.save(
+                                report_uuid, STAGE_IMAGES_STORED, {"images": images_extracted}
+                            )
+                    except (DocxExtractionError, FileNotFoundError) as exc:
+                        await session.rollback()
+                        report = reports[report_uuid] = await session.get(Report, report_uuid)
+                        report.status = "FAILED"
+                        report.extract_error = f"Extraction error: {str(exc)}"
+                        await session.commit()
+                        publish_report_status(report)
+                        per_report[str(report_uuid)] = {"status": "failed", "error": str(exc)}
+                        continue
+
+                    images_by_report[report.id] = await report_image_repo.get_by_report(report.id)
+                    per_report[str(report.id)] = {
+                        "status": "success",
+                        "images_extracted": images_extracted,
+                    }
+
+                # 2-3. Shared-canvas extraction
+                metrics_results: dict[uuid.UUID, dict[str, Any]] = {}
+                metric_service = None
+                try:
+                    from app.services.metric_extraction import MetricExtractionService
+
+                    if images_by_report:
+                        metric_service = MetricExtractionService(session)
+                        metrics_results = await metric_service.extract_metrics_from_reports_batch(
+                            images_by_report
+                        )
+                except Exception as exc:
+                    logger.error(
+                        "task_batch_metrics_extraction_failed",
+                        extra={"report_ids": report_ids, "error": str(exc)},
+                        exc_info=True,
+                    )
+                    await session.rollback()
+                    metrics_results = {
+                        report_uuid: {
+                            "metrics_extracted": 0,
+                            "metrics_saved": 0,
+                            "errors": [{"error": f"Metric extraction failed: {str(exc)}"}],
+                            "retryable": True,
+                        }
+                        for report_uuid in images_by_report
+                    }
+                finally:
+                    if metric_service is not None:
+                        try:
+                            await metric_service.close()
+                        except Exception as close_exc:
+                            logger.warning(
+                                "task_metric_service_close_failed",
+                                extra={"report_ids": report_ids, "error": str(close_exc)},
+                            )
+
+                unassigned_metrics = metric_service.unassigned_metrics if metric_service else []
+                if unassigned_metrics:
+                    logger.warning(
+                        "task_batch_unassigned_metrics",
+                        extra={"report_ids": report_ids, "count": len(unassigned_metrics)},
+                    )
+
+                # 4. Statuses; a failed participant was rolled back, so reports are re-read
+                can_retry = self.request.retries < self.max_retries
+                retry_report_ids: list[str] = []
+                for report_uuid, metrics_result in metrics_results.items():
+                    report = reports[report_uuid] = await session.get(Report, report_uuid)
+                    if can_retry and metrics_result.get("retryable"):
+                        retry_report_ids.append(str(report_uuid))
+                        per_report[str(report_uuid)].update(
+                            {"status": "retry", "metric_errors": metrics_result.get("errors", [])}
+                        )
+                        continue
+                    _apply_metrics_status(report, metrics_result)
+                    if report.status == "EXTRACTED":
+                        await checkpoints.clear(report_uuid)
+                    per_report[str(report_uuid)].update(
+                        {
+                            "metrics_extracted": metrics_result.get("metrics_extracted", 0),
+                            "metrics_saved": metrics_result.get("metrics_saved", 0),
+                            "metric_errors": metrics_result.get("errors", []),
+                        }
+                    )
+                gemini_requests = len(metric_service.payload_reports) if metric_service else 0
+                await session.commit()
+                for report_uuid in metrics_results:
+                    report = reports[report_uuid]
+                    if str(report_uuid) in retry_report_ids:
+                        publish_report_status(report, stage=STAGE_RETRY_SCHEDULED)
+                        continue
+                    publish_report_status(report)
+                    if report.status == "EXTRACTED":
+                        extracted_participants.append(report.participant_id)
+                await schedule_if_ready(session, extracted_participants, request_id)
+
+                logger.info(
+                    "task_batch_success",
+                    extra={
+                        "reports": len(report_ids),
+                        "extracted": len(metrics_results) - len(retry_report_ids),
+                        "retry": len(retry_report_ids),
+                        "gemini_requests": gemini_requests,
+                    },
+                )
+                return {
+                    "status": "retry" if retry_report_ids else "success",
+                    "gemini_requests": gemini_requests,
+                    "reports": per_report,
+                    "retry_report_ids": retry_report_ids,
+                    "unassigned_metrics": unassigned_metrics,
+                }
+
+            except Exception as exc:
+                logger.error(
+                    "task_batch_unexpected_error",
+                    extra={"report_ids": report_ids, "error": str(exc)},
+                    exc_info=True,
+                )
+                await session.rollback()
+                failed_reports = []
+                for report_uuid in report_uuids:
+                    report = await session.get(Report, report_uuid)
+                    if report and report.status in ("UPLOADED", "PROCESSING"):
+                        report.status = "FAILED"
+                        report.extract_error = f"Unexpected error: {str(exc)}"
+                        failed_reports.append(report)
+                await session.commit()
+                for report in failed_reports:
+                    publish_report_status(report)
+                return {"status": "failed", "error": str(exc), "reports": per_report}
+            finally:
+                await async_engine.dispose()
+
+    task_id = getattr(self.request, "id", None)
+    start = time.perf_counter()
+
+    with log_context(request_id=request_id, task_id=task_id):
+        logger.info(
+            "task_started",
+            extra={
+                "event": "task_started",
+                "task_name": "extract_images_from_reports_batch",
+                "report_count": len(report_ids),
+            },
+        )
+        try:
+            result = _run_coroutine_blocking(_async_extract_batch())
+        except Exception:
+            duration_ms = round((time.perf_counter() - start) * 1000, 2)
+            logger.exception(
+                "task_failed",
+                extra={
+                    "event": "task_failed",
+                    "task_name": "extract_images_from_reports_batch",
+                    "report_count": len(report_ids),
+                    "duration_ms": duration_ms,
+                },
+            )
+            raise
+
+        duration_ms = round((time.perf_counter() - start) * 1000, 2)
+        logger.info(
+            "task_completed",
+            extra={
+                "event": "task_completed",
+                "task_name": "extract_images_from_reports_batch",
+                "report_count": len(report_ids),
+                "duration_ms": duration_ms,
+                "status": result.get("status"),
+            },
+        )
+        if result.get("status") == "retry":
+            # Only the failed reports are re-queued; their stored images are reused
+            raise self.retry(
+                args=[result["retry_report_ids"]],
+                kwargs={"request_id": request_id},
+                countdown=30 * 2**self.request.retries,
+            )
         return result
@@ -0,0 +1,243 @@
+"""
+Celery tasks for the auto-scoring pipeline (opt-in, AUTO_SCORING_PIPELINE_ENABLED).
+
+When the last report of a participant reaches EXTRACTED, the extraction task
+calls ``schedule_if_ready``, which starts a chain:
+
+    score_participant_activities(participant, codes): every configured activity
+        in one batch (BulkScoringService: one metrics load, one vectorized
+        pass, one insert)
+    dispatch_pipeline_recommendations -> group of generate_report_recommendations
+
+Scores are saved without enqueueing recommendations; the callback fans them
+out in one go, so results are ready before anyone opens the participant page.
+The scoring step never raises, so the callback always runs.
+"""
+
+from __future__ import annotations
+
+import logging
+import uuid
+from collections.abc import Iterable
+
+import redis
+from celery import chain, group
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.celery_app import celery_app
+from app.core.config import Settings
+from app.core.events import EVENT_RECOMMENDATIONS, publish_event
+from app.core.logging import log_context
+from app.repositories.prof_activity import ProfActivityRepository
+from app.repositories.report import ReportRepository
+from app.repositories.scoring_result import ScoringResultRepository
+from app.services.bulk_scoring import BulkScoringService
+from app.services.reference_cache import get_prof_activities
+from app.tasks.recommendations import _run_coroutine_blocking, generate_report_recommendations
+
+logger = logging.getLogger(__name__)
+
+settings = Settings()
+
+# Reports of one participant finishing together must start the pipeline only once
+PIPELINE_LOCK_TTL_S = 60
+PIPELINE_LOCK_PREFIX = "pipeline:participant:"
+
+
+def _acquire_pipeline_lock(participant_id: uuid.UUID) -> bool:
+    """Claim the pipeline start for a participant (fails open without Redis)."""
+    try:
+        client = redis.Redis.from_url(
+            settings.redis_url, socket_connect_timeout=1, socket_timeout=1
+        )
+        try:
+            return bool(
+                client.set(
+                    f"{PIPELINE_LOCK_PREFIX}{participant_id}", "1", nx=True, ex=PIPELINE_LOCK_TTL_S
+                )
+            )
+        finally:
+            client.close()
+    except redis.RedisError as exc:
+        logger.warning(
+            "pipeline_lock_unavailable",
+            extra={"participant_id": str(participant_id), "error": str(exc)},
+        )
+        return True
+
+
+async def schedule_if_ready(
+    session: AsyncSession,
+    participant_ids: Iterable[uuid.UUID],
+    request_id: str | None = None,
+) -> list[str]:
+    """
+    Start the pipeline for participants whose reports are all EXTRACTED.
+
+    Never raises: a pipeline problem must not fail the extraction that triggered it.
+
+    Returns:
+        IDs of participants the pipeline was started for
+    """
+    if not settings.auto_scoring_pipeline_enabled:
+        return []
+
+    participant_ids = list(dict.fromkeys(participant_ids))
+    started = []
+    try:
+        report_repo = ReportRepository(session)
+        activity_codes = settings.auto_scoring_activity_codes_list
+        for participant_id in participant_ids:
+            reports = await report_repo.get_all_by_participant(participant_id)
+            if not reports or any(report.status != "EXTRACTED" for report in reports):
+                continue
+            if not activity_codes:
+                activities = await get_prof_activities(ProfActivityRepository(session))
+                activity_codes = [activity.code for activity in activities]
+            if not activity_codes or not _acquire_pipeline_lock(participant_id):
+                continue
+
+            chain(
+                score_participant_activities.s(
+                    str(participant_id), activity_codes, request_id=request_id
+                ),
+                dispatch_pipeline_recommendations.s(str(participant_id), request_id=request_id),
+            ).apply_async()
+            started.append(str(participant_id))
+            logger.info(
+                "pipeline_scheduled",
+                extra={
+                    "participant_id": str(participant_id),
+                    "activity_codes": activity_codes,
+                    "reports": len(reports),
+                },
+            )
+    except Exception as exc:
+        logger.error(
+            "pipeline_schedule_failed",
+            extra={"participant_ids": [str(p) for p in participant_ids], "error": str(exc)},
+            exc_info=True,
+        )
+    return started
+
+
+@celery_app.task(name="app.tasks.pipeline.score_participant_activities")
+def score_participant_activities(
+    participant_id: str, activity_codes: list[str], request_id: str | None = None
+) -> list[dict]:
+    """
+    Chain head: score one participant against the activities in one batch.
+
+    Results are saved with recommendations left pending. Never raises, so one
+    activity (or a database or Redis error) cannot block the callback:
+    activities without a usable weight table or with missing metrics are
+    reported as "skipped", a failed run as "error" for every activity.
+    """
+
+    async def _async_score() -> list[dict]:
+        async_engine = create_async_engine(
+            settings.postgres_dsn,
+            echo=False,
+            pool_pre_ping=True,
+        )
+        AsyncSessionLocal = sessionmaker(
+            async_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        try:
+            async with AsyncSessionLocal() as session:
+                summary = await BulkScoringService(session).score_all(
+                    participant_ids=[uuid.UUID(participant_id)], activity_codes=activity_codes
+                )
+                scoring_results = await ScoringResultRepository(session).get_many(
+                    [uuid.UUID(result_id) for result_id in summary.scoring_result_ids]
+                )
+        finally:
+            await async_engine.dispose()
+
+        by_code = {result.weight_table.prof_activity.code: result for result in scoring_results}
+        results = []
+        for code in activity_codes:
+            scoring_result = by_code.get(code)
+            if scoring_result is None:
+                reason = summary.skipped_activities.get(code, "Missing or out-of-range metrics")
+                logger.info(
+                    "pipeline_score_skipped",
+                    extra={
+                        "participant_id": participant_id,
+                        "activity_code": code,
+                        "reason": reason,
+                    },
+                )
+                results.append({"activity_code": code, "status": "skipped", "reason": reason})
+                continue
+
+            publish_event(
+                EVENT_RECOMMENDATIONS,
+                participant_id,
+                scoring_result_id=str(scoring_result.id),
+                status=scoring_result.recommendations_status,
+                stage=None,
+                error=None,
+            )
+            results.append(
+                {
+                    "activity_code": code,
+                    "status": "scored",
+                    "scoring_result_id": str(scoring_result.id),
+                    "score_pct": str(scoring_result.score_pct),
+                    "recommendations_status": scoring_result.recommendations_status,
+                }
+            )
+        return results
+
+    with log_context(request_id=request_id):
+        try:
+            return _run_coroutine_blocking(_async_score())
+        except Exception as exc:
+            logger.error(
+                "pipeline_score_failed",
+                extra={"participant_id": participant_id, "error": str(exc)},
+                exc_info=True,
+            )
+            return [
+                {"activity_code": code, "status": "error", "reason": str(exc)}
+                for code in activity_codes
+            ]
+
+
+@celery_app.task(name="app.tasks.pipeline.dispatch_pipeline_recommendations")
+def dispatch_pipeline_recommendations(
+    results: list[dict], participant_id: str, request_id: str | None = None
+) -> dict:
+    """Chain callback: fan out recommendation generation for the new scores."""
+    pending = [
+        result["scoring_result_id"]
+        for result in results
+        if result.get("status") == "scored" and result.get("recommendations_status") == "pending"
+    ]
+    task_ids: list[str] = []
+    if pending:
+        job = group(
+            generate_report_recommendations.s(scoring_result_id, request_id=request_id)
+            for scoring_result_id in pending
+        ).apply_async()
+        task_ids = [task.id for task in job.results]
+
+    logger.info(
+        "pipeline_recommendations_dispatched",
+        extra={
+            "participant_id": participant_id,
+            "scored": sum(1 for result in results if result.get("status") == "scored"),
+            "skipped": sum(1 for result in results if result.get("status") == "skipped"),
+            "failed": sum(1 for result in results if result.get("status") == "error"),
+            "recommendations": len(pending),
+        },
+    )
+    return {
+        "participant_id": participant_id,
+        "scores": results,
+        "recommendations_task_ids": task_ids,
+    }
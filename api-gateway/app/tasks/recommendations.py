@@ -18,11 +18,27 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import selectinload, sessionmaker
 
+from app.core.autoscale import record_key_pool_stats
 from app.core.celery_app import celery_app
 from app.core.config import Settings
+from app.core.events import STAGE_GENERATING, publish_recommendations_status
 from app.core.gemini_factory import create_gemini_client
+from app.core.logging import log_context
 from app.db.models import ScoringResult
-from app.services.recommendations import generate_recommendations
+from app.schemas.recommendations import RecommendationsResponse
+from app.services.recommendation_cache import get_recommendation_cache, recommendation_cache_key
+from app.services.recommendation_flight import (
+    RecommendationFlights,
+    flight_key,
+    get_recommendation_flights,
+)
+from app.services.recommendations import (
+    RecommendationsBatchItem,
+    RecommendationsGenerator,
+    build_recommendation_metrics,
+    generate_recommendations,
+)
+from app.services.reference_cache import get_metric_defs
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +49,10 @@ _TASK_LOOP: asyncio.AbstractEventLoop | None = None
 _TASK_LOOP_THREAD: threading.Thread | None = None
 _TASK_LOOP_LOCK = threading.Lock()
 
+# A flight follower checks on its result this often until the leader fills it
+# or the flight expires
+FLIGHT_RECHECK_S = 30
+
 
 def _start_background_loop(loop: asyncio.AbstractEventLoop) -> None:
     asyncio.set_event_loop(loop)
@@ -73,6 +93,71 @@ def _run_coroutine_blocking(coro: Coroutine[Any, Any, Any]) -> Any:
     return future.result()
 
 
+async def _complete_flight(
+    session: AsyncSession,
+    flights: RecommendationFlights,
+    flight: str,
+    leader: ScoringResult,
+) -> list[str]:
+    """
+    End the leader's flight and copy its outcome to the followers.
+
+    Followers that are no longer pending (filled some other way) are left alone.
+
+    Returns:
+        IDs of the follower results that were filled
+    """
+    follower_ids = await flights.complete(flight, str(leader.id))
+    if not follower_ids:
+        return []
+
+    result = await session.execute(
+        select(ScoringResult).where(
+            ScoringResult.id.in_([uuid.UUID(follower_id) for follower_id in follower_ids]),
+            ScoringResult.recommendations_status == "pending",
+        )
+    )
+    followers = list(result.scalars().all())
+    for follower in followers:
+        follower.recommendations = leader.recommendations
+        follower.recommendations_status = leader.recommendations_status
+        follower.recommendations_error = leader.recommendations_error
+    await session.commit()
+    for follower in followers:
+        publish_recommendations_status(follower)
+
+    logger.info(
+        "task_recommendations_flight_completed",
+        extra={
+            "scoring_result_id": str(leader.id),
+            "status": leader.recommendations_status,
+            "followers": [str(follower.id) for follower in followers],
+        },
+    )
+    return [str(follower.id) for follower in followers]
+
+
+def _follow_flight(scoring_result_id: str, leader_id: str, request_id: str | None) -> None:
+    """
+    Check on a flight follower's result after FLIGHT_RECHECK_S.
+
+    The re-run finishes if the leader has filled the result; otherwise it
+    calls ``lead_or_follow`` again and leads a new flight once the old one
+    has expired (leader task lost or failed before completing).
+    """
+    if settings.celery_task_always_eager:
+        # Nothing runs concurrently in eager mode: waiting would recurse
+        return
+    generate_report_recommendations.apply_async(
+        kwargs={
+            "scoring_result_id": scoring_result_id,
+            "request_id": request_id,
+            "leader_id": leader_id,
+        },
+        countdown=FLIGHT_RECHECK_S,
+    )
+
+
 @celery_app.task(
     name="app.tasks.recommendations.generate_report_recommendations",
     bind=True,
@@ -80,7 +165,7 @@ def _run_coroutine_blocking(coro: Coroutine[Any, Any, Any]) -> Any:
     default_retry_delay=30,  # 30 seconds between retries
 )
 def generate_report_recommendations(
-    self, scoring_result_id: str, request_id: str | None = None
+    self, scoring_result_id: str, request_id: str | None = None, leader_id: str | None = None
 ) -> dict:
     """
     Generate AI recommendations for a scoring result (AI-08).
@@ -92,9 +177,17 @@ def generate_report_recommendations(
     4. Updates scoring_result.recommendations field
     5. Handles retries on 429/503 errors
 
+    Recommendations come from the cache when possible. Tasks for the same
+    participant, weight table and metric snapshot share one Gemini call: the
+    first leads, the others finish as "deduplicated" and are filled by the
+    leader (see app.services.recommendation_flight). A follower re-checks its
+    result every FLIGHT_RECHECK_S and generates it itself if the flight
+    expires before the leader completes it.
+
     Args:
         scoring_result_id: UUID of the scoring result
         request_id: Optional request ID for tracing
+        leader_id: Set on a follower's re-check: the leader it waited for
 
     Returns:
         Dictionary with status and recommendations count
@@ -148,6 +241,14 @@ def generate_report_recommendations(
                     )
                     raise ValueError(f"ScoringResult {scoring_result_id} not found")
 
+                # Follower re-check: the leader has already filled this result
+                if leader_id and scoring_result.recommendations_status != "pending":
+                    return {
+                        "status": "deduplicated",
+                        "scoring_result_id": scoring_result_id,
+                        "leader_scoring_result_id": leader_id,
+                    }
+
                 # 2. Check if AI recommendations are enabled
                 if not settings.ai_recommendations_enabled:
                     logger.info(
@@ -157,6 +258,7 @@ def generate_report_recommendations(
                     scoring_result.recommendations_status = "disabled"
                     scoring_result.recommendations_error = None
                     await session.commit()
+                    publish_recommendations_status(scoring_result)
                     return {
                         "status": "skipped",
                         "reason": "AI recommendations are disabled",
@@ -186,32 +288,16 @@ def generate_report_recommendations(
                 participant_metrics = await metric_repo.list_by_participant(
                     scoring_result.participant_id
                 )
-                metrics_map = {m.metric_code: m for m in participant_metrics}
+                metrics_map = {m.metric_code: m.value for m in participant_metrics}
 
                 # Get metric definitions for names
-                metric_defs = await metric_def_repo.list_all(active_only=True)
+                metric_defs = await get_metric_defs(metric_def_repo)
                 metric_def_by_code = {m.code: m for m in metric_defs}
 
                 # 5. Build metrics list for recommendations
-                metrics_for_recommendations = []
-                for weight_entry in weight_table.weights:
-                    metric_code = weight_entry["metric_code"]
-                    weight = float(weight_entry["weight"])
-
-                    if metric_code in metrics_map:
-                        metric = metrics_map[metric_code]
-                        metric_def = metric_def_by_code.get(metric_code)
-
-                        if metric_def:
-                            metrics_for_recommendations.append(
-                                {
-                                    "code": metric_code,
-                                    "name": metric_def.name_ru or metric_def.name,
-                                    "unit": metric_def.unit or "балл",
-                                    "value": float(metric.value),
-                                    "weight": weight,
-                                }
-                            )
+                metrics_for_recommendations = build_recommendation_metrics(
+                    weight_table.weights, metrics_map, metric_def_by_code
+                )
 
                 if not metrics_for_recommendations:
                     logger.warning(
@@ -221,12 +307,54 @@ def generate_report_recommendations(
                     scoring_result.recommendations_status = "error"
                     scoring_result.recommendations_error = "No metrics found for recommendations"
                     await session.commit()
+                    publish_recommendations_status(scoring_result)
                     return {
                         "status": "failed",
                         "reason": "No metrics found for recommendations",
                     }
 
-                # 6. Create Gemini pool client
+                # 6. Reuse recommendations generated for the same profile
+                cache = get_recommendation_cache()
+                cache_key = recommendation_cache_key(
+                    prof_activity.code, weight_table, metrics_for_recommendations
+                )
+                cached = await cache.get(cache_key)
+                if cached is not None:
+                    scoring_result.recommendations = cached
+                    scoring_result.recommendations_status = "ready"
+                    scoring_result.recommendations_error = None
+                    await session.commit()
+                    publish_recommendations_status(scoring_result)
+                    return {
+                        "status": "success",
+                        "scoring_result_id": scoring_result_id,
+                        "recommendations_count": len(cached),
+                        "cached": True,
+                    }
+
+                # 7. Single flight: a running generation for the same snapshot fills
+                # this result when it finishes; check back in case it never does
+                flights = get_recommendation_flights()
+                flight = flight_key(
+                    scoring_result.participant_id, weight_table, metrics_for_recommendations
+                )
+                flight_leader_id = await flights.lead_or_follow(flight, scoring_result_id)
+                if flight_leader_id != scoring_result_id:
+                    logger.info(
+                        "task_recommendations_deduplicated",
+                        extra={
+                            "scoring_result_id": scoring_result_id,
+                            "leader_scoring_result_id": flight_leader_id,
+                        },
+                    )
+                    _follow_flight(scoring_result_id, flight_leader_id, request_id)
+                    return {
+                        "status": "deduplicated",
+                        "scoring_result_id": scoring_result_id,
+                        "leader_scoring_result_id": flight_leader_id,
+                    }
+
+                # 8. Create Gemini pool client
                 try:
                     gemini_client = create_gemini_client()
                 except ValueError as e:
@@ -237,6 +365,8 @@ def generate_report_recommendations(
                     scoring_result.recommendations_status = "error"
                     scoring_result.recommendations_error = f"Failed to create Gemini client: {e}"
                     await session.commit()
+                    publish_recommendations_status(scoring_result)
+                    await _complete_flight(session, flights, flight, scoring_result)
                     return {
                         "status": "failed",
                         "reason": f"Failed to create Gemini client: {e}",
@@ -250,7 +380,8 @@ def generate_report_recommendations(
                     },
                 )
 
-                # 7. Generate recommendations
+                # 9. Generate recommendations
+                publish_recommendations_status(scoring_result, stage=STAGE_GENERATING)
                 try:
                     recommendations_data = await generate_recommendations(
                         gemini_client=gemini_client,
@@ -268,25 +399,31 @@ def generate_report_recommendations(
                         scoring_result.recommendations_status = "error"
                         scoring_result.recommendations_error = "Gemini returned empty recommendations"
                         await session.commit()
+                        publish_recommendations_status(scoring_result)
+                        await _complete_flight(session, flights, flight, scoring_result)
                         return {
                             "status": "failed",
                             "reason": "Gemini returned empty recommendations",
                         }
 
-                    # 8. Update scoring result with recommendations
+                    # 10. Update scoring result (and flight followers) with recommendations
                     recommendations_list = recommendations_data.get("recommendations", [])
+                    await cache.set(cache_key, recommendations_list)
 
                     scoring_result.recommendations = recommendations_list
                     scoring_result.recommendations_status = "ready"
                     scoring_result.recommendations_error = None
 
                     await session.commit()
+                    publish_recommendations_status(scoring_result)
+                    followers = await _complete_flight(session, flights, flight, scoring_result)
 
                     logger.info(
                         "task_recommendations_success",
                         extra={
                             "scoring_result_id": scoring_result_id,
                             "recommendations_count": len(recommendations_list),
+                            "followers": len(followers),
                         },
                     )
 
@@ -299,7 +436,8 @@ def generate_report_recommendations(
                 except Exception as e:
                     # Check if it's a retryable error (429, 503)
                     error_str = str(e)
-                    if "429" in error_str or "503" in error_str:
+                    retryable = "429" in error_str or "503" in error_str
+                    if retryable and self.request.retries < self.max_retries:
                         logger.warning(
                             "task_recommendations_retryable_error",
                             extra={
@@ -308,10 +446,10 @@ def generate_report_recommendations(
                                 "retry": self.request.retries,
                             },
                         )
-                        # Retry task
+                        # Retry task (keeps leading the flight)
                         raise self.retry(exc=e, countdown=30)
 
-                    # Non-retryable error
+                    # Non-retryable error or retries exhausted
                     logger.error(
                         "task_recommendations_error",
                         extra={
@@ -324,6 +462,8 @@ def generate_report_recommendations(
                     scoring_result.recommendations_status = "error"
                     scoring_result.recommendations_error = error_str[:500]
                     await session.commit()
+                    publish_recommendations_status(scoring_result)
+                    await _complete_flight(session, flights, flight, scoring_result)
 
                     return {
                         "status": "failed",
@@ -331,6 +471,8 @@ def generate_report_recommendations(
                     }
 
                 finally:
+                    if hasattr(gemini_client, "get_pool_stats"):
+                        record_key_pool_stats("recommendations", gemini_client.get_pool_stats())
                     # Close client resources
                     if hasattr(gemini_client, "close"):
                         await gemini_client.close()
@@ -341,3 +483,220 @@ def generate_report_recommendations(
 
     # Run async function
     return _run_coroutine_blocking(_async_generate())
+
+
+@celery_app.task(
+    name="app.tasks.recommendations.generate_recommendations_batch",
+    bind=True,
+    max_retries=2,
+    default_retry_delay=30,
+)
+def generate_recommendations_batch(
+    self, scoring_result_ids: list[str], request_id: str | None = None
+) -> dict:
+    """
+    Generate AI recommendations for several scoring results (cohort runs).
+
+    Pending results are served from the cache, joined to running flights
+    (checked on by ``generate_report_recommendations``, as followers), or
+    packed RECOMMENDATIONS_BATCH_SIZE at a time into one Gemini request
+    (RecommendationsGenerator.generate_batch). Results that hit 429/503 are
+    retried with the task; finished ones are skipped on retry because they
+    are no longer pending.
+
+    Args:
+        scoring_result_ids: UUIDs of the scoring results
+        request_id: Optional request ID for tracing
+
+    Returns:
+        Dictionary with per-outcome counts
+    """
+
+    async def _async_generate_batch() -> dict:
+        async_engine = create_async_engine(
+            settings.postgres_dsn,
+            echo=False,
+            pool_pre_ping=True,
+        )
+        AsyncSessionLocal = sessionmaker(
+            async_engine,
+            class_=AsyncSession,
+            expire_on_commit=False,
+        )
+        counts = {"ready": 0, "cached": 0, "deduplicated": 0, "error": 0, "retry": 0}
+
+        try:
+            async with AsyncSessionLocal() as session:
+                from app.repositories.metric import MetricDefRepository
+                from app.repositories.participant_metric import ParticipantMetricRepository
+                from app.repositories.scoring_result import ScoringResultRepository
+
+                scoring_results = [
+                    result
+                    for result in await ScoringResultRepository(session).get_many(
+                        [uuid.UUID(result_id) for result_id in scoring_result_ids]
+                    )
+                    if result.recommendations_status == "pending"
+                ]
+                if not scoring_results:
+                    return {"status": "skipped", **counts}
+
+                if not settings.ai_recommendations_enabled:
+                    for scoring_result in scoring_results:
+                        scoring_result.recommendations_status = "disabled"
+                    await session.commit()
+                    for scoring_result in scoring_results:
+                        publish_recommendations_status(scoring_result)
+                    return {"status": "skipped", "reason": "AI recommendations are disabled"}
+
+                metrics_by_participant = await ParticipantMetricRepository(
+                    session
+                ).get_metrics_dicts(
+                    list({scoring_result.participant_id for scoring_result in scoring_results})
+                )
+                metric_def_by_code = {
+                    metric_def.code: metric_def
+                    for metric_def in await get_metric_defs(MetricDefRepository(session))
+                }
+
+                # 1. Cache and single flight, as in generate_report_recommendations
+                cache = get_recommendation_cache()
+                flights = get_recommendation_flights()
+                leaders = []
+                finished = []
+                for scoring_result in scoring_results:
+                    weight_table = scoring_result.weight_table
+                    prof_activity = weight_table.prof_activity
+                    metrics = build_recommendation_metrics(
+                        weight_table.weights,
+                        metrics_by_participant[scoring_result.participant_id],
+                        metric_def_by_code,
+                    )
+                    if not metrics:
+                        scoring_result.recommendations_status = "error"
+                        scoring_result.recommendations_error = (
+                            "No metrics found for recommendations"
+                        )
+                        finished.append(scoring_result)
+                        counts["error"] += 1
+                        continue
+
+                    cache_key = recommendation_cache_key(prof_activity.code, weight_table, metrics)
+                    cached = await cache.get(cache_key)
+                    if cached is not None:
+                        scoring_result.recommendations = cached
+                        scoring_result.recommendations_status = "ready"
+                        scoring_result.recommendations_error = None
+                        finished.append(scoring_result)
+                        counts["cached"] += 1
+                        continue
+
+                    flight = flight_key(scoring_result.participant_id, weight_table, metrics)
+                    result_id = str(scoring_result.id)
+                    flight_leader_id = await flights.lead_or_follow(flight, result_id)
+                    if flight_leader_id != result_id:
+                        _follow_flight(result_id, flight_leader_id, request_id)
+                        counts["deduplicated"] += 1
+                        continue
+                    leaders.append(
+                        (
+                            scoring_result,
+                            cache_key,
+                            flight,
+                            RecommendationsBatchItem(
+                                scoring_result_id=result_id,
+                                metrics=metrics,
+                                score_pct=float(scoring_result.score_pct),
+                                prof_activity_code=prof_activity.code,
+                                prof_activity_name=prof_activity.name,
+                            ),
+                        )
+                    )
+
+                await session.commit()
+                for scoring_result in finished:
+                    publish_recommendations_status(scoring_result)
+
+                if not leaders:
+                    return {"status": "success", **counts}
+
+                # 2. Generate in batches
+                retry_later = []
+                try:
+                    gemini_client = create_gemini_client()
+                except ValueError as e:
+                    logger.error("task_recommendations_no_client", extra={"error": str(e)})
+                    for scoring_result, _, _, _ in leaders:
+                        scoring_result.recommendations_status = "error"
+                        scoring_result.recommendations_error = (
+                            f"Failed to create Gemini client: {e}"
+                        )
+                    await session.commit()
+                    for scoring_result, _, flight, _ in leaders:
+                        publish_recommendations_status(scoring_result)
+                        await _complete_flight(session, flights, flight, scoring_result)
+                    counts["error"] += len(leaders)
+                    return {"status": "failed", **counts}
+
+                generator = RecommendationsGenerator(gemini_client)
+                batch_size = settings.recommendations_batch_size
+                try:
+                    for start in range(0, len(leaders), batch_size):
+                        chunk = leaders[start : start + batch_size]
+                        for scoring_result, _, _, _ in chunk:
+                            publish_recommendations_status(scoring_result, stage=STAGE_GENERATING)
+
+                        try:
+                            outcomes = await generator.generate_batch(
+                                [item for _, _, _, item in chunk]
+                            )
+                        except Exception as e:
+                            outcomes = {item.scoring_result_id: e for _, _, _, item in chunk}
+
+                        done = []
+                        for scoring_result, cache_key, flight, item in chunk:
+                            outcome = outcomes[item.scoring_result_id]
+                            if isinstance(outcome, RecommendationsResponse):
+                                recommendations_list = outcome.to_scoring_result_format()[
+                                    "recommendations"
+                                ]
+                                await cache.set(cache_key, recommendations_list)
+                                scoring_result.recommendations = recommendations_list
+                                scoring_result.recommendations_status = "ready"
+                                scoring_result.recommendations_error = None
+                                counts["ready"] += 1
+                            elif (
+                                "429" in str(outcome) or "503" in str(outcome)
+                            ) and self.request.retries < self.max_retries:
+                                retry_later.append(item.scoring_result_id)
+                                continue
+                            else:
+                                scoring_result.recommendations_status = "error"
+                                scoring_result.recommendations_error = str(outcome)[:500]
+                                counts["error"] += 1
+                            done.append((scoring_result, flight))
+
+                        await session.commit()
+                        for scoring_result, flight in done:
+                            publish_recommendations_status(scoring_result)
+                            await _complete_flight(session, flights, flight, scoring_result)
+                finally:
+                    if hasattr(gemini_client, "get_pool_stats"):
+                        record_key_pool_stats("recommendations", gemini_client.get_pool_stats())
+                    if hasattr(gemini_client, "close"):
+                        await gemini_client.close()
+
+                counts["retry"] = len(retry_later)
+                logger.info(
+                    "task_recommendations_batch_done",
+                    extra={"scoring_results": len(scoring_result_ids), **counts},
+                )
+                if retry_later:
+                    # Still pending and leading their flights: picked up again on retry
+                    raise self.retry(countdown=30)
+                return {"status": "success", **counts}
+        finally:
+            await async_engine.dispose()
+
+    with log_context(request_id=request_id):
+        return _run_coroutine_blocking(_async_generate_batch())
@@ -67,6 +67,11 @@ if [ -n "${CELERY_WORKER_CONCURRENCY:-}" ]; then
     set -- "$@" -c "${CELERY_WORKER_CONCURRENCY}"
 fi
 
+if [ -n "${CELERY_WORKER_AUTOSCALE:-}" ]; then
+    echo "Enabling Celery autoscale (max,min): ${CELERY_WORKER_AUTOSCALE}."
+    set -- "$@" --autoscale "${CELERY_WORKER_AUTOSCALE}"
+fi
+
 if [ -n "${CELERY_WORKER_HOSTNAME:-}" ]; then
     echo "Using Celery worker hostname ${CELERY_WORKER_HOSTNAME}."
     set -- "$@" -n "${CELERY_WORKER_HOSTNAME}"
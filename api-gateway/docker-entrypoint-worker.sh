@@ -35,6 +35,13 @@ else
     echo "If you see 'User location is not supported' errors, enable VPN by setting VPN_ENABLED=1"
 fi
 
+set -- celery -A app.core.celery_app.celery_app worker -l info -Q extraction
+
+if [ -n "${CELERY_WORKER_AUTOSCALE:-}" ]; then
+    echo "Enabling Celery autoscale (max,min): ${CELERY_WORKER_AUTOSCALE}."
+    set -- "$@" --autoscale "${CELERY_WORKER_AUTOSCALE}"
+fi
+
 echo "Starting Celery worker for extraction queue..."
-exec celery -A app.core.celery_app.celery_app worker -l info -Q extraction
+exec "$@"
 
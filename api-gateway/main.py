@@ -18,10 +18,11 @@ from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings, validate_config
-from app.core.middleware import RequestContextMiddleware
+from app.core.middleware import RequestContextMiddleware, UploadSizeLimitMiddleware
 from app.routers import (
     admin,
     auth,
+    events,
     metrics,
     participants,
     prof_activities,
@@ -121,6 +122,15 @@ async def lifespan(app: FastAPI):
         # Do not fail startup; log and continue
         logger.exception("metric_defs_seeding_failed", extra={"error": str(exc)})
 
+    # Compile report templates once instead of on the first report request
+    try:
+        from app.services.report_template import precompile_templates
+
+        compiled = precompile_templates()
+        logger.info("report_templates_compiled", extra={"event": "startup", "count": compiled})
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("report_templates_compile_failed", extra={"error": str(exc)})
+
     logger.info("application_ready", extra={"event": "ready", "port": settings.app_port})
 
     yield
@@ -152,6 +162,9 @@ app = FastAPI(
 )
 
 
+# ===== Upload Size Guard =====
+app.add_middleware(UploadSizeLimitMiddleware, max_bytes=lambda: settings.report_max_size_bytes)
+
 # ===== Observability Middleware =====
 app.add_middleware(RequestContextMiddleware)
 
@@ -205,6 +218,7 @@ app.include_router(admin.router, prefix="/api/admin", tags=["Admin"])
 app.include_router(participants.router, prefix="/api")
 app.include_router(prof_activities.router, prefix="/api")
 app.include_router(reports.router, prefix="/api")
+app.include_router(events.router, prefix="/api", tags=["Events"])
 app.include_router(weights.router, prefix="/api/admin", tags=["Weights"])
 app.include_router(metrics.router)
 app.include_router(scoring.router, prefix="/api", tags=["Scoring"])
@@ -50,6 +50,19 @@ def clean_env() -> Generator[None, None, None]:
     os.environ.update(original_env)
 
 
+@pytest.fixture(autouse=True)
+def fresh_weight_catalog(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Start every test without a process-wide weight catalog.
+
+    The catalog is module-global: with the weight cache enabled, a catalog
+    loaded by one test would otherwise be served to the next.
+    """
+    from app.services import weight_catalog
+
+    monkeypatch.setattr(weight_catalog, "_cache", None)
+
+
 @pytest.fixture
 def test_env(clean_env: None) -> dict[str, str]:
     """
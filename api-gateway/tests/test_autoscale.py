@@ -0,0 +1,147 @@
+"""
+Tests for capacity-aware worker autoscaling.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.core import autoscale
+from app.core.autoscale import CapacitySnapshot, plan_concurrency
+
+
+def make_snapshot(**overrides) -> CapacitySnapshot:
+    values = {
+        "queue": "extraction",
+        "keys_total": 4,
+        "keys_healthy": 4,
+        "qps_per_key": 0.5,
+        "rate_limited": 0,
+        "queue_depth": 0,
+        "reserved": 0,
+        "avg_task_seconds": 10.0,
+        "gemini_calls_per_task": 2.0,
+    }
+    values.update(overrides)
+    return CapacitySnapshot(**values)
+
+
+class FakeStore:
+    def __init__(self, state: dict[str, str] | None = None):
+        self.state = state or {}
+        self.decisions = []
+
+    def load(self, queue):
+        return self.state
+
+    def record_demand(self, queue, demand):
+        return demand
+
+    def record_decision(self, hostname, decision):
+        self.decisions.append(decision)
+
+
+class FakeAutoscaler(autoscale.CapacityAutoscaler):
+    """CapacityAutoscaler without a pool process or consumer behind it."""
+
+    def __init__(self, store, processes=2, max_concurrency=8, min_concurrency=1):
+        self.store = store
+        self.queue = "extraction"
+        self.hostname = "worker@test"
+        self.hard_max, self.hard_min = max_concurrency, min_concurrency
+        self.max_concurrency, self.min_concurrency = max_concurrency, min_concurrency
+        self.last_decision = None
+        self._rate_limited_seen = None
+        self._processes = processes
+        self.prefetch = []
+        self.shrunk = []
+
+    @property
+    def processes(self):
+        return self._processes
+
+    def _queue_depth(self):
+        return 30
+
+    def _shrink(self, n):
+        self.shrunk.append(n)
+
+    def _update_consumer_prefetch_count(self, new_max):
+        self.prefetch.append(new_max)
+
+
+@pytest.mark.unit
+class TestPlanConcurrency:
+    def test_capacity_from_littles_law(self):
+        # 4 keys × 0.5 QPS × 10 s / 2 calls per task = 10 tasks in flight
+        decision = plan_concurrency(make_snapshot(queue_depth=100), 9, 1, 16)
+
+        assert decision.capacity_limit == 10
+        assert decision.concurrency == 10
+        assert decision.reason == "capacity"
+
+    def test_step_up_is_bounded(self):
+        decision = plan_concurrency(make_snapshot(queue_depth=100), 2, 1, 16)
+
+        assert decision.concurrency == 2 + autoscale.MAX_STEP_UP
+
+    def test_follows_demand_below_capacity(self):
+        decision = plan_concurrency(make_snapshot(queue_depth=1, reserved=2), 3, 1, 16)
+
+        assert decision.concurrency == 3
+        assert decision.reason == "demand"
+
+    def test_backs_off_on_rate_limits(self):
+        decision = plan_concurrency(make_snapshot(queue_depth=100, rate_limited=3), 8, 1, 16)
+
+        assert decision.concurrency == 6
+        assert decision.reason == "rate_limited"
+
+    def test_unhealthy_keys_and_quota_share_shrink_capacity(self):
+        snapshot = make_snapshot(queue_depth=100, keys_healthy=2, quota_share=0.5)
+
+        assert plan_concurrency(snapshot, 10, 1, 16).capacity_limit == 3
+
+    def test_clamped_to_autoscale_bounds(self):
+        assert plan_concurrency(make_snapshot(), 4, 2, 16).concurrency == 2
+        assert plan_concurrency(make_snapshot(queue_depth=100), 7, 1, 8).concurrency == 8
+
+
+@pytest.mark.unit
+class TestCapacityAutoscaler:
+    def test_evaluate_lowers_cap_and_prefetch(self, monkeypatch):
+        monkeypatch.setattr(autoscale.worker_state, "reserved_requests", set())
+        monkeypatch.setattr(autoscale.settings, "gemini_qps_per_key", 0.25)
+        store = FakeStore({"keys_total": "2", "keys_healthy": "1", "avg_task_seconds": "8"})
+        scaler = FakeAutoscaler(store, processes=6, max_concurrency=8)
+
+        decision = scaler.evaluate()
+
+        # 1 healthy key × 0.25 QPS × 8 s / 2 calls = 1 task in flight
+        assert decision.capacity_limit == 1
+        assert scaler.max_concurrency == 1
+        assert scaler.shrunk == [5]
+        assert scaler.prefetch == [1]
+        assert store.decisions == [decision]
+
+    def test_rate_limit_delta_between_evaluations(self, monkeypatch):
+        monkeypatch.setattr(autoscale.worker_state, "reserved_requests", set())
+        store = FakeStore({"keys_total": "4", "rate_limited": "5"})
+        scaler = FakeAutoscaler(store)
+
+        assert scaler.snapshot().rate_limited == 0
+        store.state["rate_limited"] = "9"
+        assert scaler.snapshot().rate_limited == 4
+
+    def test_key_pool_stats_only_recorded_when_enabled(self, monkeypatch):
+        recorded = []
+        store = SimpleNamespace(record_key_pool=lambda queue, stats: recorded.append(queue))
+        monkeypatch.setattr(autoscale, "_store", store)
+
+        monkeypatch.setattr(autoscale.settings, "worker_capacity_autoscale", False)
+        autoscale.record_key_pool_stats("extraction", object())
+        monkeypatch.setattr(autoscale.settings, "worker_capacity_autoscale", True)
+        autoscale.record_key_pool_stats("extraction", object())
+        autoscale.record_key_pool_stats("default", object())
+
+        assert recorded == ["extraction"]
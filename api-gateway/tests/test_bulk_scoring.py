@@ -0,0 +1,264 @@
+"""
+Tests for vectorized bulk scoring.
+
+The reference is the Decimal arithmetic of ScoringService.calculate_score.
+"""
+
+import random
+import uuid
+from decimal import ROUND_HALF_UP, Decimal
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from pydantic import ValidationError
+
+from app.routers.scoring import WhatIfRequest
+from app.services.bulk_scoring import BulkScoringService, score_matrix
+from app.services.scoring import ScoringService
+
+
+def reference_score(metrics: dict[str, Decimal], weights: dict[str, Decimal]) -> Decimal:
+    total = sum(metrics[code] * weight for code, weight in weights.items())
+    return (total * Decimal("10")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+@pytest.mark.unit
+def test_score_matrix_matches_decimal_arithmetic():
+    rng = random.Random(42)
+    codes = [f"M{index}" for index in range(12)]
+    tables = []
+    for _ in range(4):
+        chosen = rng.sample(codes, 5)
+        # Random 4-digit weights summing exactly to 1
+        raw = [Decimal(rng.randint(1, 2000)) for _ in chosen]
+        weights = [(value / sum(raw)).quantize(Decimal("0.0001")) for value in raw]
+        weights[-1] = Decimal("1") - sum(weights[:-1])
+        tables.append(dict(zip(chosen, weights, strict=True)))
+    cohort = [
+        {code: Decimal(rng.randint(100, 1000)) / 100 for code in codes if rng.random() > 0.05}
+        for _ in range(300)
+    ]
+    cohort[0]["M0"] = Decimal("10.50")  # out of range
+
+    values = np.array([[float(m[c]) if c in m else np.nan for c in codes] for m in cohort])
+    weights = np.array([[float(t[c]) if c in t else np.nan for t in tables] for c in codes])
+    cents, eligible = score_matrix(values, weights, value_digits=2, weight_digits=4)
+
+    for row, metrics in enumerate(cohort):
+        for column, table in enumerate(tables):
+            expected_eligible = all(
+                code in metrics and Decimal("1") <= metrics[code] <= Decimal("10") for code in table
+            )
+            assert eligible[row, column] == expected_eligible
+            if expected_eligible:
+                assert Decimal(int(cents[row, column])).scaleb(-2) == reference_score(
+                    metrics, table
+                )
+
+
+@pytest.mark.unit
+def test_score_matrix_rounds_half_cent_up():
+    # 7.01 × 0.25 + 7.00 × 0.75 = 7.0025 -> 70.025 %; float math gives 70.02499...
+    cents, eligible = score_matrix(
+        np.array([[7.01, 7.00]]), np.array([[0.25], [0.75]]), value_digits=2, weight_digits=2
+    )
+
+    assert eligible[0, 0] and cents[0, 0] == 7003
+
+
+class FakeRepo:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+@pytest.mark.unit
+async def test_score_all_builds_rows_like_calculate_score(monkeypatch):
+    from app.services import bulk_scoring
+
+    monkeypatch.setattr(bulk_scoring.settings, "ai_recommendations_enabled", True)
+    complete, partial = uuid.uuid4(), uuid.uuid4()
+    metrics = {
+        complete: {"A": Decimal("7.50"), "B": Decimal("7.50"), "C": Decimal("3.25")},
+        partial: {"A": Decimal("9.00")},
+    }
+    good = SimpleNamespace(
+        id=uuid.uuid4(),
+        prof_activity=SimpleNamespace(id=uuid.uuid4(), code="GOOD", name="Good"),
+        weights=[
+            {"metric_code": "A", "weight": "0.5"},
+            {"metric_code": "B", "weight": "0.25"},
+            {"metric_code": "C", "weight": "0.25"},
+        ],
+    )
+    broken = SimpleNamespace(
+        id=uuid.uuid4(),
+        prof_activity=SimpleNamespace(id=uuid.uuid4(), code="BROKEN", name="Broken"),
+        weights=[{"metric_code": "A", "weight": "0.9"}],
+    )
+    metric_defs = [
+        SimpleNamespace(code=code, name=code, name_ru=f"Метрика {code}", unit=None)
+        for code in "ABC"
+    ]
+
+    async def get_all_metrics_dicts():
+        return metrics
+
+    async def list_weight_tables():
+        return [good, broken]
+
+    async def list_metric_defs(active_only=False):
+        return metric_defs
+
+    async def list_activities():
+        return []
+
+    service = BulkScoringService(db=None)
+    service.participant_metric_repo = FakeRepo(get_all_metrics_dicts=get_all_metrics_dicts)
+    service.prof_activity_repo = FakeRepo(list_all=list_activities)
+    service.weight_table_repo = FakeRepo(list_all=list_weight_tables)
+    service.metric_def_repo = FakeRepo(list_all=list_metric_defs)
+    created: list[dict] = []
+
+    async def create_many(rows):
+        created.extend(rows)
+        return len(rows)
+
+    service.scoring_result_repo = FakeRepo(create_many=create_many)
+
+    summary = await service.score_all()
+
+    assert (summary.participants, summary.activities, summary.scored) == (2, 1, 1)
+    assert summary.skipped == 1
+    assert "BROKEN" in summary.skipped_activities
+    [row] = created
+    weights_map = {entry["metric_code"]: Decimal(entry["weight"]) for entry in good.weights}
+    assert row["participant_id"] == complete
+    assert row["score_pct"] == reference_score(metrics[complete], weights_map)
+    assert row["recommendations_status"] == "pending"
+
+    strengths, dev_areas = ScoringService(db=None)._generate_strengths_and_dev_areas(
+        metrics[complete], weights_map, {definition.code: definition for definition in metric_defs}
+    )
+    assert (row["strengths"], row["dev_areas"]) == (strengths, dev_areas)
+    assert summary.scoring_result_ids == [str(row["id"])]
+
+
+@pytest.mark.unit
+async def test_rank_activities_orders_scorable_before_incomplete():
+    def table(code, weights):
+        return SimpleNamespace(
+            id=uuid.uuid4(),
+            prof_activity=SimpleNamespace(id=uuid.uuid4(), code=code, name=code.title()),
+            weights=[{"metric_code": key, "weight": value} for key, value in weights.items()],
+        )
+
+    tables = [
+        table("HALF", {"X": "0.5", "Y": "0.5"}),
+        table("SINGLE", {"X": "1.0"}),
+        table("MISSING", {"X": "0.5", "Z": "0.5"}),
+        table("BROKEN", {"X": "0.4"}),
+    ]
+
+    async def list_all():
+        return tables
+
+    async def get_metrics_dict(participant_id):
+        return {"X": Decimal("8.00"), "Y": Decimal("6.50")}
+
+    async def no_rows(active_only=False):
+        return []
+
+    service = ScoringService(db=None)
+    service.participant_metric_repo = FakeRepo(get_metrics_dict=get_metrics_dict)
+    service.prof_activity_repo = FakeRepo(list_all=no_rows)
+    service.weight_table_repo = FakeRepo(list_all=list_all)
+    service.metric_def_repo = FakeRepo(list_all=no_rows)
+
+    result = await service.rank_activities(uuid.uuid4())
+
+    items = {item["prof_activity_code"]: item for item in result["items"]}
+    assert [item["prof_activity_code"] for item in result["items"]] == [
+        "SINGLE",
+        "HALF",
+        "MISSING",
+        "BROKEN",
+    ]
+    assert result["best"] == "SINGLE"
+    assert items["HALF"]["score_pct"] == Decimal("72.50")
+    assert items["MISSING"]["score_pct"] is None
+    assert items["MISSING"]["missing_metrics"] == ["Z"]
+    assert items["BROKEN"]["error"]
+
+
+@pytest.mark.unit
+async def test_score_what_if_uses_hypothetical_weights_and_overrides():
+    half = SimpleNamespace(id=uuid.uuid4(), code="HALF", name="Half")
+    table = SimpleNamespace(
+        id=uuid.uuid4(),
+        prof_activity=half,
+        weights=[{"metric_code": "X", "weight": "0.5"}, {"metric_code": "Y", "weight": "0.5"}],
+    )
+    full, partial = uuid.uuid4(), uuid.uuid4()
+
+    async def get_metrics_dicts(participant_ids):
+        return {
+            full: {"X": Decimal("8.00"), "Y": Decimal("6.50")},
+            partial: {"X": Decimal("8.00")},
+        }
+
+    async def list_activities(active_only=False):
+        return [half]
+
+    async def list_tables():
+        return [table]
+
+    async def list_metric_defs(active_only=False):
+        return [SimpleNamespace(code=code, name=code, name_ru=None, unit=None) for code in "XY"]
+
+    service = ScoringService(db=None)
+    service.participant_metric_repo = FakeRepo(get_metrics_dicts=get_metrics_dicts)
+    service.prof_activity_repo = FakeRepo(list_all=list_activities)
+    service.weight_table_repo = FakeRepo(list_all=list_tables)
+    service.metric_def_repo = FakeRepo(list_all=list_metric_defs)
+    # No scoring_result_repo: nothing may be written
+
+    adhoc = await service.score_what_if(
+        [full, partial], weights={"X": Decimal("0.2"), "Y": Decimal("0.8")}
+    )
+    scored, missing = adhoc["items"]
+    assert adhoc["weight_table_id"] is None
+    assert scored["score_pct"] == Decimal("68.00")
+    assert [item["contribution"] for item in scored["details"]] == ["1.60", "5.20"]
+    assert [item["metric_code"] for item in scored["strengths"]] == ["X", "Y"]
+    assert (missing["score_pct"], missing["missing_metrics"]) == (None, ["Y"])
+
+    current = await service.score_what_if(
+        [full, partial], prof_activity_code="HALF", metric_overrides={"Y": Decimal("9")}
+    )
+    assert current["weight_table_id"] == str(table.id)
+    assert [item["score_pct"] for item in current["items"]] == [Decimal("85.00")] * 2
+
+    out_of_range = await service.score_what_if(
+        [full], prof_activity_code="HALF", metric_overrides={"X": Decimal("11")}
+    )
+    assert out_of_range["items"][0]["out_of_range_metrics"] == ["X"]
+
+    with pytest.raises(ValueError, match="Unknown metric codes: Q"):
+        await service.score_what_if([full], weights={"Q": Decimal("1")})
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("value", ["7.0049999999999999", "7.005", "1e-21", "100"])
+def test_what_if_request_rejects_overrides_participant_metric_cannot_store(value):
+    with pytest.raises(ValidationError):
+        WhatIfRequest(
+            participant_ids=[uuid.uuid4()],
+            prof_activity_code="HALF",
+            metric_overrides={"X": value},
+        )
+
+    request = WhatIfRequest(
+        participant_ids=[uuid.uuid4()], prof_activity_code="HALF", metric_overrides={"X": "7.05"}
+    )
+    assert request.metric_overrides == {"X": Decimal("7.05")}
@@ -0,0 +1,123 @@
+"""
+Tests for the streaming participant dataset export.
+"""
+
+import csv
+import importlib.util
+import io
+import uuid
+from contextlib import asynccontextmanager
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import dataset_export
+from app.services.dataset_export import (
+    DatasetExportError,
+    DatasetLayout,
+    get_writer,
+    stream_dataset,
+)
+
+WEIGHT_TABLE_ID = str(uuid.uuid4())
+LAYOUT = DatasetLayout(metric_codes=["A", "B"], activities=[("DEV", WEIGHT_TABLE_ID)])
+
+
+def dataset_row(name, metrics=None, scores=None):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        external_id=None,
+        full_name=name,
+        birth_date=date(1990, 5, 1),
+        metrics=metrics,
+        scores=scores,
+    )
+
+
+class FakeParticipantRepository:
+    batches: list = []
+
+    def __init__(self, db):
+        pass
+
+    async def stream_dataset(self, batch_size=1000):
+        for batch in self.batches:
+            yield batch
+
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    async def load_layout(db):
+        return LAYOUT
+
+    monkeypatch.setattr(dataset_export, "load_layout", load_layout)
+    monkeypatch.setattr(dataset_export, "ParticipantRepository", FakeParticipantRepository)
+
+
+@pytest.mark.unit
+def test_layout_pivots_metrics_and_latest_scores():
+    row = dataset_row(
+        "Иванов",
+        metrics={"A": "7.50", "X": "1.00"},
+        scores={WEIGHT_TABLE_ID: ["81.25", "2025-01-15T10:00:00.5+00:00"]},
+    )
+
+    values = LAYOUT.row(row)
+
+    assert [name for name, _ in LAYOUT.columns][4:] == ["A", "B", "score_pct:DEV", "scored_at:DEV"]
+    assert [str(value) if value is not None else None for value in values[4:]] == [
+        "7.50",
+        None,
+        "81.25",
+        "2025-01-15 10:00:00.500000+00:00",
+    ]
+    assert LAYOUT.row(dataset_row("Петров"))[4:] == [None, None, None, None]
+
+
+@pytest.mark.unit
+async def test_csv_is_streamed_batch_by_batch(fake_db):
+    FakeParticipantRepository.batches = [
+        [dataset_row("Иванов", metrics={"A": "7.50", "B": "9.00"})],
+        [
+            dataset_row("Петров", scores={WEIGHT_TABLE_ID: ["64.00", "2025-01-15T10:00:00+00:00"]}),
+            dataset_row("Сидоров"),
+        ],
+    ]
+
+    chunks = [chunk async for chunk in stream_dataset("csv", session_factory=fake_session)]
+
+    # Header, then one chunk per cursor batch
+    assert len(chunks) == 3
+    text = b"".join(chunks).decode("utf-8-sig")
+    rows = list(csv.reader(io.StringIO(text)))
+    assert rows[0] == [
+        "participant_id",
+        "external_id",
+        "full_name",
+        "birth_date",
+        "A",
+        "B",
+        "score_pct:DEV",
+        "scored_at:DEV",
+    ]
+    assert rows[1][2:] == ["Иванов", "1990-05-01", "7.50", "9.00", "", ""]
+    assert rows[2][6:] == ["64.00", "2025-01-15T10:00:00+00:00"]
+    assert len(rows) == 4
+
+
+@pytest.mark.unit
+def test_unknown_format_and_missing_optional_package():
+    with pytest.raises(DatasetExportError, match="Unsupported"):
+        get_writer("json")
+    if importlib.util.find_spec("openpyxl") is None:
+        with pytest.raises(DatasetExportError, match="pip install openpyxl"):
+            get_writer("xlsx")
+    if importlib.util.find_spec("pyarrow") is None:
+        with pytest.raises(DatasetExportError, match="pip install pyarrow"):
+            get_writer("parquet")
@@ -0,0 +1,146 @@
+"""
+Tests for status events: Redis publishing, progress mapping and the SSE stream.
+"""
+
+import json
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.core import events
+from app.core.cache import SharedRedis
+from app.core.config import settings
+
+
+class FakeRedis:
+    def __init__(self, fail: bool = False):
+        self.fail = fail
+        self.published: list[tuple[str, dict]] = []
+
+    def publish(self, channel: str, message: str) -> int:
+        if self.fail:
+            raise redis.ConnectionError("connection refused")
+        self.published.append((channel, json.loads(message)))
+        return 1
+
+
+class FakePubSub:
+    def __init__(self, messages: list[dict | None]):
+        self.messages = list(messages)
+        self.closed = False
+        self.connection_pool = SimpleNamespace(disconnect=self._disconnect)
+        self.pool_disconnected = False
+
+    async def get_message(self, timeout: float):
+        return self.messages.pop(0) if self.messages else None
+
+    async def aclose(self):
+        self.closed = True
+
+    async def _disconnect(self):
+        self.pool_disconnected = True
+
+
+def make_report(**overrides):
+    values = {
+        "id": uuid.uuid4(),
+        "participant_id": uuid.uuid4(),
+        "status": "PROCESSING",
+        "extract_error": None,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+@pytest.fixture
+def publisher(monkeypatch):
+    fake = SharedRedis("status_events")
+    monkeypatch.setattr(events, "_publisher", fake)
+    monkeypatch.setattr(settings, "status_events_enabled", True)
+    return fake
+
+
+@pytest.mark.unit
+class TestPublishEvent:
+    def test_publishes_to_participant_channel(self, publisher):
+        client = publisher._client = FakeRedis()
+        report = make_report()
+
+        assert events.publish_report_status(report, stage="IMAGES_STORED", progress={"images": 3})
+
+        channel, event = client.published[0]
+        assert channel == f"events:participant:{report.participant_id}"
+        assert event["type"] == "report"
+        assert event["report_id"] == str(report.id)
+        assert event["stage"] == "IMAGES_STORED"
+        assert event["progress"] == {"images": 3}
+
+    def test_failure_backs_off_without_raising(self, publisher):
+        client = publisher._client = FakeRedis(fail=True)
+        report = make_report()
+
+        assert events.publish_report_status(report) is False
+        client.fail = False
+        # Still inside the back-off window: Redis is not contacted
+        assert events.publish_report_status(report) is False
+        assert client.published == []
+
+    def test_disabled(self, publisher, monkeypatch):
+        client = publisher._client = FakeRedis()
+        monkeypatch.setattr(settings, "status_events_enabled", False)
+
+        assert events.publish_report_status(make_report()) is False
+        assert client.published == []
+
+
+@pytest.mark.unit
+class TestExtractionProgress:
+    def test_group_progress(self, monkeypatch):
+        published = []
+        monkeypatch.setattr(
+            events,
+            "publish_report_status",
+            lambda report, stage=None, progress=None: published.append((stage, progress)),
+        )
+        report = make_report()
+        progress = events.ExtractionProgress(report)
+
+        progress(report.id, "IMAGES_STORED", 0, {"images": 4})
+        progress(report.id, "GROUPS_BUILT", 0, {"groups": [["a", "b"], ["c", "d"]]})
+        progress(report.id, "GROUP_PARSED", 1, {"metrics": []})
+        progress(uuid.uuid4(), "GROUP_PARSED", 0, {"metrics": []})
+
+        assert published == [
+            ("IMAGES_STORED", {"images": 4}),
+            ("GROUPS_BUILT", {"groups": 2}),
+            ("GROUP_PARSED", {"parsed": 1, "groups": 2}),
+        ]
+
+
+@pytest.mark.unit
+class TestStreamEvents:
+    async def test_snapshot_then_live_events(self):
+        report = make_report(status="EXTRACTED")
+        live = {"type": "recommendations", "scoring_result_id": "x", "status": "ready"}
+        pubsub = FakePubSub([{"type": "message", "data": json.dumps(live).encode()}, None])
+        calls = iter([False, False, True])
+
+        async def is_disconnected():
+            return next(calls)
+
+        snapshot = events.snapshot_events(report.participant_id, [report], [])
+        frames = [
+            frame
+            async for frame in events.stream_events(
+                pubsub, snapshot, is_disconnected, keepalive_s=60
+            )
+        ]
+
+        assert frames[0].startswith("retry: ")
+        assert frames[1].startswith("event: report\n")
+        assert json.loads(frames[1].split("data: ", 1)[1])["status"] == "EXTRACTED"
+        assert frames[2] == f"event: recommendations\ndata: {json.dumps(live)}\n\n"
+        assert len(frames) == 3
+        assert pubsub.closed and pubsub.pool_disconnected
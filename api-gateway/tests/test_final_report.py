@@ -592,3 +592,127 @@ async def test_final_report__invalid_format_parameter__defaults_to_json(
     data = response.json()
     assert "participant_name" in data
     assert "score_pct" in data
+
+
+@pytest.mark.asyncio
+async def test_api_final_report__matching_etag__returns_304(
+    test_env, client: AsyncClient, db_session, participant_with_full_data
+):
+    """Repeat views with If-None-Match get 304; a metric change yields a new ETag."""
+    participant = participant_with_full_data["participant"]
+    prof_activity = participant_with_full_data["prof_activity"]
+
+    from app.repositories.participant_metric import ParticipantMetricRepository
+    from app.services.auth import create_user
+
+    user = await create_user(db_session, "active@example.com", "password123", role="USER")
+    user.status = "ACTIVE"
+    await db_session.commit()
+    login_response = await client.post(
+        "/api/auth/login", json={"email": "active@example.com", "password": "password123"}
+    )
+    auth_cookies = dict(login_response.cookies)
+    url = f"/api/participants/{participant.id}/final-report?activity_code={prof_activity.code}"
+
+    first = await client.get(url, cookies=auth_cookies)
+    etag = first.headers["etag"]
+    repeat = await client.get(url, cookies=auth_cookies, headers={"If-None-Match": etag})
+    html = await client.get(f"{url}&format=html", cookies=auth_cookies)
+
+    assert first.status_code == 200
+    assert repeat.status_code == 304
+    assert repeat.content == b""
+    assert html.headers["etag"] != etag
+
+    metric = (await ParticipantMetricRepository(db_session).list_by_participant(participant.id))[0]
+    await ParticipantMetricRepository(db_session).update_value(
+        participant.id, metric.metric_code, Decimal("5.00")
+    )
+    changed = await client.get(url, cookies=auth_cookies, headers={"If-None-Match": etag})
+
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+
+
+@pytest.mark.unit
+async def test_final_report_cache__same_version_skips_report_query(monkeypatch):
+    """Reports are cached per data version; a metric change invalidates the key."""
+    from types import SimpleNamespace
+
+    from app.services import final_report_cache
+    from app.services.weight_catalog import get_weight_catalog_cache
+
+    monkeypatch.setattr(final_report_cache.settings, "final_report_cache_enabled", True)
+    monkeypatch.setattr(final_report_cache, "_cache", final_report_cache.FinalReportCache())
+
+    activity = SimpleNamespace(id=uuid4(), code="DEV", name="Developer")
+    table = SimpleNamespace(
+        id=uuid4(), prof_activity=activity, weights=[{"metric_code": "A", "weight": "1.0"}]
+    )
+    scoring_result = SimpleNamespace(
+        id=uuid4(),
+        score_pct=Decimal("80.00"),
+        strengths=[],
+        dev_areas=[],
+        recommendations=None,
+        recommendations_status="disabled",
+        recommendations_error=None,
+        computed_at=datetime(2025, 1, 1),
+        compute_notes=None,
+    )
+    metric = SimpleNamespace(metric_code="A", value=Decimal("8.00"), confidence=None)
+    version_row = SimpleNamespace(
+        id=scoring_result.id,
+        recommendations_status="disabled",
+        recommendations_digest="r",
+        full_name="Иванов Иван",
+        metrics_digest="m1",
+    )
+    report_queries = []
+
+    async def rows(participant_id, weight_table_id):
+        report_queries.append(weight_table_id)
+        return scoring_result, "Иванов Иван", [metric]
+
+    async def version(participant_id, weight_table_id):
+        return version_row
+
+    metric_def = SimpleNamespace(code="A", name="A", name_ru="Метрика", unit="балл")
+
+    async def list_all(active_only=False):
+        return [metric_def]
+
+    async def list_tables():
+        return [table]
+
+    async def list_activities():
+        return [activity]
+
+    service = ScoringService(db=None)
+    service.prof_activity_repo = SimpleNamespace(list_all=list_activities)
+    service.weight_table_repo = SimpleNamespace(list_all=list_tables)
+    service.metric_def_repo = SimpleNamespace(list_all=list_all)
+    service.scoring_result_repo = SimpleNamespace(
+        get_final_report_rows=rows, get_final_report_version=version
+    )
+    participant_id = uuid4()
+
+    first_version = await service.final_report_version(participant_id, "DEV")
+    first = await service.generate_final_report(participant_id, "DEV", version=first_version)
+    again = await service.generate_final_report(
+        participant_id, "DEV", version=await service.final_report_version(participant_id, "DEV")
+    )
+    version_row.metrics_digest = "m2"
+    changed_version = await service.final_report_version(participant_id, "DEV")
+    await service.generate_final_report(participant_id, "DEV", version=changed_version)
+    # Catalog content, not its shared version counter (0 without Redis), is fingerprinted
+    metric_def.unit = "%"
+    await get_weight_catalog_cache().invalidate("test")
+    renamed_version = await service.final_report_version(participant_id, "DEV")
+
+    assert again is first
+    assert renamed_version.etag("json") != changed_version.etag("json")
+    assert first["participant_name"] == "Иванов Иван"
+    assert len(report_queries) == 2
+    assert changed_version.etag("json") != first_version.etag("json")
+    assert first_version.etag("json") != first_version.etag("html")
@@ -169,6 +169,25 @@ class TestGeminiTextGeneration:
         request = mock_transport.requests[0]
         assert request["json"]["generationConfig"]["responseMimeType"] == "application/json"
 
+    async def test_generate_text_response_schema(self, gemini_client, mock_transport):
+        """A Pydantic model is sent as a Gemini responseSchema (OpenAPI subset)."""
+        from app.schemas.recommendations import RecommendationsResponse
+
+        mock_transport.add_response({"result": "ok"})
+
+        await gemini_client.generate_text(
+            prompt="Return JSON", response_schema=RecommendationsResponse
+        )
+
+        config = mock_transport.requests[0]["json"]["generationConfig"]
+        assert config["responseMimeType"] == "application/json"
+        schema = config["responseSchema"]
+        assert schema["required"] == ["strengths", "dev_areas", "recommendations"]
+        strength = schema["properties"]["strengths"]["items"]
+        assert strength["propertyOrdering"] == ["title", "metric_codes", "reason"]
+        assert strength["properties"]["metric_codes"]["minItems"] == 1
+        assert "$ref" not in str(schema) and "title" not in strength["properties"]["title"]
+
     async def test_generate_text_custom_timeout(self, gemini_client, mock_transport):
         """Test text generation with custom timeout."""
         mock_transport.add_response({"result": "ok"})
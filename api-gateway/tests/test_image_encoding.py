@@ -0,0 +1,158 @@
+"""
+Tests for the adaptive Vision payload encoder.
+"""
+
+import io
+
+import pytest
+from PIL import Image, ImageDraw
+
+from app.services.image_encoding import (
+    FORMAT_JPEG,
+    FORMAT_PNG,
+    FORMAT_PNG_GRAY,
+    FORMAT_PNG_PALETTE,
+    FORMAT_WEBP_LOSSLESS,
+    AdaptiveImageEncoder,
+    psnr,
+    sniff_mime_type,
+)
+
+MAX_BYTES = 20 * 1024 * 1024
+
+
+def make_table_canvas(color: bool = False) -> Image.Image:
+    """Text-like canvas: dark glyph strokes on white, optional coloured bars."""
+    img = Image.new("RGB", (1200, 900), (255, 255, 255))
+    draw = ImageDraw.Draw(img)
+    for row in range(20):
+        y = 20 + row * 42
+        draw.text((20, y), f"METRIC LABEL {row:02d}", fill=(0, 0, 0))
+        draw.line((10, y + 30, 1190, y + 30), fill=(200, 200, 200), width=1)
+        if color:
+            draw.rectangle((600, y, 600 + row * 25, y + 20), fill=(30, 120, 220))
+    return img
+
+
+def make_photo_like() -> Image.Image:
+    """Smooth multi-colour gradient (thousands of distinct colours)."""
+    img = Image.new("RGB", (512, 512))
+    img.putdata([(x // 2, y // 2, (x + y) // 4) for y in range(512) for x in range(512)])
+    return img
+
+
+@pytest.mark.unit
+class TestAdaptiveImageEncoder:
+    """Candidate selection and constraints."""
+
+    def test_grayscale_table_prefers_gray_or_palette(self):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES)
+        payload = encoder.encode(make_table_canvas())
+
+        assert payload is not None
+        assert payload.format in (FORMAT_PNG_GRAY, FORMAT_PNG_PALETTE, FORMAT_WEBP_LOSSLESS)
+        reference = encoder.encode_all(make_table_canvas())
+        png = next(r for r in reference if r.format == FORMAT_PNG)
+        assert payload.size_bytes <= png.size_bytes
+
+    def test_colour_canvas_skips_grayscale(self):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES)
+        formats = {r.format for r in encoder.encode_all(make_table_canvas(color=True))}
+
+        assert FORMAT_PNG_GRAY not in formats
+        assert FORMAT_PNG in formats
+
+    def test_exact_palette_is_lossless(self):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES, candidates=(FORMAT_PNG_PALETTE,))
+        canvas = make_table_canvas(color=True)
+        payload = encoder.encode(canvas)
+
+        assert payload is not None
+        assert payload.psnr_db is None
+        decoded = Image.open(io.BytesIO(payload.data)).convert("RGB")
+        assert psnr(canvas, decoded) == float("inf")
+
+    def test_lossy_candidates_rejected_below_psnr_threshold(self):
+        encoder = AdaptiveImageEncoder(
+            max_bytes=MAX_BYTES, min_psnr_db=99.0, candidates=(FORMAT_JPEG, FORMAT_PNG)
+        )
+        payload = encoder.encode(make_photo_like())
+
+        assert payload is not None
+        assert payload.format == FORMAT_PNG
+
+    def test_returns_none_when_nothing_fits(self):
+        encoder = AdaptiveImageEncoder(max_bytes=10)
+
+        assert encoder.encode(make_table_canvas()) is None
+
+    def test_png_only_mode(self):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES, candidates=(FORMAT_PNG,))
+        payload = encoder.encode(make_table_canvas())
+
+        assert payload.format == FORMAT_PNG
+        assert payload.mime_type == "image/png"
+        assert payload.encode_ms >= 0
+
+    def test_unknown_candidate_rejected(self):
+        with pytest.raises(ValueError, match="Unknown encoder candidates"):
+            AdaptiveImageEncoder(max_bytes=MAX_BYTES, candidates=("TIFF",))
+
+    def test_budget_skips_optimized_png_once_a_candidate_is_accepted(self, monkeypatch):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES, time_budget_ms=100.0)
+        encoded_formats = []
+        original = encoder._encode_candidate
+
+        def slow_encode(rgb, fmt, fast=False):
+            encoded_formats.append(fmt)
+            encoded = original(rgb, fmt, fast=fast)
+            if encoded is not None:
+                encoded.encode_ms = 100.0
+            return encoded
+
+        monkeypatch.setattr(encoder, "_encode_candidate", slow_encode)
+        payload = encoder.encode(make_table_canvas())
+
+        assert payload.format == FORMAT_PNG_GRAY
+        assert encoded_formats == [FORMAT_PNG_GRAY]
+
+    def test_budget_exhausted_without_result_falls_back_to_fast_png(self):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES, time_budget_ms=0.0)
+        payload = encoder.encode(make_table_canvas())
+
+        assert payload is not None
+        assert payload.format == FORMAT_PNG
+        decoded = Image.open(io.BytesIO(payload.data)).convert("RGB")
+        assert psnr(make_table_canvas(), decoded) == float("inf")
+
+    def test_png_only_mode_over_budget_keeps_png(self, monkeypatch):
+        encoder = AdaptiveImageEncoder(
+            max_bytes=MAX_BYTES, time_budget_ms=1.0, candidates=(FORMAT_PNG,)
+        )
+        original = encoder._encode_candidate
+
+        def slow_encode(rgb, fmt, fast=False):
+            encoded = original(rgb, fmt, fast=fast)
+            encoded.encode_ms = 50.0
+            return encoded
+
+        monkeypatch.setattr(encoder, "_encode_candidate", slow_encode)
+        payload = encoder.encode(make_table_canvas())
+
+        assert payload is not None
+        assert payload.format == FORMAT_PNG
+
+    def test_report_contains_format_bytes_and_time(self):
+        encoder = AdaptiveImageEncoder(max_bytes=MAX_BYTES)
+        report = encoder.encode(make_table_canvas()).as_report()
+
+        assert {"format", "mime_type", "bytes", "encode_ms", "width", "height"} <= set(report)
+        assert report["width"] == 1200
+
+
+@pytest.mark.unit
+def test_sniff_mime_type():
+    for fmt, expected in (("PNG", "image/png"), ("JPEG", "image/jpeg"), ("WEBP", "image/webp")):
+        output = io.BytesIO()
+        Image.new("RGB", (8, 8), (255, 255, 255)).save(output, format=fmt)
+        assert sniff_mime_type(output.getvalue()) == expected
@@ -0,0 +1,32 @@
+"""
+Tests for local repair of LLM JSON output.
+"""
+
+import pytest
+
+from app.services.json_repair import repair_json
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    ("text", "expected", "repairs"),
+    [
+        ('{"a": [1, 2]}', {"a": [1, 2]}, []),
+        ('```json\n{"a": 1}\n```', {"a": 1}, ["fences"]),
+        ('Вот ответ: {"a": 1} Надеюсь, помог', {"a": 1}, ["prose"]),
+        ('{"a": [1, 2,], "b": {"c": 1,},}', {"a": [1, 2], "b": {"c": 1}}, ["trailing_commas"]),
+        ('{"a": "x, y]", }', {"a": "x, y]"}, ["trailing_commas"]),
+        ('{"a": [1, 2], "b": "unterminat', {"a": [1, 2], "b": "unterminat"}, ["truncated"]),
+        ('{"a": [{"t": 1}, {"t": 2, "u"', {"a": [{"t": 1}, {"t": 2}]}, ["truncated"]),
+        ('[{"t": 1}, {"t": 2}, {"t": tr', [{"t": 1}, {"t": 2}], ["truncated"]),
+    ],
+)
+def test_repair_json(text, expected, repairs):
+    assert repair_json(text) == (expected, repairs)
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("text", ["This is not valid JSON", "", '{"a": nope}'])
+def test_repair_json_unrepairable(text):
+    with pytest.raises(ValueError):
+        repair_json(text)
@@ -18,7 +18,7 @@ from PIL import Image
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.db.models import FileRef, MetricDef, Participant, Report, ReportImage, User
-from app.services.metric_extraction import MetricExtractionService
+from app.services.metric_extraction import MetricExtractionService, parse_vision_metrics
 
 
 # ===== Helper Functions =====
@@ -299,3 +299,287 @@ class TestMetricExtractionWithCombination:
         assert len(result["errors"]) > 0
         assert "No images provided" in result["errors"][0]["error"]
 
+
+
+# ===== Batched Extraction (shared canvases) =====
+
+
+@pytest.mark.unit
+class TestBatchCanvasPacking:
+    """Packing several reports into shared canvases with section attribution."""
+
+    def _service(self) -> MetricExtractionService:
+        # Packing and section resolution do not touch the database
+        return MetricExtractionService(db=None)
+
+    def test_three_reports_share_one_canvas(self):
+        service = self._service()
+        report_ids = [uuid.uuid4() for _ in range(3)]
+        sections = [
+            (idx + 1, report_id, [Image.new("RGB", (800, 600), (255, 255, 255))] * 2)
+            for idx, report_id in enumerate(report_ids)
+        ]
+
+        canvases = service._pack_sections_into_canvases(sections)
+
+        assert len(canvases) == 1
+        canvas, section_map = canvases[0]
+        assert section_map == {1: report_ids[0], 2: report_ids[1], 3: report_ids[2]}
+        assert canvas.width == 800
+        assert canvas.height <= service.max_combined_height
+
+    def test_overflowing_section_repeats_header_on_next_canvas(self):
+        service = self._service()
+        report_a, report_b = uuid.uuid4(), uuid.uuid4()
+        tall = Image.new("RGB", (800, 5000), (255, 255, 255))
+        sections = [(1, report_a, [tall, tall]), (2, report_b, [tall, tall])]
+
+        canvases = service._pack_sections_into_canvases(sections)
+
+        assert len(canvases) == 2
+        assert canvases[0][1] == {1: report_a, 2: report_b}
+        assert canvases[1][1] == {2: report_b}
+        for canvas, _ in canvases:
+            assert canvas.height <= service.max_combined_height
+
+    def test_resolve_section(self):
+        report_id = uuid.uuid4()
+        section_map = {1: report_id}
+
+        assert MetricExtractionService._resolve_section({"section": 1}, section_map) == report_id
+        assert MetricExtractionService._resolve_section({"section": "1"}, section_map) == report_id
+        assert MetricExtractionService._resolve_section({"section": 7}, section_map) is None
+        assert MetricExtractionService._resolve_section({}, section_map) is None
+
+
+# ===== Structured Vision Output =====
+
+
+@pytest.mark.unit
+class TestParseVisionMetrics:
+    """Parsing of schema-constrained (or almost valid) vision output."""
+
+    def test_valid_response(self):
+        text = '{"metrics": [{"label": "ЛИДЕРСТВО", "value": "7,5", "section": 2}]}'
+
+        assert parse_vision_metrics(text) == [
+            {"label": "ЛИДЕРСТВО", "value": "7,5", "section": 2}
+        ]
+
+    def test_bad_item_does_not_lose_group(self):
+        text = (
+            '```json\n{"metrics": [{"label": "ЛИДЕРСТВО", "value": 7.5}, {"label": ""}, '
+            '{"label": "ПОДДЕРЖКА", "value": "9"},]}\n```'
+        )
+
+        assert parse_vision_metrics(text) == [
+            {"label": "ЛИДЕРСТВО", "value": "7.5"},
+            {"label": "ПОДДЕРЖКА", "value": "9"},
+        ]
+
+    def test_truncated_last_item_is_dropped(self):
+        text = (
+            '{"metrics": [{"label": "ЛИДЕРСТВО", "value": "7.5"}, '
+            '{"label": "ПОДДЕРЖКА", "value": "6'
+        )
+
+        assert parse_vision_metrics(text) == [{"label": "ЛИДЕРСТВО", "value": "7.5"}]
+
+    def test_unparseable_response(self):
+        assert parse_vision_metrics("no metrics here") == []
+
+
+# ===== Resumable Extraction (checkpoints) =====
+
+
+class FakeCheckpoints:
+    """In-memory stand-in for ExtractionCheckpointRepository."""
+
+    def __init__(self, state: dict | None = None):
+        self.state = dict(state or {})
+        self.saved: list[tuple[str, int]] = []
+
+    async def load(self, report_id):
+        return dict(self.state)
+
+    async def save(self, report_id, stage, payload, group_index=0):
+        self.state[(stage, group_index)] = payload
+        self.saved.append((stage, group_index))
+
+
+class FakeResult:
+    def __init__(self, value):
+        self.value = value
+
+    def scalar_one_or_none(self):
+        return self.value
+
+
+class FakeSession:
+    def __init__(self, report):
+        self.report = report
+
+    async def execute(self, *args, **kwargs):
+        return FakeResult(self.report)
+
+
+@pytest.mark.unit
+class TestResumableExtraction:
+    """Checkpointed stages are not repeated on retry."""
+
+    async def test_metrics_saved_checkpoint_short_circuits(self):
+        service = MetricExtractionService(db=None)
+        stored = {"metrics_extracted": 3, "metrics_saved": 3, "errors": [], "failed_groups": []}
+        checkpoints = FakeCheckpoints({("METRICS_SAVED", 0): stored})
+
+        result = await service.extract_metrics_from_report_images(
+            uuid.uuid4(), [], checkpoints=checkpoints
+        )
+
+        assert result == stored
+
+    async def test_parsed_groups_skip_images_and_gemini(self, monkeypatch):
+        report = Report(id=uuid.uuid4(), participant_id=uuid.uuid4(), status="PROCESSING")
+        service = MetricExtractionService(db=FakeSession(report))
+        images = [ReportImage(id=uuid.uuid4(), order_index=i, page=0) for i in range(3)]
+        group_ids = [[str(images[0].id)], [str(images[1].id), str(images[2].id)]]
+        checkpoints = FakeCheckpoints(
+            {
+                ("GROUPS_BUILT", 0): {"groups": group_ids},
+                ("GROUP_PARSED", 0): {"metrics": [{"label": "ЛИДЕРСТВО", "value": "7.5"}]},
+                ("GROUP_PARSED", 1): {"metrics": [{"label": "ПОДДЕРЖКА", "value": "9"}]},
+            }
+        )
+
+        async def no_call(*args, **kwargs):
+            raise AssertionError("must not be called on resume")
+
+        async def no_metric_defs(*args, **kwargs):
+            return []
+
+        monkeypatch.setattr(service, "_load_image_data", no_call)
+        monkeypatch.setattr(service, "_extract_metrics_with_retry", no_call)
+        monkeypatch.setattr(service.metric_def_repo, "list_all", no_metric_defs)
+
+        result = await service.extract_metrics_from_report_images(
+            report.id, images, checkpoints=checkpoints
+        )
+
+        assert result["metrics_extracted"] == 2
+        assert result["failed_groups"] == []
+        # Nothing mapped (no metric definitions): the failure is not replayed later
+        assert result["metrics_saved"] == 0
+        assert ("METRICS_SAVED", 0) not in checkpoints.state
+
+    async def test_empty_parse_is_not_checkpointed(self, monkeypatch):
+        report = Report(id=uuid.uuid4(), participant_id=uuid.uuid4(), status="PROCESSING")
+        service = MetricExtractionService(db=FakeSession(report))
+        image = ReportImage(id=uuid.uuid4(), order_index=0, page=0)
+        checkpoints = FakeCheckpoints(
+            {
+                ("GROUPS_BUILT", 0): {"groups": [[str(image.id)]]},
+                # Left by an earlier run: must be re-requested, not replayed
+                ("GROUP_PARSED", 0): {"metrics": []},
+            }
+        )
+        calls = []
+
+        async def load_image(img):
+            return create_test_image()
+
+        async def empty_parse(*args, **kwargs):
+            calls.append(args)
+            return []
+
+        async def no_metric_defs(*args, **kwargs):
+            return []
+
+        monkeypatch.setattr(service, "_load_image_data", load_image)
+        monkeypatch.setattr(service, "_extract_metrics_with_retry", empty_parse)
+        monkeypatch.setattr(service.metric_def_repo, "list_all", no_metric_defs)
+
+        await service.extract_metrics_from_report_images(
+            report.id, [image], checkpoints=checkpoints
+        )
+
+        assert len(calls) == 1
+        assert ("GROUP_PARSED", 0) not in checkpoints.saved
+
+
+# ===== Batched Extraction (failure isolation) =====
+
+
+class FakeRows:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def all(self):
+        return self.rows
+
+
+class FakeBatchSession:
+    def __init__(self, rows):
+        self.rows = rows
+        self.rollbacks = 0
+
+    async def execute(self, *args, **kwargs):
+        return FakeRows(self.rows)
+
+    async def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.mark.unit
+class TestBatchExtractionIsolation:
+    """One participant's failure does not fail the whole batch."""
+
+    async def test_failed_participant_is_isolated(self, monkeypatch):
+        from app.services import metric_extraction
+
+        participant_a, participant_b = uuid.uuid4(), uuid.uuid4()
+        report_a, report_b = uuid.uuid4(), uuid.uuid4()
+        db = FakeBatchSession([(report_a, participant_a), (report_b, participant_b)])
+        service = MetricExtractionService(db=db)
+        image = Image.new("RGB", (800, 600), (255, 255, 255))
+        saved = {}
+
+        async def no_metric_defs(*args, **kwargs):
+            return []
+
+        async def load_images(images, errors):
+            return [(image, "img")]
+
+        async def vision(*args, **kwargs):
+            return [{"label": "ЛИДЕРСТВО", "value": "7.5", "section": 1}, {"label": "ПОДДЕРЖКА"}]
+
+        async def save(participant_id, report_ids, metrics_by_report, metric_def_by_code, results):
+            if participant_id == participant_a:
+                raise RuntimeError("connection reset")
+            saved[participant_id] = metrics_by_report
+
+        class ReloadedImages:
+            def __init__(self, db):
+                pass
+
+            async def get_by_report(self, report_id):
+                return ["reloaded"]
+
+        monkeypatch.setattr(service.metric_def_repo, "list_all", no_metric_defs)
+        monkeypatch.setattr(service, "_load_processed_images", load_images)
+        monkeypatch.setattr(service, "_extract_metrics_with_retry", vision)
+        monkeypatch.setattr(service, "_save_participant_batch", save)
+        monkeypatch.setattr(metric_extraction, "ReportImageRepository", ReloadedImages)
+
+        results = await service.extract_metrics_from_reports_batch(
+            {report_a: ["image"], report_b: ["image"]}
+        )
+
+        assert db.rollbacks == 1
+        assert results[report_a]["retryable"] is True
+        assert "connection reset" in results[report_a]["errors"][0]["error"]
+        assert "retryable" not in results[report_b]
+        assert [m.normalized_label for m in saved[participant_b][report_b]] == ["ЛИДЕРСТВО"]
+        # The metric without a section is reported, not attributed to a report
+        assert service.unassigned_metrics == [
+            {"participant_id": str(participant_b), "canvas": 1, "metric": {"label": "ПОДДЕРЖКА"}}
+        ]
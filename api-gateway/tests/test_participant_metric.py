@@ -379,3 +379,51 @@ async def test_manual_update_value(db_session):
     assert updated.id == metric.id
     assert updated.value == Decimal("9.0")
     assert updated.confidence == Decimal("0.95")  # Kept old confidence
+
+
+@pytest.mark.unit
+async def test_upsert_many_applies_priority_with_single_commit(db_session):
+    """Batched upsert resolves newer-report priority across reports of one participant."""
+    participant = Participant(full_name="Batch Participant")
+    db_session.add(participant)
+    await db_session.commit()
+    await db_session.refresh(participant)
+
+    reports = []
+    for idx, age_days in enumerate((2, 0)):
+        file_ref = FileRef(
+            storage="LOCAL",
+            bucket="test",
+            key=f"batch{idx}.docx",
+            mime="application/pdf",
+            size_bytes=1024,
+        )
+        db_session.add(file_ref)
+        await db_session.commit()
+        report = Report(
+            participant_id=participant.id,
+            status="PROCESSING",
+            file_ref_id=file_ref.id,
+            uploaded_at=datetime.now(UTC) - timedelta(days=age_days),
+        )
+        db_session.add(report)
+        await db_session.commit()
+        await db_session.refresh(report)
+        reports.append(report)
+    older, newer = reports
+
+    repo = ParticipantMetricRepository(db_session)
+    written = await repo.upsert_many(
+        participant.id,
+        [
+            ("competency_1", Decimal("8.0"), Decimal("1.0"), newer.id),
+            ("competency_1", Decimal("3.0"), Decimal("1.0"), older.id),
+            ("competency_2", Decimal("5.5"), Decimal("1.0"), older.id),
+        ],
+    )
+
+    assert written == 2
+    metrics = {m.metric_code: m for m in await repo.list_by_participant(participant.id)}
+    assert metrics["competency_1"].value == Decimal("8.0")
+    assert metrics["competency_1"].last_source_report_id == newer.id
+    assert metrics["competency_2"].value == Decimal("5.5")
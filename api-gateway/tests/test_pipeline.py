@@ -0,0 +1,180 @@
+"""
+Tests for the auto-scoring pipeline scheduling and recommendation fan-out.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+
+from app.tasks import pipeline
+
+
+class FakeReportRepository:
+    statuses: dict[uuid.UUID, list[str]] = {}
+
+    def __init__(self, session):
+        pass
+
+    async def get_all_by_participant(self, participant_id):
+        return [SimpleNamespace(status=s) for s in self.statuses.get(participant_id, [])]
+
+
+class FakeSignature:
+    def __init__(self, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+
+
+class FakeTask:
+    def s(self, *args, **kwargs):
+        return FakeSignature(*args, **kwargs)
+
+
+@pytest.fixture
+def scheduled(monkeypatch):
+    calls = []
+
+    def fake_chain(*signatures):
+        return SimpleNamespace(apply_async=lambda: calls.append(signatures))
+
+    monkeypatch.setattr(pipeline.settings, "auto_scoring_pipeline_enabled", True)
+    monkeypatch.setattr(pipeline.settings, "auto_scoring_activity_codes", "DEV, QA")
+    monkeypatch.setattr(pipeline, "ReportRepository", FakeReportRepository)
+    monkeypatch.setattr(pipeline, "chain", fake_chain)
+    monkeypatch.setattr(pipeline, "score_participant_activities", FakeTask())
+    monkeypatch.setattr(pipeline, "dispatch_pipeline_recommendations", FakeTask())
+    monkeypatch.setattr(pipeline, "_acquire_pipeline_lock", lambda participant_id: True)
+    return calls
+
+
+@pytest.mark.unit
+class TestScheduleIfReady:
+    async def test_starts_chain_when_all_reports_extracted(self, scheduled):
+        ready, waiting = uuid.uuid4(), uuid.uuid4()
+        FakeReportRepository.statuses = {
+            ready: ["EXTRACTED", "EXTRACTED"],
+            waiting: ["EXTRACTED", "PROCESSING"],
+        }
+
+        started = await pipeline.schedule_if_ready(None, [ready, waiting, ready], "req-1")
+
+        assert started == [str(ready)]
+        score, body = scheduled[0]
+        assert score.args == (str(ready), ["DEV", "QA"])
+        assert body.args == (str(ready),)
+        assert body.kwargs == {"request_id": "req-1"}
+
+    async def test_lock_prevents_duplicate_start(self, scheduled, monkeypatch):
+        participant_id = uuid.uuid4()
+        FakeReportRepository.statuses = {participant_id: ["EXTRACTED"]}
+        monkeypatch.setattr(pipeline, "_acquire_pipeline_lock", lambda participant_id: False)
+
+        assert await pipeline.schedule_if_ready(None, [participant_id]) == []
+        assert scheduled == []
+
+    async def test_disabled(self, scheduled, monkeypatch):
+        participant_id = uuid.uuid4()
+        FakeReportRepository.statuses = {participant_id: ["EXTRACTED"]}
+        monkeypatch.setattr(pipeline.settings, "auto_scoring_pipeline_enabled", False)
+
+        assert await pipeline.schedule_if_ready(None, [participant_id]) == []
+        assert scheduled == []
+
+
+@pytest.mark.unit
+def test_dispatch_fans_out_pending_results_only(monkeypatch):
+    dispatched = []
+
+    def fake_group(signatures):
+        signatures = list(signatures)
+        dispatched.extend(sig.args[0] for sig in signatures)
+        results = [SimpleNamespace(id=f"task-{i}") for i in range(len(signatures))]
+        return SimpleNamespace(apply_async=lambda: SimpleNamespace(results=results))
+
+    monkeypatch.setattr(pipeline, "group", fake_group)
+    monkeypatch.setattr(pipeline, "generate_report_recommendations", FakeTask())
+
+    result = pipeline.dispatch_pipeline_recommendations.run(
+        [
+            {"status": "scored", "scoring_result_id": "a", "recommendations_status": "pending"},
+            {"status": "scored", "scoring_result_id": "b", "recommendations_status": "disabled"},
+            {"status": "skipped", "reason": "Missing extracted metrics"},
+        ],
+        "participant-1",
+    )
+
+    assert dispatched == ["a"]
+    assert result["recommendations_task_ids"] == ["task-0"]
+
+
+@pytest.mark.unit
+class TestScoreParticipantActivities:
+    @pytest.fixture
+    def published(self, monkeypatch):
+        events = []
+        monkeypatch.setattr(
+            pipeline, "publish_event", lambda *args, **kwargs: events.append((args, kwargs))
+        )
+        return events
+
+    def test_scores_in_one_batch(self, monkeypatch, published):
+        participant_id = str(uuid.uuid4())
+        scored = SimpleNamespace(
+            id=uuid.uuid4(),
+            score_pct=87.5,
+            recommendations_status="pending",
+            weight_table=SimpleNamespace(prof_activity=SimpleNamespace(code="DEV")),
+        )
+        batches = []
+
+        class FakeBulkScoringService:
+            def __init__(self, session):
+                pass
+
+            async def score_all(self, participant_ids, activity_codes):
+                batches.append((participant_ids, activity_codes))
+                return SimpleNamespace(
+                    scoring_result_ids=[str(scored.id)],
+                    skipped_activities={"PM": "No weight table"},
+                )
+
+        class FakeScoringResultRepository:
+            def __init__(self, session):
+                pass
+
+            async def get_many(self, ids):
+                return [scored] if ids == [scored.id] else []
+
+        monkeypatch.setattr(pipeline, "BulkScoringService", FakeBulkScoringService)
+        monkeypatch.setattr(pipeline, "ScoringResultRepository", FakeScoringResultRepository)
+
+        results = pipeline.score_participant_activities.run(participant_id, ["DEV", "QA", "PM"])
+
+        assert batches == [([uuid.UUID(participant_id)], ["DEV", "QA", "PM"])]
+        assert [(r["activity_code"], r["status"]) for r in results] == [
+            ("DEV", "scored"),
+            ("QA", "skipped"),
+            ("PM", "skipped"),
+        ]
+        assert results[0]["scoring_result_id"] == str(scored.id)
+        assert results[2]["reason"] == "No weight table"
+        assert len(published) == 1
+
+    def test_unexpected_error_still_returns_entries(self, monkeypatch, published):
+        class FailingBulkScoringService:
+            def __init__(self, session):
+                pass
+
+            async def score_all(self, participant_ids, activity_codes):
+                raise RuntimeError("connection refused")
+
+        monkeypatch.setattr(pipeline, "BulkScoringService", FailingBulkScoringService)
+
+        results = pipeline.score_participant_activities.run(str(uuid.uuid4()), ["DEV", "QA"])
+
+        assert results == [
+            {"activity_code": "DEV", "status": "error", "reason": "connection refused"},
+            {"activity_code": "QA", "status": "error", "reason": "connection refused"},
+        ]
+        assert published == []
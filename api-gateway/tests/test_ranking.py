@@ -0,0 +1,270 @@
+"""
+Tests for the cohort ranking index (leaderboards and percentiles per activity).
+"""
+
+import fnmatch
+import threading
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.services import ranking
+from app.services.ranking import RankingIndex, RankingService, percentile
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args, **kwargs):
+            self.calls.append((name, args, kwargs))
+
+        return record
+
+    def execute(self):
+        self.client._check()
+        return [getattr(self.client, name)(*args, **kwargs) for name, args, kwargs in self.calls]
+
+
+class FakeRedis:
+    """Sorted sets and hashes with the Redis ordering rules the index relies on."""
+
+    def __init__(self):
+        self.zsets: dict[str, dict[str, float]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+        self.fail = False
+        self.threads: set[int] = set()
+
+    def _check(self):
+        self.threads.add(threading.get_ident())
+        if self.fail:
+            raise redis.ConnectionError("connection refused")
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def delete(self, *keys):
+        self._check()
+        for key in keys:
+            self.zsets.pop(key, None)
+            self.hashes.pop(key, None)
+
+    def zadd(self, key, mapping):
+        self._check()
+        self.zsets.setdefault(key, {}).update({m: float(s) for m, s in mapping.items()})
+
+    def scan_iter(self, match, _type=None):
+        self._check()
+        assert _type == "zset"
+        return [key for key in list(self.zsets) if fnmatch.fnmatchcase(key, match)]
+
+    def zrem(self, key, member):
+        self._check()
+        self.zsets.get(key, {}).pop(member, None)
+
+    def zscore(self, key, member):
+        self._check()
+        return self.zsets.get(key, {}).get(member)
+
+    def zcard(self, key):
+        self._check()
+        return len(self.zsets.get(key, {}))
+
+    def zrevrange(self, key, start, end, withscores=False):
+        self._check()
+        ordered = sorted(
+            self.zsets.get(key, {}).items(), key=lambda item: (item[1], item[0]), reverse=True
+        )
+        return [(member.encode(), score) for member, score in ordered[start : end + 1]]
+
+    def zcount(self, key, low, high):
+        self._check()
+
+        def above(score, bound):
+            if bound == "-inf":
+                return True
+            return score > float(bound[1:]) if bound.startswith("(") else score >= float(bound)
+
+        def below(score, bound):
+            if bound == "+inf":
+                return True
+            return score < float(bound[1:]) if bound.startswith("(") else score <= float(bound)
+
+        return sum(
+            1
+            for score in self.zsets.get(key, {}).values()
+            if above(score, low) and below(score, high)
+        )
+
+    def hset(self, key, mapping):
+        self._check()
+        self.hashes.setdefault(key, {}).update(mapping)
+
+    def hget(self, key, field):
+        self._check()
+        value = self.hashes.get(key, {}).get(field)
+        return value.encode() if value is not None else None
+
+
+class FakeRepo:
+    def __init__(self, **methods):
+        self.__dict__.update(methods)
+
+
+DEV = SimpleNamespace(
+    id=uuid.uuid4(),
+    prof_activity=SimpleNamespace(id=uuid.uuid4(), code="DEV", name="Developer"),
+    weights=[{"metric_code": "A", "weight": "0.5"}, {"metric_code": "B", "weight": "0.5"}],
+)
+
+PIDS = [uuid.UUID(int=index) for index in range(1, 6)]
+
+
+@pytest.fixture
+def cohort():
+    return {
+        PIDS[0]: {"A": Decimal("9.00"), "B": Decimal("8.00")},  # 85.00
+        PIDS[1]: {"A": Decimal("6.00"), "B": Decimal("7.00")},  # 65.00
+        PIDS[2]: {"A": Decimal("7.00"), "B": Decimal("6.00")},  # 65.00
+        PIDS[3]: {"A": Decimal("5.00"), "B": Decimal("4.00")},  # 45.00
+        PIDS[4]: {"A": Decimal("9.00")},  # missing B: not ranked
+    }
+
+
+def make_service(cohort, weight_tables, index):
+    async def get_all_metrics_dicts():
+        return cohort
+
+    async def get_metrics_dict(participant_id):
+        return cohort.get(participant_id, {})
+
+    async def list_all():
+        return weight_tables
+
+    async def get_many(participant_ids):
+        return {pid: SimpleNamespace(full_name=f"P{pid.int}") for pid in participant_ids}
+
+    service = RankingService(db=None, index=index)
+    service.participant_metric_repo = FakeRepo(
+        get_all_metrics_dicts=get_all_metrics_dicts, get_metrics_dict=get_metrics_dict
+    )
+
+    async def no_rows(active_only=False):
+        return []
+
+    service.prof_activity_repo = FakeRepo(list_all=no_rows)
+    service.weight_table_repo = FakeRepo(list_all=list_all)
+    service.metric_def_repo = FakeRepo(list_all=no_rows)
+    service.participant_repo = FakeRepo(get_many=get_many)
+    return service
+
+
+@pytest.fixture
+def index(monkeypatch):
+    monkeypatch.setattr(ranking.settings, "ranking_index_enabled", True)
+    instance = RankingIndex()
+    instance._redis._client = FakeRedis()
+    return instance
+
+
+@pytest.mark.unit
+def test_percentile_counts_ties_as_half():
+    assert percentile(below=0, equal=1, total=1) == Decimal("50.00")
+    assert percentile(below=1, equal=2, total=4) == Decimal("50.00")
+    assert percentile(below=3, equal=1, total=4) == Decimal("87.50")
+
+
+@pytest.mark.unit
+async def test_leaderboard_from_index_matches_database_fallback(cohort, index, monkeypatch):
+    indexed = await make_service(cohort, [DEV], index).leaderboard("DEV", limit=2, offset=1)
+
+    monkeypatch.setattr(ranking.settings, "ranking_index_enabled", False)
+    computed = await make_service(cohort, [DEV], index).leaderboard("DEV", limit=2, offset=1)
+
+    assert indexed == computed
+    assert len(index._redis._client.zsets["ranking:activity:DEV"]) == 4
+    assert indexed["total"] == 4
+    # Tied 65.00 scores share rank 2, ordered by participant id (descending)
+    assert [(item["rank"], item["participant_id"]) for item in indexed["items"]] == [
+        (2, str(PIDS[2])),
+        (2, str(PIDS[1])),
+    ]
+    assert indexed["items"][0]["score_pct"] == Decimal("65.00")
+
+
+@pytest.mark.unit
+async def test_index_calls_run_off_the_event_loop(cohort, index):
+    service = make_service(cohort, [DEV], index)
+
+    await service.leaderboard("DEV")
+    await service.participant_rank("DEV", PIDS[0])
+
+    assert index._redis._client.threads
+    assert threading.get_ident() not in index._redis._client.threads
+
+
+@pytest.mark.unit
+async def test_refresh_participant_updates_rank_incrementally(cohort, index):
+    service = make_service(cohort, [DEV], index)
+    await service.leaderboard("DEV")  # builds the index
+
+    cohort[PIDS[3]] = {"A": Decimal("10.00"), "B": Decimal("9.50")}
+    cohort[PIDS[0]] = {"A": Decimal("11.00"), "B": Decimal("8.00")}  # out of range
+    await service.refresh_participant(PIDS[3])
+    await service.refresh_participant(PIDS[0])
+
+    top = await service.participant_rank("DEV", PIDS[3])
+    assert (top["score_pct"], top["rank"], top["total"]) == (Decimal("97.50"), 1, 3)
+    assert top["percentile"] == Decimal("83.33")
+    assert (await service.participant_rank("DEV", PIDS[0]))["rank"] is None
+
+
+@pytest.mark.unit
+async def test_deleted_participant_leaves_every_ranking(cohort, index):
+    service = make_service(cohort, [DEV], index)
+    await service.leaderboard("DEV")  # builds the index
+
+    del cohort[PIDS[0]]
+    assert await service.remove_participant(PIDS[0]) is True
+
+    result = await service.leaderboard("DEV")
+    assert result["total"] == 3
+    assert str(PIDS[0]) not in [item["participant_id"] for item in result["items"]]
+
+
+@pytest.mark.unit
+async def test_changed_weights_rebuild_the_ranking(cohort, index):
+    await make_service(cohort, [DEV], index).leaderboard("DEV")
+
+    reweighted = SimpleNamespace(
+        id=DEV.id,
+        prof_activity=DEV.prof_activity,
+        weights=[{"metric_code": "A", "weight": "1.0"}],
+    )
+    result = await make_service(cohort, [reweighted], index).leaderboard("DEV", limit=1)
+
+    # PIDS[4] has A only and is now ranked; weights are compared, not just the table id
+    assert result["total"] == 5
+    assert result["items"][0]["participant_id"] == str(PIDS[4])
+
+
+@pytest.mark.unit
+async def test_redis_failure_falls_back_to_database(cohort, index):
+    service = make_service(cohort, [DEV], index)
+    index._redis._client.fail = True
+
+    result = await service.participant_rank("DEV", PIDS[0])
+
+    assert (result["rank"], result["total"], result["percentile"]) == (1, 4, Decimal("87.50"))
+    assert await service.refresh_participant(PIDS[0]) is False
+
+
+@pytest.mark.unit
+async def test_unknown_activity_raises(cohort, index):
+    with pytest.raises(ValueError, match="No weight table"):
+        await make_service(cohort, [DEV], index).leaderboard("MISSING")
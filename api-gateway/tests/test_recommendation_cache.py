@@ -0,0 +1,179 @@
+"""
+Tests for the TTL/LRU cache, the shared Redis client and the recommendations cache.
+"""
+
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.core.cache import SharedRedis, TTLCache
+from app.services import recommendation_cache
+from app.services.recommendation_cache import RecommendationCache, recommendation_cache_key
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[bytes, bytes]] = {}
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise redis.ConnectionError("connection refused")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value.encode() if isinstance(value, str) else value
+
+    def hincrby(self, key, field, amount):
+        self._check()
+        fields = self.hashes.setdefault(key, {})
+        fields[field.encode()] = str(int(fields.get(field.encode(), 0)) + amount).encode()
+
+    def hgetall(self, key):
+        self._check()
+        return self.hashes.get(key, {})
+
+
+def make_weight_table(weights=None):
+    return SimpleNamespace(
+        id=uuid.UUID("00000000-0000-0000-0000-000000000001"),
+        weights=weights
+        or [{"metric_code": "A", "weight": "0.6"}, {"metric_code": "B", "weight": "0.4"}],
+    )
+
+
+def metrics(a: float, b: float) -> list[dict]:
+    return [{"code": "A", "value": a, "weight": 0.6}, {"code": "B", "value": b, "weight": 0.4}]
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(recommendation_cache.settings, "recommendations_cache_enabled", True)
+    instance = RecommendationCache()
+    instance._redis._client = FakeRedis()
+    return instance
+
+
+@pytest.mark.unit
+class TestTTLCache:
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert "b" not in cache
+        assert cache.get("a") == 1
+        assert cache.stats.evictions == 1
+
+    def test_expiry_and_hit_rate(self):
+        clock = FakeClock()
+        cache = TTLCache(maxsize=10, ttl_s=5, clock=clock)
+        cache.set("a", 1)
+
+        assert cache.get("a") == 1
+        clock.now = 5
+        assert cache.get("a") is None
+        assert cache.stats.as_dict() == {
+            "hits": 1,
+            "misses": 1,
+            "evictions": 0,
+            "expirations": 1,
+            "hit_rate": 0.5,
+        }
+
+
+@pytest.mark.unit
+class TestSharedRedis:
+    async def test_arun_runs_off_the_event_loop(self):
+        shared = SharedRedis("test")
+        shared._client = FakeRedis()
+        shared._client.data["k"] = b"v"
+        threads = []
+
+        def call(client):
+            threads.append(threading.get_ident())
+            return client.get("k")
+
+        assert await shared.arun("get", call) == b"v"
+        assert threads and threads[0] != threading.get_ident()
+
+    async def test_failure_backs_off_and_returns_default(self):
+        shared = SharedRedis("test")
+        shared._client = client = FakeRedis()
+        client.fail = True
+
+        assert await shared.arun("get", lambda c: c.get("k"), default="missing") == "missing"
+        client.fail = False
+        # Inside the back-off window Redis is not contacted
+        assert shared.run("get", lambda c: c.get("k"), default="skipped") == "skipped"
+        assert not shared.available
+
+
+@pytest.mark.unit
+class TestCacheKey:
+    def test_similar_profiles_share_key(self):
+        table = make_weight_table()
+
+        assert recommendation_cache_key("DEV", table, metrics(7.1, 5.0)) == (
+            recommendation_cache_key("DEV", table, list(reversed(metrics(6.9, 5.0))))
+        )
+        assert recommendation_cache_key("DEV", table, metrics(7.1, 5.0)) != (
+            recommendation_cache_key("DEV", table, metrics(8.0, 5.0))
+        )
+
+    def test_weights_activity_and_prompt_change_key(self, monkeypatch):
+        key = recommendation_cache_key("DEV", make_weight_table(), metrics(7, 5))
+        edited = make_weight_table(
+            [{"metric_code": "A", "weight": "0.5"}, {"metric_code": "B", "weight": "0.5"}]
+        )
+
+        assert recommendation_cache_key("DEV", edited, metrics(7, 5)) != key
+        assert recommendation_cache_key("QA", make_weight_table(), metrics(7, 5)) != key
+        monkeypatch.setattr(recommendation_cache.RecommendationsGenerator, "PROMPT_VERSION", "next")
+        assert recommendation_cache_key("DEV", make_weight_table(), metrics(7, 5)) != key
+
+
+@pytest.mark.unit
+class TestRecommendationCache:
+    async def test_shared_tier_fills_other_processes(self, cache):
+        recommendations = [{"title": "Наставник", "skill_focus": "x", "development_advice": "y"}]
+        await cache.set("k", recommendations)
+
+        other = RecommendationCache()
+        other._redis._client = cache._redis._client
+
+        assert await other.get("k") == recommendations
+        assert await other.get("missing") is None
+        assert other.stats()["shared"] == {"hits": 1, "misses": 1, "hit_rate": 0.5}
+
+    async def test_redis_failure_falls_back_to_local(self, cache):
+        cache._redis._client.fail = True
+        await cache.set("k", [{"title": "t"}])
+
+        assert await cache.get("k") == [{"title": "t"}]
+        assert cache.stats()["shared"] is None
+
+    async def test_disabled(self, cache, monkeypatch):
+        monkeypatch.setattr(recommendation_cache.settings, "recommendations_cache_enabled", False)
+        await cache.set("k", [{"title": "t"}])
+
+        assert await cache.get("k") is None
+        assert cache._redis._client.data == {}
@@ -0,0 +1,122 @@
+"""
+Tests for single-flight coordination of recommendation generation.
+
+The fake Redis emulates the two Lua scripts with the same semantics.
+"""
+
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.services import recommendation_flight
+from app.services.recommendation_flight import RecommendationFlights, flight_key
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values: dict[str, str] = {}
+        self.sets: dict[str, set[str]] = {}
+        self.fail = False
+
+    def eval(self, script, numkeys, flight, followers, scoring_result_id, *args):
+        if self.fail:
+            raise redis.ConnectionError("connection refused")
+        leader = self.values.get(flight)
+        if script == recommendation_flight._LEAD_OR_FOLLOW:
+            if leader is None:
+                self.values[flight] = scoring_result_id
+                return scoring_result_id
+            if leader != scoring_result_id:
+                self.sets.setdefault(followers, set()).add(scoring_result_id)
+            return leader
+        if script == recommendation_flight._COMPLETE:
+            if leader != scoring_result_id:
+                return []
+            self.values.pop(flight)
+            return sorted(self.sets.pop(followers, set()))
+        raise AssertionError("unexpected script")
+
+
+def make_weight_table():
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        weights=[{"metric_code": "A", "weight": "0.6"}, {"metric_code": "B", "weight": "0.4"}],
+    )
+
+
+@pytest.fixture
+def flights():
+    instance = RecommendationFlights()
+    instance._redis._client = FakeRedis()
+    return instance
+
+
+@pytest.mark.unit
+class TestRecommendationFlights:
+    async def test_first_leads_others_follow(self, flights):
+        assert await flights.lead_or_follow("f", "r1") == "r1"
+        assert await flights.lead_or_follow("f", "r2") == "r1"
+        assert await flights.lead_or_follow("f", "r3") == "r1"
+        # Leader retry keeps the flight
+        assert await flights.lead_or_follow("f", "r1") == "r1"
+
+        assert await flights.complete("f", "r1") == ["r2", "r3"]
+        # A follower checking back after completion leads a new flight
+        assert await flights.lead_or_follow("f", "r2") == "r2"
+
+    async def test_only_leader_completes(self, flights):
+        await flights.lead_or_follow("f", "r1")
+        await flights.lead_or_follow("f", "r2")
+
+        assert await flights.complete("f", "r2") == []
+        assert await flights.complete("f", "r1") == ["r2"]
+
+    async def test_redis_failure_fails_open(self, flights):
+        flights._redis._client.fail = True
+
+        assert await flights.lead_or_follow("f", "r1") == "r1"
+        assert await flights.lead_or_follow("f", "r2") == "r2"
+        assert await flights.complete("f", "r1") == []
+
+
+@pytest.mark.unit
+def test_flight_key_tracks_participant_and_snapshot():
+    participant_id, table = uuid.uuid4(), make_weight_table()
+    metrics = [{"code": "A", "value": 7.0}, {"code": "B", "value": 5.5}]
+
+    key = flight_key(participant_id, table, metrics)
+
+    assert flight_key(participant_id, table, list(reversed(metrics))) == key
+    assert flight_key(uuid.uuid4(), table, metrics) != key
+    assert flight_key(participant_id, table, [{"code": "A", "value": 7.0}]) != key
+    # Exact values: no quantization, unlike the recommendations cache
+    assert flight_key(participant_id, table, [{"code": "A", "value": 7.1}, metrics[1]]) != key
+
+
+@pytest.mark.unit
+def test_follower_checks_back_on_its_result(monkeypatch):
+    from app.tasks import recommendations as tasks
+
+    scheduled = []
+    monkeypatch.setattr(
+        tasks.generate_report_recommendations,
+        "apply_async",
+        lambda **options: scheduled.append(options),
+    )
+    monkeypatch.setattr(tasks.settings, "celery_task_always_eager", False)
+
+    tasks._follow_flight("r2", "r1", "req")
+
+    assert scheduled == [
+        {
+            "kwargs": {"scoring_result_id": "r2", "request_id": "req", "leader_id": "r1"},
+            "countdown": tasks.FLIGHT_RECHECK_S,
+        }
+    ]
+
+    # Eager tasks run inline: a re-check would recurse instead of waiting
+    monkeypatch.setattr(tasks.settings, "celery_task_always_eager", True)
+    tasks._follow_flight("r2", "r1", "req")
+    assert len(scheduled) == 1
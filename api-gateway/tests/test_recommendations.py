@@ -598,6 +598,202 @@ async def test_recommendations_generator_prompt_building():
     assert '"version": 3' in prompt
 
 
+def _text_response(payload: Any) -> dict[str, Any]:
+    text = payload if isinstance(payload, str) else json.dumps(payload, ensure_ascii=False)
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def _valid_recommendations(title: str) -> dict[str, Any]:
+    return {
+        "strengths": [{"title": title, "metric_codes": ["CODE"], "reason": "Причина"}],
+        "dev_areas": [{"title": title, "metric_codes": ["CODE"], "actions": ["Действие"]}],
+        "recommendations": [
+            {
+                "title": title,
+                "skill_focus": "Навык",
+                "development_advice": "Совет",
+                "recommended_formats": ["воркшоп"],
+            }
+        ],
+    }
+
+
+def _batch_items(*ids: str) -> list:
+    from app.services.recommendations import RecommendationsBatchItem
+
+    return [
+        RecommendationsBatchItem(
+            scoring_result_id=scoring_result_id,
+            metrics=[{"code": "CODE", "name": "Test", "unit": "балл", "value": 5.0, "weight": 1.0}],
+            score_pct=50.0,
+            prof_activity_code="TEST",
+            prof_activity_name="Тест",
+        )
+        for scoring_result_id in ids
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_recommendations_generator_batch_retries_only_failed_items():
+    """Batch: one request for all items, invalid/missing elements retried individually."""
+    transport = MockTransport()
+    transport.add_response(
+        _text_response(
+            [
+                {"scoring_result_id": "a", **_valid_recommendations("A")},
+                {"scoring_result_id": "b", "strengths": "not a list"},
+            ]
+        )
+    )
+    transport.add_response(_text_response(_valid_recommendations("B")))
+    transport.add_response(_text_response(_valid_recommendations("C")))
+
+    client = GeminiClient(api_key="test_key", transport=transport, offline=True)
+    results = await RecommendationsGenerator(client).generate_batch(_batch_items("a", "b", "c"))
+
+    assert {key: value.strengths[0].title for key, value in results.items()} == {
+        "a": "A",
+        "b": "B",
+        "c": "C",
+    }
+    assert transport.call_count == 3
+    batch_prompt = transport.requests[0]["json"]["contents"][0]["parts"][0]["text"]
+    assert '"scoring_result_id": "a"' in batch_prompt
+    assert '"scoring_result_id": "c"' in batch_prompt
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_recommendations_generator_batch_unparseable_response():
+    """Batch: an unparseable array falls back to per-item generation; errors stay per item."""
+    transport = MockTransport()
+    transport.add_response(_text_response("[{not json"))
+    transport.add_response(_text_response(_valid_recommendations("A")))
+    transport.add_response(_text_response("Invalid JSON"))
+    transport.add_response(_text_response("Invalid JSON"))
+
+    client = GeminiClient(api_key="test_key", transport=transport, offline=True)
+    results = await RecommendationsGenerator(client).generate_batch(_batch_items("a", "b"))
+
+    assert isinstance(results["a"], RecommendationsResponse)
+    assert isinstance(results["b"], ValueError)
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "raw_text",
+    [
+        "```json\n" + json.dumps(_valid_recommendations("A"), ensure_ascii=False) + "\n```",
+        json.dumps(_valid_recommendations("A"), ensure_ascii=False).replace("]", ", ]"),
+        # Cut off by max tokens inside the last recommendation
+        json.dumps(_valid_recommendations("A"), ensure_ascii=False)[:-40],
+    ],
+    ids=["fences", "trailing_commas", "truncated"],
+)
+async def test_recommendations_generator_repairs_locally(raw_text):
+    """Almost-valid JSON is repaired without a self-heal request."""
+    from app.services import recommendations as recommendations_module
+
+    transport = MockTransport()
+    transport.add_response(_text_response(raw_text))
+
+    client = GeminiClient(api_key="test_key", transport=transport, offline=True)
+    before = recommendations_module.parse_path_counts["repaired"]
+    result = await RecommendationsGenerator(client).generate(
+        metrics=[{"code": "CODE", "name": "Test", "unit": "балл", "value": 5.0, "weight": 1.0}],
+        score_pct=50.0,
+        prof_activity_code="TEST",
+        prof_activity_name="Test",
+    )
+
+    assert transport.call_count == 1
+    assert result.strengths[0].title == "A"
+    assert result.recommendations[0].title == "A"
+    assert recommendations_module.parse_path_counts["repaired"] == before + 1
+
+
+class FakeCounterRedis:
+    def __init__(self):
+        self.hashes: dict[str, dict[bytes, int]] = {}
+
+    def hincrby(self, key, field, amount):
+        counters = self.hashes.setdefault(key, {})
+        counters[field.encode()] = counters.get(field.encode(), 0) + amount
+        return counters[field.encode()]
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_parse_path_counters_are_shared_in_redis(monkeypatch):
+    """Parse paths are counted in Redis, so worker processes show up in the stats."""
+    from app.core.cache import SharedRedis
+    from app.services import recommendations as recommendations_module
+
+    shared = SharedRedis("recommendations_parse_path")
+    shared._client = FakeCounterRedis()
+    monkeypatch.setattr(recommendations_module, "_parse_path_redis", shared)
+
+    transport = MockTransport()
+    transport.add_response(
+        _text_response("```json\n" + json.dumps(_valid_recommendations("A")) + "\n```")
+    )
+    client = GeminiClient(api_key="test_key", transport=transport, offline=True)
+    await RecommendationsGenerator(client).generate(
+        metrics=[{"code": "CODE", "name": "Test", "unit": "балл", "value": 5.0, "weight": 1.0}],
+        score_pct=50.0,
+        prof_activity_code="TEST",
+        prof_activity_name="Test",
+    )
+
+    stats = recommendations_module.parse_path_stats()
+    assert stats["shared"]["repaired"] == 1
+    assert stats["shared"]["failed"] == 0
+    assert stats["local"]["repaired"] >= 1
+
+
+@pytest.mark.unit
+def test_parse_path_stats_without_redis(monkeypatch):
+    from app.core.cache import SharedRedis
+    from app.services import recommendations as recommendations_module
+
+    shared = SharedRedis("recommendations_parse_path")
+    shared.failed("test", RuntimeError("down"))
+    monkeypatch.setattr(recommendations_module, "_parse_path_redis", shared)
+
+    assert recommendations_module.parse_path_stats()["shared"] is None
+
+
+@pytest.mark.asyncio
+@pytest.mark.unit
+async def test_recommendations_generator_coerces_field_types():
+    """Scalar instead of list fields is fixed locally; incomplete items are dropped."""
+    payload = _valid_recommendations("A")
+    payload["dev_areas"][0]["actions"] = "Одно действие"
+    payload["recommendations"][0]["recommended_formats"] = "курс, воркшоп"
+    payload["strengths"].append({"title": "Без причины", "metric_codes": ["CODE"]})
+
+    transport = MockTransport()
+    transport.add_response(_text_response(payload))
+
+    client = GeminiClient(api_key="test_key", transport=transport, offline=True)
+    result = await RecommendationsGenerator(client).generate(
+        metrics=[{"code": "CODE", "name": "Test", "unit": "балл", "value": 5.0, "weight": 1.0}],
+        score_pct=50.0,
+        prof_activity_code="TEST",
+        prof_activity_name="Test",
+    )
+
+    assert transport.call_count == 1
+    assert len(result.strengths) == 1
+    assert result.dev_areas[0].actions == ["Одно действие"]
+    assert result.recommendations[0].recommended_formats == ["курс", "воркшоп"]
+
+
 # ===== Integration Tests (AI-08) =====
 
 
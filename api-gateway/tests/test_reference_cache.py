@@ -0,0 +1,205 @@
+"""
+Tests for the two-tier reference data cache (metric definitions, activities, mappings).
+"""
+
+import threading
+import uuid
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.schemas.metric import MetricDefResponse
+from app.services import reference_cache
+from app.services.metric_mapping import MetricMappingService
+from app.services.reference_cache import (
+    CHANNEL,
+    METRIC_DEFS,
+    METRIC_MAPPINGS,
+    SCOPES,
+    VERSIONS_KEY,
+    ReferenceCache,
+)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+        self.hashes: dict[str, dict[str, int]] = {}
+        self.published: list[tuple[str, str]] = []
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise redis.ConnectionError("connection refused")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self._check()
+        self.data[key] = value.encode()
+
+    def hget(self, key, field):
+        self._check()
+        value = self.hashes.get(key, {}).get(field)
+        return str(value).encode() if value is not None else None
+
+    def hincrby(self, key, field, amount):
+        self._check()
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = fields.get(field, 0) + amount
+        return fields[field]
+
+    def hgetall(self, key):
+        self._check()
+        return {k.encode(): str(v).encode() for k, v in self.hashes.get(key, {}).items()}
+
+    def publish(self, channel, message):
+        self._check()
+        self.published.append((channel, message))
+
+
+def metric_def(code):
+    return SimpleNamespace(
+        id=uuid.uuid4(),
+        code=code,
+        name=code,
+        name_ru=f"Метрика {code}",
+        description=None,
+        unit=None,
+        min_value=None,
+        max_value=None,
+        active=True,
+    )
+
+
+class CountingRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    async def list_all(self, active_only=False):
+        self.calls += 1
+        return self.rows
+
+
+@pytest.fixture
+def shared_redis(monkeypatch):
+    monkeypatch.setattr(reference_cache.settings, "reference_cache_enabled", True)
+    return FakeRedis()
+
+
+def make_cache(client):
+    cache = ReferenceCache(subscribe=False)
+    cache._redis._client = client
+    return cache
+
+
+def load(cache, repo):
+    return cache.get(METRIC_DEFS, "active", MetricDefResponse, repo.list_all)
+
+
+@pytest.mark.unit
+async def test_second_process_reads_redis_instead_of_database(shared_redis):
+    repo = CountingRepo([metric_def("A"), metric_def("B")])
+    api, worker = make_cache(shared_redis), make_cache(shared_redis)
+
+    first = await load(api, repo)
+    assert await load(api, repo) is first
+    from_redis = await load(worker, repo)
+
+    assert repo.calls == 1
+    assert from_redis == first
+    assert isinstance(from_redis[0], MetricDefResponse)
+    assert api.local.stats.hits == 1
+    stats = api.stats()
+    assert (stats["shared"]["hits"], stats["shared"]["misses"]) == (1, 1)
+
+
+@pytest.mark.unit
+async def test_invalidate_bumps_scope_version_and_runs_callbacks(shared_redis):
+    repo = CountingRepo([metric_def("A")])
+    cache = make_cache(shared_redis)
+    mapping = MetricMappingService()
+    mapping.load()
+    cache.on_invalidate(METRIC_MAPPINGS, mapping.mark_stale)
+
+    await load(cache, repo)
+    await cache.invalidate(METRIC_DEFS, "test")
+    repo.rows = [metric_def("A"), metric_def("C")]
+    reloaded = await load(cache, repo)
+
+    assert repo.calls == 2
+    assert [item.code for item in reloaded] == ["A", "C"]
+    assert shared_redis.hashes[VERSIONS_KEY] == {METRIC_DEFS: 1}
+    assert shared_redis.published == [(CHANNEL, METRIC_DEFS)]
+    assert mapping._loaded is True
+
+    await cache.invalidate(METRIC_MAPPINGS, "test")
+    assert mapping._loaded is False
+    assert mapping.get_supported_report_types()
+
+
+@pytest.mark.unit
+async def test_invalidation_during_load_keeps_stale_rows_out(shared_redis):
+    cache = make_cache(shared_redis)
+    rows = [metric_def("A")]
+
+    async def racing_loader(active_only=True):
+        await cache.invalidate(METRIC_DEFS, "concurrent write")
+        return rows
+
+    await cache.get(METRIC_DEFS, "active", MetricDefResponse, racing_loader)
+
+    assert len(cache.local) == 0
+    # Stored under the version read before the load, which readers no longer use
+    assert list(shared_redis.data) == ["cache:reference:metric_defs:active:v0"]
+
+
+@pytest.mark.unit
+async def test_listener_invalidation_clears_local_tier_on_next_get(shared_redis):
+    cache = make_cache(shared_redis)
+    repo = CountingRepo([metric_def("A")])
+    await load(cache, repo)
+
+    # As on the pub/sub listener thread: the local map is left to the loop
+    listener = threading.Thread(target=cache._drop, args=(SCOPES,))
+    listener.start()
+    listener.join()
+    assert len(cache.local) == 1
+
+    shared_redis.data.clear()
+    await load(cache, repo)
+
+    assert repo.calls == 2
+    assert len(cache.local) == 1
+
+
+@pytest.mark.unit
+async def test_redis_failure_keeps_local_tier(shared_redis):
+    shared_redis.fail = True
+    repo = CountingRepo([metric_def("A")])
+    cache = make_cache(shared_redis)
+
+    await load(cache, repo)
+    await load(cache, repo)
+    await cache.invalidate(METRIC_DEFS)
+    await load(cache, repo)
+
+    assert repo.calls == 2
+    assert cache.stats()["shared"] is None
+
+
+@pytest.mark.unit
+async def test_disabled_loads_every_time(shared_redis, monkeypatch):
+    monkeypatch.setattr(reference_cache.settings, "reference_cache_enabled", False)
+    repo = CountingRepo([metric_def("A")])
+    cache = make_cache(shared_redis)
+
+    await load(cache, repo)
+    await load(cache, repo)
+
+    assert repo.calls == 2
+    assert shared_redis.data == {}
@@ -0,0 +1,77 @@
+"""
+Tests for bulk ZIP upload helpers: manifest parsing and extraction chunking.
+"""
+
+import json
+import uuid
+from datetime import date
+
+import pytest
+
+from app.schemas.report import BulkUploadItem
+from app.services.report_bulk import ReportBulkUploadService, parse_manifest
+
+
+@pytest.mark.unit
+class TestParseManifest:
+    def test_csv_with_bom_and_optional_columns(self):
+        data = (
+            "\ufefffilename,external_id,full_name,birth_date\n"
+            "a.docx,EMP-1,Иванов Иван,1990-05-01\n"
+            "b.docx,EMP-2,,\n"
+        ).encode()
+
+        rows = parse_manifest("manifest.csv", data)
+
+        assert [(r.filename, r.external_id) for r in rows] == [
+            ("a.docx", "EMP-1"),
+            ("b.docx", "EMP-2"),
+        ]
+        assert rows[0].full_name == "Иванов Иван"
+        assert rows[0].birth_date == date(1990, 5, 1)
+        assert rows[1].full_name is None and rows[1].birth_date is None
+
+    def test_json_list(self):
+        data = json.dumps([{"filename": "a.docx", "external_id": 7}]).encode()
+
+        rows = parse_manifest("manifest.json", data)
+
+        assert rows[0].external_id == "7"
+
+    @pytest.mark.parametrize(
+        ("name", "data"),
+        [
+            ("manifest.csv", b"filename,external_id\na.docx,\n"),
+            ("manifest.csv", b"filename,external_id,birth_date\na.docx,E,01.05.1990\n"),
+            ("manifest.json", b'{"filename": "a.docx"}'),
+        ],
+    )
+    def test_invalid_manifest(self, name, data):
+        with pytest.raises(ValueError):
+            parse_manifest(name, data)
+
+
+@pytest.mark.unit
+class TestExtractionChunks:
+    def test_participant_reports_stay_together(self):
+        first, second, third = uuid.uuid4(), uuid.uuid4(), uuid.uuid4()
+        items = [
+            BulkUploadItem(filename=f"{i}.docx", report_id=uuid.uuid4(), participant_id=pid)
+            for i, pid in enumerate([first, first, second, second, second, third])
+        ]
+
+        chunks = ReportBulkUploadService.extraction_chunks(items, chunk_size=4)
+
+        ids = [str(item.report_id) for item in items]
+        assert chunks == [ids[0:2], ids[2:6]]
+
+    def test_oversized_participant_gets_own_chunk(self):
+        pid = uuid.uuid4()
+        items = [
+            BulkUploadItem(filename=f"{i}.docx", report_id=uuid.uuid4(), participant_id=pid)
+            for i in range(5)
+        ]
+
+        chunks = ReportBulkUploadService.extraction_chunks(items, chunk_size=2)
+
+        assert len(chunks) == 1 and len(chunks[0]) == 5
@@ -0,0 +1,120 @@
+"""
+Tests for the shared Jinja2 environment and the streamed bulk final report export.
+"""
+
+import io
+import json
+import uuid
+import zipfile
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from decimal import Decimal
+
+import pytest
+
+from app.services import report_export
+from app.services.report_export import MANIFEST_NAME, stream_final_reports_zip
+from app.services.report_template import (
+    FINAL_REPORT_TEMPLATE,
+    get_jinja_env,
+    precompile_templates,
+)
+
+
+def report(participant_id, name):
+    return {
+        "participant_id": participant_id,
+        "participant_name": name,
+        "report_date": datetime(2025, 1, 15, tzinfo=UTC),
+        "prof_activity_code": "DEV",
+        "prof_activity_name": "Developer",
+        "weight_table_id": str(uuid.uuid4()),
+        "score_pct": Decimal("75.00"),
+        "strengths": [],
+        "dev_areas": [],
+        "recommendations": [],
+        "recommendations_status": "disabled",
+        "recommendations_error": None,
+        "metrics": [],
+        "notes": "",
+        "template_version": "1.0.0",
+    }
+
+
+class FakeScoringService:
+    reports: dict = {}
+
+    def __init__(self, db):
+        pass
+
+    async def final_report_version(self, participant_id, prof_activity_code):
+        if participant_id not in self.reports:
+            raise ValueError(f"No scoring result found for participant {participant_id}")
+        return participant_id
+
+    async def generate_final_report(self, participant_id, prof_activity_code, version=None):
+        return self.reports[participant_id]
+
+
+@asynccontextmanager
+async def fake_session():
+    yield None
+
+
+@pytest.mark.unit
+def test_environment_is_shared_and_templates_precompiled():
+    env = get_jinja_env()
+
+    assert precompile_templates() >= 1
+    assert get_jinja_env() is env
+    assert env.get_template(FINAL_REPORT_TEMPLATE) is env.get_template(FINAL_REPORT_TEMPLATE)
+
+
+@pytest.mark.unit
+async def test_export_streams_members_in_order_and_lists_skipped(monkeypatch):
+    ids = [uuid.uuid4() for _ in range(5)]
+    missing = ids[2]
+    FakeScoringService.reports = {
+        pid: report(pid, f"Участник/{n}") for n, pid in enumerate(ids) if pid != missing
+    }
+    monkeypatch.setattr(report_export, "ScoringService", FakeScoringService)
+    monkeypatch.setattr(
+        report_export,
+        "render_report_files",
+        lambda data, include_pdf: [(f"{data['participant_id']}.html", b"<html></html>")],
+    )
+
+    chunks = [
+        chunk
+        async for chunk in stream_final_reports_zip(
+            "DEV", ids, session_factory=fake_session, concurrency=2
+        )
+    ]
+
+    # One chunk per report plus the manifest and central directory
+    assert len(chunks) == 5
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        names = archive.namelist()
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+    assert names == [f"{pid}.html" for pid in ids if pid != missing] + [MANIFEST_NAME]
+    assert [item["participant_id"] for item in manifest["errors"]] == [str(missing)]
+    assert len(manifest["exported"]) == 4
+
+
+@pytest.mark.unit
+async def test_export_renders_html_members_with_safe_names(monkeypatch):
+    pid = uuid.uuid4()
+    FakeScoringService.reports = {pid: report(pid, 'Иванов "Иван"/И.')}
+    monkeypatch.setattr(report_export, "ScoringService", FakeScoringService)
+
+    data = b"".join(
+        [
+            chunk
+            async for chunk in stream_final_reports_zip("DEV", [pid], session_factory=fake_session)
+        ]
+    )
+
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        html = archive.read(f"Иванов _Иван_И_{pid}.html").decode()
+    assert "<html" in html.lower()
+    assert "Иванов" in html
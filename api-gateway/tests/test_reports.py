@@ -1,5 +1,6 @@
 """Tests for report upload and download endpoints."""
 
+import zipfile
 from io import BytesIO
 
 import pytest
@@ -238,6 +239,87 @@ async def test_download_report_returns_file_with_etag(
     assert second_response.status_code == 304
 
 
+@pytest.mark.asyncio
+async def test_download_uses_stored_etag_and_supports_range(
+    test_env,
+    reports_storage,
+    client: AsyncClient,
+    auth_cookies: dict[str, str],
+    sample_participant: Participant,
+):
+    """304 and Range downloads use the ETag persisted at upload."""
+    payload = build_docx_bytes("Range content")
+    upload_response = await client.post(
+        f"/api/participants/{sample_participant.id}/reports",
+        files={
+            "file": (
+                "original.docx",
+                payload,
+                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            )
+        },
+        cookies=auth_cookies,
+    )
+    assert upload_response.status_code == 201
+    data = upload_response.json()
+    etag_header = f'"{data["etag"]}"'
+
+    # 304 is answered from the stored ETag even if the file is gone from disk
+    stored_path = reports_storage / data["file_ref"]["key"]
+    stored_path.rename(stored_path.with_suffix(".bak"))
+    not_modified = await client.get(
+        f"/api/reports/{data['id']}/download",
+        headers={"If-None-Match": etag_header},
+        cookies=auth_cookies,
+    )
+    assert not_modified.status_code == 304
+    stored_path.with_suffix(".bak").rename(stored_path)
+
+    partial = await client.get(
+        f"/api/reports/{data['id']}/download",
+        headers={"Range": "bytes=0-9"},
+        cookies=auth_cookies,
+    )
+    assert partial.status_code == 206
+    assert partial.content == payload[:10]
+    assert partial.headers["etag"] == etag_header
+
+
+@pytest.mark.asyncio
+async def test_download_offloaded_to_reverse_proxy(
+    test_env,
+    reports_storage,
+    client: AsyncClient,
+    auth_cookies: dict[str, str],
+    sample_participant: Participant,
+    monkeypatch,
+):
+    """With X-Accel-Redirect offload the app returns headers only."""
+    monkeypatch.setattr(settings, "report_download_offload", "x-accel-redirect")
+    upload_response = await client.post(
+        f"/api/participants/{sample_participant.id}/reports",
+        files={
+            "file": (
+                "original.docx",
+                build_docx_bytes("Offload content"),
+                "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            )
+        },
+        cookies=auth_cookies,
+    )
+    assert upload_response.status_code == 201
+    data = upload_response.json()
+
+    response = await client.get(f"/api/reports/{data['id']}/download", cookies=auth_cookies)
+
+    assert response.status_code == 200
+    assert response.content == b""
+    assert response.headers["x-accel-redirect"] == (
+        f"/protected-storage/{data['file_ref']['key']}"
+    )
+    assert "original.docx" in response.headers["content-disposition"]
+
+
 @pytest.mark.asyncio
 async def test_upload_requires_auth(
     test_env,
@@ -334,6 +416,122 @@ async def test_delete_report_success(
     assert download_response.status_code == 404
 
 
+@pytest.mark.asyncio
+async def test_duplicate_upload_shares_file_until_last_delete(
+    test_env,
+    reports_storage,
+    client: AsyncClient,
+    auth_cookies: dict[str, str],
+    sample_participant: Participant,
+):
+    """Identical uploads share one stored file; it is removed with the last report."""
+    payload = build_docx_bytes("Same content")
+    responses = []
+    for _ in range(2):
+        response = await client.post(
+            f"/api/participants/{sample_participant.id}/reports",
+            files={
+                "file": (
+                    "original.docx",
+                    payload,
+                    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+                )
+            },
+            cookies=auth_cookies,
+        )
+        assert response.status_code == 201
+        responses.append(response.json())
+
+    first, second = responses
+    assert first["id"] != second["id"]
+    assert first["file_ref"]["id"] == second["file_ref"]["id"]
+    assert first["etag"] == second["etag"]
+
+    stored_path = reports_storage / first["file_ref"]["key"]
+    assert stored_path.exists()
+    # Only one copy of the document is kept on disk
+    assert len(list(reports_storage.rglob("original.docx"))) == 1
+
+    delete_response = await client.delete(f"/api/reports/{first['id']}", cookies=auth_cookies)
+    assert delete_response.status_code == 204
+    assert stored_path.exists()
+
+    download_response = await client.get(
+        f"/api/reports/{second['id']}/download", cookies=auth_cookies
+    )
+    assert download_response.status_code == 200
+    assert download_response.content == payload
+
+    delete_response = await client.delete(f"/api/reports/{second['id']}", cookies=auth_cookies)
+    assert delete_response.status_code == 204
+    assert not stored_path.exists()
+
+
+@pytest.mark.asyncio
+async def test_bulk_zip_upload_creates_participants_and_reports(
+    test_env,
+    reports_storage,
+    client: AsyncClient,
+    auth_cookies: dict[str, str],
+    sample_participant: Participant,
+):
+    """ZIP with a manifest: existing participant reused, new one created, bad rows reported."""
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr(
+            "manifest.csv",
+            "filename,external_id,full_name,birth_date\n"
+            "a.docx,RPT-001,,\n"
+            "b.docx,EMP-NEW,Новый Участник,1990-05-01\n"
+            "missing.docx,RPT-001,,\n"
+            "c.docx,EMP-UNKNOWN,,\n",
+        )
+        zf.writestr("a.docx", build_docx_bytes("A"))
+        zf.writestr("b.docx", build_docx_bytes("B"))
+        zf.writestr("c.docx", build_docx_bytes("C"))
+
+    response = await client.post(
+        "/api/reports/bulk-upload",
+        files={"file": ("reports.zip", archive.getvalue(), "application/zip")},
+        data={"extract": "false"},
+        cookies=auth_cookies,
+    )
+
+    assert response.status_code == 201
+    body = response.json()
+    assert body["participants_created"] == 1
+    assert body["extraction_task_ids"] == []
+    items = {item["filename"]: item for item in body["items"]}
+    assert set(items) == {"a.docx", "b.docx"}
+    assert items["a.docx"]["participant_id"] == str(sample_participant.id)
+    assert items["b.docx"]["participant_created"] is True
+    assert {error["filename"] for error in body["errors"]} == {"missing.docx", "c.docx"}
+
+    reports_response = await client.get(
+        f"/api/participants/{sample_participant.id}/reports", cookies=auth_cookies
+    )
+    assert [r["id"] for r in reports_response.json()["items"]] == [items["a.docx"]["report_id"]]
+    assert reports_response.json()["items"][0]["status"] == "UPLOADED"
+
+
+@pytest.mark.asyncio
+async def test_bulk_upload_requires_manifest(
+    test_env, reports_storage, client: AsyncClient, auth_cookies: dict[str, str]
+):
+    archive = BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        zf.writestr("a.docx", build_docx_bytes("A"))
+
+    response = await client.post(
+        "/api/reports/bulk-upload",
+        files={"file": ("reports.zip", archive.getvalue(), "application/zip")},
+        cookies=auth_cookies,
+    )
+
+    assert response.status_code == 400
+    assert "manifest" in response.json()["detail"]
+
+
 @pytest.mark.asyncio
 async def test_delete_report_404(
     test_env,
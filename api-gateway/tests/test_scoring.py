@@ -335,6 +335,38 @@ async def test_api_calculate_score__unauthorized__returns_401(
     assert response.status_code == 401
 
 
+@pytest.mark.asyncio
+async def test_api_best_fit__ranks_activities_without_writing(
+    client,
+    db_session,
+    participant_with_metrics,
+    weight_table_with_batura_weights,
+    active_user_token,
+):
+    """
+    Best-fit ranking scores every activity read-only.
+    """
+    participant, _ = participant_with_metrics
+    prof_activity, _ = weight_table_with_batura_weights
+
+    response = await client.get(
+        f"/api/scoring/participants/{participant.id}/best-fit",
+        cookies={"access_token": active_user_token},
+    )
+
+    assert response.status_code == 200
+    data = response.json()
+    item = next(i for i in data["items"] if i["prof_activity_code"] == prof_activity.code)
+    assert Decimal(str(item["score_pct"])) == Decimal("71.25")
+    assert item["missing_metrics"] == []
+    assert Decimal(str(item["coverage_pct"])) == Decimal("100")
+    assert data["best"] == data["items"][0]["prof_activity_code"]
+
+    # Nothing saved
+    scoring_result_repo = ScoringResultRepository(db_session)
+    assert await scoring_result_repo.list_by_participant(participant.id) == []
+
+
 # ===== S2-03: Strengths/Dev Areas Tests =====
 
 
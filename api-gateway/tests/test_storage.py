@@ -0,0 +1,122 @@
+"""
+Tests for LOCAL report storage and the upload size guard.
+"""
+
+import hashlib
+from io import BytesIO
+from types import SimpleNamespace
+
+import pytest
+from fastapi import FastAPI, HTTPException, UploadFile
+from httpx import ASGITransport, AsyncClient
+
+from app.core.middleware import UploadSizeLimitMiddleware
+from app.services.report import ReportService
+from app.services.storage import FileTooLargeError, LocalReportStorage, get_report_storage
+
+
+def make_upload(payload: bytes) -> UploadFile:
+    return UploadFile(file=BytesIO(payload), filename="original.docx")
+
+
+@pytest.mark.unit
+class TestLocalReportStorage:
+    """Streaming save: hashes, atomic rename, cleanup."""
+
+    async def test_save_report_writes_file_and_hashes(self, tmp_path):
+        storage = LocalReportStorage(str(tmp_path))
+        payload = b"docx-bytes" * (LocalReportStorage.CHUNK_SIZE // 5)
+
+        stored = await storage.save_report(make_upload(payload), "reports/p/r/original.docx", 10**8)
+
+        assert stored.path.read_bytes() == payload
+        assert stored.size_bytes == len(payload)
+        assert stored.etag == hashlib.md5(payload).hexdigest()
+        assert stored.sha256 == hashlib.sha256(payload).hexdigest()
+        # No temporary files left next to the report
+        assert [p.name for p in stored.path.parent.iterdir()] == ["original.docx"]
+
+    async def test_oversized_upload_leaves_nothing_behind(self, tmp_path):
+        storage = LocalReportStorage(str(tmp_path))
+        key = "reports/p/r/original.docx"
+
+        with pytest.raises(FileTooLargeError):
+            await storage.save_report(make_upload(b"0" * 2048), key, max_bytes=1024)
+
+        assert list(storage.resolve_path(key).parent.iterdir()) == []
+
+    async def test_backend_interface_roundtrip(self, tmp_path):
+        storage = get_report_storage("LOCAL", SimpleNamespace(file_storage_base=str(tmp_path)))
+        key = storage.image_blob_key("ab" * 32)
+
+        await storage.write_bytes(key, b"0123456789", "image/png")
+
+        assert await storage.exists(key)
+        assert await storage.read_bytes(key) == b"0123456789"
+        assert b"".join([c async for c in storage.iter_bytes(key, 2, 5)]) == b"2345"
+        async with storage.local_copy(key) as path:
+            assert path.read_bytes() == b"0123456789"
+        await storage.delete(key)
+        assert not await storage.exists(key)
+        with pytest.raises(FileNotFoundError):
+            await storage.read_bytes(key)
+
+
+@pytest.mark.unit
+class TestParseRange:
+    """Single-range parsing for proxied object storage downloads."""
+
+    @pytest.mark.parametrize(
+        ("header", "expected"),
+        [
+            (None, None),
+            ("bytes=0-9", (0, 9)),
+            ("bytes=10-", (10, 99)),
+            ("bytes=-20", (80, 99)),
+            ("bytes=90-500", (90, 99)),
+            ("bytes=0-1,5-6", None),
+            ("items=0-1", None),
+        ],
+    )
+    def test_valid_and_ignored_ranges(self, header, expected):
+        assert ReportService.parse_range(header, 100) == expected
+
+    def test_unsatisfiable_range(self):
+        with pytest.raises(HTTPException) as exc_info:
+            ReportService.parse_range("bytes=200-300", 100)
+
+        assert exc_info.value.status_code == 416
+        assert exc_info.value.headers["Content-Range"] == "bytes */100"
+
+
+@pytest.mark.unit
+class TestUploadSizeLimitMiddleware:
+    """Content-Length based rejection before the body is read."""
+
+    @pytest.fixture
+    def client(self):
+        app = FastAPI()
+
+        @app.post("/api/participants/{participant_id}/reports")
+        async def upload(participant_id: str):
+            return {"ok": True}
+
+        @app.post("/api/other")
+        async def other():
+            return {"ok": True}
+
+        guarded = UploadSizeLimitMiddleware(app, max_bytes=lambda: 1000, overhead_bytes=0)
+        return AsyncClient(transport=ASGITransport(app=guarded), base_url="http://test")
+
+    async def test_rejects_by_content_length(self, client):
+        response = await client.post("/api/participants/123/reports", content=b"0" * 1001)
+
+        assert response.status_code == 413
+        assert response.json()["detail"] == "Report file exceeds maximum allowed size"
+
+    async def test_allows_within_limit_and_other_paths(self, client):
+        small = await client.post("/api/participants/123/reports", content=b"0" * 1000)
+        other = await client.post("/api/other", content=b"0" * 5000)
+
+        assert small.status_code == 200
+        assert other.status_code == 200
@@ -0,0 +1,185 @@
+"""
+Tests for the compiled weight-table cache.
+"""
+
+import uuid
+from decimal import Decimal
+from types import SimpleNamespace
+
+import pytest
+import redis
+
+from app.services import weight_catalog
+from app.services.scoring import ScoringService
+from app.services.weight_catalog import (
+    CHANNEL,
+    VERSION_KEY,
+    WeightCatalogCache,
+    load_weight_catalog,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data: dict[str, int] = {}
+        self.published: list[tuple[str, str]] = []
+        self.fail = False
+
+    def _check(self):
+        if self.fail:
+            raise redis.ConnectionError("connection refused")
+
+    def get(self, key):
+        self._check()
+        return self.data.get(key)
+
+    def incr(self, key):
+        self._check()
+        self.data[key] = self.data.get(key, 0) + 1
+        return self.data[key]
+
+    def publish(self, channel, message):
+        self._check()
+        self.published.append((channel, message))
+
+
+class CountingRepo:
+    def __init__(self, rows):
+        self.rows = rows
+        self.calls = 0
+
+    async def list_all(self, active_only=False):
+        self.calls += 1
+        return self.rows
+
+
+ACTIVITY = SimpleNamespace(id=uuid.uuid4(), code="DEV", name="Developer")
+
+
+def make_repos(weights=None):
+    weight_table = SimpleNamespace(
+        id=uuid.uuid4(),
+        prof_activity=ACTIVITY,
+        weights=weights
+        or [{"metric_code": "A", "weight": "0.75"}, {"metric_code": "B", "weight": "0.25"}],
+    )
+    metric_defs = [
+        SimpleNamespace(code=code, name=code, name_ru=f"Метрика {code}", unit=None) for code in "AB"
+    ]
+    return CountingRepo([ACTIVITY]), CountingRepo([weight_table]), CountingRepo(metric_defs)
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    monkeypatch.setattr(weight_catalog.settings, "weight_cache_enabled", True)
+    instance = WeightCatalogCache(subscribe=False, clock=FakeClock())
+    instance._redis._client = FakeRedis()
+    monkeypatch.setattr(weight_catalog, "_cache", instance)
+    return instance
+
+
+def loader(repos):
+    async def load(version):
+        return await load_weight_catalog(*repos, version=version)
+
+    return load
+
+
+@pytest.mark.unit
+async def test_catalog_parses_weights_once():
+    catalog = await load_weight_catalog(*make_repos())
+
+    table = catalog.weight_tables["DEV"]
+    assert table.metric_codes == ("A", "B")
+    assert table.weights_map == {"A": Decimal("0.75"), "B": Decimal("0.25")}
+    assert table.error is None
+    assert catalog.compiled_activity("DEV").column == 0
+    assert catalog.metric_defs["A"].name_ru == "Метрика A"
+
+    broken = await load_weight_catalog(*make_repos([{"metric_code": "A", "weight": "0.5"}]))
+    assert broken.weight_tables["DEV"].error == "Sum of weights must equal 1.0, got 0.5"
+    with pytest.raises(ValueError, match="Sum of weights"):
+        broken.compiled_activity("DEV")
+
+
+@pytest.mark.unit
+async def test_invalidate_bumps_version_and_reloads(cache):
+    repos = make_repos()
+
+    first = await cache.get(loader(repos))
+    assert await cache.get(loader(repos)) is first
+    assert repos[1].calls == 1
+
+    await cache.invalidate("test")
+
+    assert cache._redis._client.data[VERSION_KEY] == 1
+    assert cache._redis._client.published == [(CHANNEL, "1")]
+    reloaded = await cache.get(loader(repos))
+    assert reloaded is not first and reloaded.version == 1
+    assert cache.stats()["local"]["hits"] == 1
+    assert cache.stats()["local"]["reloads"] == 2
+
+
+@pytest.mark.unit
+async def test_ttl_bounds_staleness_without_redis(cache, monkeypatch):
+    monkeypatch.setattr(weight_catalog.settings, "weight_cache_ttl_sec", 60)
+    cache._redis._client.fail = True
+    repos = make_repos()
+
+    await cache.get(loader(repos))
+    cache._clock.now = 59
+    await cache.get(loader(repos))
+    cache._clock.now = 61
+    await cache.get(loader(repos))
+
+    assert repos[1].calls == 2
+
+
+@pytest.mark.unit
+async def test_disabled_loads_every_time(cache, monkeypatch):
+    monkeypatch.setattr(weight_catalog.settings, "weight_cache_enabled", False)
+    repos = make_repos()
+
+    await cache.get(loader(repos))
+    await cache.get(loader(repos))
+
+    assert repos[1].calls == 2
+
+
+@pytest.mark.unit
+async def test_warm_calculate_score_reads_only_participant_metrics(cache, monkeypatch):
+    monkeypatch.setattr(weight_catalog.settings, "ai_recommendations_enabled", False)
+    participant_id = uuid.uuid4()
+    metric_reads = []
+    saved = []
+
+    async def get_metrics_dict(pid):
+        metric_reads.append(pid)
+        return {"A": Decimal("7.00"), "B": Decimal("9.00")}
+
+    async def create(**fields):
+        saved.append(fields)
+        return SimpleNamespace(id=uuid.uuid4(), recommendations_error=None, **fields)
+
+    repos = make_repos()
+    service = ScoringService(db=None)
+    service.prof_activity_repo, service.weight_table_repo, service.metric_def_repo = repos
+    service.participant_metric_repo = SimpleNamespace(get_metrics_dict=get_metrics_dict)
+    service.scoring_result_repo = SimpleNamespace(create=create)
+
+    await service.calculate_score(participant_id, "DEV")
+    result = await service.calculate_score(participant_id, "DEV")
+
+    assert [repo.calls for repo in repos] == [1, 1, 1]
+    assert metric_reads == [participant_id, participant_id]
+    assert result["score_pct"] == Decimal("75.00")
+    assert [item["metric_name"] for item in result["strengths"]] == ["Метрика B", "Метрика A"]
+    assert saved[-1]["recommendations_status"] == "disabled"
@@ -85,5 +85,17 @@ export const participantsApi = {
       data
     )
     return response.data
+  },
+
+  /**
+   * Подписаться на события статусов отчётов и рекомендаций участника (SSE)
+   * Авторизация — httpOnly cookie, EventSource отправляет её сам.
+   * @param {string} participantId - UUID участника
+   * @returns {EventSource}
+   */
+  subscribeEvents(participantId) {
+    return new EventSource(`/api/events/participants/${participantId}`, {
+      withCredentials: true
+    })
   }
 }